@@ -13,6 +13,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app.core.database import Base
+from app.core.locks import STARTUP_LOCK, FileLock
 from app.models.project import Project
 from app.models.user import User  # Import all models
 
@@ -75,5 +76,7 @@ def run_migrations_online() -> None:
 if context.is_offline_mode():
     run_migrations_offline()
 else:
-    run_migrations_online()
+    # Same lock as the app's startup: one migrator, workers wait for it
+    with FileLock(STARTUP_LOCK).hold():
+        run_migrations_online()
 
@@ -0,0 +1,41 @@
+"""Per-service project routes
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+Adds projects.routes (JSON list of service routes with optional
+load-balancer settings). NULL keeps the single default route.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def column_exists(table_name, column_name):
+    """Check if column exists in table"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = [c['name'] for c in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def upgrade() -> None:
+    if not column_exists('projects', 'routes'):
+        with op.batch_alter_table('projects') as batch_op:
+            batch_op.add_column(sa.Column('routes', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('routes')
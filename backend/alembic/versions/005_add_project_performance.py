@@ -0,0 +1,42 @@
+"""Per-project performance middlewares
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+Adds projects.performance (JSON settings for Traefik middlewares:
+compression, cache headers, rate/in-flight limits, retry, circuit
+breaker, HTTPS/HTTP2). NULL means no middlewares.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def column_exists(table_name, column_name):
+    """Check if column exists in table"""
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    columns = [c['name'] for c in inspector.get_columns(table_name)]
+    return column_name in columns
+
+
+def upgrade() -> None:
+    if not column_exists('projects', 'performance'):
+        with op.batch_alter_table('projects') as batch_op:
+            batch_op.add_column(sa.Column('performance', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_column('performance')
@@ -0,0 +1,267 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from app.core.security import get_current_active_user
+from app.core.profiling import profile_store
+from app.core.locks import leader
+from app.core.scheduler import scheduler
+from app.core.config import settings
+from app.models.user import User
+from app.models.schemas import JobResponse, SnapshotCreate, SnapshotRestore
+from app.services.backup_service import BackupService
+from app.services.log_service import LogService
+from app.services.restore_service import RestoreService, reconcile_restore
+from app.services.snapshot_service import SnapshotService
+from app.services.job_service import job_manager
+from app.constants.messages import ErrorMessages
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def check_is_admin(current_user: User) -> None:
+    """Check if current user is admin"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail=ErrorMessages.ADMIN_REQUIRED
+        )
+
+
+@router.get("/profiles")
+async def list_profiles(
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """
+    List captured request profiles, newest first (admin only)
+
+    Profiles are captured for admin requests sent with the X-Profile: 1
+    header (or ?profile=1) and for requests slower than
+    PROFILING_SLOW_REQUEST_MS, when PROFILING_ENABLED is set.
+    """
+    check_is_admin(current_user)
+
+    return {
+        "enabled": settings.PROFILING_ENABLED,
+        "slow_request_ms": settings.PROFILING_SLOW_REQUEST_MS,
+        "profiles": profile_store.summaries(),
+    }
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """Get a captured profile with its call tree (admin only)"""
+    check_is_admin(current_user)
+
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorMessages.PROFILE_NOT_FOUND,
+        )
+
+    return profile
+
+
+@router.delete("/profiles", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_profiles(
+    current_user: User = Depends(get_current_active_user),
+) -> None:
+    """Delete all captured profiles (admin only)"""
+    check_is_admin(current_user)
+
+    profile_store.clear()
+
+
+@router.get("/scheduler")
+async def get_scheduler(
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """
+    List periodic jobs and their last results (admin only)
+
+    Jobs run in the leader worker only; a request served by another worker
+    ("leader": false) reports the run state the leader last published.
+    """
+    check_is_admin(current_user)
+
+    state = scheduler.state() if scheduler.running else scheduler.read_state()
+    if state is None:
+        # No leader has started the scheduler yet
+        state = {"running": False, "jobs": [job.to_dict() for job in scheduler.jobs]}
+    return {
+        "enabled": settings.SCHEDULER_ENABLED,
+        "leader": leader.is_leader,
+        **state,
+    }
+
+
+def _run_backup() -> dict:
+    """Backup job body (raises so the job is reported as failed)"""
+    result, error = BackupService().create_backup(trigger="api")
+    if error or result is None:
+        raise Exception(error or "Backup failed")
+    return result
+
+
+@router.post(
+    "/backups", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED
+)
+async def create_backup(
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """
+    Start a database backup (admin only)
+
+    A consistent snapshot of the database is written to BACKUP_DIR by a
+    background job; poll it at the Location URL, its result holds the
+    archive name, size, SHA-256 and manifest. Host configuration files
+    (.env, docker-compose.yml) are added by `./docklite maint backup` only.
+    """
+    check_is_admin(current_user)
+
+    job = job_manager.submit(
+        "backup", _run_backup, owner_id=int(current_user.id), target="database"
+    )
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job.to_dict()
+
+
+@router.get("/backups")
+async def list_backups(
+    current_user: User = Depends(get_current_active_user),
+) -> list[dict]:
+    """List backup archives in BACKUP_DIR, newest first (admin only)"""
+    check_is_admin(current_user)
+
+    return await asyncio.to_thread(BackupService().list_backups)
+
+
+def _run_snapshot(projects: Optional[list[str]], volumes: Optional[bool]) -> dict:
+    """Snapshot job body (raises so the job is reported as failed)"""
+    result, error = SnapshotService().create_snapshot(
+        projects=projects, volumes=volumes, trigger="api"
+    )
+    if error or result is None:
+        raise Exception(error or "Snapshot failed")
+    return result
+
+
+@router.post(
+    "/snapshots", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED
+)
+async def create_snapshot(
+    response: Response,
+    snapshot: Optional[SnapshotCreate] = None,
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """
+    Start an incremental snapshot (admin only)
+
+    The database, project directories (all, or the given slugs) and their
+    named volumes are chunked into the store in BACKUP_DIR; only chunks
+    not stored yet are written. Poll the job at the Location URL, its
+    result holds the snapshot ID, per-source sizes and chunk statistics.
+    """
+    check_is_admin(current_user)
+
+    snapshot = snapshot or SnapshotCreate()
+    job = job_manager.submit(
+        "snapshot",
+        _run_snapshot,
+        snapshot.projects,
+        snapshot.volumes,
+        owner_id=int(current_user.id),
+        target=",".join(snapshot.projects) if snapshot.projects else "all",
+    )
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job.to_dict()
+
+
+@router.get("/snapshots")
+async def list_snapshots(
+    current_user: User = Depends(get_current_active_user),
+) -> list[dict]:
+    """List incremental snapshots, newest first (admin only)"""
+    check_is_admin(current_user)
+
+    return await asyncio.to_thread(SnapshotService().list_snapshots)
+
+
+async def _run_restore(
+    snapshot_id: str,
+    database: bool,
+    projects: Optional[list[str]],
+    volumes: Optional[list[str]],
+) -> dict:
+    """Restore job body (raises so the job is reported as failed)"""
+    result, error = await asyncio.to_thread(
+        RestoreService().restore_snapshot, snapshot_id, database, projects, volumes
+    )
+    if error or result is None:
+        raise Exception(error or "Restore failed")
+    return await reconcile_restore(result)
+
+
+@router.post(
+    "/snapshots/{snapshot_id}/restore",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def restore_snapshot(
+    snapshot_id: str,
+    response: Response,
+    restore: Optional[SnapshotRestore] = None,
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """
+    Restore a snapshot in place (admin only)
+
+    The database, the given projects (with their volumes) and volumes, or
+    everything when nothing is selected, are staged and verified while
+    running; only the affected projects' containers are stopped for the
+    final swap. snapshot_id may be "latest". Poll the job at the Location
+    URL; restart the backend after restoring the database. Host files
+    (.env, ...) are restored by `./docklite maint restore` only.
+    """
+    check_is_admin(current_user)
+
+    restore = restore or SnapshotRestore()
+    job = job_manager.submit(
+        "restore",
+        _run_restore,
+        snapshot_id,
+        restore.database,
+        restore.projects,
+        restore.volumes,
+        owner_id=int(current_user.id),
+        target=snapshot_id,
+    )
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job.to_dict()
+
+
+@router.get("/logs/usage")
+async def get_log_usage(
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """
+    Container log disk usage by project (admin only)
+
+    Lists each container's log driver and rotation options; "unbounded"
+    names containers whose logs can grow without limit (created before
+    the logging policy: redeploy them to apply it).
+    """
+    check_is_admin(current_user)
+
+    result, error = await asyncio.to_thread(LogService().get_usage)
+    if error or result is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=error or "Cannot read log usage",
+        )
+    return result
@@ -2,20 +2,41 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from app.core.security import get_current_active_user
+import asyncio
+import shlex
+from typing import Awaitable, Callable, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketException,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.security import get_current_active_user, get_websocket_user
 from app.models.user import User
+from app.services.container_metrics import MAX_POINTS, read_store
+from app.services.docker_api import HijackedStream
 from app.services.docker_service import DockerService
+from app.services.exec_service import ExecSession, SessionSlots
 from app.constants.messages import ErrorMessages
 from app.types import ContainerOperation
-
+from app.utils.formatters import parse_duration
 
 router = APIRouter(prefix="/containers", tags=["containers"])
 
 # System containers that cannot be stopped/restarted/removed via API
 SYSTEM_CONTAINERS = ["docklite-backend", "docklite-frontend", "docklite-traefik"]
 
+# Interactive sessions (exec/attach), capped across workers
+session_slots = SessionSlots()
+
 
 def check_is_admin(current_user: User) -> None:
     """Check if current user is admin"""
@@ -324,3 +345,216 @@ async def get_container_stats(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get stats: {str(e)}",
         )
+
+
+@router.get("/{container_id}/metrics")
+async def get_container_metrics(
+    container_id: str,
+    range_: str = Query("24h", alias="range", description="e.g. 1h, 24h, 30d"),
+    step: str = Query("5m", description="e.g. 15s, 5m, 1h"),
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """
+    Get a container's resource usage history (admin only).
+
+    Points are averages and peaks over each step; steps finer than the
+    stored resolution for the range are widened to it.
+
+    Args:
+        container_id: Container name or ID
+        range_: How far back from now
+        step: Width of each point
+        current_user: Current authenticated user
+
+    Returns:
+        {"container", "id", "project", "tier", "range", "step",
+        "timestamps", "metrics": {name: {"avg", "max"}}}
+    """
+    check_is_admin(current_user)
+
+    range_seconds, step_seconds = parse_duration(range_), parse_duration(step)
+    if not range_seconds or not step_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="range and step must be durations like 30s, 5m, 2h or 7d",
+        )
+    if range_seconds / step_seconds > MAX_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_POINTS} points per query: use a larger step",
+        )
+
+    def query() -> Optional[dict]:
+        return read_store().query(container_id, range_seconds, step_seconds)
+
+    result = await asyncio.to_thread(query)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No metrics recorded for container {container_id}",
+        )
+    return result
+
+
+def check_session_allowed(current_user: User) -> None:
+    """Check an interactive session may be opened (admins, feature enabled)"""
+    if not current_user.is_admin:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason=ErrorMessages.ADMIN_REQUIRED
+        )
+    if settings.EXEC_MAX_SESSIONS <= 0:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason="Interactive sessions are disabled",
+        )
+
+
+async def run_session(
+    websocket: WebSocket,
+    open_stream: Callable[
+        [DockerService], Awaitable[tuple[Optional[HijackedStream], Optional[str]]]
+    ],
+    resize: Callable[[DockerService, int, int], tuple[bool, Optional[str]]],
+    exit_code: Optional[Callable[[DockerService], Optional[int]]] = None,
+) -> None:
+    """
+    Relay an accepted-to-be WebSocket to a Docker stream within a session slot
+
+    Sessions over EXEC_MAX_SESSIONS are refused with close code 1013 (try
+    again later). Docker errors are sent as {"type": "error"} before closing.
+    """
+    slot = session_slots.acquire()
+    if slot is None:
+        raise WebSocketException(
+            code=status.WS_1013_TRY_AGAIN_LATER,
+            reason=f"Too many sessions (max {settings.EXEC_MAX_SESSIONS})",
+        )
+    try:
+        await websocket.accept()
+        try:
+            docker_service = await asyncio.to_thread(DockerService)
+            stream, error = await open_stream(docker_service)
+        except Exception as e:
+            stream, error = None, str(e)
+        if stream is None:
+            await websocket.send_json({"type": "error", "message": error})
+            await websocket.close(status.WS_1011_INTERNAL_ERROR)
+            return
+
+        session = ExecSession(
+            websocket,
+            stream,
+            lambda rows, cols: resize(docker_service, rows, cols),
+            (lambda: exit_code(docker_service)) if exit_code else None,
+        )
+        await session.run()
+    finally:
+        slot.release()
+
+
+@router.websocket("/{container_id}/exec")
+async def exec_container(
+    websocket: WebSocket,
+    container_id: str,
+    cmd: str = Query("/bin/sh", description="Command line (shell quoting)"),
+    tty: bool = Query(True, description="Allocate a pseudo-TTY"),
+    rows: Optional[int] = Query(None, gt=0, description="Initial terminal rows"),
+    cols: Optional[int] = Query(None, gt=0, description="Initial terminal columns"),
+    current_user: User = Depends(get_websocket_user),
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    """
+    Interactive `docker exec` over a WebSocket (admin only).
+
+    Binary frames carry stdin (client to server) and output (server to
+    client; stdout and stderr are merged). Text frames are JSON control
+    messages: the client sends {"type": "resize", "rows": R, "cols": C},
+    the server sends {"type": "exit", "exit_code": N} when the command
+    ends, or {"type": "error", "message": ...}.
+
+    Args:
+        websocket: Client connection (Bearer header or token cookie)
+        container_id: Container ID or name
+        cmd: Command to run
+        tty: Allocate a pseudo-TTY
+        rows: Initial terminal height
+        cols: Initial terminal width
+        current_user: Current authenticated user
+        db: Database session (closed before relaying)
+    """
+    check_session_allowed(current_user)
+    # Don't hold a DB connection (and SQLite read lock) for the session
+    await db.close()
+    try:
+        command = shlex.split(cmd)
+    except ValueError as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=str(e))
+    if not command:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Empty command"
+        )
+
+    # Set by open_stream; resizes and the exit code are only asked for once
+    # the stream is open
+    exec_id: Optional[str] = None
+
+    async def open_stream(
+        docker_service: DockerService,
+    ) -> tuple[Optional[HijackedStream], Optional[str]]:
+        nonlocal exec_id
+        created, error = await asyncio.to_thread(
+            docker_service.create_exec, container_id, command, tty, rows, cols
+        )
+        if error:
+            return None, error
+        assert created is not None
+        exec_id = created
+        return await asyncio.to_thread(docker_service.start_exec, created, tty)
+
+    def resize(
+        docker_service: DockerService, rows: int, cols: int
+    ) -> tuple[bool, Optional[str]]:
+        assert exec_id is not None
+        return docker_service.resize_exec(exec_id, rows, cols)
+
+    def exit_code(docker_service: DockerService) -> Optional[int]:
+        assert exec_id is not None
+        return docker_service.get_exec_exit_code(exec_id)
+
+    await run_session(websocket, open_stream, resize, exit_code)
+
+
+@router.websocket("/{container_id}/attach")
+async def attach_container(
+    websocket: WebSocket,
+    container_id: str,
+    current_user: User = Depends(get_websocket_user),
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    """
+    Attach to a running container's main process over a WebSocket (admin only).
+
+    Same frames as the exec endpoint. Detaching (closing the WebSocket)
+    leaves the container running.
+
+    Args:
+        websocket: Client connection (Bearer header or token cookie)
+        container_id: Container ID or name
+        current_user: Current authenticated user
+        db: Database session (closed before relaying)
+    """
+    check_session_allowed(current_user)
+    await db.close()
+
+    async def open_stream(
+        docker_service: DockerService,
+    ) -> tuple[Optional[HijackedStream], Optional[str]]:
+        return await asyncio.to_thread(docker_service.attach_container, container_id)
+
+    await run_session(
+        websocket,
+        open_stream,
+        lambda docker_service, r, c: docker_service.resize_container(
+            container_id, r, c
+        ),
+    )
@@ -0,0 +1,105 @@
+from typing import AsyncGenerator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.events import TOPICS, hub
+from app.core.security import get_current_user_with_cookie
+from app.models.user import User
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# Client reconnect delay sent to EventSource (milliseconds)
+RETRY_MS = 5000
+
+
+def parse_topics(topics: Optional[str]) -> frozenset[str]:
+    """
+    Parse the comma-separated topics filter
+
+    Args:
+        topics: e.g. "containers,stats" (None/empty: all topics)
+
+    Returns:
+        Set of topics
+
+    Raises:
+        HTTPException: 400 for unknown topics
+    """
+    if not topics:
+        return frozenset(TOPICS)
+    requested = frozenset(t.strip() for t in topics.split(",") if t.strip())
+    unknown = requested - set(TOPICS)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown topics: {', '.join(sorted(unknown))}. "
+            f"Available: {', '.join(TOPICS)}",
+        )
+    return requested
+
+
+async def event_stream(
+    topics: frozenset[str], user_id: int, is_admin: bool
+) -> AsyncGenerator[str, None]:
+    """
+    Server-sent events for one client
+
+    Sends a comment line on idle streams (keeps proxies from closing the
+    connection) and a "dropped" event when the client fell behind and
+    events were discarded, so it can refetch state.
+    """
+    # Subscribed here, not in the endpoint: unsubscribing in `finally` then
+    # covers every way the stream can end
+    subscription = hub.subscribe(topics, user_id, is_admin)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        while not subscription.closed:
+            events = await subscription.get(timeout=settings.EVENTS_KEEPALIVE_SECONDS)
+            if subscription.dropped:
+                yield f'event: dropped\ndata: {{"count": {subscription.dropped}}}\n\n'
+                subscription.dropped = 0
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            yield "".join(event.to_sse() for event in events)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@router.get("")
+async def stream_events(
+    topics: Optional[str] = Query(
+        None, description=f"Comma-separated topics ({', '.join(TOPICS)}); all if empty"
+    ),
+    current_user: User = Depends(get_current_user_with_cookie),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Real-time updates as server-sent events
+
+    One multiplexed stream (event name = topic) replaces polling: container
+    state changes, project changes, background job progress and container
+    stats samples. Non-admins only receive events of their own projects and
+    jobs. Authenticates with the Bearer header or the token cookie (browsers'
+    EventSource can't send headers).
+    """
+    if not settings.EVENTS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    requested = parse_topics(topics)
+
+    # Don't hold a DB connection (and SQLite read lock) for the stream's life
+    await db.close()
+
+    return StreamingResponse(
+        event_stream(requested, int(current_user.id), bool(current_user.is_admin)),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop Traefik/nginx from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+    )
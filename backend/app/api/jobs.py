@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.security import get_current_active_user
+from app.models.user import User
+from app.models.schemas import JobResponse
+from app.services.job_service import job_manager
+from app.constants.messages import ErrorMessages
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """Get background job status (with ownership check)"""
+    job = job_manager.get(
+        job_id, user_id=int(current_user.id), is_admin=bool(current_user.is_admin)
+    )
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=ErrorMessages.JOB_NOT_FOUND
+        )
+
+    return job.to_dict()
@@ -0,0 +1,138 @@
+"""API endpoints for the container log archive."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants.messages import ErrorMessages
+from app.core.database import get_db
+from app.core.security import get_current_active_user
+from app.models.project import Project
+from app.models.user import User
+from app.services.log_archive import MAX_SEARCH_LIMIT, LogArchive
+from app.utils.formatters import parse_duration
+
+router = APIRouter(prefix="/logs", tags=["logs"])
+
+
+def parse_time(value: Optional[str], now: float) -> Optional[float]:
+    """
+    Parse a since/until parameter
+
+    Args:
+        value: Relative to now ("15m", "2h", "7d"), UNIX seconds or an
+            ISO 8601 date/time (UTC if no offset)
+        now: Current UNIX time
+
+    Returns:
+        UNIX time, or None for no value
+
+    Raises:
+        HTTPException: 400 for unparseable values
+    """
+    if not value:
+        return None
+    relative = parse_duration(value)
+    if relative is not None:
+        return now - relative
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid time: {value!r} (e.g. 15m, 2h, 7d, a UNIX time "
+            "or 2024-05-01T12:00:00Z)",
+        )
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+async def visible_projects(
+    project: Optional[str], current_user: User, db: AsyncSession
+) -> Optional[list[str]]:
+    """
+    Projects whose logs a search covers
+
+    Admins search any project (all of them, containers outside projects
+    included, without a filter); users only the projects they own.
+
+    Returns:
+        Project slugs, or None for no restriction
+
+    Raises:
+        HTTPException: 404 if a user asks for a project they don't own
+    """
+    if current_user.is_admin:
+        return [project] if project else None
+
+    query = select(Project.slug).where(Project.owner_id == current_user.id)
+    if project:
+        query = query.where(Project.slug == project)
+    result = await db.execute(query)
+    slugs = [str(slug) for slug in result.scalars().all()]
+    if project and not slugs:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorMessages.PROJECT_NOT_FOUND,
+        )
+    return slugs
+
+
+@router.get("/search")
+async def search_logs(
+    q: str = Query("", description="Words all lines must contain (word* for prefixes)"),
+    project: Optional[str] = Query(None, description="Project slug"),
+    container: Optional[str] = Query(None, description="Container name"),
+    since: Optional[str] = Query(None, description="e.g. 15m, 2h, 7d or a time"),
+    until: Optional[str] = Query(None, description="Same formats as since"),
+    limit: int = Query(100, ge=1, le=MAX_SEARCH_LIMIT),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """
+    Search archived container logs, newest lines first
+
+    Users see the logs of their own projects, admins all logs.
+
+    Args:
+        q: Search words (empty: any line)
+        project: Only this project
+        container: Only this container
+        since: Only lines from this time on
+        until: Only lines before this time
+        limit: Most lines returned
+        current_user: Current authenticated user
+        db: Database session
+
+    Returns:
+        {"lines": [{"time", "project", "container", "stream", "message"}]}
+    """
+    now = time.time()
+    start, end = parse_time(since, now), parse_time(until, now)
+    projects = await visible_projects(project, current_user, db)
+    if projects == []:
+        return {"lines": []}
+
+    def search() -> tuple[list[dict], Optional[str]]:
+        archive = LogArchive()
+        try:
+            return archive.search(q, projects, container, start, end, limit)
+        finally:
+            archive.close()
+
+    lines, error = await asyncio.to_thread(search)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    return {"lines": lines}
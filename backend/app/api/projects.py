@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict
 
@@ -10,6 +10,7 @@ from app.models.schemas import (
     ProjectUpdate,
     ProjectResponse,
     ProjectListResponse,
+    JobResponse,
 )
 from app.services.project_service import ProjectService
 from app.utils.formatters import format_project_response
@@ -96,22 +97,31 @@ async def update_project(
     return format_project_response(updated_project)
 
 
-@router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{project_id}", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED
+)
 async def delete_project(
     project_id: int,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
-) -> None:
-    """Delete project (with ownership check)"""
+) -> dict:
+    """
+    Delete project (with ownership check)
+
+    The project is removed right away; its files are removed by a background
+    job whose status can be polled at the Location URL.
+    """
     service = ProjectService(db)
-    success, error = await service.delete_project(
+    job, error = await service.delete_project(
         project_id, user_id=int(current_user.id), is_admin=bool(current_user.is_admin)
     )
 
-    if not success:
+    if error or not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=error)
 
-    return None
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job.to_dict()
 
 
 @router.get("/{project_id}/env", response_model=Dict[str, str])
@@ -0,0 +1,37 @@
+"""
+Relay admin RPC requests from stdin to the admin socket.
+
+Used by the ./docklite CLI when it can't open the socket itself (e.g. not
+running as the socket's owner): one `docker compose exec -T backend python
+-m app.cli_helpers.rpc_call` carries all requests of a command.
+"""
+
+import socket
+import sys
+
+from app.core.admin_rpc import socket_path
+
+
+def main() -> int:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path()))
+    except OSError as e:
+        print(f"ERROR: admin socket unavailable: {e}", file=sys.stderr)
+        return 1
+
+    responses = sock.makefile("rb")
+    with sock, responses:
+        for line in sys.stdin.buffer:
+            sock.sendall(line)
+            response = responses.readline()
+            if not response:
+                print("ERROR: admin socket closed", file=sys.stderr)
+                return 1
+            sys.stdout.buffer.write(response)
+            sys.stdout.buffer.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,11 +3,13 @@ Application constants
 """
 
 from .project_constants import ProjectStatus, PROJECT_STATUS_MAP
+from .job_constants import JobStatus
 from .messages import ErrorMessages, SuccessMessages
 
 __all__ = [
     "ProjectStatus",
     "PROJECT_STATUS_MAP",
+    "JobStatus",
     "ErrorMessages",
     "SuccessMessages",
 ]
@@ -0,0 +1,21 @@
+"""
+Background job constants
+"""
+
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    """Background job status enum"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+# Finished jobs kept for status polling (oldest are dropped first)
+MAX_FINISHED_JOBS = 100
+
+# Job records of other (possibly exited) workers are deleted after a day
+JOB_RECORD_MAX_AGE_SECONDS = 24 * 3600
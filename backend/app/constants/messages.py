@@ -16,6 +16,12 @@ class ErrorMessages:
     PROJECT_EXISTS = "Project with this domain already exists"
     INVALID_COMPOSE = "Invalid docker-compose.yml content"
 
+    # Jobs
+    JOB_NOT_FOUND = "Job not found"
+
+    # Admin
+    PROFILE_NOT_FOUND = "Profile not found"
+
     # Users
     USER_NOT_FOUND = "User not found"
     USERNAME_EXISTS = "Username already exists"
@@ -0,0 +1,234 @@
+"""
+Admin RPC
+Local administration channel for the ./docklite CLI: newline-delimited JSON
+over a unix socket served by the leader worker, so CLI commands talk to the
+running backend instead of starting an interpreter in the container per
+call. Access is limited by the socket's file permissions (owner only).
+
+Request:  {"id": 1, "method": "users.list", "params": {...}}
+Response: {"id": 1, "result": ...}
+          {"id": 1, "error": {"code": "not_found", "message": "..."}}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.core.locks import lock_dir
+from app.core.metrics import ADMIN_RPC_REQUESTS
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Error codes
+INVALID_REQUEST = "invalid_request"
+METHOD_NOT_FOUND = "method_not_found"
+INVALID_PARAMS = "invalid_params"
+NOT_FOUND = "not_found"
+CONFLICT = "conflict"
+INTERNAL_ERROR = "internal_error"
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+class RPCError(Exception):
+    """Error reported to the caller (code + message)"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+    def to_dict(self) -> dict:
+        return {"code": self.code, "message": self.message}
+
+
+def socket_path() -> Path:
+    """Path of the admin socket (ADMIN_RPC_SOCKET, else in LOCK_DIR)"""
+    if settings.ADMIN_RPC_SOCKET:
+        return Path(settings.ADMIN_RPC_SOCKET)
+    return lock_dir() / "admin.sock"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encode(message: dict) -> bytes:
+    """Serialize one message line"""
+    return json.dumps(message, default=_json_default).encode() + b"\n"
+
+
+class AdminRPCServer:
+    """
+    Method registry and unix socket server
+
+    Requests of one connection are handled in order; connections are
+    independent, so a long batch call doesn't block other CLI commands.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._methods: dict[str, Handler] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._bound: Optional[Path] = None
+        self._connections: set[asyncio.StreamWriter] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    @property
+    def methods(self) -> list[str]:
+        return sorted(self._methods)
+
+    def add_method(self, name: str, handler: Handler) -> None:
+        """
+        Register a method
+
+        Args:
+            name: Method name (e.g. "users.list")
+            handler: Coroutine function; request params are passed as keyword
+                arguments, the return value must be JSON-serializable
+        """
+        self._methods[name] = handler
+
+    def method(self, name: str) -> Callable[[Handler], Handler]:
+        """Decorator form of add_method"""
+
+        def register(handler: Handler) -> Handler:
+            self.add_method(name, handler)
+            return handler
+
+        return register
+
+    async def dispatch(self, request: Any) -> dict:
+        """
+        Run one request
+
+        Args:
+            request: Decoded request object
+
+        Returns:
+            Response object (result or error)
+        """
+        request_id = request.get("id") if isinstance(request, dict) else None
+        method = request.get("method") if isinstance(request, dict) else None
+        try:
+            if not isinstance(method, str):
+                raise RPCError(
+                    INVALID_REQUEST, "Request must be an object with a method"
+                )
+            handler = self._methods.get(method)
+            if handler is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Unknown method: {method}")
+            params = request.get("params") or {}
+            if not isinstance(params, dict):
+                raise RPCError(INVALID_PARAMS, "params must be an object")
+            try:
+                inspect.signature(handler).bind(**params)
+            except TypeError as e:
+                raise RPCError(INVALID_PARAMS, str(e))
+            result = await handler(**params)
+        except RPCError as e:
+            ADMIN_RPC_REQUESTS.inc(str(method), "error")
+            return {"id": request_id, "error": e.to_dict()}
+        except Exception as e:
+            logger.exception(f"Admin RPC {method} failed")
+            ADMIN_RPC_REQUESTS.inc(str(method), "error")
+            return {
+                "id": request_id,
+                "error": {"code": INTERNAL_ERROR, "message": str(e)},
+            }
+        ADMIN_RPC_REQUESTS.inc(method, "ok")
+        return {"id": request_id, "result": result}
+
+    async def start(self) -> None:
+        """Bind the socket (replacing a stale one) and start serving"""
+        if self._server is not None or not settings.ADMIN_RPC_ENABLED:
+            return
+        path = self.path or socket_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.unlink(missing_ok=True)
+            # Owner-only from the bind on: a chmod afterwards would leave a
+            # window in which any local user can connect
+            umask = os.umask(0o177)
+            try:
+                self._server = await asyncio.start_unix_server(
+                    self._serve,
+                    path=str(path),
+                    limit=settings.ADMIN_RPC_MAX_REQUEST_BYTES,
+                )
+            finally:
+                os.umask(umask)
+            os.chmod(path, 0o600)
+        except OSError as e:
+            logger.warning(f"Admin RPC socket {path} unavailable: {e}")
+            return
+        self._bound = path
+        logger.info(f"Admin RPC listening on {path}")
+
+    async def stop(self) -> None:
+        """Stop serving and remove the socket"""
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+        if self._bound is not None:
+            self._bound.unlink(missing_ok=True)
+            self._bound = None
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Line over ADMIN_RPC_MAX_REQUEST_BYTES: the stream can't
+                    # be resynchronized, so answer and hang up
+                    error = RPCError(INVALID_REQUEST, "Request too large")
+                    writer.write(encode({"id": None, "error": error.to_dict()}))
+                    await writer.drain()
+                    return
+                if not line:
+                    return
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    error = RPCError(INVALID_REQUEST, "Malformed JSON")
+                    response = {"id": None, "error": error.to_dict()}
+                else:
+                    response = await self.dispatch(request)
+                writer.write(encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+
+# Server of this worker (bound by the leader only)
+admin_rpc = AdminRPCServer()
+
+
+@admin_rpc.method("ping")
+async def ping() -> dict:
+    """Liveness check; reports the serving worker"""
+    return {"pid": os.getpid(), "methods": admin_rpc.methods}
@@ -12,6 +12,7 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./docklite.db"
+    DATABASE_ECHO: bool = False  # Log every SQL statement (debugging only)
 
     # Security
     SECRET_KEY: str = "dev-secret-key-change-in-production"
@@ -23,16 +24,137 @@ class Settings(BaseSettings):
     DEPLOY_USER: str = "docklite"
     DEPLOY_HOST: str = "localhost"
     DEPLOY_PORT: int = 22
+    # Write-behind window for .env edits (rapid edits coalesce into one write)
+    ENV_WRITE_DELAY_MS: int = 200
+
+    # Docker
+    # Engine API unix socket (e.g. /var/run/docker.sock). Empty: use the
+    # docker CLI. Also used to point the backend at a fake daemon in tests.
+    DOCKER_API_SOCKET: str = ""
+    # Docker's per-container directories (log files; mounted read-only)
+    DOCKER_CONTAINERS_DIR: str = "/var/lib/docker/containers"
+    # Container stats read from cgroup v2 files when CGROUP_ROOT is a v2
+    # hierarchy that shows the containers' cgroups (in a container: the
+    # host's /sys/fs/cgroup mounted read-only), else from the Engine API
+    CGROUP_STATS_ENABLED: bool = True
+    CGROUP_ROOT: str = "/sys/fs/cgroup"
+    # Host /proc, for network counters (cgroups have none); unset: network
+    # counters of cgroup-sampled containers are unknown (None, "N/A")
+    CGROUP_PROC_ROOT: str = ""
+
+    # Container logs: policy injected into every service of project compose
+    # files, so Docker rotates the logs and they never fill the disk
+    # "json-file", "local" (compressed) or "" (leave compose files alone)
+    PROJECT_LOG_DRIVER: str = "json-file"
+    PROJECT_LOG_MAX_SIZE: str = "10m"  # Rotate a container's log at this size
+    PROJECT_LOG_MAX_FILE: int = 3  # Log files kept per container (with the current one)
+    # Log archive: the leader worker follows the logs of running containers
+    # into a full-text indexed SQLite database (GET /api/logs/search)
+    LOG_ARCHIVE_ENABLED: bool = True
+    LOG_ARCHIVE_PATH: Optional[str] = None  # None: logs.db next to the database
+    LOG_ARCHIVE_RETENTION_DAYS: int = 7  # Older lines are pruned
+    LOG_ARCHIVE_MAX_MB: int = 1024  # Oldest lines pruned above this size (0: no cap)
+    LOG_ARCHIVE_FLUSH_SECONDS: float = 2.0  # Lines are written in batches this often
+    LOG_ARCHIVE_SCAN_SECONDS: int = 15  # Started containers are followed within this
+    LOG_ARCHIVE_PRUNE_CRON: str = "*/10 * * * *"  # Retention ("": off)
 
     # Server
     HOSTNAME: Optional[str] = None  # If set, overrides system hostname
+    # Production server (gunicorn.conf.py / python -m app.main)
+    WEB_CONCURRENCY: int = 0  # Worker processes (0: CPU count + 1, max 8)
+    SERVER_KEEPALIVE: int = 95  # Seconds; longer than Traefik's 90s idle timeout
+    SERVER_BACKLOG: int = 2048  # Pending connections queue
+    SERVER_MAX_REQUESTS: int = 10000  # Recycle a worker after N requests (0: never)
+    SERVER_MAX_REQUESTS_JITTER: int = 1000  # Spread recycling of workers
+    SERVER_GRACEFUL_TIMEOUT: int = 30  # Seconds to finish requests on recycle/stop
+    SERVER_RELOAD: bool = False  # Auto-reload (python -m app.main, development)
+    # Lock files coordinating workers (None: next to the SQLite database)
+    LOCK_DIR: Optional[str] = None
+    LEADER_RETRY_SECONDS: int = 5  # Followers retry the leader lock this often
+
+    # Scheduler (periodic jobs, run by the leader worker only)
+    SCHEDULER_ENABLED: bool = True
+    RECONCILE_INTERVAL_SECONDS: int = 300  # Project files / Traefik config (0: off)
+    CONTAINER_SAMPLE_INTERVAL_SECONDS: int = 60  # docklite_containers gauge (0: off)
+    TRASH_CLEANUP_CRON: str = "*/30 * * * *"  # Stale trash removal ("": off)
+    TRASH_STALE_SECONDS: int = 3600  # Trash directories older than this are stale
+
+    # Real-time events (GET /api/events, server-sent events)
+    EVENTS_ENABLED: bool = True
+    EVENTS_QUEUE_SIZE: int = 100  # Per client; oldest events dropped when full
+    EVENTS_KEEPALIVE_SECONDS: int = 15  # Comment line sent on idle streams
+    EVENTS_STATS_INTERVAL_SECONDS: int = 15  # Container stats samples (0: off)
+
+    # Interactive container sessions (WebSocket exec/attach, admin only)
+    EXEC_MAX_SESSIONS: int = 8  # Concurrent sessions across all workers (0: off)
+    EXEC_IDLE_TIMEOUT_SECONDS: int = 1800  # Close sessions without traffic
+    EXEC_BUFFER_SIZE: int = 64 * 1024  # Bytes read from Docker per frame
+
+    # Admin RPC (local unix socket for ./docklite CLI commands, leader only)
+    ADMIN_RPC_ENABLED: bool = True
+    # Socket path (None: LOCK_DIR/admin.sock); owner-only permissions
+    ADMIN_RPC_SOCKET: Optional[str] = None
+    ADMIN_RPC_MAX_REQUEST_BYTES: int = 16 * 1024 * 1024  # One request line
+
+    # Backups (consistent SQLite snapshots in compressed, checksummed archives)
+    BACKUP_DIR: str = "./backups"  # Archives (bind-mounted to ./backups on the host)
+    BACKUP_COMPRESSION: str = "auto"  # "zstd", "gzip" or "auto" (zstd if installed)
+    BACKUP_COMPRESSION_LEVEL: int = 0  # 0: codec default (zstd 3, gzip 6)
+    BACKUP_THREADS: int = 0  # Compression and snapshot threads (0: one per CPU)
+    # Databases up to this size are snapshotted in memory; larger ones to a
+    # temp file next to the archive
+    BACKUP_SNAPSHOT_MEMORY_MAX_BYTES: int = 256 * 1024 * 1024
+    # Incremental snapshots: content-addressed chunk store in BACKUP_DIR/store
+    # holding the database, project directories and named volumes
+    BACKUP_CHUNK_SIZE: int = 1024 * 1024  # Files are stored as chunks of this size
+    BACKUP_SNAPSHOT_KEEP: int = 14  # Newest snapshots kept; older ones pruned (0: all)
+    BACKUP_SNAPSHOT_CRON: str = ""  # Scheduled snapshots, e.g. "0 3 * * *" ("": off)
+    BACKUP_SNAPSHOT_VOLUMES: bool = True  # Include the named volumes of projects
+    BACKUP_HELPER_IMAGE: str = "busybox:stable"  # Copies and swaps volume data
+    # Pause a project's running containers while its volumes are copied, so
+    # databases in them are snapshotted consistently (False: copied live)
+    BACKUP_PAUSE_CONTAINERS: bool = True
+    # Seconds project containers get to stop before restored data is swapped in
+    BACKUP_RESTORE_STOP_TIMEOUT: int = 30
 
     # Traefik
     TRAEFIK_DASHBOARD_HOST: str = "localhost"  # Host for Traefik dashboard
+    # "labels" - routing labels in each project's compose (Docker provider)
+    # "file" - single dynamic config file watched by Traefik's file provider
+    TRAEFIK_ROUTING_MODE: str = "labels"
+    TRAEFIK_DYNAMIC_CONFIG_DIR: str = "/etc/traefik/dynamic"
+    # ACME resolver for project HTTPS routers (None: Traefik default cert)
+    TRAEFIK_CERT_RESOLVER: Optional[str] = None
 
     # API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
 
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" (one object per line) or "text"
+    # Sampling of high-volume loggers: "logger=fraction kept,..."
+    # e.g. "docklite.access=0.1" (warnings/errors are always kept)
+    LOG_SAMPLING: str = ""
+    ACCESS_LOG_ENABLED: bool = True
+
+    # Monitoring
+    METRICS_ENABLED: bool = True  # Prometheus text format at /metrics
+    # Container metrics history (GET /api/containers/{id}/metrics): the leader
+    # samples all running containers into in-memory ring buffers (raw samples
+    # for an hour, 1-minute rollups for a day, 1-hour rollups for the
+    # retention) and writes them to disk, where other workers read them
+    CONTAINER_METRICS_ENABLED: bool = True
+    CONTAINER_METRICS_INTERVAL_SECONDS: int = 15  # Raw sample resolution
+    CONTAINER_METRICS_RETENTION_DAYS: int = 30  # Hourly rollups kept
+    # None: metrics.tsdb next to the SQLite database
+    CONTAINER_METRICS_PATH: Optional[str] = None
+    CONTAINER_METRICS_COMPACT_SECONDS: int = 60  # Written to disk this often
+    # Request profiling (admin X-Profile: 1 header / ?profile=1, slow requests)
+    PROFILING_ENABLED: bool = False  # Off: hooks not installed at all
+    PROFILING_SLOW_REQUEST_MS: int = 0  # Capture requests slower than this (0: off)
+    PROFILING_INTERVAL_MS: int = 5  # Stack sampling interval
+    PROFILING_MAX_PROFILES: int = 50  # Captured profiles kept (LOCK_DIR/profiles)
+
 
 settings = Settings()
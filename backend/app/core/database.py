@@ -1,9 +1,13 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
 # Create async engine
-engine = create_async_engine(settings.DATABASE_URL, echo=True, future=True)
+engine = create_async_engine(
+    settings.DATABASE_URL, echo=settings.DATABASE_ECHO, future=True
+)
+instrument_engine(engine)
 
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -0,0 +1,372 @@
+"""
+Real-time event hub
+Events (container state changes, project changes, job progress, stats
+samples) are fanned out to the server-sent event streams of GET
+/api/events. Each worker has a hub; workers exchange events over unix
+datagram sockets in LOCK_DIR/events, so a subscriber sees events published
+by any worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import os
+import socket
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.locks import lock_dir
+from app.core.metrics import EVENT_SUBSCRIBERS, EVENTS_DROPPED, EVENTS_PUBLISHED
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Event topics
+TOPIC_CONTAINERS = "containers"  # Container state changes (Docker events)
+TOPIC_PROJECTS = "projects"  # Project created/updated/deleted
+TOPIC_JOBS = "jobs"  # Background job progress
+TOPIC_STATS = "stats"  # Container resource usage samples, per project
+TOPICS = (TOPIC_CONTAINERS, TOPIC_PROJECTS, TOPIC_JOBS, TOPIC_STATS)
+
+# Peer socket list is re-read at most this often (workers come and go)
+PEER_REFRESH_SECONDS = 1.0
+# Largest datagram read from peers
+MAX_DATAGRAM = 256 * 1024
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class Event:
+    """
+    Event published to subscribers
+
+    owner_id scopes visibility: admins see every event, other users only
+    events of their own projects/jobs (owner_id None: admins only).
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self, topic: str, type: str, data: dict, owner_id: Optional[int] = None
+    ):
+        self.id = next(self._ids)
+        self.topic = topic
+        self.type = type
+        self.data = data
+        self.owner_id = owner_id
+
+    def visible_to(self, user_id: int, is_admin: bool) -> bool:
+        """Check if a user may see the event"""
+        return is_admin or (self.owner_id is not None and self.owner_id == user_id)
+
+    def to_message(self) -> dict:
+        """Serializable form (bus datagrams)"""
+        return {
+            "topic": self.topic,
+            "type": self.type,
+            "data": self.data,
+            "owner_id": self.owner_id,
+        }
+
+    def to_sse(self) -> str:
+        """Format as a server-sent event (event name is the topic)"""
+        data = json.dumps({"type": self.type, **self.data}, default=_json_default)
+        return f"id: {self.id}\nevent: {self.topic}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """
+    One client's event queue
+
+    The queue is bounded: when a slow client falls behind, its oldest
+    events are dropped (and counted) instead of buffering without limit.
+    """
+
+    def __init__(self, topics: frozenset[str], user_id: int, is_admin: bool, size: int):
+        self.topics = topics
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self.dropped = 0
+        self.closed = False
+        self._queue: deque[Event] = deque(maxlen=size)
+        self._ready = asyncio.Event()
+
+    def offer(self, event: Event) -> None:
+        """Queue an event if the subscriber wants and may see it"""
+        if event.topic not in self.topics:
+            return
+        if not event.visible_to(self.user_id, self.is_admin):
+            return
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+            EVENTS_DROPPED.inc(event.topic)
+        self._queue.append(event)
+        self._ready.set()
+
+    def close(self) -> None:
+        """End the stream (server shutdown)"""
+        self.closed = True
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> list[Event]:
+        """
+        Wait for events
+
+        Args:
+            timeout: Seconds to wait (None: forever)
+
+        Returns:
+            Queued events (empty on timeout or when closed)
+        """
+        if not self._queue and not self.closed:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._ready.clear()
+        events = list(self._queue)
+        self._queue.clear()
+        return events
+
+
+class EventBus:
+    """Unix datagram sockets connecting the hubs of one instance's workers"""
+
+    def __init__(self, directory: Optional[Path] = None, name: Optional[str] = None):
+        self.directory = directory
+        # Socket/marker name, the worker's pid (liveness checks use it)
+        self.name = name or str(os.getpid())
+        self._sock: Optional[socket.socket] = None
+        self._path: Optional[Path] = None
+        self._peers: list[Path] = []
+        self._peers_read = 0.0
+
+    def open(self) -> socket.socket:
+        """Bind this worker's socket"""
+        directory = self._directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        self._path = directory / f"{self.name}.sock"
+        self._path.unlink(missing_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(str(self._path))
+        sock.setblocking(False)
+        self._sock = sock
+        return sock
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._path is not None:
+            self._path.unlink(missing_ok=True)
+            for marker in self._path.parent.glob(f"*.{self.name}.want"):
+                marker.unlink(missing_ok=True)
+            self._path = None
+
+    def set_interest(self, topic: str, interested: bool) -> None:
+        """Mark whether this worker has subscribers of a topic"""
+        if self._path is None:
+            return
+        marker = self._path.parent / f"{topic}.{self.name}.want"
+        if interested:
+            marker.touch()
+        else:
+            marker.unlink(missing_ok=True)
+
+    def has_interest(self, topic: str) -> bool:
+        """Check if any live worker has subscribers of a topic"""
+        if self._path is None:
+            return False
+        for marker in self._path.parent.glob(f"{topic}.*.want"):
+            try:
+                os.kill(int(marker.name.split(".")[1]), 0)
+            except ProcessLookupError:
+                # Marker of a worker that exited without cleanup
+                marker.unlink(missing_ok=True)
+                continue
+            except (ValueError, PermissionError):
+                pass
+            return True
+        return False
+
+    def send(self, payload: bytes) -> None:
+        """Send to every other worker (never blocks: full peers miss it)"""
+        if self._sock is None or self._path is None:
+            return
+        for peer in self._peer_paths():
+            try:
+                self._sock.sendto(payload, str(peer))
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Socket of a worker that exited without cleanup
+                peer.unlink(missing_ok=True)
+                self._peers_read = 0.0
+            except BlockingIOError:
+                EVENTS_DROPPED.inc("bus")
+            except OSError as e:
+                logger.warning(f"Event bus send to {peer.name} failed: {e}")
+
+    def receive(self) -> list[bytes]:
+        """Read all pending datagrams"""
+        payloads = []
+        while self._sock is not None:
+            try:
+                payloads.append(self._sock.recv(MAX_DATAGRAM))
+            except BlockingIOError:
+                break
+        return payloads
+
+    def _directory(self) -> Path:
+        return self.directory or lock_dir() / "events"
+
+    def _peer_paths(self) -> list[Path]:
+        own = self._path
+        if own is None:
+            return []
+        now = time.monotonic()
+        if now - self._peers_read > PEER_REFRESH_SECONDS:
+            self._peers = [path for path in own.parent.glob("*.sock") if path != own]
+            self._peers_read = now
+        return self._peers
+
+
+class EventHub:
+    """Subscriber registry and publisher of this worker"""
+
+    def __init__(self, bus: Optional[EventBus] = None) -> None:
+        self._subscriptions: set[Subscription] = set()
+        self._topic_subscribers: dict[str, int] = {}
+        self._bus = bus or EventBus()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bus_fd: Optional[int] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def has_interest(self, topic: str) -> bool:
+        """
+        Check if any worker has subscribers of a topic
+
+        Lets publishers skip producing expensive events nobody watches.
+        """
+        return self._topic_subscribers.get(topic, 0) > 0 or self._bus.has_interest(
+            topic
+        )
+
+    def subscribe(
+        self, topics: frozenset[str], user_id: int, is_admin: bool
+    ) -> Subscription:
+        """
+        Register a subscriber
+
+        Args:
+            topics: Topics to receive
+            user_id: Subscriber's user ID
+            is_admin: Admins receive events of all users
+
+        Returns:
+            Subscription (unsubscribe when the client disconnects)
+        """
+        subscription = Subscription(
+            topics, user_id, is_admin, settings.EVENTS_QUEUE_SIZE
+        )
+        self._subscriptions.add(subscription)
+        EVENT_SUBSCRIBERS.inc()
+        for topic in topics:
+            count = self._topic_subscribers.get(topic, 0) + 1
+            self._topic_subscribers[topic] = count
+            if count == 1:
+                self._bus.set_interest(topic, True)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription not in self._subscriptions:
+            return
+        self._subscriptions.discard(subscription)
+        EVENT_SUBSCRIBERS.dec()
+        for topic in subscription.topics:
+            count = self._topic_subscribers.get(topic, 0) - 1
+            self._topic_subscribers[topic] = max(0, count)
+            if count <= 0:
+                self._bus.set_interest(topic, False)
+
+    def publish(
+        self, topic: str, type: str, data: dict, owner_id: Optional[int] = None
+    ) -> None:
+        """
+        Publish an event to subscribers of all workers
+
+        Args:
+            topic: One of TOPICS
+            type: Event type within the topic (e.g. "start", "created")
+            data: JSON-serializable payload
+            owner_id: User whose resource this is (None: admins only)
+        """
+        if not settings.EVENTS_ENABLED:
+            return
+        event = Event(topic, type, data, owner_id)
+        EVENTS_PUBLISHED.inc(topic)
+        self._deliver(event)
+        try:
+            payload = json.dumps(event.to_message(), default=_json_default).encode()
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Event {topic}/{type} not serializable: {e}")
+            return
+        self._bus.send(payload)
+
+    async def start(self) -> None:
+        """Join the event bus (once per worker)"""
+        if self._bus_fd is not None or not settings.EVENTS_ENABLED:
+            return
+        try:
+            sock = self._bus.open()
+        except OSError as e:
+            logger.warning(f"Event bus unavailable, events stay in-worker: {e}")
+            return
+        for topic, count in self._topic_subscribers.items():
+            self._bus.set_interest(topic, count > 0)
+        self._loop = asyncio.get_running_loop()
+        self._bus_fd = sock.fileno()
+        self._loop.add_reader(self._bus_fd, self._on_bus_readable)
+
+    async def stop(self) -> None:
+        """Leave the bus and end all streams"""
+        if self._bus_fd is not None and self._loop is not None:
+            self._loop.remove_reader(self._bus_fd)
+            self._bus_fd = None
+        self._bus.close()
+        for subscription in list(self._subscriptions):
+            subscription.close()
+
+    def _deliver(self, event: Event) -> None:
+        for subscription in list(self._subscriptions):
+            subscription.offer(event)
+
+    def _on_bus_readable(self) -> None:
+        for payload in self._bus.receive():
+            try:
+                message = json.loads(payload)
+                event = Event(
+                    message["topic"],
+                    message["type"],
+                    message["data"],
+                    message.get("owner_id"),
+                )
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Malformed event bus message: {e}")
+                continue
+            self._deliver(event)
+
+
+# Hub of this worker
+hub = EventHub()
@@ -0,0 +1,191 @@
+"""
+Cross-worker locks
+Worker processes of one DockLite instance coordinate through flock()ed
+files in LOCK_DIR: a blocking lock serializes schema setup at startup, and
+a non-blocking one elects the single worker that runs background
+reconcilers. The kernel drops a process's locks when it exits, so a
+recycled or crashed leader is replaced by another worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import os
+import tempfile
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.metrics import WORKER_LEADER
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STARTUP_LOCK = "startup"
+LEADER_LOCK = "leader"
+
+
+def lock_dir() -> Path:
+    """
+    Directory of the lock files
+
+    LOCK_DIR, else the directory of the SQLite database (one set of locks
+    per database), else a temporary directory.
+    """
+    if settings.LOCK_DIR:
+        return Path(settings.LOCK_DIR)
+    url = make_url(settings.DATABASE_URL)
+    database = url.database
+    if url.get_backend_name() == "sqlite" and database and database != ":memory:":
+        return Path(database).resolve().parent
+    return Path(tempfile.gettempdir()) / "docklite"
+
+
+class FileLock:
+    """Exclusive flock() on LOCK_DIR/<name>.lock"""
+
+    def __init__(self, name: str, directory: Optional[Path] = None):
+        self.path = (directory or lock_dir()) / f"{name}.lock"
+        self._fd: Optional[int] = None
+
+    @property
+    def locked(self) -> bool:
+        """Check if this object holds the lock"""
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        Take the lock
+
+        Args:
+            blocking: Wait for it (False: give up immediately)
+
+        Returns:
+            True if the lock is held now
+        """
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        except BaseException:
+            os.close(fd)
+            raise
+        # Holder's pid, for humans looking at the lock file
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """Drop the lock (no-op when not held)"""
+        if self._fd is None:
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        """Hold the lock for a with-block (blocking)"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+@asynccontextmanager
+async def startup_lock() -> AsyncIterator[None]:
+    """
+    Serialize a startup section across workers
+
+    Schema creation and other one-time setup run in one worker at a time;
+    the others wait (in a thread, the event loop stays free).
+    """
+    lock = FileLock(STARTUP_LOCK)
+    await asyncio.to_thread(lock.acquire)
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+class LeaderElection:
+    """
+    Single-leader election among the workers of one host
+
+    The worker holding the leader lock runs the registered callbacks once
+    when elected. Followers retry every LEADER_RETRY_SECONDS and take over
+    when the leader exits.
+    """
+
+    def __init__(self, name: str = LEADER_LOCK):
+        self.name = name
+        self._lock: Optional[FileLock] = None
+        self._callbacks: list[Callable[[], Awaitable[None]]] = []
+        self._watcher: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock is not None and self._lock.locked
+
+    def on_elected(
+        self, callback: Callable[[], Awaitable[None]]
+    ) -> Callable[[], Awaitable[None]]:
+        """Register a coroutine function run when this worker becomes leader"""
+        self._callbacks.append(callback)
+        return callback
+
+    async def start(self) -> None:
+        """Try to become leader now; keep retrying in the background if not"""
+        if await self._try_acquire():
+            return
+        WORKER_LEADER.set(0)
+        logger.info(f"Worker {os.getpid()} is a follower")
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Stop retrying and give up leadership (another worker takes over)"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+        if self._lock is not None:
+            self._lock.release()
+            self._lock = None
+        WORKER_LEADER.set(0)
+
+    async def _watch(self) -> None:
+        while not await self._try_acquire():
+            await asyncio.sleep(settings.LEADER_RETRY_SECONDS)
+
+    async def _try_acquire(self) -> bool:
+        if self._lock is None:
+            self._lock = FileLock(self.name)
+        if not self._lock.acquire(blocking=False):
+            return False
+
+        WORKER_LEADER.set(1)
+        logger.info(f"Worker {os.getpid()} elected leader")
+        for callback in self._callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Leader task {callback.__name__} failed: {e}")
+        return True
+
+
+# Leader of this instance's workers (runs reconcilers, schedulers, listeners)
+leader = LeaderElection()
@@ -0,0 +1,484 @@
+"""
+Prometheus metrics
+Minimal in-process registry rendering the Prometheus text exposition format.
+
+Hot-path updates are lock-free: every thread (event loop, thread pool
+workers) writes to its own shard, and shards are only summed when /metrics
+is scraped. Each worker process keeps its own registry and a scrape reaches
+one of them, so every series carries the worker's pid label: counters of
+different workers stay separate series instead of appearing to reset, and
+queries aggregate them (sum without (pid) (rate(...))).
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# Constant labels added to every series of a registry: ((name, value), ...)
+ConstLabels = tuple[tuple[str, str], ...]
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    """Render {name="value",...} (empty string without labels)"""
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """Metric family with per-thread shards"""
+
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: list[dict] = []
+
+    def _shard(self) -> dict:
+        """Get the calling thread's shard (created on first use)"""
+        shard: Optional[dict] = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            self._shards.append(shard)  # list.append is atomic
+        return shard
+
+    def _key(self, labels: tuple) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {labels}"
+            )
+        return tuple(str(v) for v in labels)
+
+    def clear(self) -> None:
+        """Reset all samples (tests)"""
+        for shard in list(self._shards):
+            shard.clear()
+
+    def collect(self, const_labels: ConstLabels = ()) -> list[str]:
+        """Render the family as exposition format lines"""
+        raise NotImplementedError
+
+    def _labels(
+        self, key: tuple[str, ...], const_labels: ConstLabels, *extra: tuple[str, str]
+    ) -> str:
+        """Label set of a sample: family labels, constant labels, then extra"""
+        pairs = (*const_labels, *extra)
+        return _format_labels(
+            (*self.labelnames, *(n for n, _ in pairs)), (*key, *(v for _, v in pairs))
+        )
+
+    def _header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    TYPE = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Increment the counter for a label set"""
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Current total for a label set"""
+        key = self._key(labels)
+        return float(sum(shard.get(key, 0) for shard in list(self._shards)))
+
+    def _totals(self) -> dict[tuple, float]:
+        totals: dict[tuple, float] = {}
+        for shard in list(self._shards):
+            for key, value in list(shard.items()):
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def collect(self, const_labels: ConstLabels = ()) -> list[str]:
+        lines = self._header()
+        for key, value in sorted(self._totals().items()):
+            labels = self._labels(key, const_labels)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down (summed across shards)"""
+
+    TYPE = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """Decrement the gauge for a label set"""
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the gauge for a label set (for gauges not also inc/dec'd)"""
+        key = self._key(labels)
+        for shard in list(self._shards):
+            shard.pop(key, None)
+        self._shard()[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record an observation for a label set"""
+        shard = self._shard()
+        key = self._key(labels)
+        # [per-bucket counts..., +Inf count, sum]
+        state = shard.get(key)
+        if state is None:
+            state = shard[key] = [0] * (len(self.buckets) + 2)
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the duration of a with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        """Number of observations for a label set"""
+        key = self._key(labels)
+        return sum(sum(shard[key][:-1]) for shard in list(self._shards) if key in shard)
+
+    def collect(self, const_labels: ConstLabels = ()) -> list[str]:
+        totals: dict[tuple, list[float]] = {}
+        for shard in list(self._shards):
+            for key, state in list(shard.items()):
+                total = totals.setdefault(key, [0] * len(state))
+                for i, value in enumerate(state):
+                    total[i] += value
+
+        lines = self._header()
+        bounds = [*self.buckets, float("inf")]
+        for key, state in sorted(totals.items()):
+            cumulative = 0.0
+            for bound, count in zip(bounds, state):
+                cumulative += count
+                labels = self._labels(key, const_labels, ("le", _format_value(bound)))
+                value = _format_value(cumulative)
+                lines.append(f"{self.name}_bucket{labels} {value}")
+            labels = self._labels(key, const_labels)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metric families rendered together
+
+    Args:
+        label_pid: Add the rendering process's pid label to every series
+    """
+
+    def __init__(self, label_pid: bool = False) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self.label_pid = label_pid
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric family (names must be unique)"""
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        metric = Gauge(name, documentation, labelnames)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all families in the Prometheus text format"""
+        # Read now: workers are forked after the registry is created
+        pid = str(os.getpid())
+        const_labels: ConstLabels = (("pid", pid),) if self.label_pid else ()
+        lines = [
+            "# HELP docklite_worker_info Worker process serving this scrape",
+            "# TYPE docklite_worker_info gauge",
+            f'docklite_worker_info{{pid="{pid}"}} 1',
+        ]
+        for metric in self._metrics.values():
+            lines.extend(metric.collect(const_labels))
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Reset all samples (tests)"""
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+registry = MetricsRegistry(label_pid=True)
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "docklite_http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    "docklite_http_requests_in_flight", "HTTP requests currently being served"
+)
+WORKER_LEADER = registry.gauge(
+    "docklite_worker_leader", "1 if this worker is the elected leader"
+)
+DOCKER_CALL_DURATION = registry.histogram(
+    "docklite_docker_call_duration_seconds",
+    "Docker CLI call duration by operation",
+    ("operation",),
+)
+DOCKER_CALL_FAILURES = registry.counter(
+    "docklite_docker_call_failures_total",
+    "Failed Docker CLI calls by operation",
+    ("operation",),
+)
+DB_QUERY_DURATION = registry.histogram(
+    "docklite_db_query_duration_seconds",
+    "Database statement duration by statement type",
+    ("statement",),
+)
+PASSWORD_HASH_DURATION = registry.histogram(
+    "docklite_password_hash_duration_seconds",
+    "bcrypt hashing/verification duration",
+    ("operation",),
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5),
+)
+SCHEDULER_RUNS = registry.counter(
+    "docklite_scheduler_runs_total",
+    "Scheduled job runs by job and result (success/failure/timeout/skipped)",
+    ("job", "result"),
+)
+SCHEDULER_RUN_DURATION = registry.histogram(
+    "docklite_scheduler_run_duration_seconds",
+    "Scheduled job run duration",
+    ("job",),
+    buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0),
+)
+SCHEDULER_LAST_SUCCESS = registry.gauge(
+    "docklite_scheduler_last_success_timestamp_seconds",
+    "Unix time of the last successful run by job",
+    ("job",),
+)
+CONTAINERS = registry.gauge(
+    "docklite_containers", "Containers by state (sampled periodically)", ("state",)
+)
+EVENTS_PUBLISHED = registry.counter(
+    "docklite_events_published_total", "Real-time events published by topic", ("topic",)
+)
+EVENTS_DROPPED = registry.counter(
+    "docklite_events_dropped_total",
+    "Events dropped for slow subscribers by topic (bus: full peer worker)",
+    ("topic",),
+)
+EVENT_SUBSCRIBERS = registry.gauge(
+    "docklite_event_subscribers", "Open /api/events streams"
+)
+EXEC_SESSIONS = registry.gauge(
+    "docklite_exec_sessions", "Open interactive container sessions (exec/attach)"
+)
+EXEC_SESSIONS_REJECTED = registry.counter(
+    "docklite_exec_sessions_rejected_total",
+    "Interactive sessions refused because EXEC_MAX_SESSIONS were open",
+)
+EXEC_BYTES = registry.counter(
+    "docklite_exec_bytes_total",
+    "Bytes relayed by interactive sessions by direction (input/output)",
+    ("direction",),
+)
+ADMIN_RPC_REQUESTS = registry.counter(
+    "docklite_admin_rpc_requests_total",
+    "Admin RPC calls by method and status (ok/error)",
+    ("method", "status"),
+)
+BACKUPS = registry.counter(
+    "docklite_backups_total",
+    "Backups and snapshots by trigger (api/cli/scheduler) and status (ok/partial/error)",
+    ("trigger", "status"),
+)
+BACKUP_DURATION = registry.histogram(
+    "docklite_backup_duration_seconds",
+    "Time to write a backup archive or incremental snapshot",
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0),
+)
+BACKUP_CHUNKS = registry.counter(
+    "docklite_backup_chunks_total",
+    "Snapshot chunks by result (new: written to the store, existing: deduplicated)",
+    ("result",),
+)
+BACKUP_STORED_BYTES = registry.counter(
+    "docklite_backup_stored_bytes_total",
+    "Compressed bytes of new chunks written to the snapshot store",
+)
+RESTORES = registry.counter(
+    "docklite_restores_total",
+    "Snapshot restores by status (ok/partial/error)",
+    ("status",),
+)
+RESTORE_DOWNTIME = registry.histogram(
+    "docklite_restore_downtime_seconds",
+    "Time project containers were stopped to swap in restored data",
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0),
+)
+LOG_ARCHIVE_LINES = registry.counter(
+    "docklite_log_archive_lines_total",
+    "Container log lines written to the log archive",
+)
+LOG_ARCHIVE_FOLLOWED = registry.gauge(
+    "docklite_log_archive_followed_containers",
+    "Containers whose logs are being followed into the archive",
+)
+CACHE_REQUESTS = registry.counter(
+    "docklite_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ("cache", "result"),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """
+    Count a cache lookup (hit ratio = hits / (hits + misses))
+
+    Args:
+        cache: Cache name
+        hit: Whether the lookup was served from the cache
+    """
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+def statement_type(statement: str) -> str:
+    """Reduce a SQL statement to its verb (bounded label cardinality)"""
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    if verb in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+        return verb
+    return "OTHER"
+
+
+def instrument_engine(engine: Any) -> None:
+    """
+    Time every statement executed through a SQLAlchemy engine
+
+    Args:
+        engine: AsyncEngine or Engine
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if starts:
+            DB_QUERY_DURATION.observe(
+                time.perf_counter() - starts.pop(), statement_type(statement)
+            )
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency and in-flight requests
+
+    Requests are labelled with the matched route template (e.g.
+    /api/projects/{project_id}), never the raw path, so cardinality stays
+    bounded. Unmatched paths are labelled "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            )
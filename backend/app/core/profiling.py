@@ -0,0 +1,349 @@
+"""
+Request profiling
+Opt-in sampling profiler for individual requests and slow-request capture.
+
+A single background thread samples the event loop thread's stack every
+PROFILING_INTERVAL_MS and attributes each sample to the asyncio task that
+is running at that moment, so concurrent requests don't pollute each
+other's profiles. Samples show where the event loop spends CPU time for
+the request; time spent awaiting I/O or in worker threads is not sampled
+(compare samples * interval with duration_ms).
+
+Profiles are kept when an admin asks for one (X-Profile: 1 header or
+?profile=1) or when the request takes longer than PROFILING_SLOW_REQUEST_MS,
+as files in LOCK_DIR/profiles shared by all worker processes.
+With PROFILING_ENABLED off the middleware is not installed at all.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.locks import lock_dir
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "profile"
+TRUTHY = ("1", "true", "yes")
+
+# Deepest stack kept per sample (frames closest to the root are dropped)
+MAX_STACK_DEPTH = 64
+
+
+class _RequestProfile:
+    """Samples and metadata of one in-flight request"""
+
+    def __init__(self, requested: bool):
+        self.requested = requested
+        self.is_admin = False
+        self.samples: list[tuple[str, ...]] = []
+
+
+# Profile of the request being handled (None: not profiled)
+_current_profile: ContextVar[Optional[_RequestProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def mark_user(user: Any) -> None:
+    """
+    Record the authenticated user of the current request
+
+    Called by the auth dependencies; requested profiles are only kept for
+    admins. No-op when the request is not profiled.
+
+    Args:
+        user: Authenticated user
+    """
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.is_admin = bool(getattr(user, "is_admin", False))
+
+
+def _frame_name(frame: Any) -> str:
+    """Readable frame label: function (file:first line)"""
+    code = frame.f_code
+    filename = Path(code.co_filename)
+    short = "/".join(filename.parts[-2:])
+    return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+
+def _extract_stack(frame: Any) -> tuple[str, ...]:
+    """Stack as root-first frame labels, starting below the middleware"""
+    stack: list[str] = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        # Event loop / server frames above the middleware are the same for
+        # every sample
+        if frame.f_code is ProfilingMiddleware.__call__.__code__:
+            break
+        stack.append(_frame_name(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def build_call_tree(samples: list[tuple[str, ...]], interval_ms: float) -> dict:
+    """
+    Merge sampled stacks into a call tree
+
+    Args:
+        samples: Root-first stacks
+        interval_ms: Sampling interval (to estimate time per node)
+
+    Returns:
+        Root node: {"name", "samples", "time_ms", "children": [...]}, children
+        sorted by samples (descending)
+    """
+    root: dict = {"name": "<request>", "samples": 0, "children": {}}
+    for stack in samples:
+        root["samples"] += 1
+        node = root
+        for name in stack:
+            child = node["children"].get(name)
+            if child is None:
+                child = node["children"][name] = {
+                    "name": name,
+                    "samples": 0,
+                    "children": {},
+                }
+            child["samples"] += 1
+            node = child
+
+    def finalize(node: dict) -> dict:
+        children = sorted(
+            node["children"].values(), key=lambda c: c["samples"], reverse=True
+        )
+        return {
+            "name": node["name"],
+            "samples": node["samples"],
+            "time_ms": round(node["samples"] * interval_ms, 1),
+            "children": [finalize(child) for child in children],
+        }
+
+    return finalize(root)
+
+
+class StackSampler:
+    """Background thread sampling the stacks of registered asyncio tasks"""
+
+    def __init__(self) -> None:
+        # task -> (loop, thread id, profile)
+        self._targets: dict[asyncio.Task, tuple[Any, int, _RequestProfile]] = {}
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, task: asyncio.Task, profile: _RequestProfile) -> None:
+        """Start attributing samples of a task to a profile"""
+        loop = task.get_loop()
+        self._targets[task] = (loop, threading.get_ident(), profile)
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="docklite-profiler", daemon=True
+            )
+            self._thread.start()
+        self._wakeup.set()
+
+    def unregister(self, task: asyncio.Task) -> None:
+        """Stop sampling a task"""
+        self._targets.pop(task, None)
+
+    def _run(self) -> None:
+        interval = settings.PROFILING_INTERVAL_MS / 1000
+        while True:
+            if not self._targets:
+                # Idle until a request registers (re-check after clear, so
+                # a registration racing with it is not missed)
+                self._wakeup.clear()
+                if not self._targets:
+                    self._wakeup.wait()
+            time.sleep(interval)
+            self.sample()
+
+    def sample(self) -> None:
+        """Take one sample of every registered task that is running now"""
+        targets = list(self._targets.items())
+        if not targets:
+            return
+        frames = sys._current_frames()
+        for task, (loop, thread_id, profile) in targets:
+            if asyncio.current_task(loop) is not task:
+                continue  # Task is suspended (awaiting I/O) or another runs
+            frame = frames.get(thread_id)
+            if frame is not None:
+                profile.samples.append(_extract_stack(frame))
+
+
+class ProfileStore:
+    """
+    Most recent captured profiles (bounded)
+
+    Kept as files in LOCK_DIR/profiles, so every worker process lists the
+    profiles captured by all of them.
+    """
+
+    def __init__(self, max_profiles: int, directory: Optional[Path] = None) -> None:
+        self.max_profiles = max_profiles
+        self._directory = directory
+
+    @property
+    def directory(self) -> Path:
+        return self._directory or lock_dir() / "profiles"
+
+    def add(self, profile: dict) -> None:
+        # Names sort by capture time: <ns>-<id>.json
+        path = self.directory / f"{time.time_ns():020d}-{profile['id']}.json"
+        temp = path.with_suffix(".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp.write_text(json.dumps(profile, default=str))
+            os.replace(temp, path)
+            for old in self._paths()[self.max_profiles :]:
+                old.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not store profile {profile['id']}: {e}")
+
+    def summaries(self) -> list[dict]:
+        """Profiles newest first, without call trees"""
+        profiles = (self._read(path) for path in self._paths())
+        return [
+            {k: v for k, v in profile.items() if k != "tree"}
+            for profile in profiles
+            if profile is not None
+        ]
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        path = next(
+            (p for p in self._paths() if p.stem.partition("-")[2] == profile_id), None
+        )
+        return self._read(path) if path is not None else None
+
+    def clear(self) -> None:
+        for path in self._paths():
+            path.unlink(missing_ok=True)
+
+    def _paths(self) -> list[Path]:
+        """Profile files, newest first"""
+        try:
+            return sorted(self.directory.glob("*.json"), reverse=True)
+        except OSError:
+            return []
+
+    @staticmethod
+    def _read(path: Path) -> Optional[dict]:
+        try:
+            profile: dict = json.loads(path.read_text())
+            return profile
+        except (OSError, ValueError):
+            # Pruned by another worker meanwhile
+            return None
+
+
+sampler = StackSampler()
+profile_store = ProfileStore(settings.PROFILING_MAX_PROFILES)
+
+
+def _profile_requested(scope: Scope) -> bool:
+    """Check the X-Profile header / ?profile= query flag"""
+    for name, value in scope.get("headers", ()):
+        if name == PROFILE_HEADER:
+            return value.decode("latin-1").lower() in TRUTHY
+    query = scope.get("query_string", b"").decode("latin-1")
+    for pair in query.split("&"):
+        key, _, value = pair.partition("=")
+        if key == PROFILE_QUERY_PARAM:
+            return value.lower() in TRUTHY
+    return False
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requested and slow requests
+
+    Only installed when PROFILING_ENABLED is set. Requests are sampled when
+    they ask for it or when slow-request capture is on
+    (PROFILING_SLOW_REQUEST_MS > 0).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = _profile_requested(scope)
+        slow_ms = settings.PROFILING_SLOW_REQUEST_MS
+        task = asyncio.current_task()
+        if not (requested or slow_ms > 0) or task is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = _RequestProfile(requested)
+        token = _current_profile.set(profile)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        sampler.register(task, profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.unregister(task)
+            _current_profile.reset(token)
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            reason = None
+            if requested and profile.is_admin:
+                reason = "requested"
+            elif slow_ms > 0 and duration_ms >= slow_ms:
+                reason = "slow"
+
+            if reason:
+                self._store(scope, profile, reason, status_code, duration_ms)
+
+    @staticmethod
+    def _store(
+        scope: Scope,
+        profile: _RequestProfile,
+        reason: str,
+        status_code: int,
+        duration_ms: float,
+    ) -> None:
+        route = scope.get("route")
+        interval_ms = settings.PROFILING_INTERVAL_MS
+        profile_store.add(
+            {
+                "id": uuid.uuid4().hex,
+                "reason": reason,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": status_code,
+                "duration_ms": round(duration_ms, 1),
+                "samples": len(profile.samples),
+                "interval_ms": interval_ms,
+                "created_at": datetime.utcnow().isoformat(),
+                "tree": build_call_tree(profile.samples, interval_ms),
+            }
+        )
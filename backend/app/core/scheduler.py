@@ -0,0 +1,422 @@
+"""
+Periodic background jobs
+An in-process asyncio scheduler for interval and cron jobs. It is started
+by the elected leader worker only (see app.core.locks), so each job runs
+once per host no matter how many workers serve requests. The leader writes
+the run state to LOCK_DIR/scheduler.json for the other workers to report.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.locks import lock_dir
+from app.core.metrics import (
+    SCHEDULER_LAST_SUCCESS,
+    SCHEDULER_RUN_DURATION,
+    SCHEDULER_RUNS,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+JobFunc = Callable[[], Awaitable[None]]
+
+# Run results (docklite_scheduler_runs_total "result" label)
+RESULT_SUCCESS = "success"
+RESULT_FAILURE = "failure"
+RESULT_TIMEOUT = "timeout"
+RESULT_SKIPPED = "skipped"  # Previous run still in progress
+
+
+class CronSchedule:
+    """
+    Five-field cron expression: minute hour day-of-month month day-of-week
+
+    Fields accept "*", numbers, ranges ("1-5"), steps ("*/15", "0-30/10")
+    and lists ("1,15"). Day of week is 0-6 from Sunday (7 is Sunday too).
+    As in cron, when both day fields are restricted either may match.
+    """
+
+    FIELDS = (
+        ("minute", 0, 59),
+        ("hour", 0, 23),
+        ("day", 1, 31),
+        ("month", 1, 12),
+        ("weekday", 0, 7),
+    )
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != len(self.FIELDS):
+            raise ValueError(
+                f"Cron expression needs {len(self.FIELDS)} fields: {expression!r}"
+            )
+        self.expression = expression
+        values = [
+            self._parse_field(part, low, high)
+            for part, (_, low, high) in zip(parts, self.FIELDS)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = values
+        # 7 is an alias of Sunday
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> set[int]:
+        values: set[int] = set()
+        for item in field.split(","):
+            span, _, step_text = item.partition("/")
+            step = int(step_text) if step_text else 1
+            if span == "*":
+                start, end = low, high
+            elif "-" in span:
+                start_text, end_text = span.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(span)
+                end = high if step_text else start
+            if step < 1 or start < low or end > high or start > end:
+                raise ValueError(f"Invalid cron field {field!r} ({low}-{high})")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        # datetime: Monday=0; cron: Sunday=0
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """
+        First matching minute strictly after a moment
+
+        Args:
+            moment: Reference time (naive local time)
+
+        Returns:
+            Next fire time
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Five years covers every satisfiable expression (e.g. Feb 29)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + candidate.month // 12
+                candidate = candidate.replace(
+                    year=year, month=candidate.month % 12 + 1, day=1, hour=0, minute=0
+                )
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+
+class ScheduledJob:
+    """A job registered with the scheduler and its run state"""
+
+    def __init__(
+        self,
+        name: str,
+        func: JobFunc,
+        interval: Optional[float] = None,
+        cron: Optional[str] = None,
+        jitter: float = 0.0,
+        timeout: Optional[float] = None,
+        run_at_start: bool = False,
+    ):
+        if (interval is None) == (cron is None):
+            raise ValueError(f"Job {name}: give exactly one of interval or cron")
+        if interval is not None and interval <= 0:
+            raise ValueError(f"Job {name}: interval must be positive")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = CronSchedule(cron) if cron is not None else None
+        self.jitter = jitter
+        self.timeout = timeout
+        self.run_at_start = run_at_start
+        self.next_run: Optional[float] = None
+        self.last_run: Optional[float] = None
+        self.last_result: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    def schedule_next(self, now: float, first: bool = False) -> float:
+        """
+        Compute (and store) the next run time
+
+        Args:
+            now: Current time (epoch seconds)
+            first: Scheduling at scheduler start (honors run_at_start)
+
+        Returns:
+            Next run time (epoch seconds), jitter included
+        """
+        if first and self.run_at_start:
+            base = now
+        elif self.interval is not None:
+            base = now + self.interval
+        else:
+            assert self.cron is not None
+            base = self.cron.next_after(datetime.fromtimestamp(now)).timestamp()
+        self.next_run = base + random.uniform(0, self.jitter)
+        return self.next_run
+
+    def to_dict(self) -> dict:
+        """Convert job to response dict"""
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "cron": self.cron.expression if self.cron else None,
+            "jitter": self.jitter,
+            "timeout": self.timeout,
+            "next_run": _to_datetime(self.next_run),
+            "last_run": _to_datetime(self.last_run),
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+def _to_datetime(timestamp: Optional[float]) -> Optional[datetime]:
+    return datetime.utcfromtimestamp(timestamp) if timestamp is not None else None
+
+
+def _isoformat(value: datetime) -> str:
+    return value.isoformat()
+
+
+class Scheduler:
+    """
+    Asyncio scheduler for periodic coroutine jobs
+
+    A job never overlaps itself: a run that comes due while the previous
+    one is still going is skipped. Each run is bounded by the job's
+    timeout, and failures are logged and counted, never raised.
+    """
+
+    def __init__(self, state_path: Optional[Path] = None) -> None:
+        self._jobs: dict[str, ScheduledJob] = {}
+        self._runs: dict[str, asyncio.Task[str]] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._state_path = state_path
+
+    @property
+    def state_path(self) -> Path:
+        """Run state shared with the other workers (default: LOCK_DIR/scheduler.json)"""
+        return self._state_path or lock_dir() / "scheduler.json"
+
+    @property
+    def running(self) -> bool:
+        """Check if the scheduler loop is running in this worker"""
+        return self._loop_task is not None and not self._loop_task.done()
+
+    @property
+    def jobs(self) -> list[ScheduledJob]:
+        """Registered jobs"""
+        return list(self._jobs.values())
+
+    def add_job(
+        self,
+        name: str,
+        func: JobFunc,
+        *,
+        interval: Optional[float] = None,
+        cron: Optional[str] = None,
+        jitter: float = 0.0,
+        timeout: Optional[float] = None,
+        run_at_start: bool = False,
+    ) -> ScheduledJob:
+        """
+        Register a periodic job
+
+        Args:
+            name: Unique job name (metrics label)
+            func: Coroutine function to run
+            interval: Seconds between runs (or cron)
+            cron: Five-field cron expression, local time (or interval)
+            jitter: Random delay up to this many seconds added to each run
+            timeout: Seconds after which a run is cancelled (None: no limit)
+            run_at_start: Run once as soon as the scheduler starts
+
+        Returns:
+            Registered job
+        """
+        if name in self._jobs:
+            raise ValueError(f"Job {name} is already scheduled")
+        job = ScheduledJob(name, func, interval, cron, jitter, timeout, run_at_start)
+        self._jobs[name] = job
+        if self.running and self._wakeup is not None:
+            job.schedule_next(time.time(), first=True)
+            self._wakeup.set()
+        return job
+
+    def interval(self, seconds: float, **options: Any) -> Callable[[JobFunc], JobFunc]:
+        """Decorator registering an interval job (options as in add_job)"""
+
+        def decorator(func: JobFunc) -> JobFunc:
+            self.add_job(
+                options.pop("name", func.__name__), func, interval=seconds, **options
+            )
+            return func
+
+        return decorator
+
+    def cron(self, expression: str, **options: Any) -> Callable[[JobFunc], JobFunc]:
+        """Decorator registering a cron job (options as in add_job)"""
+
+        def decorator(func: JobFunc) -> JobFunc:
+            self.add_job(
+                options.pop("name", func.__name__), func, cron=expression, **options
+            )
+            return func
+
+        return decorator
+
+    def start(self) -> None:
+        """Start the scheduler loop (no-op when already running)"""
+        if self.running:
+            return
+        now = time.time()
+        for job in self._jobs.values():
+            job.schedule_next(now, first=True)
+        self._wakeup = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._loop())
+        self._save_state()
+        logger.info(f"Scheduler started with {len(self._jobs)} jobs")
+
+    async def stop(self) -> None:
+        """Stop the loop and cancel runs in progress"""
+        tasks = list(self._runs.values())
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._runs.clear()
+        self._loop_task = None
+        self._save_state()
+
+    def state(self) -> dict:
+        """Run state of this worker's scheduler (as in GET /api/admin/scheduler)"""
+        return {
+            "running": self.running,
+            "pid": os.getpid(),
+            "updated_at": datetime.utcnow(),
+            "jobs": [job.to_dict() for job in self._jobs.values()],
+        }
+
+    def _save_state(self) -> None:
+        """Publish the run state for the other workers (atomic replace)"""
+        path = self.state_path
+        temp = path.with_suffix(".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp.write_text(json.dumps(self.state(), default=_isoformat))
+            os.replace(temp, path)
+        except OSError as e:
+            logger.warning(f"Could not write scheduler state: {e}")
+
+    def read_state(self) -> Optional[dict]:
+        """
+        Run state published by the leader worker
+
+        Returns:
+            State dict (datetimes as ISO strings) or None if never written
+        """
+        try:
+            state: dict = json.loads(self.state_path.read_text())
+            return state
+        except (OSError, ValueError):
+            return None
+
+    async def run_job(self, name: str) -> str:
+        """
+        Run a job now, outside its schedule
+
+        Args:
+            name: Job name
+
+        Returns:
+            Run result (success/failure/timeout/skipped)
+        """
+        task = self._launch(self._jobs[name])
+        if task is None:
+            return RESULT_SKIPPED
+        return await task
+
+    async def _loop(self) -> None:
+        wakeup = self._wakeup
+        assert wakeup is not None
+        while True:
+            now = time.time()
+            launched = False
+            for job in self._jobs.values():
+                if job.next_run is not None and job.next_run <= now:
+                    job.schedule_next(now)
+                    self._launch(job)
+                    launched = True
+            if launched:
+                self._save_state()
+
+            due = [job.next_run for job in self._jobs.values() if job.next_run]
+            delay = max(0.0, min(due) - time.time()) if due else None
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _launch(self, job: ScheduledJob) -> Optional[asyncio.Task[str]]:
+        if job.name in self._runs:
+            logger.warning(f"Scheduled job {job.name} still running, run skipped")
+            SCHEDULER_RUNS.inc(job.name, RESULT_SKIPPED)
+            return None
+        task = asyncio.create_task(self._run(job))
+        self._runs[job.name] = task
+        task.add_done_callback(lambda _: self._runs.pop(job.name, None))
+        return task
+
+    async def _run(self, job: ScheduledJob) -> str:
+        started = time.time()
+        job.last_run = started
+        job.last_error = None
+        try:
+            await asyncio.wait_for(job.func(), job.timeout)
+            result = RESULT_SUCCESS
+            SCHEDULER_LAST_SUCCESS.set(time.time(), job.name)
+        except asyncio.TimeoutError:
+            result = RESULT_TIMEOUT
+            job.last_error = f"Timed out after {job.timeout}s"
+            logger.error(f"Scheduled job {job.name}: {job.last_error}")
+        except Exception as e:
+            result = RESULT_FAILURE
+            job.last_error = str(e)
+            logger.error(f"Scheduled job {job.name} failed: {e}")
+        job.last_result = result
+        SCHEDULER_RUNS.inc(job.name, result)
+        SCHEDULER_RUN_DURATION.observe(time.time() - started, job.name)
+        if self.running:
+            self._save_state()
+        return result
+
+
+# Jobs of this instance (started by the leader worker, see app.main)
+scheduler = Scheduler()
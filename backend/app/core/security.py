@@ -1,8 +1,17 @@
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import (
+    Depends,
+    HTTPException,
+    status,
+    Request,
+    WebSocket,
+    WebSocketException,
+)
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+from urllib.parse import urlsplit
 from app.core.database import get_db
+from app.core.profiling import mark_user
 from app.services.auth_service import AuthService
 from app.models.user import User
 
@@ -43,6 +52,7 @@ async def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user"
         )
 
+    mark_user(user)
     return user
 
 
@@ -108,4 +118,44 @@ async def get_current_user_with_cookie(
             status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user"
         )
 
+    mark_user(user)
+    return user
+
+
+async def get_websocket_user(
+    websocket: WebSocket, db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Get current user of a WebSocket handshake (Authorization header or cookie)
+
+    Browsers send cookies with WebSocket handshakes from any site, so
+    cross-origin handshakes are rejected.
+
+    Raises:
+        WebSocketException: 1008 (policy violation) when not authenticated
+    """
+    origin = websocket.headers.get("origin")
+    if origin and urlsplit(origin).netloc != websocket.headers.get("host"):
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Cross-origin request"
+        )
+
+    token = None
+    authorization = websocket.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    elif "token" in websocket.cookies:
+        token = websocket.cookies["token"]
+
+    token_data = AuthService.decode_token(token) if token else None
+    user = None
+    if token_data is not None and token_data.username is not None:
+        user = await AuthService(db).get_user_by_username(token_data.username)
+    if user is None or not user.is_active:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason="Could not validate credentials",
+        )
+
+    mark_user(user)
     return user
@@ -0,0 +1,59 @@
+"""
+Production server settings
+Shared by gunicorn.conf.py (the container's server) and `python -m app.main`.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+from app.core.config import settings
+
+# Cap for the CPU-based default: SQLite has a single writer, more workers
+# mostly queue on the database lock
+MAX_AUTO_WORKERS = 8
+
+
+def worker_count(configured: Optional[int] = None, cpus: Optional[int] = None) -> int:
+    """
+    Number of worker processes
+
+    Args:
+        configured: Explicit count (default: WEB_CONCURRENCY; 0 = automatic)
+        cpus: CPU count (default: os.cpu_count())
+
+    Returns:
+        Configured count, else CPU count + 1 (at least 2, at most 8)
+    """
+    if configured is None:
+        configured = settings.WEB_CONCURRENCY
+    if configured > 0:
+        return configured
+    cpus = cpus or os.cpu_count() or 1
+    return max(2, min(cpus + 1, MAX_AUTO_WORKERS))
+
+
+def run() -> None:
+    """
+    Serve with uvicorn directly (development / no gunicorn)
+
+    Uses uvloop and httptools when installed (uvicorn[standard]). Workers
+    are not recycled here (uvicorn does not replace exited workers); use
+    gunicorn for that.
+    """
+    import uvicorn
+
+    uvicorn.run(
+        "app.main:app",
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        reload=settings.SERVER_RELOAD,
+        workers=1 if settings.SERVER_RELOAD else worker_count(),
+        loop="auto",
+        http="auto",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEPALIVE,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT,
+        access_log=False,
+    )
@@ -1,9 +1,47 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
-from app.api import projects, presets, deployment, auth, users, containers
+from app.api import (
+    projects,
+    presets,
+    deployment,
+    auth,
+    users,
+    containers,
+    jobs,
+    admin,
+    events,
+    logs,
+)
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.core import metrics, profiling, server
+from app.core.admin_rpc import admin_rpc
+from app.core.events import hub
+from app.core.locks import leader, startup_lock
+from app.core.scheduler import scheduler
+from app.services import (
+    backup_service,
+    log_service,
+    maintenance,
+    restore_service,
+    snapshot_service,
+    user_admin,
+)
+from app.services.container_metrics import compact_container_metrics
+from app.services.docker_events import container_event_listener
+from app.services.log_archive import log_collector
+from app.services.project_store import project_file_store
+from app.services.job_service import job_manager
+from app.utils.logger import AccessLogMiddleware, setup_logging, shutdown_logging
+
+setup_logging()
+maintenance.register_jobs(scheduler)
+user_admin.register_rpc_methods(admin_rpc)
+backup_service.register_rpc_methods(admin_rpc)
+snapshot_service.register_rpc_methods(admin_rpc)
+restore_service.register_rpc_methods(admin_rpc)
+log_service.register_rpc_methods(admin_rpc)
 
 app = FastAPI(
     title="DockLite", description="Web Server Management System", version="1.0.0"
@@ -18,6 +56,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in request profiling (not installed at all when disabled)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+# Request latency / in-flight metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(
+        metrics.MetricsMiddleware, exclude_paths=("/metrics", "/api/events")
+    )
+
+# Request IDs + JSON access log (outermost: the ID covers all other logs)
+app.add_middleware(AccessLogMiddleware, access_log=settings.ACCESS_LOG_ENABLED)
+
 # Include routers
 app.include_router(auth.router, prefix="/api")  # Auth endpoints (public)
 app.include_router(users.router, prefix="/api")  # User management (admin only)
@@ -25,18 +76,96 @@ app.include_router(projects.router, prefix="/api")
 app.include_router(presets.router, prefix="/api")
 app.include_router(deployment.router, prefix="/api")
 app.include_router(containers.router, prefix="/api")  # Container management
+app.include_router(jobs.router, prefix="/api")  # Background job status
+app.include_router(admin.router, prefix="/api")  # Admin diagnostics
+app.include_router(events.router, prefix="/api")  # Real-time updates (SSE)
+app.include_router(logs.router, prefix="/api")  # Archived container logs
 
 
 # Startup event
 @app.on_event("startup")
 async def startup():
-    """Initialize database and create tables"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-    # Ensure projects directory exists
-    projects_dir = Path(settings.PROJECTS_DIR)
-    projects_dir.mkdir(parents=True, exist_ok=True)
+    """Initialize database and create tables, join the leader election"""
+    # One worker at a time: concurrent CREATE TABLE races on a fresh database
+    async with startup_lock():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        # Ensure projects directory exists
+        projects_dir = Path(settings.PROJECTS_DIR)
+        projects_dir.mkdir(parents=True, exist_ok=True)
+
+    await hub.start()
+    await leader.start()
+
+
+@leader.on_elected
+async def run_reconcilers():
+    """Background reconciliation, run by the leader worker only"""
+    # Repair drift between DB rows and PROJECTS_DIR (e.g. after a crash) and
+    # regenerate Traefik dynamic config (no-op in labels routing mode)
+    await maintenance.reconcile_projects()
+
+    # Finish removing project trees of deletions interrupted by a restart
+    for trash_dir in project_file_store.list_trash():
+        job_manager.submit(
+            "delete_project_files",
+            project_file_store.remove_tree,
+            trash_dir,
+            target=trash_dir.name,
+        )
+
+
+@leader.on_elected
+async def start_scheduler():
+    """Periodic jobs, run by the leader worker only"""
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+
+
+@leader.on_elected
+async def start_event_listener():
+    """Docker events -> /api/events, followed by the leader worker only"""
+    if settings.EVENTS_ENABLED:
+        container_event_listener.start()
+
+
+@leader.on_elected
+async def start_log_collector():
+    """Container logs -> log archive, followed by the leader worker only"""
+    if settings.LOG_ARCHIVE_ENABLED:
+        log_collector.start()
+
+
+@leader.on_elected
+async def start_admin_rpc():
+    """Admin socket for ./docklite CLI commands, served by the leader only"""
+    await admin_rpc.start()
+
+
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown():
+    """Flush pending write-behind project file writes, finish running jobs"""
+    await project_file_store.flush()
+    await job_manager.wait()
+    # Hand leadership (and the periodic jobs) to another worker
+    await scheduler.stop()
+    await compact_container_metrics()
+    await container_event_listener.stop()
+    await log_collector.stop()
+    await admin_rpc.stop()
+    await leader.stop()
+    await hub.stop()
+    shutdown_logging()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """Prometheus metrics (text exposition format)"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
 
 @app.get("/")
@@ -71,8 +200,4 @@ async def api_health_check():
 
 
 if __name__ == "__main__":
-    import uvicorn
-
-    uvicorn.run(
-        "app.main:app", host=settings.API_HOST, port=settings.API_PORT, reload=True
-    )
+    server.run()
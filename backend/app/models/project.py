@@ -17,6 +17,8 @@ class Project(Base):
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     compose_content = Column(Text, nullable=False)
     env_vars = Column(Text, nullable=True, default="{}")  # JSON string
+    routes = Column(Text, nullable=True)  # JSON list of service routes
+    performance = Column(Text, nullable=True)  # JSON performance middlewares
     # created, running, stopped, error
     status = Column(String(50), default="created")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
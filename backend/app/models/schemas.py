@@ -1,13 +1,51 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, Dict
+from typing import Any, Optional, Dict, List
 from datetime import datetime
 
 
+class LoadBalancerConfig(BaseModel):
+    sticky: bool = False  # Cookie-based sticky sessions
+    health_check_path: Optional[str] = Field(None, pattern=r"^/")
+    health_check_interval: str = Field("10s", pattern=r"^\d+(ms|s|m)$")
+    health_check_timeout: str = Field("3s", pattern=r"^\d+(ms|s|m)$")
+    replicas: Optional[int] = Field(None, ge=1, le=50)
+
+
+class ServiceRoute(BaseModel):
+    """Route to one compose service (path prefix and/or subdomain)"""
+
+    service: str = Field(..., min_length=1, max_length=255)
+    path_prefix: Optional[str] = Field(None, pattern=r"^/[^`\s]*$")
+    subdomain: Optional[str] = Field(
+        None, pattern=r"^[a-z0-9]([a-z0-9-]*[a-z0-9])?$", max_length=63
+    )
+    strip_prefix: bool = False
+    port: Optional[int] = Field(None, ge=1, le=65535)  # Auto-detected if empty
+    load_balancer: Optional[LoadBalancerConfig] = None
+
+
+class PerformanceConfig(BaseModel):
+    """Per-project Traefik performance middlewares"""
+
+    https: bool = False  # Also serve on websecure (TLS, HTTP/2)
+    compress: bool = False
+    cache_control: Optional[str] = Field(None, max_length=255)
+    max_in_flight: Optional[int] = Field(None, ge=1)
+    rate_limit_average: Optional[int] = Field(None, ge=1)  # Requests per second
+    rate_limit_burst: Optional[int] = Field(None, ge=1)
+    retry_attempts: Optional[int] = Field(None, ge=1, le=10)
+    # e.g. "NetworkErrorRatio() > 0.30"
+    circuit_breaker: Optional[str] = Field(None, max_length=255)
+
+
 class ProjectBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
     domain: str = Field(..., min_length=1, max_length=255)
     compose_content: str = Field(..., min_length=1)
     env_vars: Optional[Dict[str, str]] = Field(default_factory=dict)
+    # Empty: whole domain routed to the entry service
+    routes: Optional[List[ServiceRoute]] = None
+    performance: Optional[PerformanceConfig] = None
 
 
 class ProjectCreate(ProjectBase):
@@ -19,6 +57,8 @@ class ProjectUpdate(BaseModel):
     domain: Optional[str] = Field(None, min_length=1, max_length=255)
     compose_content: Optional[str] = Field(None, min_length=1)
     env_vars: Optional[Dict[str, str]] = None
+    routes: Optional[List[ServiceRoute]] = None  # [] resets to default routing
+    performance: Optional[PerformanceConfig] = None  # {} resets to defaults
 
 
 class ProjectResponse(ProjectBase):
@@ -38,6 +78,32 @@ class ProjectListResponse(BaseModel):
     total: int
 
 
+# ========== Job Schemas ==========
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    target: Optional[str] = None
+    status: str  # pending, running, completed, failed
+    error: Optional[str] = None
+    result: Optional[Any] = None  # Set by jobs that produce a value (e.g. backups)
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class SnapshotCreate(BaseModel):
+    projects: Optional[list[str]] = None  # Slugs; None: all projects
+    volumes: Optional[bool] = None  # None: BACKUP_SNAPSHOT_VOLUMES
+
+
+class SnapshotRestore(BaseModel):
+    # Nothing selected: everything in the snapshot
+    database: bool = False
+    projects: Optional[list[str]] = None  # Slugs (with their volumes)
+    volumes: Optional[list[str]] = None  # Volume names
+
+
 # ========== User Schemas ==========
 
 
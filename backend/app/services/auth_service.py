@@ -8,6 +8,7 @@ from sqlalchemy import select
 from app.models.user import User
 from app.models.schemas import UserCreate, TokenData
 from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_DURATION
 from app.constants.messages import ErrorMessages
 
 
@@ -24,13 +25,15 @@ class AuthService:
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """Verify a password against hash"""
-        result = pwd_context.verify(plain_password, hashed_password)
+        with PASSWORD_HASH_DURATION.time("verify"):
+            result = pwd_context.verify(plain_password, hashed_password)
         return bool(result)
 
     @staticmethod
     def get_password_hash(password: str) -> str:
         """Hash a password"""
-        result = pwd_context.hash(password)
+        with PASSWORD_HASH_DURATION.time("hash"):
+            result = pwd_context.hash(password)
         return str(result)
 
     @staticmethod
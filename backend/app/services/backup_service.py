@@ -0,0 +1,507 @@
+"""
+Backups
+Consistent snapshots of the SQLite database (online backup API), streamed
+straight into a compressed tar archive together with a checksummed manifest
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import tarfile
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Iterator, Optional, cast
+
+from sqlalchemy.engine import make_url
+
+from app.core.admin_rpc import INTERNAL_ERROR, INVALID_PARAMS, AdminRPCServer, RPCError
+from app.core.config import settings
+from app.core.locks import FileLock
+from app.core.metrics import BACKUP_DURATION, BACKUPS
+from app.utils.files import TEMP_SUFFIX, atomic_write_text, fsync_dir
+from app.utils.hostname import get_server_hostname
+from app.utils.logger import get_logger
+
+try:
+    import zstandard
+except ImportError:  # Optional: archives are gzipped instead
+    zstandard = None
+
+logger = get_logger(__name__)
+
+ARCHIVE_PREFIX = "docklite_backup_"
+MANIFEST_NAME = "manifest.json"
+DATABASE_MEMBER = "docklite.db"
+MANIFEST_FORMAT = 1
+# Archive file suffix per compression codec
+SUFFIXES = {"zstd": ".tar.zst", "gzip": ".tar.gz"}
+# Seconds a snapshot waits for a writer holding the database lock
+SNAPSHOT_BUSY_TIMEOUT = 30
+COPY_CHUNK = 1024 * 1024
+# Lock file in BACKUP_DIR: one backup at a time across workers and the CLI
+BACKUP_LOCK = ".backup"
+
+
+def database_path() -> Optional[Path]:
+    """
+    File of the SQLite database from DATABASE_URL
+
+    Returns:
+        Database path, or None for in-memory/non-SQLite databases
+    """
+    url = make_url(settings.DATABASE_URL)
+    database = url.database
+    if url.get_backend_name() != "sqlite" or not database or database == ":memory:":
+        return None
+    return Path(database).resolve()
+
+
+def resolve_codec(name: str) -> str:
+    """
+    Compression codec for a BACKUP_COMPRESSION value
+
+    Args:
+        name: "zstd", "gzip" or "auto"
+
+    Returns:
+        "zstd" or "gzip"
+
+    Raises:
+        ValueError: Unknown codec, or zstd requested but not installed
+    """
+    if name == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if name not in SUFFIXES:
+        raise ValueError(f"Unknown backup compression: {name}")
+    if name == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires the zstandard package")
+    return name
+
+
+def codec_for(path: Path) -> str:
+    """Compression codec of an archive, from its file name"""
+    for codec, suffix in SUFFIXES.items():
+        if path.name.endswith(suffix):
+            return codec
+    raise ValueError(f"Not a backup archive: {path.name}")
+
+
+class _HashingWriter:
+    """Write-through file wrapper computing the SHA-256 of what passes"""
+
+    def __init__(self, fileobj: BinaryIO):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.fileobj.write(data)
+
+    def flush(self) -> None:
+        self.fileobj.flush()
+
+
+class _HashingReader:
+    """Read-through file wrapper computing the SHA-256 of what passes"""
+
+    def __init__(self, fileobj: BinaryIO):
+        self.fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.fileobj.read(size)
+        self.sha256.update(data)
+        return data
+
+
+@contextmanager
+def compressor(fileobj: BinaryIO, codec: str) -> Iterator[BinaryIO]:
+    """
+    Compressing stream writing into fileobj (left open)
+
+    zstd compresses on BACKUP_THREADS threads (one per CPU by default).
+    """
+    level = settings.BACKUP_COMPRESSION_LEVEL
+    if codec == "zstd":
+        cctx = zstandard.ZstdCompressor(
+            level=level or 3, threads=settings.BACKUP_THREADS or -1
+        )
+        stream = cctx.stream_writer(fileobj, closefd=False)
+    else:
+        stream = gzip.GzipFile(
+            fileobj=fileobj, mode="wb", compresslevel=level or 6, mtime=0
+        )
+    with stream:
+        yield stream
+
+
+@contextmanager
+def decompressor(fileobj: BinaryIO, codec: str) -> Iterator[BinaryIO]:
+    """Decompressing stream reading from fileobj (left open)"""
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd archives require the zstandard package")
+        stream = zstandard.ZstdDecompressor().stream_reader(fileobj, closefd=False)
+    else:
+        stream = gzip.GzipFile(fileobj=fileobj, mode="rb")
+    with stream:
+        yield stream
+
+
+@contextmanager
+def database_snapshot(
+    path: Path, spill_dir: Path
+) -> Iterator[tuple[BinaryIO, int, dict[str, Any]]]:
+    """
+    Consistent copy of a live SQLite database
+
+    The online backup API copies all pages in one step, inside a single
+    read transaction: writers wait (busy timeout) for the copy instead of
+    producing a torn file. Small databases are copied into memory and
+    serialized; larger ones into a temp file in spill_dir.
+
+    Args:
+        path: Database file
+        spill_dir: Directory for the temp copy of large databases
+
+    Yields:
+        (readable snapshot, size in bytes, info for the manifest)
+    """
+    spill: Optional[Path] = None
+    in_memory = (
+        hasattr(sqlite3.Connection, "serialize")
+        and path.stat().st_size <= settings.BACKUP_SNAPSHOT_MEMORY_MAX_BYTES
+    )
+    source = sqlite3.connect(path, timeout=SNAPSHOT_BUSY_TIMEOUT)
+    try:
+        if in_memory:
+            target = sqlite3.connect(":memory:")
+        else:
+            fd, name = tempfile.mkstemp(
+                dir=spill_dir, prefix=".snapshot.", suffix=TEMP_SUFFIX
+            )
+            os.close(fd)
+            spill = Path(name)
+            target = sqlite3.connect(spill)
+        try:
+            source.backup(target)
+            info = {
+                "page_size": target.execute("PRAGMA page_size").fetchone()[0],
+                "page_count": target.execute("PRAGMA page_count").fetchone()[0],
+                "quick_check": target.execute("PRAGMA quick_check").fetchone()[0],
+            }
+            data = target.serialize() if in_memory else None
+        finally:
+            target.close()
+    except BaseException:
+        if spill:
+            spill.unlink(missing_ok=True)
+        raise
+    finally:
+        source.close()
+
+    try:
+        if data is not None:
+            with io.BytesIO(data) as snapshot:
+                yield snapshot, len(data), info
+        else:
+            assert spill is not None
+            with open(spill, "rb") as snapshot:
+                yield snapshot, spill.stat().st_size, info
+    finally:
+        if spill:
+            spill.unlink(missing_ok=True)
+
+
+def _add_member(
+    tar: tarfile.TarFile, name: str, fileobj: BinaryIO, size: int, mode: int = 0o600
+) -> dict[str, Any]:
+    """Stream one file into the archive; returns its manifest entry"""
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mode = mode
+    info.mtime = int(time.time())
+    reader = _HashingReader(fileobj)
+    # Duck-typed file: tarfile only calls read()
+    tar.addfile(info, cast(BinaryIO, reader))
+    return {"path": name, "size": size, "sha256": reader.sha256.hexdigest()}
+
+
+def chown_like(fd: int, directory: Path) -> None:
+    """
+    Give a file to the owner of its directory when running as root
+
+    The backend container runs as root; archives in the bind-mounted
+    BACKUP_DIR stay readable by the host user who owns ./backups.
+    """
+    if os.geteuid() != 0:
+        return
+    stat = directory.stat()
+    os.fchown(fd, stat.st_uid, stat.st_gid)
+
+
+def check_member_name(name: str) -> str:
+    """Validate a caller-supplied archive path (relative, no ..)"""
+    path = PurePosixPath(name)
+    if (
+        not name
+        or path.is_absolute()
+        or ".." in path.parts
+        or str(path) in (DATABASE_MEMBER, MANIFEST_NAME)
+    ):
+        raise ValueError(f"Invalid archive path: {name!r}")
+    return str(path)
+
+
+class BackupService:
+    """
+    Service for backup archives in BACKUP_DIR
+
+    Blocking (database copy, compression, disk I/O): run it in a worker
+    thread (job_manager.submit / asyncio.to_thread).
+    """
+
+    def __init__(
+        self, backup_dir: Optional[Path] = None, database: Optional[Path] = None
+    ):
+        self.backup_dir = Path(backup_dir or settings.BACKUP_DIR)
+        self.database = database if database is not None else database_path()
+
+    def _archive_path(self, codec: str) -> Path:
+        """Unused archive path named after the current time"""
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        suffix = SUFFIXES[codec]
+        path = self.backup_dir / f"{ARCHIVE_PREFIX}{stamp}{suffix}"
+        counter = 1
+        while path.exists():
+            path = self.backup_dir / f"{ARCHIVE_PREFIX}{stamp}_{counter}{suffix}"
+            counter += 1
+        return path
+
+    def create_backup(
+        self, files: Optional[dict[str, bytes]] = None, trigger: str = "api"
+    ) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        """
+        Write a backup archive
+
+        The database snapshot and the given files are streamed through the
+        compressor into a hidden temp file, renamed into place once complete
+        (with a sha256sum-style sidecar). manifest.json, the last member,
+        lists the size and SHA-256 of every other member.
+
+        Args:
+            files: Extra archive members (path -> content), e.g. the host's
+                .env sent by the CLI
+            trigger: What started the backup ("api"/"cli"), for metrics
+
+        Returns:
+            (archive info, None) on success, (None, error) on failure
+        """
+        started = time.perf_counter()
+        try:
+            codec = resolve_codec(settings.BACKUP_COMPRESSION)
+            members = {check_member_name(k): v for k, v in (files or {}).items()}
+            self.backup_dir.mkdir(parents=True, exist_ok=True)
+            with FileLock(BACKUP_LOCK, self.backup_dir).hold():
+                archive = self._archive_path(codec)
+                result = self._write_archive(archive, codec, members)
+        except (OSError, ValueError, sqlite3.Error, tarfile.TarError) as e:
+            BACKUPS.inc(trigger, "error")
+            logger.error(f"Backup failed: {e}")
+            return None, f"Backup failed: {e}"
+
+        BACKUPS.inc(trigger, "ok")
+        BACKUP_DURATION.observe(time.perf_counter() - started)
+        logger.info(
+            f"Backup created: {result['name']} ({result['size']} bytes, {codec})"
+        )
+        return result, None
+
+    def _write_archive(
+        self, archive: Path, codec: str, members: dict[str, bytes]
+    ) -> dict[str, Any]:
+        """Stream the archive into a temp file and publish it"""
+        manifest: dict[str, Any] = {
+            "format": MANIFEST_FORMAT,
+            "name": archive.name,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "hostname": get_server_hostname(),
+            "compression": codec,
+            "database": None,
+            "files": [],
+        }
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.backup_dir, prefix=f".{archive.name}.", suffix=TEMP_SUFFIX
+        )
+        tmp = Path(tmp_name)
+        try:
+            # Archives hold password hashes and .env secrets
+            os.fchmod(fd, 0o600)
+            chown_like(fd, self.backup_dir)
+            with os.fdopen(fd, "wb") as raw:
+                hashed = _HashingWriter(raw)
+                # Duck-typed file: the compressors only call write()/flush()
+                with compressor(cast(BinaryIO, hashed), codec) as stream, tarfile.open(
+                    fileobj=stream, mode="w|"
+                ) as tar:
+                    if self.database is not None and self.database.exists():
+                        with database_snapshot(self.database, self.backup_dir) as (
+                            snapshot,
+                            size,
+                            info,
+                        ):
+                            if info["quick_check"] != "ok":
+                                raise ValueError(
+                                    f"Database integrity check failed: {info['quick_check']}"
+                                )
+                            manifest["files"].append(
+                                _add_member(tar, DATABASE_MEMBER, snapshot, size)
+                            )
+                        manifest["database"] = info
+                    for name, content in members.items():
+                        manifest["files"].append(
+                            _add_member(tar, name, io.BytesIO(content), len(content))
+                        )
+                    data = json.dumps(manifest, indent=2).encode()
+                    _add_member(tar, MANIFEST_NAME, io.BytesIO(data), len(data), 0o644)
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(tmp, archive)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+        sha256 = hashed.sha256.hexdigest()
+        sidecar = atomic_write_text(
+            archive.with_name(f"{archive.name}.sha256"), f"{sha256}  {archive.name}\n"
+        )
+        with open(sidecar, "rb") as f:
+            chown_like(f.fileno(), self.backup_dir)
+        fsync_dir(self.backup_dir)
+        return {
+            "name": archive.name,
+            "path": str(archive),
+            "size": hashed.size,
+            "sha256": sha256,
+            "manifest": manifest,
+        }
+
+    def list_backups(self) -> list[dict[str, Any]]:
+        """
+        Archives in BACKUP_DIR, newest first
+
+        Returns:
+            Name, size, modification time, codec and SHA-256 (from the
+            sidecar file, None if missing) of each archive
+        """
+        if not self.backup_dir.is_dir():
+            return []
+        backups: list[dict[str, Any]] = []
+        for path in self.backup_dir.glob(f"{ARCHIVE_PREFIX}*"):
+            try:
+                codec = codec_for(path)
+                stat = path.stat()
+            except (ValueError, OSError):
+                continue
+            sidecar = path.with_name(f"{path.name}.sha256")
+            try:
+                sha256: Optional[str] = sidecar.read_text().split()[0]
+            except (OSError, IndexError):
+                sha256 = None
+            backups.append(
+                {
+                    "name": path.name,
+                    "size": stat.st_size,
+                    "created_at": datetime.fromtimestamp(stat.st_mtime),
+                    "compression": codec,
+                    "sha256": sha256,
+                }
+            )
+        backups.sort(key=lambda b: b["created_at"], reverse=True)
+        return backups
+
+
+def read_manifest(archive: Path) -> dict[str, Any]:
+    """
+    Read and verify an archive: every member against the manifest checksums
+
+    Args:
+        archive: Backup archive
+
+    Returns:
+        Manifest
+
+    Raises:
+        ValueError: Missing manifest or checksum mismatch
+    """
+    checksums: dict[str, str] = {}
+    manifest: Optional[dict[str, Any]] = None
+    with open(archive, "rb") as raw, decompressor(raw, codec_for(archive)) as stream:
+        with tarfile.open(fileobj=stream, mode="r|") as tar:
+            for member in tar:
+                extracted = tar.extractfile(member)
+                if extracted is None:
+                    continue
+                if member.name == MANIFEST_NAME:
+                    manifest = json.loads(extracted.read())
+                    continue
+                digest = hashlib.sha256()
+                for chunk in iter(lambda: extracted.read(COPY_CHUNK), b""):
+                    digest.update(chunk)
+                checksums[member.name] = digest.hexdigest()
+
+    if manifest is None:
+        raise ValueError(f"{archive.name}: no {MANIFEST_NAME}")
+    for entry in manifest["files"]:
+        if checksums.get(entry["path"]) != entry["sha256"]:
+            raise ValueError(f"{archive.name}: checksum mismatch for {entry['path']}")
+    return manifest
+
+
+def register_rpc_methods(rpc: AdminRPCServer) -> None:
+    """
+    Expose backups on the admin RPC socket (./docklite maint backup)
+
+    Args:
+        rpc: Server to add the methods to
+    """
+
+    async def create_backup(files: Optional[dict] = None) -> dict:
+        try:
+            members = {
+                str(name): base64.b64decode(content, validate=True)
+                for name, content in (files or {}).items()
+            }
+        except (AttributeError, TypeError, ValueError):
+            raise RPCError(INVALID_PARAMS, "files must map paths to base64 content")
+        for name in members:
+            try:
+                check_member_name(name)
+            except ValueError as e:
+                raise RPCError(INVALID_PARAMS, str(e))
+
+        result, error = await asyncio.to_thread(
+            BackupService().create_backup, members, "cli"
+        )
+        if error or result is None:
+            raise RPCError(INTERNAL_ERROR, error or "Backup failed")
+        return result
+
+    async def list_backups() -> list[dict]:
+        backups = await asyncio.to_thread(BackupService().list_backups)
+        return [{**b, "created_at": b["created_at"].isoformat()} for b in backups]
+
+    rpc.add_method("backup.create", create_backup)
+    rpc.add_method("backup.list", list_backups)
@@ -0,0 +1,191 @@
+"""
+Container stats from cgroup v2 files
+CPU, memory and block I/O of running containers read straight from their
+cgroups (CGROUP_ROOT) instead of a stats call to the daemon per container,
+which also samples for about a second. CPU % is the usage delta between
+two reads, so the sampler keeps each container's previous read.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+
+# Parents of container cgroups: systemd and cgroupfs cgroup drivers
+CGROUP_PARENTS = ("system.slice", "docker")
+CGROUP_NAME_PATTERN = re.compile(r"^(?:docker-)?([0-9a-f]{64})(?:\.scope)?$")
+
+
+def read_keyed(path: Path) -> dict[str, int]:
+    """Values of a flat keyed file (cpu.stat, memory.stat: "key value" lines)"""
+    values = {}
+    for line in path.read_text().splitlines():
+        key, _, value = line.partition(" ")
+        if value.isdigit():
+            values[key] = int(value)
+    return values
+
+
+def read_io_stat(path: Path) -> tuple[int, int]:
+    """Bytes read and written over all devices of an io.stat file"""
+    read = written = 0
+    for line in path.read_text().splitlines():
+        # "8:0 rbytes=1 wbytes=2 rios=3 wios=4 dbytes=0 dios=0"
+        for field in line.split()[1:]:
+            key, _, value = field.partition("=")
+            if key == "rbytes":
+                read += int(value)
+            elif key == "wbytes":
+                written += int(value)
+    return read, written
+
+
+def read_net_dev(path: Path) -> tuple[int, int]:
+    """Bytes received and sent over all interfaces but loopback (/proc/net/dev)"""
+    received = sent = 0
+    for line in path.read_text().splitlines()[2:]:
+        interface, _, counters = line.partition(":")
+        values = counters.split()
+        if interface.strip() != "lo" and len(values) >= 9:
+            received += int(values[0])
+            sent += int(values[8])
+    return received, sent
+
+
+class CgroupSampler:
+    """Reads container stats from cgroup v2; thread-safe"""
+
+    def __init__(self, root: Optional[str] = None, proc_root: Optional[str] = None):
+        self.root = Path(root or settings.CGROUP_ROOT)
+        proc_root = proc_root or settings.CGROUP_PROC_ROOT
+        self.proc_root = Path(proc_root) if proc_root else None
+        # Short container ID -> cgroup directory
+        self._paths: dict[str, Path] = {}
+        # Short container ID -> (monotonic time, CPU usage in µs)
+        self._previous: dict[str, tuple[float, int]] = {}
+        self._lock = threading.Lock()
+        try:
+            self._host_memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (ValueError, OSError):
+            self._host_memory = 0
+
+    def available(self) -> bool:
+        """True if CGROUP_ROOT is a cgroup v2 (unified) hierarchy"""
+        return (self.root / "cgroup.controllers").is_file()
+
+    def read(self, container_ids: list[str]) -> tuple[dict[str, dict], list[str]]:
+        """
+        Read the stats of running containers
+
+        A container's first read has no CPU delta yet and reports 0 %.
+
+        Args:
+            container_ids: Short (12 character) IDs
+
+        Returns:
+            ({id: {"cpu_percent", "memory_bytes", "memory_limit_bytes",
+            "network_rx_bytes", "network_tx_bytes", "block_read_bytes",
+            "block_write_bytes"}}, IDs without a readable cgroup). Containers
+            that stopped meanwhile are in neither. The network counters are
+            None when the host's /proc isn't visible.
+        """
+        if not self.available():
+            return {}, list(container_ids)
+
+        with self._lock:
+            if any(cid not in self._paths for cid in container_ids):
+                self._scan()
+            readings: dict[str, dict] = {}
+            missing = []
+            for cid in container_ids:
+                path = self._paths.get(cid)
+                if path is None:
+                    missing.append(cid)
+                    continue
+                try:
+                    readings[cid] = self._read_cgroup(cid, path)
+                except FileNotFoundError:
+                    # Stopped since it was listed
+                    self._paths.pop(cid, None)
+                except (OSError, ValueError, KeyError):
+                    missing.append(cid)
+            # Forget containers that are gone
+            listed = set(container_ids)
+            self._previous = {
+                cid: read for cid, read in self._previous.items() if cid in listed
+            }
+        return readings, missing
+
+    def _scan(self) -> None:
+        """Find the cgroup directories of all containers"""
+        paths = {}
+        for parent in CGROUP_PARENTS:
+            try:
+                entries = list(os.scandir(self.root / parent))
+            except OSError:
+                continue
+            for entry in entries:
+                match = CGROUP_NAME_PATTERN.match(entry.name)
+                if match and entry.is_dir(follow_symlinks=False):
+                    paths[match.group(1)[:12]] = Path(entry.path)
+        self._paths = paths
+
+    def _read_cgroup(self, container_id: str, path: Path) -> dict:
+        """Stats of one container from its cgroup directory"""
+        now = time.monotonic()
+        usage_usec = read_keyed(path / "cpu.stat")["usage_usec"]
+        previous = self._previous.get(container_id)
+        self._previous[container_id] = (now, usage_usec)
+        cpu_percent = 0.0
+        if previous is not None and now > previous[0]:
+            # 100 % per fully used CPU, like `docker stats`
+            used = max(0, usage_usec - previous[1]) / 1e6
+            cpu_percent = used / (now - previous[0]) * 100
+
+        memory = int((path / "memory.current").read_text())
+        # Page cache is reclaimable: not counted, like `docker stats`
+        inactive_file = read_keyed(path / "memory.stat").get("inactive_file", 0)
+        if inactive_file < memory:
+            memory -= inactive_file
+        limit = (path / "memory.max").read_text().strip()
+        block_read, block_write = read_io_stat(path / "io.stat")
+        rx, tx = self._network(path)
+
+        return {
+            "cpu_percent": cpu_percent,
+            "memory_bytes": memory,
+            "memory_limit_bytes": self._host_memory if limit == "max" else int(limit),
+            "network_rx_bytes": rx,
+            "network_tx_bytes": tx,
+            "block_read_bytes": block_read,
+            "block_write_bytes": block_write,
+        }
+
+    def _network(self, path: Path) -> tuple[Optional[int], Optional[int]]:
+        """
+        Network counters of a container (cgroups have none)
+
+        Read from /proc/<pid>/net/dev of one of its processes, which needs
+        the host's /proc at CGROUP_PROC_ROOT; (None, None) when unset or not
+        visible (unknown, not 0: it would read as an idle network).
+        """
+        if self.proc_root is None:
+            return None, None
+        try:
+            with open(path / "cgroup.procs") as f:
+                pid = f.readline().strip()
+            if pid:
+                return read_net_dev(self.proc_root / pid / "net" / "dev")
+        except (OSError, ValueError):
+            pass
+        return None, None
+
+
+# Shared by all stats calls of this worker (CPU deltas need previous reads)
+cgroup_sampler = CgroupSampler()
@@ -0,0 +1,469 @@
+"""
+Container metrics history
+An embedded time-series store: the leader worker samples the resource
+usage of running containers into per-container ring buffers (array-backed
+columns) at three resolutions, and periodically writes them to one file
+that the other workers read to answer range queries.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+from app.core.config import settings
+from app.core.metrics import record_cache_lookup
+from app.services.backup_service import database_path
+from app.services.docker_service import DockerService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STORE_FILE = "metrics.tsdb"
+FILE_MAGIC = b"DLTSDB1\n"
+
+# Stored per sample: gauges, and network counters turned into rates
+FIELDS = ("cpu_percent", "memory_bytes", "memory_percent", "net_rx_rate", "net_tx_rate")
+
+RAW_RETENTION_SECONDS = 3600
+MINUTE_RETENTION_SECONDS = 86400
+
+# Most points returned by one query
+MAX_POINTS = 2000
+
+
+@dataclass(frozen=True)
+class Tier:
+    """Resolution level: `capacity` buckets of `resolution` seconds"""
+
+    name: str
+    resolution: int
+    capacity: int
+
+    @property
+    def retention(self) -> int:
+        return self.resolution * self.capacity
+
+
+def default_tiers() -> tuple[Tier, ...]:
+    """Raw samples, 1-minute and 1-hour rollups (finest first)"""
+    interval = max(1, settings.CONTAINER_METRICS_INTERVAL_SECONDS)
+    return (
+        Tier("raw", interval, max(1, RAW_RETENTION_SECONDS // interval)),
+        Tier("1m", 60, MINUTE_RETENTION_SECONDS // 60),
+        Tier("1h", 3600, max(1, settings.CONTAINER_METRICS_RETENTION_DAYS) * 24),
+    )
+
+
+def metrics_path() -> Path:
+    """
+    File of the compacted store
+
+    CONTAINER_METRICS_PATH, else metrics.tsdb next to the SQLite database,
+    else in a temporary directory.
+    """
+    if settings.CONTAINER_METRICS_PATH:
+        return Path(settings.CONTAINER_METRICS_PATH)
+    database = database_path()
+    if database is not None:
+        return database.parent / STORE_FILE
+    return Path(tempfile.gettempdir()) / "docklite" / STORE_FILE
+
+
+def _counter(value: Optional[float]) -> float:
+    """Sampled counter, NaN when unknown (network without the host's /proc)"""
+    return math.nan if value is None else float(value)
+
+
+def _rate(current: float, previous: float, elapsed: float) -> float:
+    """Per-second rate of a counter; NaN (not stored as 0) when unknown"""
+    if math.isnan(current) or math.isnan(previous):
+        return math.nan
+    # Counters restart with the container
+    return max(0.0, current - previous) / elapsed
+
+
+def _point(value: float, samples: int) -> Optional[float]:
+    """Aggregated value of a query point (None: no samples or unknown)"""
+    return round(value, 2) if samples and math.isfinite(value) else None
+
+
+class Ring:
+    """
+    One tier of one container as parallel columns
+
+    Bucket n (time // resolution) lives in slot n % capacity; a slot is
+    reset when a newer bucket wraps around onto it. Each slot keeps the
+    sample count and per-field sums and maxima, so coarser buckets can be
+    aggregated from finer ones without losing the average or the peak.
+    An unknown value (NaN) turns the field's sum into NaN and leaves its
+    maximum alone, so the bucket reads as unknown rather than as 0.
+    """
+
+    def __init__(self, tier: Tier):
+        self.tier = tier
+        size = tier.capacity
+        self.times = array("d", bytes(8 * size))  # Bucket start (0: empty)
+        self.counts = array("I", bytes(4 * size))
+        self.sums = [array("f", bytes(4 * size)) for _ in FIELDS]
+        self.maxes = [array("f", bytes(4 * size)) for _ in FIELDS]
+
+    def columns(self) -> list[array]:
+        return [self.times, self.counts, *self.sums, *self.maxes]
+
+    def add(self, ts: float, values: list[float]) -> None:
+        bucket = int(ts // self.tier.resolution)
+        slot = bucket % self.tier.capacity
+        start = float(bucket * self.tier.resolution)
+        if self.times[slot] != start:
+            self.times[slot] = start
+            self.counts[slot] = 0
+            for column in self.sums:
+                column[slot] = 0.0
+            for column in self.maxes:
+                column[slot] = -math.inf
+        self.counts[slot] += 1
+        for index, value in enumerate(values):
+            self.sums[index][slot] += value
+            if value > self.maxes[index][slot]:
+                self.maxes[index][slot] = value
+
+
+@dataclass
+class Series:
+    """Metrics of one container (by name: history survives recreation)"""
+
+    name: str
+    id: str
+    project: str
+    rings: list[Ring]
+    last_seen: float = 0.0
+    # (time, rx bytes, tx bytes) of the previous sample, for rates
+    previous: Optional[tuple[float, float, float]] = field(default=None)
+
+
+class ContainerMetricsStore:
+    """In-memory ring buffers of all containers; thread-safe"""
+
+    def __init__(self, tiers: Optional[tuple[Tier, ...]] = None):
+        self.tiers = tiers or default_tiers()
+        self.series: dict[str, Series] = {}
+        self._lock = threading.Lock()
+
+    def record(self, samples: list[dict], now: Optional[float] = None) -> int:
+        """
+        Add one sample per container to every tier
+
+        The first sample of a container only sets the baseline of its
+        network counters (rates need two samples).
+
+        Args:
+            samples: DockerService.get_all_container_stats items
+            now: Sample time
+
+        Returns:
+            Number of samples stored
+        """
+        now = now or time.time()
+        stored = 0
+        with self._lock:
+            for sample in samples:
+                series = self.series.get(sample["name"])
+                if series is None:
+                    series = self.series[sample["name"]] = Series(
+                        sample["name"],
+                        sample["id"],
+                        sample.get("project", ""),
+                        [Ring(tier) for tier in self.tiers],
+                    )
+                series.id = sample["id"]
+                series.last_seen = now
+                rx = _counter(sample.get("network_rx_bytes", 0))
+                tx = _counter(sample.get("network_tx_bytes", 0))
+                previous, series.previous = series.previous, (now, rx, tx)
+                if previous is None or now <= previous[0]:
+                    continue
+                elapsed = now - previous[0]
+                values = [
+                    float(sample.get("cpu_percent", 0)),
+                    float(sample.get("memory_bytes", 0)),
+                    float(sample.get("memory_percent", 0)),
+                    _rate(rx, previous[1], elapsed),
+                    _rate(tx, previous[2], elapsed),
+                ]
+                for ring in series.rings:
+                    ring.add(now, values)
+                stored += 1
+        return stored
+
+    def find(self, ref: str) -> Optional[Series]:
+        """Series of a container by name, ID or ID prefix"""
+        with self._lock:
+            series = self.series.get(ref.lstrip("/"))
+            if series is None and len(ref) >= 3:
+                matches = [
+                    s
+                    for s in self.series.values()
+                    if s.id.startswith(ref) or ref.startswith(s.id)
+                ]
+                series = matches[0] if len(matches) == 1 else None
+            return series
+
+    def query(
+        self,
+        ref: str,
+        range_seconds: int,
+        step_seconds: int,
+        now: Optional[float] = None,
+    ) -> Optional[dict[str, Any]]:
+        """
+        Aggregate a container's metrics into evenly spaced points
+
+        Uses the coarsest tier that still covers the range at the step;
+        the step is rounded to a multiple of that tier's resolution.
+
+        Args:
+            ref: Container name, ID or ID prefix
+            range_seconds: How far back from now
+            step_seconds: Width of each point
+            now: Current time
+
+        Returns:
+            {"container", "id", "project", "tier", "range", "step",
+            "timestamps": [start of each point], "metrics": {field:
+            {"avg": [...], "max": [...]}}} (None for points without
+            samples or with unknown values), or None for unknown containers
+        """
+        series = self.find(ref)
+        if series is None:
+            return None
+        now = now or time.time()
+
+        covering = [i for i, t in enumerate(self.tiers) if t.retention >= range_seconds]
+        covering = covering or [len(self.tiers) - 1]
+        fine = [i for i in covering if self.tiers[i].resolution <= step_seconds]
+        index = fine[-1] if fine else covering[0]
+        resolution = self.tiers[index].resolution
+        step = max(resolution, step_seconds - step_seconds % resolution)
+        count = min(MAX_POINTS, max(1, math.ceil(range_seconds / step)))
+        end = (math.floor(now / step) + 1) * step
+        start = end - count * step
+
+        with self._lock:
+            ring = series.rings[index]
+            # Column at a time: select the slots in range once, then
+            # aggregate each field's column over them
+            times = ring.times
+            selected = [i for i, t in enumerate(times) if t and start <= t < end]
+            points = [int((times[i] - start) // step) for i in selected]
+            counts = [0] * count
+            for slot, point in zip(selected, points):
+                counts[point] += ring.counts[slot]
+            metrics = {}
+            for column, name in enumerate(FIELDS):
+                sums = [0.0] * count
+                maxes = [-math.inf] * count
+                sum_column, max_column = ring.sums[column], ring.maxes[column]
+                for slot, point in zip(selected, points):
+                    sums[point] += sum_column[slot]
+                    maxes[point] = max(maxes[point], max_column[slot])
+                metrics[name] = {
+                    "avg": [
+                        _point(total / n if n else 0.0, n)
+                        for total, n in zip(sums, counts)
+                    ],
+                    "max": [_point(peak, n) for peak, n in zip(maxes, counts)],
+                }
+
+        return {
+            "container": series.name,
+            "id": series.id,
+            "project": series.project,
+            "tier": self.tiers[index].name,
+            "range": count * step,
+            "step": step,
+            "timestamps": [start + n * step for n in range(count)],
+            "metrics": metrics,
+        }
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """
+        Drop containers without samples within the longest retention
+
+        Returns:
+            Number of containers dropped
+        """
+        cutoff = (now or time.time()) - max(t.retention for t in self.tiers)
+        with self._lock:
+            gone = [name for name, s in self.series.items() if s.last_seen < cutoff]
+            for name in gone:
+                del self.series[name]
+        return len(gone)
+
+    def save(self, path: Path) -> int:
+        """
+        Write all series to a file (replaced atomically)
+
+        A JSON header line (layout, containers) is followed by the raw
+        columns of every ring, in header order.
+
+        Args:
+            path: Store file
+
+        Returns:
+            Bytes written
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with self._lock:
+            header = {
+                "byteorder": sys.byteorder,
+                "fields": list(FIELDS),
+                "tiers": [[t.name, t.resolution, t.capacity] for t in self.tiers],
+                "series": [
+                    {
+                        "name": s.name,
+                        "id": s.id,
+                        "project": s.project,
+                        "last_seen": s.last_seen,
+                    }
+                    for s in self.series.values()
+                ],
+            }
+            with open(tmp_path, "wb") as f:
+                f.write(FILE_MAGIC + json.dumps(header).encode() + b"\n")
+                for series in self.series.values():
+                    for ring in series.rings:
+                        for column in ring.columns():
+                            column.tofile(f)
+                size = f.tell()
+        os.replace(tmp_path, path)
+        return size
+
+    @classmethod
+    def load(
+        cls, path: Path, tiers: Optional[tuple[Tier, ...]] = None
+    ) -> "ContainerMetricsStore":
+        """
+        Read a store written by save()
+
+        Args:
+            path: Store file
+            tiers: Expected layout (default: from settings)
+
+        Returns:
+            The store
+
+        Raises:
+            FileNotFoundError: No store file yet
+            ValueError: Corrupt file, or written with another layout
+        """
+        store = cls(tiers)
+        with open(path, "rb") as f:
+            if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                raise ValueError(f"Not a metrics store: {path}")
+            header = json.loads(f.readline())
+            layout = [[t.name, t.resolution, t.capacity] for t in store.tiers]
+            if header["tiers"] != layout or header["fields"] != list(FIELDS):
+                raise ValueError("Metrics store was written with another layout")
+            swap = header["byteorder"] != sys.byteorder
+            for item in header["series"]:
+                rings = [Ring(tier) for tier in store.tiers]
+                for ring in rings:
+                    for column in ring.columns():
+                        _read_column(f, column, swap)
+                store.series[item["name"]] = Series(
+                    item["name"],
+                    item["id"],
+                    item["project"],
+                    rings,
+                    item["last_seen"],
+                )
+        return store
+
+
+def _read_column(f: BinaryIO, column: array, swap: bool) -> None:
+    """Fill a zeroed column from the file"""
+    size = len(column)
+    del column[:]
+    try:
+        column.fromfile(f, size)
+    except EOFError:
+        raise ValueError("Metrics store is truncated")
+    if swap:
+        column.byteswap()
+
+
+# Live store of the leader worker (None until it samples)
+_live_store: Optional[ContainerMetricsStore] = None
+# Store read from disk by the other workers: (file mtime, store)
+_disk_cache: Optional[tuple[int, ContainerMetricsStore]] = None
+
+
+def _open_store(path: Path) -> ContainerMetricsStore:
+    """Store from disk, or a new one when missing or unreadable"""
+    try:
+        return ContainerMetricsStore.load(path)
+    except FileNotFoundError:
+        return ContainerMetricsStore()
+    except (ValueError, OSError) as e:
+        logger.warning(f"Starting a new metrics store: {e}")
+        return ContainerMetricsStore()
+
+
+def read_store() -> ContainerMetricsStore:
+    """
+    Store to answer queries from
+
+    The live store in the sampling (leader) worker, else the last
+    compacted file (reloaded when it changed).
+    """
+    global _disk_cache
+    if _live_store is not None:
+        return _live_store
+    path = metrics_path()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return ContainerMetricsStore()
+    hit = _disk_cache is not None and _disk_cache[0] == mtime
+    record_cache_lookup("container_metrics", hit)
+    if _disk_cache is None or not hit:
+        _disk_cache = (mtime, _open_store(path))
+    return _disk_cache[1]
+
+
+async def sample_container_metrics() -> None:
+    """Sample running containers into the live store"""
+    global _live_store
+
+    def sample() -> list[dict]:
+        samples, error = DockerService().get_all_container_stats()
+        if error:
+            raise Exception(error)
+        return samples
+
+    if _live_store is None:
+        # Continue the history of the previous leader
+        _live_store = await asyncio.to_thread(_open_store, metrics_path())
+    samples = await asyncio.to_thread(sample)
+    _live_store.record(samples)
+
+
+async def compact_container_metrics() -> None:
+    """Write the live store to disk, dropping long-gone containers"""
+    if _live_store is None:
+        return
+    store = _live_store
+    store.prune()
+    await asyncio.to_thread(store.save, metrics_path())
@@ -0,0 +1,424 @@
+"""
+Docker Engine API client
+Minimal HTTP/1.1 client for the Engine API over a unix socket (stdlib only).
+Used by DockerService when DOCKER_API_SOCKET is set, and for interactive
+exec/attach sessions (hijacked connections).
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+import struct
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+from urllib.parse import quote, urlencode
+
+# Engine API version requested in paths (Docker 24+)
+API_VERSION = "1.43"
+
+# Content type of multiplexed stdout/stderr streams (logs of non-TTY containers)
+RAW_STREAM_CONTENT_TYPE = "application/vnd.docker.raw-stream"
+MULTIPLEXED_STREAM_CONTENT_TYPE = "application/vnd.docker.multiplexed-stream"
+
+# Largest response head accepted for upgraded (hijacked) requests
+MAX_RESPONSE_HEAD = 64 * 1024
+
+
+class DockerAPIError(Exception):
+    """Engine API returned an error status"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a unix socket"""
+
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+def demux_stream(data: bytes) -> bytes:
+    """
+    Strip the 8-byte frame headers of a multiplexed stdout/stderr stream
+
+    Args:
+        data: Stream body ([stream type, 0, 0, 0, size (uint32 BE)] + payload...)
+
+    Returns:
+        Payloads of all frames in order
+    """
+    output = bytearray()
+    offset = 0
+    while offset + 8 <= len(data):
+        (size,) = struct.unpack(">I", data[offset + 4 : offset + 8])
+        output += data[offset + 8 : offset + 8 + size]
+        offset += 8 + size
+    return bytes(output)
+
+
+@dataclass
+class HijackedStream:
+    """Raw stream of an exec/attach session (see DockerAPIClient.hijack)"""
+
+    sock: socket.socket
+    # Stream bytes that arrived together with the response head
+    buffered: bytes
+    # TTY: raw output; otherwise multiplexed stdout/stderr frames
+    tty: bool
+
+    def close(self) -> None:
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class StreamDemuxer:
+    """
+    Incremental demux_stream for multiplexed streams read in chunks
+
+    Frames may span reads: an incomplete frame is kept until the rest
+    arrives.
+    """
+
+    def __init__(self) -> None:
+        self._pending = bytearray()
+
+    def feed(self, data: bytes) -> bytes:
+        """
+        Add stream bytes
+
+        Args:
+            data: Next bytes read from the stream
+
+        Returns:
+            Payloads of the frames completed by data
+        """
+        return b"".join(payload for _, payload in self.feed_frames(data))
+
+    def feed_frames(self, data: bytes) -> list[tuple[int, bytes]]:
+        """
+        Add stream bytes, keeping the stream of each frame
+
+        Args:
+            data: Next bytes read from the stream
+
+        Returns:
+            (stream type: 1 stdout, 2 stderr, payload) of the frames
+            completed by data
+        """
+        self._pending += data
+        frames = []
+        offset = 0
+        while offset + 8 <= len(self._pending):
+            (size,) = struct.unpack(">I", self._pending[offset + 4 : offset + 8])
+            if offset + 8 + size > len(self._pending):
+                break
+            frames.append(
+                (
+                    self._pending[offset],
+                    bytes(self._pending[offset + 8 : offset + 8 + size]),
+                )
+            )
+            offset += 8 + size
+        del self._pending[:offset]
+        return frames
+
+
+class DockerAPIClient:
+    """
+    Engine API client bound to one unix socket
+
+    Keeps one keep-alive connection (reconnects when the daemon closed it).
+    Not thread-safe: use one client per thread.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._conn: Optional[_UnixHTTPConnection] = None
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        body: Optional[Any] = None,
+    ) -> tuple[int, str, bytes]:
+        """
+        Send a request
+
+        Args:
+            method: HTTP method
+            path: API path without version prefix (e.g. "/containers/json")
+            params: Query parameters (None values are skipped, bools -> 1/0)
+            timeout: Override of the socket timeout for this request
+            body: JSON request body
+
+        Returns:
+            Tuple of (status, content type, body)
+        """
+        url = self._url(path, params)
+        payload, headers = self._body(body)
+        for attempt in range(2):
+            conn = self._connection(timeout)
+            try:
+                conn.request(method, url, body=payload, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError):
+                # Idle keep-alive connection closed by the daemon: retry once
+                self.close()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                self.close()
+                raise
+            if response.will_close:
+                self.close()
+            return response.status, response.getheader("Content-Type", ""), body
+        raise ConnectionError("unreachable")  # pragma: no cover
+
+    def json(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        body: Optional[Any] = None,
+    ) -> Any:
+        """
+        Send a request and decode the JSON response
+
+        Raises:
+            DockerAPIError: On 4xx/5xx responses (message from the daemon)
+        """
+        status, _, content = self.request(method, path, params, timeout, body)
+        self.raise_for_status(status, content)
+        return json.loads(content) if content else None
+
+    def open_stream(
+        self, method: str, path: str, params: Optional[dict[str, Any]] = None
+    ) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """
+        Send a request on a dedicated connection, leaving the body unread
+
+        For endpoints that stream until closed (e.g. /events). The caller
+        reads the response and closes the connection; shutting down
+        connection.sock from another thread unblocks a pending read.
+
+        Args:
+            method: HTTP method
+            path: API path without version prefix
+            params: Query parameters
+
+        Returns:
+            Tuple of (connection, response)
+
+        Raises:
+            DockerAPIError: On error statuses
+        """
+        conn = _UnixHTTPConnection(self.socket_path, self.timeout)
+        try:
+            conn.request(method, self._url(path, params), headers={"Host": "docker"})
+            response = conn.getresponse()
+            if response.status >= 400:
+                self.raise_for_status(response.status, response.read())
+            # Streams stay idle for long periods: no read timeout
+            conn.sock.settimeout(None)
+        except BaseException:
+            conn.close()
+            raise
+        return conn, response
+
+    def upload(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]],
+        body: Iterable[bytes],
+        timeout: Optional[float] = None,
+        content_type: str = "application/x-tar",
+    ) -> tuple[int, bytes]:
+        """
+        Send a request with a streamed body on a dedicated connection
+
+        The body is sent chunked (Transfer-Encoding) as the iterable
+        produces it, so it never has to fit in memory (e.g. a tar archive
+        for PUT /containers/{id}/archive).
+
+        Args:
+            method: HTTP method
+            path: API path without version prefix
+            params: Query parameters
+            body: Body parts
+            timeout: Socket timeout (default: the client's)
+            content_type: Content type of the body
+
+        Returns:
+            Tuple of (status, response body)
+        """
+        conn = _UnixHTTPConnection(self.socket_path, timeout or self.timeout)
+        try:
+            conn.request(
+                method,
+                self._url(path, params),
+                body=body,
+                headers={"Host": "docker", "Content-Type": content_type},
+                encode_chunked=True,
+            )
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+    def hijack(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        body: Optional[Any] = None,
+    ) -> tuple[socket.socket, bytes]:
+        """
+        Send a request that upgrades the connection to a raw stream
+
+        For exec start and attach: once the daemon answered "101 UPGRADED"
+        the socket carries the process's stdin (written by the caller) and
+        output. The response head is read byte-wise off the socket, so no
+        stream data is consumed by an HTTP buffer.
+
+        Args:
+            method: HTTP method
+            path: API path without version prefix
+            params: Query parameters
+            body: JSON request body
+
+        Returns:
+            Tuple of (blocking socket without timeout, stream bytes that
+            arrived with the response head)
+
+        Raises:
+            DockerAPIError: On error statuses
+        """
+        payload, headers = self._body(body)
+        headers.update({"Connection": "Upgrade", "Upgrade": "tcp"})
+        head = f"{method} {self._url(path, params)} HTTP/1.1\r\n" + "".join(
+            f"{name}: {value}\r\n" for name, value in headers.items()
+        )
+        if payload is not None:
+            head += f"Content-Length: {len(payload)}\r\n"
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+            sock.sendall(head.encode() + b"\r\n" + (payload or b""))
+            status, response_headers, rest = self._read_head(sock)
+            if status >= 400:
+                length = int(response_headers.get("content-length") or 0)
+                while len(rest) < length:
+                    chunk = sock.recv(length - len(rest))
+                    if not chunk:
+                        break
+                    rest += chunk
+                self.raise_for_status(status, rest)
+            if status not in (101, 200):
+                raise DockerAPIError(status, f"Unexpected upgrade status {status}")
+            # Interactive streams stay idle for long periods: no read timeout
+            sock.settimeout(None)
+        except BaseException:
+            sock.close()
+            raise
+        return sock, rest
+
+    @staticmethod
+    def raise_for_status(status: int, body: bytes) -> None:
+        """Raise DockerAPIError for error statuses"""
+        if status < 400:
+            return
+        try:
+            message = json.loads(body).get("message", "")
+        except (ValueError, AttributeError):
+            message = body.decode("utf-8", "replace").strip()
+        raise DockerAPIError(status, message or f"Docker API error {status}")
+
+    @staticmethod
+    def quote(value: str) -> str:
+        """Escape a container ID/name for use in a path"""
+        return quote(value, safe="")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _url(path: str, params: Optional[dict[str, Any]]) -> str:
+        url = f"/v{API_VERSION}{path}"
+        if params:
+            query = {
+                key: int(value) if isinstance(value, bool) else value
+                for key, value in params.items()
+                if value is not None
+            }
+            url = f"{url}?{urlencode(query)}"
+        return url
+
+    @staticmethod
+    def _body(body: Optional[Any]) -> tuple[Optional[bytes], dict[str, str]]:
+        if body is None:
+            return None, {"Host": "docker"}
+        return json.dumps(body).encode(), {
+            "Host": "docker",
+            "Content-Type": "application/json",
+        }
+
+    @staticmethod
+    def _read_head(sock: socket.socket) -> tuple[int, dict[str, str], bytes]:
+        """Read a response head; returns (status, headers, bytes after it)"""
+        buffer = b""
+        while b"\r\n\r\n" not in buffer:
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("Docker closed the connection")
+            buffer += chunk
+            if len(buffer) > MAX_RESPONSE_HEAD:
+                raise ConnectionError("Response head too large")
+        head, _, rest = buffer.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            status = int(lines[0].split(" ", 2)[1])
+        except (IndexError, ValueError):
+            raise ConnectionError(f"Malformed status line: {lines[0]!r}")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return status, headers, rest
+
+    def _connection(self, timeout: Optional[float]) -> _UnixHTTPConnection:
+        if self._conn is None:
+            self._conn = _UnixHTTPConnection(self.socket_path, self.timeout)
+        self._conn.timeout = timeout if timeout is not None else self.timeout
+        if self._conn.sock is not None:
+            self._conn.sock.settimeout(self._conn.timeout)
+        return self._conn
@@ -0,0 +1,205 @@
+"""
+Docker events to real-time events
+The leader worker follows the daemon's container event stream and
+publishes state changes on the "containers" topic (see app.core.events).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.core.events import TOPIC_CONTAINERS, hub
+from app.core.metrics import record_cache_lookup
+from app.models.project import Project
+from app.services.docker_service import DockerEventStream, DockerService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Container state after each forwarded action (other actions, e.g.
+# exec_start or attach, are not state changes)
+STATE_BY_ACTION = {
+    "create": "created",
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "stop": "exited",
+    "kill": "exited",
+    "oom": "exited",
+    "destroy": "removed",
+    "health_status": "running",
+}
+
+# Delay before reconnecting after the stream ended (daemon restart)
+RECONNECT_SECONDS = 5
+
+COMPOSE_PROJECT_LABEL = "com.docker.compose.project"
+COMPOSE_SERVICE_LABEL = "com.docker.compose.service"
+
+
+class ProjectOwners:
+    """Project slug -> (project ID, owner ID), reloaded from the DB on misses"""
+
+    def __init__(self, refresh_seconds: float = 5.0):
+        self.refresh_seconds = refresh_seconds
+        self._owners: dict[str, tuple[int, int]] = {}
+        self._loaded = 0.0
+
+    async def lookup(self, slug: str) -> Optional[tuple[int, int]]:
+        """
+        Find the project of a compose project name
+
+        Args:
+            slug: Compose project name (project slug)
+
+        Returns:
+            Tuple of (project ID, owner ID), or None for non-project containers
+        """
+        if not slug:
+            return None
+        hit = slug in self._owners
+        record_cache_lookup("project_owners", hit)
+        if not hit and time.monotonic() - self._loaded > self.refresh_seconds:
+            await self.reload()
+        return self._owners.get(slug)
+
+    async def reload(self) -> None:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Project.slug, Project.id, Project.owner_id)
+            )
+            self._owners = {
+                str(slug): (int(project_id), int(owner_id))
+                for slug, project_id, owner_id in result.all()
+            }
+        self._loaded = time.monotonic()
+
+
+project_owners = ProjectOwners()
+
+
+async def publish_container_event(event: dict) -> None:
+    """
+    Publish a Docker container event to subscribers
+
+    Args:
+        event: Engine API event (GET /events, `docker events` JSON)
+    """
+    # "health_status: healthy" -> "health_status"
+    action = (event.get("Action") or event.get("status") or "").split(":")[0]
+    state = STATE_BY_ACTION.get(action.strip())
+    if state is None:
+        return
+
+    actor = event.get("Actor") or {}
+    attributes = actor.get("Attributes") or {}
+    name = attributes.get("name", "")
+    project = attributes.get(COMPOSE_PROJECT_LABEL, "")
+    owner = await project_owners.lookup(project)
+
+    hub.publish(
+        TOPIC_CONTAINERS,
+        action.strip(),
+        {
+            "id": (actor.get("ID") or event.get("id") or "")[:12],
+            "name": name,
+            "project": project,
+            "project_id": owner[0] if owner else None,
+            "service": attributes.get(COMPOSE_SERVICE_LABEL, ""),
+            "state": state,
+            "time": event.get("time"),
+        },
+        owner_id=owner[1] if owner else None,
+    )
+
+
+class ContainerEventListener:
+    """
+    Follows the Docker event stream in a background thread
+
+    Events are handed to the event loop and published; the stream is
+    reopened after RECONNECT_SECONDS when it ends (daemon restarts).
+    """
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self._stream: Optional[DockerEventStream] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start following events (no-op when already running)"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            queue: asyncio.Queue = asyncio.Queue()
+            try:
+                self._stream = await asyncio.to_thread(
+                    lambda: DockerService().event_stream()
+                )
+                threading.Thread(
+                    target=self._pump,
+                    args=(self._stream, queue, loop),
+                    name="docker-events",
+                    daemon=True,
+                ).start()
+                while (event := await queue.get()) is not None:
+                    try:
+                        await publish_container_event(event)
+                    except Exception as e:
+                        logger.warning(f"Failed to publish container event: {e}")
+                logger.warning("Docker event stream ended, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Docker event stream unavailable: {e}")
+            finally:
+                if self._stream is not None:
+                    self._stream.close()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    @staticmethod
+    def _pump(
+        stream: DockerEventStream,
+        queue: asyncio.Queue,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        """Read the blocking stream, hand events to the loop (thread)"""
+        try:
+            for event in stream:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+        except Exception as e:
+            logger.warning(f"Docker event stream failed: {e}")
+        finally:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+            except RuntimeError:
+                pass  # Loop closed (shutdown)
+
+
+# Run by the leader worker (see app.main)
+container_event_listener = ContainerEventListener()
@@ -3,19 +3,116 @@
 from __future__ import annotations
 
 import subprocess
+import http.client
 import json
-from typing import Optional
+import re
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import IO, Any, Callable, Iterable, Iterator, Optional
+
+from app.core.config import settings
+from app.core.metrics import DOCKER_CALL_DURATION, DOCKER_CALL_FAILURES
+from app.services.cgroup_stats import cgroup_sampler
+from app.services.docker_api import (
+    MULTIPLEXED_STREAM_CONTENT_TYPE,
+    RAW_STREAM_CONTENT_TYPE,
+    DockerAPIClient,
+    DockerAPIError,
+    HijackedStream,
+    StreamDemuxer,
+    demux_stream,
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Parallel Engine API stats requests (each waits ~1s for a CPU sample)
+STATS_CONCURRENCY = 8
+# Parallel Engine API requests for per-container calls (inspect, ...)
+API_CONCURRENCY = 8
+
+# Engine API socket for interactive sessions in CLI mode (the docker CLI
+# can't hand over a hijacked stream)
+DEFAULT_DOCKER_SOCKET = "/var/run/docker.sock"
+
+# Mount point of a volume in the helper containers used to copy its data
+VOLUME_MOUNT = "/volume"
+# Label of helper containers (value: what the helper does); copy helpers
+# are never started, all are removed once done
+HELPER_LABEL = "docklite.helper"
+# Directory in a volume receiving restored data until swap_volume
+VOLUME_STAGING = ".docklite-restore"
+# Previous content during swap_volume, removed at the end
+VOLUME_OLD = ".docklite-old"
+# Helper scripts (busybox sh), the volume mounted at VOLUME_MOUNT
+PREPARE_STAGING_SCRIPT = f"cd {VOLUME_MOUNT} && rm -rf {VOLUME_STAGING} {VOLUME_OLD} && mkdir {VOLUME_STAGING}"
+# Renames only (same filesystem): the old top-level entries move aside,
+# the staged ones up, then the old ones are deleted
+SWAP_STAGING_SCRIPT = f"""set -e
+cd {VOLUME_MOUNT}
+[ -d {VOLUME_STAGING} ]
+mkdir {VOLUME_OLD}
+for f in * .[!.]* ..?*; do
+  case "$f" in {VOLUME_STAGING}|{VOLUME_OLD}) continue ;; esac
+  if [ -e "$f" ] || [ -L "$f" ]; then mv "$f" {VOLUME_OLD}/; fi
+done
+for f in {VOLUME_STAGING}/* {VOLUME_STAGING}/.[!.]* {VOLUME_STAGING}/..?*; do
+  if [ -e "$f" ] || [ -L "$f" ]; then mv "$f" .; fi
+done
+rmdir {VOLUME_STAGING}
+rm -rf {VOLUME_OLD}
+"""
+# Label naming the compose project (project slug) of containers and volumes
+COMPOSE_PROJECT_LABEL = "com.docker.compose.project"
+# Read size when draining streamed command output
+COPY_CHUNK = 64 * 1024
+# Byte counts printed by the docker CLI ("1.5kB", "100MiB")
+SIZE_PATTERN = re.compile(r"^([\d.]+)\s*([A-Za-z]+)$")
+SIZE_UNITS = {
+    "b": 1,
+    "kb": 1000,
+    "mb": 1000**2,
+    "gb": 1000**3,
+    "tb": 1000**4,
+    "kib": 1024,
+    "mib": 1024**2,
+    "gib": 1024**3,
+    "tib": 1024**4,
+}
 
 
 class DockerService:
-    """Service for interacting with Docker via CLI."""
+    """
+    Service for interacting with Docker via CLI.
+
+    With DOCKER_API_SOCKET set, the Engine API is called directly over that
+    unix socket instead (no docker CLI needed); results have the same shape.
+    """
 
     def __init__(self) -> None:
         """Initialize Docker service."""
+        self._api: Optional[DockerAPIClient] = None
+        self._session_api: Optional[DockerAPIClient] = None
+        if settings.DOCKER_API_SOCKET:
+            self._api = DockerAPIClient(settings.DOCKER_API_SOCKET)
+            try:
+                self._api_call("ping", "GET", "/_ping", timeout=5)
+            except Exception as e:
+                raise Exception(f"Docker is not available: {str(e)}")
+            return
+
         # Test Docker is available
         try:
-            subprocess.run(
-                ["docker", "version"], capture_output=True, check=True, timeout=5
+            self._run(
+                "version",
+                ["docker", "version"],
+                capture_output=True,
+                check=True,
+                timeout=5,
             )
         except (
             subprocess.CalledProcessError,
@@ -34,13 +131,21 @@ class DockerService:
         Returns:
             List of container dictionaries
         """
+        if self._api is not None:
+            return self._api_list_containers(all)
+
         try:
             cmd = ["docker", "ps", "--format", "{{json .}}"]
             if all:
                 cmd.append("--all")
 
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, check=True, timeout=10
+            result = self._run(
+                "ps",
+                cmd,
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=10,
             )
 
             containers = []
@@ -65,10 +170,18 @@ class DockerService:
         Returns:
             Container dictionary or None if not found
         """
+        if self._api is not None:
+            return self._api_get_container(container_id)
+
         try:
             cmd = ["docker", "inspect", container_id]
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, check=True, timeout=10
+            result = self._run(
+                "inspect",
+                cmd,
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=10,
             )
 
             data = json.loads(result.stdout)
@@ -90,8 +203,12 @@ class DockerService:
         Returns:
             Tuple of (success, error_message)
         """
+        if self._api is not None:
+            return self._api_action("start", container_id)
+
         try:
-            subprocess.run(
+            self._run(
+                "start",
                 ["docker", "start", container_id],
                 capture_output=True,
                 text=True,
@@ -121,8 +238,12 @@ class DockerService:
         Returns:
             Tuple of (success, error_message)
         """
+        if self._api is not None:
+            return self._api_action("stop", container_id, timeout)
+
         try:
-            subprocess.run(
+            self._run(
+                "stop",
                 ["docker", "stop", "-t", str(timeout), container_id],
                 capture_output=True,
                 text=True,
@@ -152,8 +273,12 @@ class DockerService:
         Returns:
             Tuple of (success, error_message)
         """
+        if self._api is not None:
+            return self._api_action("restart", container_id, timeout)
+
         try:
-            subprocess.run(
+            self._run(
+                "restart",
                 ["docker", "restart", "-t", str(timeout), container_id],
                 capture_output=True,
                 text=True,
@@ -183,12 +308,22 @@ class DockerService:
         Returns:
             Tuple of (success, error_message)
         """
+        if self._api is not None:
+            return self._api_action("rm", container_id, force=force)
+
         try:
             cmd = ["docker", "rm", container_id]
             if force:
                 cmd.insert(2, "-f")
 
-            subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=30)
+            self._run(
+                "rm",
+                cmd,
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=30,
+            )
             return True, None
         except subprocess.CalledProcessError as e:
             return (
@@ -199,6 +334,56 @@ class DockerService:
         except Exception as e:
             return False, f"Docker error: {str(e)}"
 
+    def pause_container(self, container_id: str) -> tuple[bool, Optional[str]]:
+        """
+        Freeze the processes of a running container (cgroup freezer).
+
+        Args:
+            container_id: Container ID or name
+
+        Returns:
+            Tuple of (success, error_message)
+        """
+        return self._pause_action("pause", container_id)
+
+    def unpause_container(self, container_id: str) -> tuple[bool, Optional[str]]:
+        """
+        Resume the processes of a paused container.
+
+        Args:
+            container_id: Container ID or name
+
+        Returns:
+            Tuple of (success, error_message)
+        """
+        return self._pause_action("unpause", container_id)
+
+    def _pause_action(
+        self, operation: str, container_id: str
+    ) -> tuple[bool, Optional[str]]:
+        """Pause or unpause a container via the Engine API or the CLI."""
+        if self._api is not None:
+            return self._api_action(operation, container_id)
+
+        try:
+            self._run(
+                operation,
+                ["docker", operation, container_id],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=30,
+            )
+            return True, None
+        except subprocess.CalledProcessError as e:
+            return (
+                False,
+                (e.stderr.strip() if e.stderr else None)
+                or f"Failed to {operation} container '{container_id}'",
+            )
+        except Exception as e:
+            return False, f"Docker error: {str(e)}"
+
     def get_container_logs(
         self, container_id: str, tail: int = 100, timestamps: bool = True
     ) -> tuple[Optional[str], Optional[str]]:
@@ -213,14 +398,22 @@ class DockerService:
         Returns:
             Tuple of (logs, error_message)
         """
+        if self._api is not None:
+            return self._api_logs(container_id, tail, timestamps)
+
         try:
             cmd = ["docker", "logs", "--tail", str(tail)]
             if timestamps:
                 cmd.append("--timestamps")
             cmd.append(container_id)
 
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, check=True, timeout=30
+            result = self._run(
+                "logs",
+                cmd,
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=30,
             )
             return result.stdout + result.stderr, None
         except subprocess.CalledProcessError as e:
@@ -244,6 +437,9 @@ class DockerService:
         Returns:
             Tuple of (stats_dict, error_message)
         """
+        if self._api is not None:
+            return self._api_stats(container_id)
+
         try:
             # Get stats in JSON format (no-stream for single snapshot)
             cmd = [
@@ -254,36 +450,17 @@ class DockerService:
                 "{{json .}}",
                 container_id,
             ]
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, check=True, timeout=10
+            result = self._run(
+                "stats",
+                cmd,
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=10,
             )
 
             if result.stdout.strip():
-                stats_data = json.loads(result.stdout.strip())
-
-                # Parse CPU percentage (remove %)
-                cpu_str = stats_data.get("CPUPerc", "0%").rstrip("%")
-                cpu_percent = float(cpu_str) if cpu_str else 0.0
-
-                # Parse memory (format: "100MiB / 2GiB")
-                mem_usage_str = stats_data.get("MemUsage", "0B / 0B")
-                mem_perc_str = stats_data.get("MemPerc", "0%").rstrip("%")
-                mem_percent = float(mem_perc_str) if mem_perc_str else 0.0
-
-                # Parse network I/O (format: "1.5kB / 2kB")
-                net_io = stats_data.get("NetIO", "0B / 0B")
-
-                return {
-                    "cpu_percent": round(cpu_percent, 2),
-                    "memory_usage": mem_usage_str.split(" / ")[0],
-                    "memory_limit": (
-                        mem_usage_str.split(" / ")[1]
-                        if " / " in mem_usage_str
-                        else "0B"
-                    ),
-                    "memory_percent": round(mem_percent, 2),
-                    "network_io": net_io,
-                }, None
+                return self._parse_cli_stats(json.loads(result.stdout.strip())), None
 
             return None, "No stats available"
         except subprocess.CalledProcessError as e:
@@ -295,6 +472,1158 @@ class DockerService:
         except Exception as e:
             return None, f"Docker error: {str(e)}"
 
+    def get_all_container_stats(self) -> tuple[list[dict], Optional[str]]:
+        """
+        Get resource usage of all running containers.
+
+        Returns:
+            Tuple of (samples, error_message). Samples have the container's
+            id, name, project and service plus the get_container_stats fields.
+        """
+        try:
+            containers = self.list_all_containers(all=False)
+        except Exception as e:
+            return [], str(e)
+        if not containers:
+            return [], None
+
+        samples = []
+        if settings.CGROUP_STATS_ENABLED:
+            # Cheap file reads where the cgroups are visible; the daemon
+            # samples the rest
+            readings, missing = cgroup_sampler.read([c["id"] for c in containers])
+            samples = [
+                self._stats_sample(c, self._format_stats(**readings[c["id"]]))
+                for c in containers
+                if c["id"] in readings
+            ]
+            containers = [c for c in containers if c["id"] in missing]
+            if not containers:
+                return samples, None
+
+        if self._api is not None:
+            return samples + self._api_all_stats(containers), None
+
+        cmd = ["docker", "stats", "--no-stream", "--format", "{{json .}}"]
+        if samples:
+            cmd += [c["id"] for c in containers]
+        try:
+            # One call samples all (remaining) running containers in parallel
+            result = self._run(
+                "stats",
+                cmd,
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=30,
+            )
+        except subprocess.CalledProcessError as e:
+            return self._partial_stats(
+                samples,
+                containers,
+                (e.stderr.strip() if e.stderr else None) or "Failed to get stats",
+            )
+        except Exception as e:
+            return self._partial_stats(samples, containers, f"Docker error: {str(e)}")
+
+        by_id = {container["id"]: container for container in containers}
+        for line in result.stdout.splitlines():
+            if not line.strip():
+                continue
+            stats_data = json.loads(line)
+            container = by_id.get(stats_data.get("ID", "")[:12])
+            if container is not None:  # None: started after the listing
+                samples.append(
+                    self._stats_sample(container, self._parse_cli_stats(stats_data))
+                )
+        return samples, None
+
+    @staticmethod
+    def _partial_stats(
+        samples: list[dict], unsampled: list[dict], error: str
+    ) -> tuple[list[dict], Optional[str]]:
+        """
+        Result of get_all_container_stats when `docker stats` failed.
+
+        The samples already read from cgroups are kept (the failure is
+        logged); without any, the call failed.
+        """
+        if not samples:
+            return [], error
+        names = ", ".join(c["name"] for c in unsampled)
+        logger.warning(f"Stats of {names} unavailable: {error}")
+        return samples, None
+
+    def get_log_configs(self) -> tuple[list[dict], Optional[str]]:
+        """
+        Get the logging configuration of all containers.
+
+        Returns:
+            Tuple of ([{"id" (full), "name", "project", "driver", "options"}],
+            error message or None)
+        """
+        try:
+            if self._api is not None:
+                _, body = self._api_call(
+                    "ps", "GET", "/containers/json", {"all": True}, timeout=10
+                )
+                ids = [item["Id"] for item in json.loads(body)]
+
+                def inspect(container_id: str, client: DockerAPIClient) -> Any:
+                    path = f"/containers/{DockerAPIClient.quote(container_id)}/json"
+                    try:
+                        _, data = self._api_call(
+                            "inspect", "GET", path, timeout=10, client=client
+                        )
+                    except DockerAPIError as e:
+                        if e.status == 404:  # Removed since the listing
+                            return None
+                        raise
+                    return json.loads(data)
+
+                items = [item for item in self._api_map(inspect, ids) if item]
+            else:
+                result = self._run(
+                    "ps",
+                    ["docker", "ps", "--all", "--no-trunc", "--quiet"],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=10,
+                )
+                ids = result.stdout.split()
+                items = []
+                if ids:
+                    # One call inspects all containers
+                    result = self._run(
+                        "inspect",
+                        ["docker", "inspect", *ids],
+                        capture_output=True,
+                        text=True,
+                        check=False,
+                        timeout=30,
+                    )
+                    items = json.loads(result.stdout or "[]")
+        except subprocess.CalledProcessError as e:
+            return [], f"Failed to list containers: {e.stderr}"
+        except Exception as e:
+            return [], f"Failed to inspect containers: {str(e)}"
+
+        configs = []
+        for item in items:
+            log_config = (item.get("HostConfig") or {}).get("LogConfig") or {}
+            labels = (item.get("Config") or {}).get("Labels") or {}
+            configs.append(
+                {
+                    "id": item.get("Id", ""),
+                    "name": item.get("Name", "").lstrip("/"),
+                    "project": labels.get(COMPOSE_PROJECT_LABEL, ""),
+                    "driver": log_config.get("Type", ""),
+                    "options": log_config.get("Config") or {},
+                }
+            )
+        configs.sort(key=lambda c: c["name"])
+        return configs, None
+
+    def event_stream(self) -> "DockerEventStream":
+        """
+        Open a stream of container events (start, die, destroy, ...).
+
+        Returns:
+            DockerEventStream (blocking iterator; close() from any thread)
+        """
+        return DockerEventStream(self._api)
+
+    def log_stream(self, container_id: str, since: float = 0) -> "DockerLogStream":
+        """
+        Follow the log of a container (Engine API, also in CLI mode).
+
+        Args:
+            container_id: Container ID or name
+            since: Only lines logged after this UNIX time (0: whole log)
+
+        Returns:
+            DockerLogStream (blocking iterator; close() from any thread)
+        """
+        return DockerLogStream(self._interactive_api().socket_path, container_id, since)
+
+    def list_volumes(self) -> tuple[list[dict], Optional[str]]:
+        """
+        List named volumes with the compose project that created them.
+
+        Returns:
+            Tuple of ([{"name", "project"}], error message or None);
+            project is "" for volumes not created by compose
+        """
+        try:
+            if self._api is not None:
+                _, body = self._api_call("volume_ls", "GET", "/volumes", timeout=10)
+                items = json.loads(body).get("Volumes") or []
+                volumes = [
+                    {
+                        "name": item["Name"],
+                        "project": (item.get("Labels") or {}).get(
+                            COMPOSE_PROJECT_LABEL, ""
+                        ),
+                    }
+                    for item in items
+                ]
+            else:
+                result = self._run(
+                    "volume_ls",
+                    [
+                        "docker",
+                        "volume",
+                        "ls",
+                        "--format",
+                        '{{.Name}}\t{{.Label "com.docker.compose.project"}}',
+                    ],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=10,
+                )
+                volumes = []
+                for line in result.stdout.splitlines():
+                    name, _, project = line.partition("\t")
+                    if name:
+                        volumes.append({"name": name, "project": project})
+        except subprocess.CalledProcessError as e:
+            return [], f"Failed to list volumes: {e.stderr}"
+        except Exception as e:
+            return [], f"Failed to list volumes: {str(e)}"
+        volumes.sort(key=lambda v: v["name"])
+        return volumes, None
+
+    def list_project_containers(self, project: str) -> tuple[list[dict], Optional[str]]:
+        """
+        List the containers of a compose project.
+
+        Args:
+            project: Compose project name (project slug)
+
+        Returns:
+            Tuple of ([{"id", "name", "running"}], error message or None)
+        """
+        label = f"{COMPOSE_PROJECT_LABEL}={project}"
+        try:
+            if self._api is not None:
+                _, body = self._api_call(
+                    "ps",
+                    "GET",
+                    "/containers/json",
+                    {"all": True, "filters": json.dumps({"label": [label]})},
+                    timeout=10,
+                )
+                containers = [
+                    {
+                        "id": item["Id"],
+                        "name": (item.get("Names") or ["/"])[0].lstrip("/"),
+                        "running": item.get("State") == "running",
+                    }
+                    for item in json.loads(body)
+                ]
+            else:
+                result = self._run(
+                    "ps",
+                    [
+                        "docker",
+                        "ps",
+                        "--all",
+                        "--filter",
+                        f"label={label}",
+                        "--format",
+                        "{{.ID}}\t{{.Names}}\t{{.State}}",
+                    ],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=10,
+                )
+                containers = []
+                for line in result.stdout.splitlines():
+                    fields = line.split("\t")
+                    if len(fields) == 3:
+                        containers.append(
+                            {
+                                "id": fields[0],
+                                "name": fields[1],
+                                "running": fields[2] == "running",
+                            }
+                        )
+        except subprocess.CalledProcessError as e:
+            return [], f"Failed to list containers: {e.stderr}"
+        except Exception as e:
+            return [], f"Failed to list containers: {str(e)}"
+        containers.sort(key=lambda c: c["name"])
+        return containers, None
+
+    @contextmanager
+    def export_volume(self, name: str) -> Iterator[IO[bytes]]:
+        """
+        Stream the content of a named volume as a tar archive.
+
+        The volume is mounted read-only in a helper container that is
+        created but never started (BACKUP_HELPER_IMAGE), and copied out of
+        it like `docker cp`. Member names are relative to the volume root.
+
+        Args:
+            name: Volume name
+
+        Yields:
+            Readable tar stream
+
+        Raises:
+            Exception: If the helper can't be created or the copy fails
+        """
+        container_id = self._create_volume_helper(name, read_only=True)
+        source = f"{VOLUME_MOUNT}/."
+        try:
+            if self._api is not None:
+                path = f"/containers/{container_id}/archive"
+                start = time.perf_counter()
+                try:
+                    conn, response = self._api.open_stream(
+                        "GET", path, {"path": source}
+                    )
+                except Exception:
+                    DOCKER_CALL_FAILURES.inc("volume_export")
+                    raise
+                try:
+                    yield response
+                finally:
+                    conn.close()
+                    DOCKER_CALL_DURATION.observe(
+                        time.perf_counter() - start, "volume_export"
+                    )
+            else:
+                with self._stream_process(
+                    "volume_export",
+                    ["docker", "cp", f"{container_id}:{source}", "-"],
+                    stdout=subprocess.PIPE,
+                ) as process:
+                    assert process.stdout is not None
+                    yield process.stdout
+        finally:
+            self._remove_helper(container_id)
+
+    def stage_volume(self, name: str, archive: Iterable[bytes]) -> None:
+        """
+        Extract a tar stream into the staging directory of a named volume.
+
+        Containers using the volume keep running: the data lands in
+        VOLUME_STAGING (emptied first) and only replaces the volume content
+        in swap_volume.
+
+        Args:
+            name: Volume name
+            archive: Tar archive parts, member names relative to the
+                volume root
+
+        Raises:
+            Exception: If a helper container or the copy fails
+        """
+        self._run_volume_helper(name, "prepare", PREPARE_STAGING_SCRIPT)
+        container_id = self._create_volume_helper(name, read_only=False)
+        destination = f"{VOLUME_MOUNT}/{VOLUME_STAGING}"
+        try:
+            if self._api is not None:
+                path = f"/containers/{container_id}/archive"
+                start = time.perf_counter()
+                try:
+                    status, body = self._api.upload(
+                        "PUT", path, {"path": destination}, archive, timeout=300
+                    )
+                    self._api.raise_for_status(status, body)
+                except Exception:
+                    DOCKER_CALL_FAILURES.inc("volume_import")
+                    raise
+                finally:
+                    DOCKER_CALL_DURATION.observe(
+                        time.perf_counter() - start, "volume_import"
+                    )
+            else:
+                with self._stream_process(
+                    "volume_import",
+                    ["docker", "cp", "-", f"{container_id}:{destination}"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                ) as process:
+                    assert process.stdin is not None
+                    for data in archive:
+                        process.stdin.write(data)
+        finally:
+            self._remove_helper(container_id)
+
+    def swap_volume(self, name: str) -> None:
+        """
+        Replace the content of a named volume with its staged data.
+
+        Stop the containers using the volume first. Only renames happen
+        while they are down; the old data is deleted last.
+
+        Args:
+            name: Volume name (staged with stage_volume)
+
+        Raises:
+            Exception: If the helper container fails
+        """
+        self._run_volume_helper(name, "swap", SWAP_STAGING_SCRIPT)
+
+    def _run_volume_helper(self, volume: str, action: str, script: str) -> None:
+        """Run a shell script in a helper container and remove it."""
+        container_id = self._create_volume_helper(
+            volume, read_only=False, action=action, command=["sh", "-c", script]
+        )
+        try:
+            if self._api is None:
+                try:
+                    self._run(
+                        f"volume_{action}",
+                        ["docker", "start", "--attach", container_id],
+                        capture_output=True,
+                        text=True,
+                        check=True,
+                        timeout=3600,
+                    )
+                except subprocess.CalledProcessError as e:
+                    raise Exception(
+                        f"Volume {action} failed for {volume}: "
+                        f"{(e.stderr or e.stdout or '').strip()}"
+                    )
+                return
+
+            path = f"/containers/{container_id}"
+            self._api_call(f"volume_{action}", "POST", f"{path}/start", timeout=30)
+            _, body = self._api_call(
+                f"volume_{action}", "POST", f"{path}/wait", timeout=3600
+            )
+            status = json.loads(body).get("StatusCode", 0)
+            if status != 0:
+                output, _ = self._api_logs(container_id, 20, False)
+                raise Exception(
+                    f"Volume {action} failed for {volume} (exit status "
+                    f"{status}): {(output or '').strip()}"
+                )
+        finally:
+            self._remove_helper(container_id)
+
+    def _create_volume_helper(
+        self,
+        volume: str,
+        read_only: bool,
+        action: str = "copy",
+        command: Optional[list[str]] = None,
+    ) -> str:
+        """Create a stopped container with the volume at VOLUME_MOUNT."""
+        bind = f"{volume}:{VOLUME_MOUNT}" + (":ro" if read_only else "")
+        image = settings.BACKUP_HELPER_IMAGE
+        if self._api is None:
+            try:
+                result = self._run(
+                    "volume_helper",
+                    [
+                        "docker",
+                        "create",
+                        "--label",
+                        f"{HELPER_LABEL}={action}",
+                        "-v",
+                        bind,
+                        image,
+                        *(command or []),
+                    ],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=300,  # May pull the image
+                )
+            except subprocess.CalledProcessError as e:
+                raise Exception(f"Failed to create helper container: {e.stderr}")
+            return str(result.stdout).strip()
+
+        config: dict[str, Any] = {
+            "Image": image,
+            "Labels": {HELPER_LABEL: action},
+            "HostConfig": {"Binds": [bind]},
+        }
+        if command:
+            config["Cmd"] = command
+        for attempt in range(2):
+            try:
+                _, body = self._api_call(
+                    "volume_helper",
+                    "POST",
+                    "/containers/create",
+                    timeout=30,
+                    body=config,
+                )
+                helper_id: str = json.loads(body)["Id"]
+                return helper_id
+            except DockerAPIError as e:
+                if e.status != 404 or attempt:
+                    raise Exception(f"Failed to create helper container: {e.message}")
+                # Image not present: pull it (the response ends when done)
+                repository, _, tag = image.partition(":")
+                self._api_call(
+                    "pull",
+                    "POST",
+                    "/images/create",
+                    {"fromImage": repository, "tag": tag or "latest"},
+                    timeout=300,
+                )
+        raise Exception("unreachable")  # pragma: no cover
+
+    def _remove_helper(self, container_id: str) -> None:
+        """Remove a helper container (errors only logged by Docker)."""
+        try:
+            if self._api is not None:
+                self._api_call(
+                    "remove",
+                    "DELETE",
+                    f"/containers/{container_id}",
+                    {"force": True, "v": False},
+                    timeout=30,
+                )
+            else:
+                self._run(
+                    "remove",
+                    ["docker", "rm", "--force", container_id],
+                    capture_output=True,
+                    timeout=30,
+                )
+        except Exception:
+            pass
+
+    @staticmethod
+    @contextmanager
+    def _stream_process(
+        operation: str, cmd: list[str], **kwargs: Any
+    ) -> Iterator["subprocess.Popen[bytes]"]:
+        """
+        Run a docker CLI command whose stdin/stdout the caller streams.
+
+        When the with-block completes, stdin is closed, unread output is
+        drained and the exit status checked.
+
+        Raises:
+            Exception: If the command fails
+        """
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, stderr=subprocess.PIPE, **kwargs)
+        try:
+            try:
+                yield process
+            except BaseException:
+                process.kill()
+                raise
+            if process.stdin is not None:
+                process.stdin.close()
+            stdout, stderr_pipe = process.stdout, process.stderr
+            if stdout is not None:
+                for _ in iter(lambda: stdout.read(COPY_CHUNK), b""):
+                    pass
+            assert stderr_pipe is not None
+            stderr = stderr_pipe.read().decode(errors="replace").strip()
+            if process.wait() != 0:
+                raise Exception(f"docker {cmd[1]} failed: {stderr}")
+        except BaseException:
+            DOCKER_CALL_FAILURES.inc(operation)
+            raise
+        finally:
+            for pipe in (process.stdin, process.stdout, process.stderr):
+                if pipe is not None:
+                    pipe.close()
+            process.wait()
+            DOCKER_CALL_DURATION.observe(time.perf_counter() - start, operation)
+
+    def create_exec(
+        self,
+        container_id: str,
+        cmd: list[str],
+        tty: bool = True,
+        rows: Optional[int] = None,
+        cols: Optional[int] = None,
+    ) -> tuple[Optional[str], Optional[str]]:
+        """
+        Create an interactive exec instance (`docker exec -it`).
+
+        Args:
+            container_id: Container ID or name
+            cmd: Command and arguments
+            tty: Allocate a pseudo-TTY
+            rows: Initial terminal height
+            cols: Initial terminal width
+
+        Returns:
+            Tuple of (exec_id, error_message)
+        """
+        config: dict[str, Any] = {
+            "AttachStdin": True,
+            "AttachStdout": True,
+            "AttachStderr": True,
+            "Tty": tty,
+            "Cmd": cmd,
+        }
+        if tty:
+            config["Env"] = ["TERM=xterm-256color"]
+            if rows and cols:
+                config["ConsoleSize"] = [rows, cols]
+        path = f"/containers/{DockerAPIClient.quote(container_id)}/exec"
+        try:
+            _, body = self._api_call(
+                "exec_create",
+                "POST",
+                path,
+                timeout=10,
+                client=self._interactive_api(),
+                body=config,
+            )
+        except DockerAPIError as e:
+            return None, e.message
+        except Exception as e:
+            return None, f"Docker error: {str(e)}"
+        return json.loads(body)["Id"], None
+
+    def start_exec(
+        self, exec_id: str, tty: bool = True
+    ) -> tuple[Optional[HijackedStream], Optional[str]]:
+        """
+        Start an exec instance attached to a raw stream.
+
+        Args:
+            exec_id: ID from create_exec
+            tty: Same as at creation
+
+        Returns:
+            Tuple of (stream, error_message); the caller closes the stream
+        """
+        path = f"/exec/{DockerAPIClient.quote(exec_id)}/start"
+        return self._api_hijack(
+            "exec_start", path, None, {"Detach": False, "Tty": tty}, tty
+        )
+
+    def resize_exec(
+        self, exec_id: str, rows: int, cols: int
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Resize the TTY of a running exec instance.
+
+        Returns:
+            Tuple of (success, error_message)
+        """
+        path = f"/exec/{DockerAPIClient.quote(exec_id)}/resize"
+        return self._api_resize(path, rows, cols)
+
+    def get_exec_exit_code(self, exec_id: str) -> Optional[int]:
+        """
+        Get the exit code of an exec instance.
+
+        Returns:
+            Exit code, or None while running or when unknown
+        """
+        path = f"/exec/{DockerAPIClient.quote(exec_id)}/json"
+        try:
+            _, body = self._api_call(
+                "exec_inspect", "GET", path, timeout=10, client=self._interactive_api()
+            )
+        except Exception:
+            return None
+        data = json.loads(body)
+        return None if data.get("Running") else data.get("ExitCode")
+
+    def attach_container(
+        self, container_id: str
+    ) -> tuple[Optional[HijackedStream], Optional[str]]:
+        """
+        Attach to a container's main process (`docker attach`).
+
+        Args:
+            container_id: Container ID or name
+
+        Returns:
+            Tuple of (stream, error_message); the caller closes the stream
+        """
+        quoted = DockerAPIClient.quote(container_id)
+        try:
+            _, body = self._api_call(
+                "inspect",
+                "GET",
+                f"/containers/{quoted}/json",
+                timeout=10,
+                client=self._interactive_api(),
+            )
+        except DockerAPIError as e:
+            return None, e.message
+        except Exception as e:
+            return None, f"Docker error: {str(e)}"
+        data = json.loads(body)
+        if not (data.get("State") or {}).get("Running"):
+            return None, f"Container '{container_id}' is not running"
+
+        params = {"stream": True, "stdin": True, "stdout": True, "stderr": True}
+        tty = bool((data.get("Config") or {}).get("Tty"))
+        return self._api_hijack(
+            "attach", f"/containers/{quoted}/attach", params, None, tty
+        )
+
+    def resize_container(
+        self, container_id: str, rows: int, cols: int
+    ) -> tuple[bool, Optional[str]]:
+        """
+        Resize the TTY of a container (attach sessions).
+
+        Returns:
+            Tuple of (success, error_message)
+        """
+        path = f"/containers/{DockerAPIClient.quote(container_id)}/resize"
+        return self._api_resize(path, rows, cols)
+
+    def _interactive_api(self) -> DockerAPIClient:
+        """Engine API client for exec/attach, also in CLI mode."""
+        if self._api is not None:
+            return self._api
+        if self._session_api is None:
+            self._session_api = DockerAPIClient(DEFAULT_DOCKER_SOCKET)
+        return self._session_api
+
+    def _api_hijack(
+        self,
+        operation: str,
+        path: str,
+        params: Optional[dict[str, Any]],
+        body: Optional[Any],
+        tty: bool,
+    ) -> tuple[Optional[HijackedStream], Optional[str]]:
+        """Open a hijacked stream, recording its setup time and failures."""
+        start = time.perf_counter()
+        try:
+            sock, buffered = self._interactive_api().hijack("POST", path, params, body)
+        except DockerAPIError as e:
+            DOCKER_CALL_FAILURES.inc(operation)
+            return None, e.message
+        except Exception as e:
+            DOCKER_CALL_FAILURES.inc(operation)
+            return None, f"Docker error: {str(e)}"
+        finally:
+            DOCKER_CALL_DURATION.observe(time.perf_counter() - start, operation)
+        return HijackedStream(sock, buffered, tty), None
+
+    def _api_resize(
+        self, path: str, rows: int, cols: int
+    ) -> tuple[bool, Optional[str]]:
+        try:
+            self._api_call(
+                "resize",
+                "POST",
+                path,
+                {"h": rows, "w": cols},
+                timeout=10,
+                client=self._interactive_api(),
+            )
+        except DockerAPIError as e:
+            return False, e.message
+        except Exception as e:
+            return False, f"Docker error: {str(e)}"
+        return True, None
+
+    @staticmethod
+    def _run(operation: str, cmd: list[str], **kwargs: Any) -> Any:
+        """
+        Run a docker CLI command, recording its duration and failures.
+
+        Args:
+            operation: Metric label (e.g. "start", "inspect")
+            cmd: Command to run
+            **kwargs: subprocess.run arguments
+
+        Returns:
+            subprocess.CompletedProcess
+        """
+        start = time.perf_counter()
+        try:
+            return subprocess.run(cmd, **kwargs)
+        except Exception:
+            DOCKER_CALL_FAILURES.inc(operation)
+            raise
+        finally:
+            DOCKER_CALL_DURATION.observe(time.perf_counter() - start, operation)
+
+    def _api_call(
+        self,
+        operation: str,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        client: Optional[DockerAPIClient] = None,
+        body: Optional[Any] = None,
+    ) -> tuple[str, bytes]:
+        """
+        Call the Engine API, recording its duration and failures.
+
+        Args:
+            operation: Metric label (same labels as the CLI calls)
+            method: HTTP method
+            path: API path (e.g. "/containers/json")
+            params: Query parameters
+            timeout: Request timeout in seconds
+            client: Client to use (another thread's; default: this service's)
+            body: JSON request body
+
+        Returns:
+            Tuple of (content type, body)
+
+        Raises:
+            DockerAPIError: On error statuses
+        """
+        client = client or self._api
+        assert client is not None
+        start = time.perf_counter()
+        try:
+            status, content_type, content = client.request(
+                method, path, params, timeout, body
+            )
+            client.raise_for_status(status, content)
+            return content_type, content
+        except Exception:
+            DOCKER_CALL_FAILURES.inc(operation)
+            raise
+        finally:
+            DOCKER_CALL_DURATION.observe(time.perf_counter() - start, operation)
+
+    def _api_list_containers(self, all: bool) -> list[dict]:
+        """List containers via GET /containers/json."""
+        try:
+            _, body = self._api_call(
+                "ps", "GET", "/containers/json", {"all": all}, timeout=10
+            )
+        except Exception as e:
+            raise Exception(f"Failed to list containers: {str(e)}")
+
+        # Same shape as `docker ps --format '{{json .}}'` lines
+        return [
+            self._format_container(
+                {
+                    "ID": item.get("Id", ""),
+                    "Names": ",".join(n.lstrip("/") for n in item.get("Names") or []),
+                    "Image": item.get("Image", ""),
+                    "Status": item.get("Status", ""),
+                    "Ports": ", ".join(self._format_api_ports(item.get("Ports"))),
+                    "CreatedAt": self._format_timestamp(item.get("Created", 0)),
+                }
+            )
+            for item in json.loads(body)
+        ]
+
+    def _api_get_container(self, container_id: str) -> Optional[dict]:
+        """Inspect a container via GET /containers/{id}/json."""
+        path = f"/containers/{DockerAPIClient.quote(container_id)}/json"
+        try:
+            _, body = self._api_call("inspect", "GET", path, timeout=10)
+        except DockerAPIError as e:
+            if e.status == 404:
+                return None
+            raise Exception(f"Failed to get container: {e.message}")
+        except Exception as e:
+            raise Exception(f"Failed to get container: {str(e)}")
+        return self._format_inspect_data(json.loads(body))
+
+    def _api_action(
+        self,
+        operation: str,
+        container_id: str,
+        timeout: Optional[int] = None,
+        force: bool = False,
+    ) -> tuple[bool, Optional[str]]:
+        """Start/stop/restart/pause/unpause/remove a container via the Engine API."""
+        path = f"/containers/{DockerAPIClient.quote(container_id)}"
+        params: Optional[dict[str, Any]]
+        if operation == "rm":
+            method, params, request_timeout = "DELETE", {"force": force}, 30.0
+        else:
+            method = "POST"
+            path = f"{path}/{operation}"
+            params = {"t": timeout} if timeout is not None else None
+            request_timeout = 30.0 if timeout is None else timeout + 10.0
+        verb = "remove" if operation == "rm" else operation
+
+        try:
+            # 304 (already started/stopped) counts as success, like the CLI
+            self._api_call(operation, method, path, params, timeout=request_timeout)
+            return True, None
+        except DockerAPIError as e:
+            return False, e.message or f"Failed to {verb} container '{container_id}'"
+        except Exception as e:
+            return False, f"Docker error: {str(e)}"
+
+    def _api_logs(
+        self, container_id: str, tail: int, timestamps: bool
+    ) -> tuple[Optional[str], Optional[str]]:
+        """Get container logs via GET /containers/{id}/logs."""
+        path = f"/containers/{DockerAPIClient.quote(container_id)}/logs"
+        params = {
+            "stdout": True,
+            "stderr": True,
+            "tail": tail,
+            "timestamps": timestamps,
+        }
+        try:
+            content_type, body = self._api_call("logs", "GET", path, params, timeout=30)
+        except DockerAPIError as e:
+            return None, e.message or f"Failed to get logs for '{container_id}'"
+        except Exception as e:
+            return None, f"Docker error: {str(e)}"
+
+        # Non-TTY containers multiplex stdout/stderr in framed chunks
+        if content_type.startswith(
+            (RAW_STREAM_CONTENT_TYPE, MULTIPLEXED_STREAM_CONTENT_TYPE)
+        ):
+            body = demux_stream(body)
+        return body.decode("utf-8", "replace"), None
+
+    def _api_stats(
+        self, container_id: str, client: Optional[DockerAPIClient] = None
+    ) -> tuple[Optional[dict], Optional[str]]:
+        """Get a stats snapshot via GET /containers/{id}/stats?stream=false."""
+        path = f"/containers/{DockerAPIClient.quote(container_id)}/stats"
+        try:
+            _, body = self._api_call(
+                "stats", "GET", path, {"stream": False}, timeout=10, client=client
+            )
+        except DockerAPIError as e:
+            return None, e.message or f"Failed to get stats for '{container_id}'"
+        except Exception as e:
+            return None, f"Docker error: {str(e)}"
+
+        data = json.loads(body) if body else None
+        if not data:
+            return None, "No stats available"
+        return self._parse_api_stats(data), None
+
+    def _api_all_stats(self, containers: list[dict]) -> list[dict]:
+        """Stats of several containers, STATS_CONCURRENCY requests at a time."""
+
+        def sample(container: dict, client: DockerAPIClient) -> Optional[dict]:
+            stats, _ = self._api_stats(container["id"], client)
+            return self._stats_sample(container, stats) if stats else None
+
+        samples = self._api_map(sample, containers, STATS_CONCURRENCY)
+        return [item for item in samples if item]
+
+    def _api_map(
+        self,
+        func: Callable[[Any, DockerAPIClient], Any],
+        items: Iterable[Any],
+        concurrency: int = API_CONCURRENCY,
+    ) -> list[Any]:
+        """
+        Call func(item, client) for each item on a thread pool.
+
+        Args:
+            func: Function making Engine API calls with the given client
+            items: Items to map
+            concurrency: Pool threads
+
+        Returns:
+            Results in the order of items
+        """
+        assert self._api is not None
+        socket_path = self._api.socket_path
+        # One keep-alive connection per pool thread
+        local = threading.local()
+        clients: list[DockerAPIClient] = []
+
+        def call(item: Any) -> Any:
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = DockerAPIClient(socket_path)
+                clients.append(client)
+            return func(item, client)
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                return list(pool.map(call, items))
+        finally:
+            for client in clients:
+                client.close()
+
+    def _parse_api_stats(self, data: dict) -> dict:
+        """Convert an Engine API stats object to our format."""
+        # CPU and memory as computed by `docker stats`
+        cpu = data.get("cpu_stats") or {}
+        precpu = data.get("precpu_stats") or {}
+        cpu_delta = (cpu.get("cpu_usage") or {}).get("total_usage", 0) - (
+            precpu.get("cpu_usage") or {}
+        ).get("total_usage", 0)
+        system_delta = cpu.get("system_cpu_usage", 0) - precpu.get(
+            "system_cpu_usage", 0
+        )
+        online_cpus = cpu.get("online_cpus") or len(
+            (cpu.get("cpu_usage") or {}).get("percpu_usage") or []
+        )
+        cpu_percent = 0.0
+        if cpu_delta > 0 and system_delta > 0:
+            cpu_percent = cpu_delta / system_delta * (online_cpus or 1) * 100
+
+        memory = data.get("memory_stats") or {}
+        memory_details = memory.get("stats") or {}
+        # Page cache is reclaimable: not counted (cgroup v2 / v1 key)
+        cache = memory_details.get(
+            "inactive_file", memory_details.get("total_inactive_file", 0)
+        )
+        usage = memory.get("usage", 0)
+        if cache < usage:
+            usage -= cache
+        limit = memory.get("limit", 0)
+
+        networks = (data.get("networks") or {}).values()
+        rx = sum(n.get("rx_bytes", 0) for n in networks)
+        tx = sum(n.get("tx_bytes", 0) for n in networks)
+
+        # "read"/"write" on cgroup v2, "Read"/"Write" on v1
+        block_io = (data.get("blkio_stats") or {}).get(
+            "io_service_bytes_recursive"
+        ) or []
+        block_read = sum(
+            e.get("value", 0) for e in block_io if e.get("op") in ("read", "Read")
+        )
+        block_write = sum(
+            e.get("value", 0) for e in block_io if e.get("op") in ("write", "Write")
+        )
+
+        return self._format_stats(
+            cpu_percent, usage, limit, rx, tx, block_read, block_write
+        )
+
+    @classmethod
+    def _format_stats(
+        cls,
+        cpu_percent: float,
+        memory_bytes: int,
+        memory_limit_bytes: int,
+        network_rx_bytes: Optional[int],
+        network_tx_bytes: Optional[int],
+        block_read_bytes: int,
+        block_write_bytes: int,
+    ) -> dict:
+        """
+        Stats in our format from counters (Engine API or cgroup files).
+
+        Network counters are None when unknown (cgroups without the host's
+        /proc): shown as "N/A", not as an idle network.
+        """
+        memory_percent = (
+            memory_bytes / memory_limit_bytes * 100 if memory_limit_bytes else 0.0
+        )
+        network_io = "N/A"
+        if network_rx_bytes is not None and network_tx_bytes is not None:
+            network_io = (
+                f"{cls._human_size(network_rx_bytes)} / "
+                f"{cls._human_size(network_tx_bytes)}"
+            )
+        return {
+            "cpu_percent": round(cpu_percent, 2),
+            "memory_usage": cls._human_size(memory_bytes, binary=True),
+            "memory_limit": cls._human_size(memory_limit_bytes, binary=True),
+            "memory_percent": round(memory_percent, 2),
+            "network_io": network_io,
+            "block_io": (
+                f"{cls._human_size(block_read_bytes)} / "
+                f"{cls._human_size(block_write_bytes)}"
+            ),
+            "memory_bytes": memory_bytes,
+            "network_rx_bytes": network_rx_bytes,
+            "network_tx_bytes": network_tx_bytes,
+            "block_read_bytes": block_read_bytes,
+            "block_write_bytes": block_write_bytes,
+        }
+
+    @staticmethod
+    def _parse_cli_stats(stats_data: dict) -> dict:
+        """Convert a `docker stats --format '{{json .}}'` line to our format."""
+        # Parse CPU percentage (remove %)
+        cpu_str = stats_data.get("CPUPerc", "0%").rstrip("%")
+        cpu_percent = float(cpu_str) if cpu_str else 0.0
+
+        # Parse memory (format: "100MiB / 2GiB")
+        mem_usage_str = stats_data.get("MemUsage", "0B / 0B")
+        mem_perc_str = stats_data.get("MemPerc", "0%").rstrip("%")
+        mem_percent = float(mem_perc_str) if mem_perc_str else 0.0
+
+        # Parse network I/O (format: "1.5kB / 2kB")
+        net_io = stats_data.get("NetIO", "0B / 0B")
+        rx, _, tx = net_io.partition(" / ")
+        block_io = stats_data.get("BlockIO", "0B / 0B")
+        block_read, _, block_write = block_io.partition(" / ")
+
+        return {
+            "cpu_percent": round(cpu_percent, 2),
+            "memory_usage": mem_usage_str.split(" / ")[0],
+            "memory_limit": (
+                mem_usage_str.split(" / ")[1] if " / " in mem_usage_str else "0B"
+            ),
+            "memory_percent": round(mem_percent, 2),
+            "network_io": net_io,
+            "block_io": block_io,
+            "memory_bytes": DockerService._parse_size(mem_usage_str.split(" / ")[0]),
+            "network_rx_bytes": DockerService._parse_size(rx),
+            "network_tx_bytes": DockerService._parse_size(tx),
+            "block_read_bytes": DockerService._parse_size(block_read),
+            "block_write_bytes": DockerService._parse_size(block_write),
+        }
+
+    @staticmethod
+    def _stats_sample(container: dict, stats: dict) -> dict:
+        """Stats of a listed container, with its identity."""
+        return {
+            "id": container["id"],
+            "name": container["name"],
+            "project": container["project"],
+            "service": container["service"],
+            **stats,
+        }
+
+    @staticmethod
+    def _format_api_ports(ports: Optional[list[dict]]) -> list[str]:
+        """Format Engine API port entries like `docker ps`."""
+        formatted = []
+        for port in ports or []:
+            private = f"{port.get('PrivatePort')}/{port.get('Type', 'tcp')}"
+            if port.get("PublicPort"):
+                ip = port.get("IP") or "0.0.0.0"
+                formatted.append(f"{ip}:{port['PublicPort']}->{private}")
+            else:
+                formatted.append(private)
+        return formatted
+
+    @staticmethod
+    def _format_timestamp(created: int) -> str:
+        """Format a unix timestamp like `docker ps` CreatedAt."""
+        moment = datetime.fromtimestamp(created or 0, timezone.utc)
+        return moment.strftime("%Y-%m-%d %H:%M:%S +0000 UTC")
+
+    @staticmethod
+    def _human_size(size: float, binary: bool = False) -> str:
+        """Format a byte count like the docker CLI ("1.5kB", "100MiB")."""
+        if binary:
+            base, units, precision = 1024.0, ["B", "KiB", "MiB", "GiB", "TiB"], 4
+        else:
+            base, units, precision = 1000.0, ["B", "kB", "MB", "GB", "TB"], 3
+        unit = 0
+        while size >= base and unit < len(units) - 1:
+            size /= base
+            unit += 1
+        return f"{size:.{precision}g}{units[unit]}"
+
+    @staticmethod
+    def _parse_size(text: str) -> int:
+        """Parse a byte count of the docker CLI ("1.5kB", "100MiB"); 0 if invalid."""
+        match = SIZE_PATTERN.match(text.strip())
+        if match is None:
+            return 0
+        number, unit = match.groups()
+        return int(float(number) * SIZE_UNITS.get(unit.lower(), 0))
+
     def _format_container(self, data: dict) -> dict:
         """
         Format docker ps JSON output to our format.
@@ -393,3 +1722,157 @@ class DockerService:
             "is_system": is_system,
             "labels": labels,
         }
+
+
+class DockerEventStream:
+    """
+    Blocking iterator over container events (`docker events` / GET /events).
+
+    Yields Engine API event dicts (Type, Action, Actor, time...). close()
+    may be called from another thread to end the iteration.
+    """
+
+    def __init__(self, api: Optional[DockerAPIClient]) -> None:
+        self._api = api
+        self._process: Optional[subprocess.Popen] = None
+        self._conn: Optional[Any] = None
+        self._closed = False
+
+    def __iter__(self) -> Iterator[dict]:
+        filters = json.dumps({"type": ["container"]})
+        try:
+            if self._api is not None:
+                self._conn, response = self._api.open_stream(
+                    "GET", "/events", {"filters": filters}
+                )
+                lines = iter(response.readline, b"")
+            else:
+                process = subprocess.Popen(
+                    [
+                        "docker",
+                        "events",
+                        "--format",
+                        "{{json .}}",
+                        "--filter",
+                        "type=container",
+                    ],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+                self._process = process
+                assert process.stdout is not None
+                lines = iter(process.stdout.readline, b"")
+
+            for line in lines:
+                if self._closed:
+                    break
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+        except OSError:
+            # Reads fail once close() shut the socket down
+            if not self._closed:
+                raise
+        finally:
+            self.close()
+            if self._conn is not None:
+                self._conn.close()
+            if self._process is not None:
+                self._process.wait()
+
+    def close(self) -> None:
+        """End the stream (unblocks a pending read)."""
+        self._closed = True
+        if self._conn is not None and self._conn.sock is not None:
+            try:
+                self._conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+
+
+class DockerLogStream:
+    """
+    Blocking iterator over the log lines of one container.
+
+    Follows GET /containers/{id}/logs with timestamps and yields
+    (UNIX time, "stdout" | "stderr", line without newline) until the
+    container stops. close() may be called from another thread.
+    """
+
+    def __init__(self, socket_path: str, container_id: str, since: float = 0) -> None:
+        # Own client: the stream holds a connection for its whole lifetime
+        self._api = DockerAPIClient(socket_path)
+        self.container_id = container_id
+        self.since = since
+        self._conn: Optional[Any] = None
+        self._closed = False
+
+    def __iter__(self) -> Iterator[tuple[float, str, str]]:
+        path = f"/containers/{DockerAPIClient.quote(self.container_id)}/logs"
+        params = {
+            "follow": True,
+            "stdout": True,
+            "stderr": True,
+            "timestamps": True,
+            "since": f"{self.since:.9f}" if self.since else None,
+        }
+        try:
+            self._conn, response = self._api.open_stream("GET", path, params)
+            # Non-TTY containers multiplex stdout/stderr in framed chunks
+            demuxer = None
+            if response.getheader("Content-Type", "").startswith(
+                (RAW_STREAM_CONTENT_TYPE, MULTIPLEXED_STREAM_CONTENT_TYPE)
+            ):
+                demuxer = StreamDemuxer()
+            # Partial line per stream (frames needn't end at newlines)
+            pending = {"stdout": b"", "stderr": b""}
+            last = self.since
+            while not self._closed:
+                data = response.read1(COPY_CHUNK)
+                if not data:
+                    break
+                frames = demuxer.feed_frames(data) if demuxer else [(1, data)]
+                for stream_type, payload in frames:
+                    stream = "stderr" if stream_type == 2 else "stdout"
+                    lines = (pending[stream] + payload).split(b"\n")
+                    pending[stream] = lines.pop()
+                    for line in lines:
+                        last, message = self._parse_line(line, last)
+                        yield last, stream, message
+        except (OSError, http.client.HTTPException):
+            # Reads fail once close() shut the socket down
+            if not self._closed:
+                raise
+        finally:
+            self.close()
+            if self._conn is not None:
+                self._conn.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @staticmethod
+    def _parse_line(line: bytes, previous: float) -> tuple[float, str]:
+        """Split "<RFC 3339 timestamp> <message>" (no timestamp: previous)."""
+        text = line.decode("utf-8", "replace").rstrip("\r")
+        stamp, _, message = text.partition(" ")
+        try:
+            seconds, _, fraction = stamp.rstrip("Z").partition(".")
+            moment = datetime.strptime(seconds, "%Y-%m-%dT%H:%M:%S")
+            timestamp = moment.replace(tzinfo=timezone.utc).timestamp()
+            return timestamp + float(f"0.{fraction or 0}"), message
+        except ValueError:
+            return previous, text
+
+    def close(self) -> None:
+        """End the stream (unblocks a pending read)."""
+        self._closed = True
+        if self._conn is not None and self._conn.sock is not None:
+            try:
+                self._conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
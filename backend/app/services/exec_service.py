@@ -0,0 +1,184 @@
+"""
+Interactive container sessions
+Relays a WebSocket to the hijacked stream of a Docker exec/attach session:
+binary frames carry stdin and output, text frames carry JSON control
+messages (resize) and the final exit status.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.core.locks import FileLock
+from app.core.metrics import EXEC_BYTES, EXEC_SESSIONS, EXEC_SESSIONS_REJECTED
+from app.services.docker_api import HijackedStream, StreamDemuxer
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SESSION_LOCK_PREFIX = "exec-session"
+
+# Idle check granularity (seconds)
+IDLE_CHECK_SECONDS = 5.0
+
+
+class SessionSlots:
+    """
+    Cap on concurrent sessions across the workers of one instance
+
+    Each open session holds a flock() on one of EXEC_MAX_SESSIONS slot
+    files in LOCK_DIR; the kernel frees the slot when the session ends or
+    its worker dies.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = directory
+
+    def acquire(self) -> Optional[FileLock]:
+        """
+        Take a free slot
+
+        Returns:
+            Held slot lock (release it when the session ends), or None when
+            all slots are taken
+        """
+        for index in range(settings.EXEC_MAX_SESSIONS):
+            slot = FileLock(f"{SESSION_LOCK_PREFIX}-{index}", self.directory)
+            if slot.acquire(blocking=False):
+                return slot
+        EXEC_SESSIONS_REJECTED.inc()
+        return None
+
+
+class ExecSession:
+    """
+    One WebSocket <-> Docker stream relay
+
+    Args:
+        websocket: Accepted WebSocket
+        stream: Hijacked exec/attach stream (closed by run())
+        resize: Blocking callable(rows, cols) -> (success, error)
+        exit_code: Blocking callable returning the exit code (None: unknown)
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        stream: HijackedStream,
+        resize: Callable[[int, int], tuple[bool, Optional[str]]],
+        exit_code: Optional[Callable[[], Optional[int]]] = None,
+    ):
+        self.websocket = websocket
+        self.stream = stream
+        self.resize = resize
+        self.exit_code = exit_code
+        self._last_activity = time.monotonic()
+
+    async def run(self) -> None:
+        """Relay until the process exits, the client leaves or goes idle"""
+        self.stream.sock.setblocking(False)
+        EXEC_SESSIONS.inc()
+        output = asyncio.create_task(self._relay_output())
+        idle = asyncio.create_task(self._watch_idle())
+        tasks = {output, idle, asyncio.create_task(self._relay_input())}
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    logger.warning(f"Exec session relay failed: {task.exception()}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.stream.close()
+            EXEC_SESSIONS.dec()
+
+        if output in done and output.exception() is None:
+            # Process ended: report how
+            code = await asyncio.to_thread(self.exit_code) if self.exit_code else None
+            await self._send_control({"type": "exit", "exit_code": code})
+            await self._close(1000)
+        elif idle in done:
+            await self._send_control({"type": "timeout"})
+            await self._close(1000)
+
+    async def _relay_output(self) -> None:
+        """Docker -> client; one preallocated read buffer for the session"""
+        loop = asyncio.get_running_loop()
+        buffer = bytearray(settings.EXEC_BUFFER_SIZE)
+        view = memoryview(buffer)
+        demuxer = None if self.stream.tty else StreamDemuxer()
+
+        pending = self.stream.buffered
+        while True:
+            if pending:
+                data = pending if demuxer is None else demuxer.feed(pending)
+                if data:
+                    await self.websocket.send_bytes(data)
+                    EXEC_BYTES.inc("output", amount=len(data))
+                self._last_activity = time.monotonic()
+            count = await loop.sock_recv_into(self.stream.sock, buffer)
+            if count == 0:
+                return
+            # One copy per read into the outgoing frame (the demuxer copies
+            # payloads itself); the read buffer is reused
+            pending = bytes(view[:count]) if demuxer is None else view[:count]
+
+    async def _relay_input(self) -> None:
+        """Client -> Docker (stdin); text frames are control messages"""
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            self._last_activity = time.monotonic()
+            if message.get("bytes") is not None:
+                await loop.sock_sendall(self.stream.sock, message["bytes"])
+                EXEC_BYTES.inc("input", amount=len(message["bytes"]))
+            elif message.get("text") is not None:
+                await self._handle_control(message["text"])
+
+    async def _handle_control(self, text: str) -> None:
+        try:
+            control = json.loads(text)
+            if control.get("type") != "resize":
+                raise ValueError(f"unknown message type {control.get('type')!r}")
+            rows, cols = int(control["rows"]), int(control["cols"])
+            if rows <= 0 or cols <= 0:
+                raise ValueError("rows and cols must be positive")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            await self._send_control({"type": "error", "message": str(e)})
+            return
+        success, error = await asyncio.to_thread(self.resize, rows, cols)
+        if not success:
+            await self._send_control({"type": "error", "message": error})
+
+    async def _watch_idle(self) -> None:
+        timeout = settings.EXEC_IDLE_TIMEOUT_SECONDS
+        if timeout <= 0:
+            await asyncio.Event().wait()  # No idle limit
+            return
+        while True:
+            remaining = self._last_activity + timeout - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, IDLE_CHECK_SECONDS))
+
+    async def _send_control(self, message: dict) -> None:
+        try:
+            await self.websocket.send_text(json.dumps(message))
+        except Exception:
+            pass  # Client already gone
+
+    async def _close(self, code: int) -> None:
+        try:
+            await self.websocket.close(code)
+        except Exception:
+            pass
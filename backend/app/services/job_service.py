@@ -0,0 +1,246 @@
+"""
+Background jobs
+Long-running blocking work (e.g. removing large project trees) runs in a
+worker thread off the event loop; clients poll the job status via the API.
+Job records are also written to LOCK_DIR/jobs so a poll answered by another
+worker process finds them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.constants.job_constants import (
+    JOB_RECORD_MAX_AGE_SECONDS,
+    MAX_FINISHED_JOBS,
+    JobStatus,
+)
+from app.core.events import TOPIC_JOBS, hub
+from app.core.locks import lock_dir
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Job:
+    """Background job record"""
+
+    def __init__(self, kind: str, owner_id: Optional[int], target: Optional[str]):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner_id = owner_id
+        self.target = target
+        self.status = JobStatus.PENDING
+        self.error: Optional[str] = None
+        self.result: Any = None  # Return value of the job callable
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        """Check if the job completed or failed"""
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def to_dict(self) -> dict:
+        """Convert job to response dict"""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "target": self.target,
+            "status": self.status.value,
+            "error": self.error,
+            "result": self.result,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def to_record(self) -> dict:
+        """Serializable record shared with the other workers"""
+        record = self.to_dict()
+        record["owner_id"] = self.owner_id
+        record["created_at"] = self.created_at.isoformat()
+        if self.finished_at is not None:
+            record["finished_at"] = self.finished_at.isoformat()
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict) -> Job:
+        """Rebuild a job written by another worker (see to_record)"""
+        job = cls(record["kind"], record.get("owner_id"), record.get("target"))
+        job.id = record["id"]
+        job.status = JobStatus(record["status"])
+        job.error = record.get("error")
+        job.result = record.get("result")
+        job.created_at = datetime.fromisoformat(record["created_at"])
+        if record.get("finished_at"):
+            job.finished_at = datetime.fromisoformat(record["finished_at"])
+        return job
+
+
+class JobManager:
+    """
+    Background job registry
+
+    Jobs run blocking callables in the default thread pool of the worker
+    that submitted them. Finished jobs are kept (up to MAX_FINISHED_JOBS)
+    so their status can be polled; every status change is also written to
+    a record file, which is how the other workers answer polls.
+    """
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        self._jobs: dict[str, Job] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._directory = directory
+
+    @property
+    def directory(self) -> Path:
+        """Directory of the job records (default: LOCK_DIR/jobs)"""
+        return self._directory or lock_dir() / "jobs"
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable[..., Any],
+        *args: Any,
+        owner_id: Optional[int] = None,
+        target: Optional[str] = None,
+    ) -> Job:
+        """
+        Run a blocking callable as a background job
+
+        Args:
+            kind: Job type (e.g. "delete_project_files")
+            func: Blocking callable, run in a worker thread (a coroutine
+                function is awaited: it offloads its blocking parts itself)
+            *args: Callable arguments
+            owner_id: User allowed to poll the job (admins see all jobs)
+            target: What the job works on (e.g. project slug)
+
+        Returns:
+            Submitted job
+        """
+        job = Job(kind, owner_id, target)
+        self._jobs[job.id] = job
+        self._save(job)
+        self._prune()
+
+        task = asyncio.create_task(self._run(job, func, args))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(
+        self, job: Job, func: Callable[..., Any], args: tuple[Any, ...]
+    ) -> None:
+        """Execute a job in the thread pool and record its outcome"""
+        job.status = JobStatus.RUNNING
+        self._publish(job)
+        try:
+            if inspect.iscoroutinefunction(func):
+                job.result = await func(*args)
+            else:
+                job.result = await asyncio.to_thread(func, *args)
+            job.status = JobStatus.COMPLETED
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            logger.error(f"Job {job.kind} ({job.target}) failed: {e}")
+        finally:
+            job.finished_at = datetime.utcnow()
+            self._publish(job)
+
+    def _publish(self, job: Job) -> None:
+        """Record job progress and notify /api/events subscribers"""
+        self._save(job)
+        hub.publish(TOPIC_JOBS, job.status.value, job.to_dict(), owner_id=job.owner_id)
+
+    def _save(self, job: Job) -> None:
+        """Write the job record (atomically: readers never see a partial file)"""
+        path = self.directory / f"{job.id}.json"
+        temp = path.with_suffix(".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp.write_text(json.dumps(job.to_record(), default=str))
+            os.replace(temp, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not record job {job.id}: {e}")
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        """Job submitted by another worker, from its record"""
+        if not job_id.isalnum():
+            return None
+        try:
+            record = json.loads((self.directory / f"{job_id}.json").read_text())
+            return Job.from_record(record)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Unreadable job record {job_id}: {e}")
+            return None
+
+    def get(
+        self, job_id: str, user_id: Optional[int] = None, is_admin: bool = False
+    ) -> Optional[Job]:
+        """
+        Get job by ID with ownership check
+
+        Jobs of other workers are read from their records.
+
+        Args:
+            job_id: Job ID
+            user_id: Requesting user ID
+            is_admin: Admins can see all jobs
+
+        Returns:
+            Job or None if not found / not visible to the user
+        """
+        job = self._jobs.get(job_id) or self._load(job_id)
+        if job is None:
+            return None
+        if user_id and not is_admin and job.owner_id != user_id:
+            return None
+        return job
+
+    async def wait(self) -> None:
+        """Wait for all running jobs (shutdown, tests)"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _prune(self) -> None:
+        """
+        Drop the oldest finished jobs beyond MAX_FINISHED_JOBS
+
+        Records left behind by exited workers are removed once older than
+        JOB_RECORD_MAX_AGE_SECONDS.
+        """
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
+            try:
+                (self.directory / f"{job.id}.json").unlink(missing_ok=True)
+            except OSError:
+                pass
+
+        cutoff = time.time() - JOB_RECORD_MAX_AGE_SECONDS
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+
+# Shared registry (jobs outlive the request that started them)
+job_manager = JobManager()
@@ -0,0 +1,486 @@
+"""
+Container log archive
+The leader worker follows the logs of running containers and writes the
+lines in batches to a separate SQLite database with a full-text index
+(FTS5), so logs stay searchable across a project's containers after
+Docker rotated them out or the containers were recreated.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import queue
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.core.metrics import LOG_ARCHIVE_FOLLOWED, LOG_ARCHIVE_LINES
+from app.services.backup_service import database_path
+from app.services.docker_service import DockerLogStream, DockerService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ARCHIVE_FILE = "logs.db"
+
+# Lines (and their full-text index, kept in sync by triggers) and how far
+# each container's log was archived, to resume after restarts
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lines (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    project TEXT NOT NULL,
+    container TEXT NOT NULL,
+    stream TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lines_project_ts ON lines (project, ts);
+CREATE INDEX IF NOT EXISTS lines_ts ON lines (ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS lines_fts USING fts5(
+    message, content='lines', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS lines_insert AFTER INSERT ON lines BEGIN
+    INSERT INTO lines_fts (rowid, message) VALUES (new.id, new.message);
+END;
+CREATE TRIGGER IF NOT EXISTS lines_delete AFTER DELETE ON lines BEGIN
+    INSERT INTO lines_fts (lines_fts, rowid, message)
+    VALUES ('delete', old.id, old.message);
+END;
+CREATE TABLE IF NOT EXISTS cursors (
+    container TEXT PRIMARY KEY,
+    ts REAL NOT NULL
+);
+"""
+
+# Longer lines are cut (a runaway line shouldn't bloat the index)
+MAX_MESSAGE_CHARS = 16 * 1024
+# Lines waiting for the writer; followers block (back-pressure on the
+# Docker stream) while it's full
+MAX_PENDING_LINES = 50_000
+# Lines deleted per statement when pruning (keeps transactions short)
+PRUNE_BATCH = 5000
+# Most results returned by one search
+MAX_SEARCH_LIMIT = 1000
+
+_TERM = re.compile(r'[^\s"]+')
+
+
+def archive_path() -> Path:
+    """
+    File of the log archive
+
+    LOG_ARCHIVE_PATH, else logs.db next to the SQLite database, else in
+    a temporary directory.
+    """
+    if settings.LOG_ARCHIVE_PATH:
+        return Path(settings.LOG_ARCHIVE_PATH)
+    database = database_path()
+    if database is not None:
+        return database.parent / ARCHIVE_FILE
+    return Path(tempfile.gettempdir()) / "docklite" / ARCHIVE_FILE
+
+
+def fts_query(text: str) -> str:
+    """
+    FTS5 query matching lines that contain all words of a search
+
+    Words are quoted, so FTS5 operators and punctuation in user input
+    are matched literally; a trailing * keeps its prefix meaning.
+
+    Args:
+        text: Search as typed, e.g. 'timeout upstr*'
+
+    Returns:
+        FTS5 MATCH expression ('"timeout" "upstr"*'), "" for no words
+    """
+    terms = []
+    for word in _TERM.findall(text):
+        prefix = word.endswith("*") and word.strip("*") != ""
+        word = word.strip("*")
+        if word:
+            terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return " ".join(terms)
+
+
+class LogArchive:
+    """
+    Log lines in SQLite, full-text indexed
+
+    The connection is opened on first use; an instance is used by one
+    thread at a time.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or archive_path())
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            try:
+                # Only effective on a new file: lets prune hand pages back
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.execute("PRAGMA synchronous = NORMAL")
+                conn.executescript(SCHEMA)
+            except BaseException:
+                conn.close()
+                raise
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def insert(
+        self, lines: list[tuple[float, str, str, str, str]], cursors: dict[str, float]
+    ) -> None:
+        """
+        Write a batch of lines in one transaction
+
+        Args:
+            lines: (UNIX time, project, container name, stream, message)
+            cursors: Container ID -> time of its last line in the batch
+        """
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO lines (ts, project, container, stream, message) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (ts, project, container, stream, message[:MAX_MESSAGE_CHARS])
+                    for ts, project, container, stream, message in lines
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO cursors (container, ts) VALUES (?, ?) "
+                "ON CONFLICT (container) DO UPDATE SET ts = max(ts, excluded.ts)",
+                list(cursors.items()),
+            )
+
+    def cursors(self) -> dict[str, float]:
+        """Container ID -> time of its last archived line"""
+        rows = self._connect().execute("SELECT container, ts FROM cursors")
+        return {container: ts for container, ts in rows}
+
+    def search(
+        self,
+        query: str = "",
+        projects: Optional[list[str]] = None,
+        container: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 100,
+    ) -> tuple[list[dict[str, Any]], Optional[str]]:
+        """
+        Find archived lines, newest first
+
+        Args:
+            query: Words all lines must contain ("": any line)
+            projects: Only these compose projects (None: all)
+            container: Only this container (name)
+            since: Only lines at or after this UNIX time
+            until: Only lines before this UNIX time
+            limit: Most lines returned
+
+        Returns:
+            Tuple of ([{"time", "project", "container", "stream",
+            "message"}], error message or None)
+        """
+        conditions: list[str] = []
+        params: list[Any] = []
+        match = fts_query(query)
+        if match:
+            conditions.append(
+                "lines.id IN (SELECT rowid FROM lines_fts WHERE lines_fts MATCH ?)"
+            )
+            params.append(match)
+        if projects is not None:
+            conditions.append(f"project IN ({', '.join('?' * len(projects))})")
+            params.extend(projects)
+        if container:
+            conditions.append("container = ?")
+            params.append(container)
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("ts < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = (
+            "SELECT ts, project, container, stream, message FROM lines "
+            f"{where} ORDER BY ts DESC, id DESC LIMIT ?"
+        )
+        try:
+            rows = self._connect().execute(sql, [*params, limit]).fetchall()
+        except sqlite3.Error as e:
+            return [], f"Log search failed: {e}"
+        return [
+            {
+                "time": ts,
+                "project": project,
+                "container": container_name,
+                "stream": stream,
+                "message": message,
+            }
+            for ts, project, container_name, stream, message in rows
+        ], None
+
+    def size(self) -> int:
+        """Bytes used by the archive (pages in use, without the freelist)"""
+        conn = self._connect()
+        page_size: int = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages: int = conn.execute("PRAGMA page_count").fetchone()[0]
+        free: int = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (pages - free) * page_size
+
+    def prune(
+        self, retention_days: int, max_bytes: int, now: Optional[float] = None
+    ) -> dict[str, int]:
+        """
+        Delete lines past the retention, then the oldest above max_bytes
+
+        Args:
+            retention_days: Lines older than this are deleted (0: keep)
+            max_bytes: Size cap (0: none)
+            now: Current UNIX time
+
+        Returns:
+            {"deleted": lines deleted, "bytes": size afterwards}
+        """
+        conn = self._connect()
+        deleted = 0
+        if retention_days > 0:
+            cutoff = (now or time.time()) - retention_days * 86400
+            while True:
+                with conn:
+                    count = conn.execute(
+                        "DELETE FROM lines WHERE id IN "
+                        "(SELECT id FROM lines WHERE ts < ? LIMIT ?)",
+                        (cutoff, PRUNE_BATCH),
+                    ).rowcount
+                deleted += count
+                if count < PRUNE_BATCH:
+                    break
+            # Cursors of containers gone for good
+            with conn:
+                conn.execute("DELETE FROM cursors WHERE ts < ?", (cutoff,))
+        size = self.size() if max_bytes > 0 else 0
+        while size > max_bytes:
+            # Lines take about the same space each: delete the oldest share
+            # over the cap (deletes only add tombstones to the index until
+            # it is optimized, so the size can't be polled while deleting)
+            total = conn.execute("SELECT COUNT(*) FROM lines").fetchone()[0]
+            if not total:
+                break
+            excess = math.ceil(total * (size - max_bytes) / size)
+            while excess > 0:
+                with conn:
+                    count = conn.execute(
+                        "DELETE FROM lines WHERE id IN "
+                        "(SELECT id FROM lines ORDER BY ts LIMIT ?)",
+                        (min(excess, PRUNE_BATCH),),
+                    ).rowcount
+                deleted += count
+                excess -= count
+                if not count:
+                    break
+            with conn:
+                conn.execute("INSERT INTO lines_fts (lines_fts) VALUES ('optimize')")
+            size = self.size()
+        if deleted:
+            conn.execute("PRAGMA incremental_vacuum")
+        return {"deleted": deleted, "bytes": self.size()}
+
+
+class LogCollector:
+    """
+    Follows the logs of running containers into the archive
+
+    One thread per container reads its log stream (resuming after the
+    last archived line) into a shared queue; the task writes the queued
+    lines every LOG_ARCHIVE_FLUSH_SECONDS in one transaction and looks
+    for newly started containers every LOG_ARCHIVE_SCAN_SECONDS. A
+    container's stream ends when it stops; the next scan after a
+    restart follows it again.
+    """
+
+    def __init__(self, archive: Optional[LogArchive] = None) -> None:
+        self._archive = archive
+        self._task: Optional[asyncio.Task] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=MAX_PENDING_LINES)
+        # Container ID -> stream being followed
+        self._streams: dict[str, DockerLogStream] = {}
+        self._threads: dict[str, threading.Thread] = {}
+        self._cursors: dict[str, float] = {}
+        # A flush cancelled with the task may still run when stop() flushes
+        self._flush_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def archive(self) -> LogArchive:
+        if self._archive is None:
+            self._archive = LogArchive()
+        return self._archive
+
+    def start(self) -> None:
+        """Start following logs (no-op when already running)"""
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop following, write the lines already read"""
+        for stream in list(self._streams.values()):
+            stream.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            logger.warning(f"Failed to write archived log lines: {e}")
+        self._streams.clear()
+        self._threads.clear()
+        LOG_ARCHIVE_FOLLOWED.set(0)
+        if self._archive is not None:
+            await asyncio.to_thread(self._archive.close)
+
+    async def _run(self) -> None:
+        self._cursors = await asyncio.to_thread(self.archive.cursors)
+        next_scan = 0.0
+        while True:
+            if time.monotonic() >= next_scan:
+                next_scan = time.monotonic() + settings.LOG_ARCHIVE_SCAN_SECONDS
+                try:
+                    containers = await asyncio.to_thread(
+                        lambda: DockerService().list_all_containers(all=False)
+                    )
+                    self.follow(containers)
+                except Exception as e:
+                    logger.warning(f"Cannot list containers to archive logs: {e}")
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.warning(f"Failed to write archived log lines: {e}")
+            await asyncio.sleep(settings.LOG_ARCHIVE_FLUSH_SECONDS)
+
+    def follow(self, containers: list[dict]) -> None:
+        """
+        Start following the containers not followed yet
+
+        Args:
+            containers: Running containers (DockerService.list_all_containers)
+        """
+        for container_id, thread in list(self._threads.items()):
+            if not thread.is_alive():
+                del self._threads[container_id]
+                self._streams.pop(container_id, None)
+
+        # Lines older than the retention would be pruned right away
+        oldest = 0.0
+        if settings.LOG_ARCHIVE_RETENTION_DAYS > 0:
+            oldest = time.time() - settings.LOG_ARCHIVE_RETENTION_DAYS * 86400
+        for container in containers:
+            if container["id"] in self._threads:
+                continue
+            since = max(self._cursors.get(container["id"], 0.0), oldest)
+            stream = DockerService().log_stream(container["id"], since)
+            thread = threading.Thread(
+                target=self._pump,
+                args=(stream, container, since),
+                name=f"docker-logs-{container['id'][:12]}",
+                daemon=True,
+            )
+            self._streams[container["id"]] = stream
+            self._threads[container["id"]] = thread
+            thread.start()
+        LOG_ARCHIVE_FOLLOWED.set(len(self._threads))
+
+    def _pump(self, stream: DockerLogStream, container: dict, since: float) -> None:
+        """Read one container's blocking stream into the queue (thread)"""
+        try:
+            for ts, source, message in stream:
+                # `since` has second granularity on older daemons
+                if ts <= since:
+                    continue
+                item = (
+                    container["id"],
+                    (ts, container["project"], container["name"], source, message),
+                )
+                while not stream.closed:
+                    try:
+                        self._queue.put(item, timeout=1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            logger.warning(f"Log stream of {container['name']} failed: {e}")
+
+    def flush(self) -> int:
+        """
+        Write the queued lines in one transaction
+
+        Returns:
+            Number of lines written
+        """
+        with self._flush_lock:
+            lines: list[tuple[float, str, str, str, str]] = []
+            cursors: dict[str, float] = {}
+            while True:
+                try:
+                    container_id, line = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                lines.append(line)
+                cursors[container_id] = max(line[0], cursors.get(container_id, 0.0))
+            if not lines:
+                return 0
+            self.archive.insert(lines, cursors)
+            for container_id, ts in cursors.items():
+                self._cursors[container_id] = max(
+                    ts, self._cursors.get(container_id, 0.0)
+                )
+        LOG_ARCHIVE_LINES.inc(amount=len(lines))
+        return len(lines)
+
+
+async def prune_log_archive() -> None:
+    """Apply LOG_ARCHIVE_RETENTION_DAYS and LOG_ARCHIVE_MAX_MB"""
+
+    def prune() -> dict[str, int]:
+        archive = LogArchive()
+        try:
+            return archive.prune(
+                settings.LOG_ARCHIVE_RETENTION_DAYS,
+                settings.LOG_ARCHIVE_MAX_MB * 1024 * 1024,
+            )
+        finally:
+            archive.close()
+
+    result = await asyncio.to_thread(prune)
+    if result["deleted"]:
+        logger.info(
+            f"Pruned {result['deleted']} archived log lines "
+            f"({result['bytes']} bytes left)"
+        )
+
+
+# Run by the leader worker (see app.main)
+log_collector = LogCollector()
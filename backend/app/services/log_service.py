@@ -0,0 +1,129 @@
+"""
+Container logs
+Disk usage of container log files by project, and whether each container
+runs with a rotation policy (see TraefikService.logging_policy)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core.admin_rpc import INTERNAL_ERROR, AdminRPCServer, RPCError
+from app.core.config import settings
+from app.services.docker_service import DockerService
+from app.services.traefik_service import TraefikService
+
+# Files of the local driver, in the container's directory
+LOCAL_LOGS_DIR = "local-logs"
+
+
+def log_files_size(container_dir: Path, container_id: str) -> int:
+    """
+    Bytes of a container's log files, rotated ones included
+
+    Args:
+        container_dir: The container's directory in DOCKER_CONTAINERS_DIR
+        container_id: Full container ID
+
+    Returns:
+        Total size (0 when the container has no log files)
+    """
+    size = 0
+    try:
+        entries = list(os.scandir(container_dir))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if entry.name.startswith(f"{container_id}-json.log"):
+            size += entry.stat(follow_symlinks=False).st_size
+        elif entry.name == LOCAL_LOGS_DIR and entry.is_dir(follow_symlinks=False):
+            with os.scandir(entry.path) as local_files:
+                size += sum(f.stat(follow_symlinks=False).st_size for f in local_files)
+    return size
+
+
+def is_bounded(driver: str, options: dict[str, str]) -> bool:
+    """True if Docker caps the log files of a container with this config"""
+    # json-file grows without limit unless max-size is set; local always
+    # rotates (20m x 5 by default); other drivers don't write log files
+    return driver != "json-file" or bool(options.get("max-size"))
+
+
+class LogService:
+    """Service reporting container log storage"""
+
+    def __init__(self, containers_dir: Optional[Path] = None):
+        self.containers_dir = Path(containers_dir or settings.DOCKER_CONTAINERS_DIR)
+
+    def get_usage(self) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        """
+        Log disk usage of all containers, grouped by compose project
+
+        Sizes are read from the log files in DOCKER_CONTAINERS_DIR (the
+        Engine API doesn't report them).
+
+        Returns:
+            ({"policy", "total_bytes", "projects": [{"project", "bytes",
+            "containers"}], "unbounded"}, None), or (None, error).
+            Projects are sorted by size, largest first; containers
+            without a compose project are under project "".
+        """
+        if not os.access(self.containers_dir, os.R_OK | os.X_OK):
+            return None, f"Container directory not readable: {self.containers_dir}"
+        try:
+            configs, error = DockerService().get_log_configs()
+        except Exception as e:
+            return None, str(e)
+        if error:
+            return None, error
+
+        projects: dict[str, dict[str, Any]] = {}
+        unbounded = []
+        for config in configs:
+            container = {
+                "id": config["id"][:12],
+                "name": config["name"],
+                "driver": config["driver"],
+                "max_size": config["options"].get("max-size"),
+                "max_file": config["options"].get("max-file"),
+                "bytes": log_files_size(
+                    self.containers_dir / config["id"], config["id"]
+                ),
+                "bounded": is_bounded(config["driver"], config["options"]),
+            }
+            if not container["bounded"]:
+                unbounded.append(config["name"])
+            project = projects.setdefault(
+                config["project"],
+                {"project": config["project"], "bytes": 0, "containers": []},
+            )
+            project["bytes"] += container["bytes"]
+            project["containers"].append(container)
+
+        ordered = sorted(projects.values(), key=lambda p: (-p["bytes"], p["project"]))
+        return {
+            "policy": TraefikService.logging_policy(),
+            "total_bytes": sum(p["bytes"] for p in ordered),
+            "projects": ordered,
+            "unbounded": unbounded,
+        }, None
+
+
+def register_rpc_methods(rpc: AdminRPCServer) -> None:
+    """
+    Expose log usage on the admin RPC socket (./docklite maint clean --logs)
+
+    Args:
+        rpc: Server to add the methods to
+    """
+
+    async def usage() -> dict:
+        result, error = await asyncio.to_thread(LogService().get_usage)
+        if error or result is None:
+            raise RPCError(INTERNAL_ERROR, error or "Cannot read log usage")
+        return result
+
+    rpc.add_method("logs.usage", usage)
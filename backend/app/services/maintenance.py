@@ -0,0 +1,196 @@
+"""
+Periodic maintenance jobs
+Registered with the scheduler, which runs them in the leader worker only
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter as StateCounts
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import TOPIC_STATS, hub
+from app.core.metrics import CONTAINERS
+from app.core.scheduler import Scheduler
+from app.services.container_metrics import (
+    compact_container_metrics,
+    sample_container_metrics,
+)
+from app.services.docker_events import project_owners
+from app.services.docker_service import DockerService
+from app.services.log_archive import prune_log_archive
+from app.services.project_service import ProjectService
+from app.services.project_store import project_file_store
+from app.services.snapshot_service import SnapshotService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Container states reported by the previous sample (zeroed when gone)
+_sampled_states: set[str] = set()
+
+
+async def reconcile_projects() -> None:
+    """Repair project file drift and regenerate the Traefik config"""
+    async with AsyncSessionLocal() as session:
+        service = ProjectService(session)
+        report = await service.check_files_consistency()
+        await service.sync_traefik_config()
+
+    if report["repaired"]:
+        logger.warning(f"Reconciliation repaired: {', '.join(report['repaired'])}")
+
+
+async def sample_container_states() -> None:
+    """Count containers by state into the docklite_containers gauge"""
+
+    def list_containers() -> list[dict]:
+        return DockerService().list_all_containers(all=True)
+
+    containers = await asyncio.to_thread(list_containers)
+    counts = StateCounts(c.get("state", "unknown") for c in containers)
+    for state in _sampled_states - counts.keys():
+        CONTAINERS.set(0, state)
+    for state, count in counts.items():
+        CONTAINERS.set(count, state)
+    _sampled_states.clear()
+    _sampled_states.update(counts)
+
+
+async def publish_container_stats() -> None:
+    """
+    Publish resource usage samples on the "stats" topic
+
+    One event per project (visible to its owner) and one admin-only event
+    for containers outside projects.
+    """
+    # Nobody watching in any worker: skip the (expensive) docker stats call
+    if not hub.has_interest(TOPIC_STATS):
+        return
+
+    def sample() -> list[dict]:
+        samples, error = DockerService().get_all_container_stats()
+        if error:
+            raise Exception(error)
+        return samples
+
+    # Containers outside DockLite projects are grouped under "" (admins only)
+    groups: dict[str, tuple[Optional[tuple[int, int]], list[dict]]] = {}
+    for item in await asyncio.to_thread(sample):
+        owner = await project_owners.lookup(item["project"])
+        slug = item["project"] if owner else ""
+        groups.setdefault(slug, (owner, []))[1].append(item)
+
+    for slug, (owner, containers) in groups.items():
+        hub.publish(
+            TOPIC_STATS,
+            "sample",
+            {
+                "project": slug,
+                "project_id": owner[0] if owner else None,
+                "containers": containers,
+            },
+            owner_id=owner[1] if owner else None,
+        )
+
+
+async def cleanup_stale_trash() -> None:
+    """
+    Remove trash directories of deletions that never finished
+
+    Only directories older than TRASH_STALE_SECONDS are removed, so
+    deletions still in progress in some worker are left alone.
+    """
+    cutoff = time.time() - settings.TRASH_STALE_SECONDS
+    for trash_dir in project_file_store.list_trash():
+        try:
+            if trash_dir.stat().st_ctime > cutoff:
+                continue
+            await asyncio.to_thread(project_file_store.remove_tree, trash_dir)
+            logger.info(f"Removed stale trash directory {trash_dir.name}")
+        except OSError as e:
+            logger.warning(f"Failed to remove {trash_dir.name}: {e}")
+
+
+async def create_snapshot() -> None:
+    """Incremental snapshot of the database, projects and volumes"""
+    _, error = await asyncio.to_thread(
+        SnapshotService().create_snapshot, trigger="scheduler"
+    )
+    if error:
+        raise Exception(error)
+
+
+def register_jobs(scheduler: Scheduler) -> None:
+    """
+    Register the maintenance jobs enabled in settings
+
+    Args:
+        scheduler: Scheduler to add the jobs to
+    """
+    if settings.RECONCILE_INTERVAL_SECONDS > 0:
+        scheduler.add_job(
+            "reconcile_projects",
+            reconcile_projects,
+            interval=settings.RECONCILE_INTERVAL_SECONDS,
+            jitter=30,
+            timeout=120,
+        )
+    if settings.CONTAINER_SAMPLE_INTERVAL_SECONDS > 0:
+        scheduler.add_job(
+            "sample_container_states",
+            sample_container_states,
+            interval=settings.CONTAINER_SAMPLE_INTERVAL_SECONDS,
+            jitter=5,
+            timeout=30,
+            run_at_start=True,
+        )
+    if settings.EVENTS_ENABLED and settings.EVENTS_STATS_INTERVAL_SECONDS > 0:
+        scheduler.add_job(
+            "publish_container_stats",
+            publish_container_stats,
+            interval=settings.EVENTS_STATS_INTERVAL_SECONDS,
+            timeout=60,
+        )
+    if settings.CONTAINER_METRICS_ENABLED:
+        scheduler.add_job(
+            "sample_container_metrics",
+            sample_container_metrics,
+            interval=max(1, settings.CONTAINER_METRICS_INTERVAL_SECONDS),
+            timeout=60,
+            run_at_start=True,
+        )
+        scheduler.add_job(
+            "compact_container_metrics",
+            compact_container_metrics,
+            interval=max(1, settings.CONTAINER_METRICS_COMPACT_SECONDS),
+            jitter=5,
+            timeout=120,
+        )
+    if settings.TRASH_CLEANUP_CRON:
+        scheduler.add_job(
+            "cleanup_stale_trash",
+            cleanup_stale_trash,
+            cron=settings.TRASH_CLEANUP_CRON,
+            jitter=60,
+            timeout=600,
+        )
+    if settings.LOG_ARCHIVE_ENABLED and settings.LOG_ARCHIVE_PRUNE_CRON:
+        scheduler.add_job(
+            "prune_log_archive",
+            prune_log_archive,
+            cron=settings.LOG_ARCHIVE_PRUNE_CRON,
+            jitter=60,
+            timeout=600,
+        )
+    if settings.BACKUP_SNAPSHOT_CRON:
+        scheduler.add_job(
+            "create_snapshot",
+            create_snapshot,
+            cron=settings.BACKUP_SNAPSHOT_CRON,
+            jitter=300,
+            timeout=6 * 3600,
+        )
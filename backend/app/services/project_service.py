@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 from pathlib import Path
 from typing import Optional
@@ -14,7 +15,16 @@ from app.utils.formatters import generate_slug_from_domain
 from app.constants.project_constants import ProjectStatus
 from app.constants.messages import ErrorMessages
 from app.services.traefik_service import TraefikService
+from app.services.job_service import Job, job_manager
+from app.services.project_store import (
+    COMPOSE_FILENAME,
+    ENV_FILENAME,
+    ProjectFileTransaction,
+    project_file_store,
+    render_env,
+)
 from app.core.config import settings
+from app.core.events import TOPIC_PROJECTS, hub
 
 
 class ProjectService:
@@ -64,6 +74,16 @@ class ProjectService:
 
         # Create project in database first to get ID
         env_vars_json = json.dumps(project_data.env_vars or {})
+        routes = (
+            [route.model_dump() for route in project_data.routes]
+            if project_data.routes
+            else None
+        )
+        performance = (
+            project_data.performance.model_dump(exclude_defaults=True) or None
+            if project_data.performance
+            else None
+        )
 
         new_project = Project(
             name=project_data.name,
@@ -73,6 +93,8 @@ class ProjectService:
             slug="",  # Will be set after flush
             compose_content=project_data.compose_content,
             env_vars=env_vars_json,
+            routes=json.dumps(routes) if routes else None,
+            performance=json.dumps(performance) if performance else None,
             status=ProjectStatus.CREATED,
         )
 
@@ -85,7 +107,13 @@ class ProjectService:
 
         # Inject Traefik labels into compose content
         modified_compose, traefik_error = TraefikService.inject_labels_to_compose(
-            project_data.compose_content, project_data.domain, slug
+            project_data.compose_content,
+            project_data.domain,
+            slug,
+            routing_mode=settings.TRAEFIK_ROUTING_MODE,
+            routes=routes,
+            performance=performance,
+            logging=TraefikService.logging_policy(),
         )
 
         if traefik_error:
@@ -95,29 +123,81 @@ class ProjectService:
         # Update compose_content with Traefik labels
         setattr(new_project, "compose_content", modified_compose)
 
-        await self.db.commit()
-        await self.db.refresh(new_project)
+        # Stage project files, publish them only after the DB commit
+        # (filesystem work runs in the thread pool, off the event loop)
+        files = await asyncio.to_thread(project_file_store.begin, slug)
+        await asyncio.to_thread(files.write, COMPOSE_FILENAME, modified_compose)
+        # Always create .env, even if empty
+        await asyncio.to_thread(
+            files.write, ENV_FILENAME, render_env(project_data.env_vars)
+        )
 
-        # Create project directory using configured PROJECTS_DIR
-        project_dir = Path(settings.PROJECTS_DIR) / slug
-        project_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            await self.db.commit()
+        except BaseException:
+            await asyncio.to_thread(files.abort)
+            raise
 
-        # Write docker-compose.yml with Traefik labels
-        compose_file = project_dir / "docker-compose.yml"
-        compose_file.write_text(modified_compose)
+        await asyncio.to_thread(files.commit)
+        await self.db.refresh(new_project)
 
-        # Write .env file (always create, even if empty)
-        env_file = project_dir / ".env"
-        if project_data.env_vars:
-            env_content = "\n".join(
-                [f"{k}={v}" for k, v in project_data.env_vars.items()]
-            )
-            env_file.write_text(env_content)
-        else:
-            env_file.write_text("")  # Create empty .env file
+        await self.sync_traefik_config()
+        self._publish("created", new_project)
 
         return new_project, None
 
+    async def sync_traefik_config(self) -> Optional[Path]:
+        """
+        Regenerate Traefik's dynamic config file from all projects
+
+        Only active in file routing mode; Traefik's file provider picks up
+        the new routes without any container being recreated.
+
+        Returns:
+            Path of the written config file, or None in labels mode
+        """
+        if settings.TRAEFIK_ROUTING_MODE != TraefikService.ROUTING_MODE_FILE:
+            return None
+
+        projects = await self.get_all_projects()
+        config = TraefikService.build_dynamic_config(
+            {
+                "domain": str(p.domain),
+                "slug": str(p.slug),
+                "compose_content": str(p.compose_content),
+                "routes": self.get_routes(p),
+                "performance": self.get_performance(p),
+            }
+            for p in projects
+        )
+        return await asyncio.to_thread(
+            TraefikService.write_dynamic_config,
+            config,
+            settings.TRAEFIK_DYNAMIC_CONFIG_DIR,
+        )
+
+    @staticmethod
+    def get_routes(project: Project) -> Optional[list[dict]]:
+        """Get project service routes (None means default routing)"""
+        if not project.routes:
+            return None
+        try:
+            routes: list[dict] = json.loads(str(project.routes))
+            return routes or None
+        except (json.JSONDecodeError, TypeError):
+            return None
+
+    @staticmethod
+    def get_performance(project: Project) -> Optional[dict]:
+        """Get project performance middleware settings (None: no middlewares)"""
+        if not project.performance:
+            return None
+        try:
+            performance: dict = json.loads(str(project.performance))
+            return performance or None
+        except (json.JSONDecodeError, TypeError):
+            return None
+
     async def get_project_path(self, project: Project) -> Path:
         """Get project directory path"""
         path: Path = Path(settings.PROJECTS_DIR) / project.slug
@@ -162,10 +242,10 @@ class ProjectService:
         if not project:
             return None, ErrorMessages.PROJECT_NOT_FOUND
 
-        project_path = await self.get_project_path(project)
-
         compose_updated = False
         domain_updated = False
+        routes_updated = project_data.routes is not None
+        performance_updated = project_data.performance is not None
 
         # Validate compose content if provided
         if project_data.compose_content:
@@ -182,8 +262,31 @@ class ProjectService:
                 return None, ErrorMessages.PROJECT_EXISTS
             domain_updated = True
 
-        # If compose or domain changed, re-inject Traefik labels
-        if compose_updated or domain_updated:
+        # Service routes ([] resets to default routing)
+        routes: Optional[list[dict]]
+        if project_data.routes is not None:
+            routes = [route.model_dump() for route in project_data.routes] or None
+        else:
+            routes = self.get_routes(project)
+
+        # Performance middlewares ({} resets to defaults)
+        performance: Optional[dict]
+        if project_data.performance is not None:
+            performance = (
+                project_data.performance.model_dump(exclude_defaults=True) or None
+            )
+        else:
+            performance = self.get_performance(project)
+
+        routing_updated = (
+            compose_updated or domain_updated or routes_updated or performance_updated
+        )
+
+        # Project file changes, staged until the DB commit succeeds
+        files: Optional[ProjectFileTransaction] = None
+
+        # If compose, domain or routing changed, re-inject Traefik labels
+        if routing_updated:
             new_compose = (
                 project_data.compose_content
                 if compose_updated
@@ -195,16 +298,27 @@ class ProjectService:
                 str(new_compose) if new_compose else "",
                 str(new_domain) if new_domain else "",
                 str(project.slug),
+                routing_mode=settings.TRAEFIK_ROUTING_MODE,
+                routes=routes,
+                performance=performance,
+                logging=TraefikService.logging_policy(),
             )
 
             if traefik_error:
                 return None, f"Failed to inject Traefik labels: {traefik_error}"
 
             setattr(project, "compose_content", modified_compose)
-
-            # Update compose file
-            compose_file = project_path / "docker-compose.yml"
-            compose_file.write_text(modified_compose)
+            if files is None:
+                files = await asyncio.to_thread(
+                    project_file_store.begin, str(project.slug)
+                )
+            await asyncio.to_thread(files.write, COMPOSE_FILENAME, modified_compose)
+            setattr(project, "routes", json.dumps(routes) if routes else None)
+            setattr(
+                project,
+                "performance",
+                json.dumps(performance) if performance else None,
+            )
 
         # Update domain in DB
         if domain_updated:
@@ -219,39 +333,72 @@ class ProjectService:
             setattr(project, "env_vars", json.dumps(project_data.env_vars))
 
             # Update .env file
-            env_file = project_path / ".env"
+            if files is None:
+                files = await asyncio.to_thread(
+                    project_file_store.begin, str(project.slug)
+                )
             if project_data.env_vars:
-                env_content = "\n".join(
-                    [f"{k}={v}" for k, v in project_data.env_vars.items()]
+                await asyncio.to_thread(
+                    files.write, ENV_FILENAME, render_env(project_data.env_vars)
                 )
-                env_file.write_text(env_content)
-            elif env_file.exists():
-                env_file.unlink()
+            else:
+                files.delete(ENV_FILENAME)
 
-        await self.db.commit()
+        try:
+            await self.db.commit()
+        except BaseException:
+            if files:
+                await asyncio.to_thread(files.abort)
+            raise
+
+        if files:
+            await asyncio.to_thread(files.commit)
         await self.db.refresh(project)
+
+        if routing_updated:
+            await self.sync_traefik_config()
+        self._publish("updated", project)
+
         return project, None
 
     async def delete_project(
         self, project_id: int, user_id: Optional[int] = None, is_admin: bool = False
-    ) -> tuple[bool, Optional[str]]:
-        """Delete project"""
+    ) -> tuple[Optional[Job], Optional[str]]:
+        """
+        Delete project
+
+        The project directory is renamed out of the way right away and
+        removed by a background job (project trees can be gigabytes).
+
+        Returns:
+            Tuple of (file removal job, error)
+        """
         project = await self.get_project(project_id, user_id, is_admin)
         if not project:
-            return False, ErrorMessages.PROJECT_NOT_FOUND
-
-        # Delete project files
-        project_path = await self.get_project_path(project)
-        if project_path.exists():
-            import shutil
+            return None, ErrorMessages.PROJECT_NOT_FOUND
 
-            shutil.rmtree(project_path)
+        slug = str(project.slug)
 
-        # Delete from database
+        # Delete from database first: leftover files of a crash are only
+        # reported as orphaned by the consistency check
         await self.db.delete(project)
         await self.db.commit()
+        self._publish("deleted", project)
 
-        return True, None
+        # Delete project files
+        project_file_store.cancel_env_write(slug)
+        trash_dir = await asyncio.to_thread(project_file_store.move_to_trash, slug)
+        job = job_manager.submit(
+            "delete_project_files",
+            project_file_store.remove_tree,
+            trash_dir,
+            owner_id=user_id,
+            target=slug,
+        )
+
+        await self.sync_traefik_config()
+
+        return job, None
 
     async def get_env_vars(
         self, project_id: int, user_id: Optional[int] = None, is_admin: bool = False
@@ -261,6 +408,11 @@ class ProjectService:
         if not project:
             return None
 
+        return self.get_env_dict(project)
+
+    @staticmethod
+    def get_env_dict(project: Project) -> dict[str, str]:
+        """Parse stored project environment variables"""
         try:
             env_vars_str = str(project.env_vars) if project.env_vars else "{}"
             result: dict[str, str] = json.loads(env_vars_str)
@@ -281,17 +433,49 @@ class ProjectService:
             return False, ErrorMessages.PROJECT_NOT_FOUND
 
         setattr(project, "env_vars", json.dumps(env_vars))
+        await self.db.commit()
 
-        # Update .env file
+        # Write-behind: rapid successive edits coalesce into one .env write
         project_path = await self.get_project_path(project)
-        project_path.mkdir(parents=True, exist_ok=True)
-        env_file = project_path / ".env"
+        await asyncio.to_thread(project_path.mkdir, parents=True, exist_ok=True)
+        project_file_store.schedule_env_write(str(project.slug), env_vars)
+        self._publish("updated", project)
 
-        if env_vars:
-            env_content = "\n".join([f"{k}={v}" for k, v in env_vars.items()])
-            env_file.write_text(env_content)
-        elif env_file.exists():
-            env_file.unlink()
-
-        await self.db.commit()
         return True, None
+
+    @staticmethod
+    def _publish(event_type: str, project: Project) -> None:
+        """Notify /api/events subscribers of a project change"""
+        hub.publish(
+            TOPIC_PROJECTS,
+            event_type,
+            {
+                "id": project.id,
+                "name": project.name,
+                "domain": project.domain,
+                "slug": project.slug,
+                "status": project.status,
+            },
+            owner_id=int(project.owner_id),
+        )
+
+    async def check_files_consistency(self, repair: bool = True) -> dict:
+        """
+        Check project files on disk against DB rows (and repair drift)
+
+        Args:
+            repair: Rewrite drifted files from the DB (False: report only)
+
+        Returns:
+            Report dict (see ProjectFileStore.check_consistency)
+        """
+        await project_file_store.flush()
+        projects = await self.get_all_projects()
+        return await asyncio.to_thread(
+            project_file_store.check_consistency,
+            [
+                (str(p.slug), str(p.compose_content), self.get_env_dict(p))
+                for p in projects
+            ],
+            repair,
+        )
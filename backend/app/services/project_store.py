@@ -0,0 +1,339 @@
+"""
+Project filesystem store
+Crash-safe writes of project files (docker-compose.yml, .env) under
+PROJECTS_DIR, ordered around DB commits, with write-behind for .env edits
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.core.config import settings
+from app.utils.files import TEMP_SUFFIX, atomic_write_text, fsync_dir, write_temp_file
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+COMPOSE_FILENAME = "docker-compose.yml"
+ENV_FILENAME = ".env"
+# Deleted project trees are renamed to a hidden ".trash-*" dir, then removed
+TRASH_PREFIX = ".trash-"
+
+
+def render_env(env_vars: Optional[dict[str, str]]) -> str:
+    """
+    Render environment variables as .env file content
+
+    Args:
+        env_vars: Environment variables
+
+    Returns:
+        .env content (KEY=value lines)
+    """
+    return "\n".join(f"{k}={v}" for k, v in (env_vars or {}).items())
+
+
+class ProjectFileTransaction:
+    """
+    Staged project file changes, applied after the DB commit
+
+    Two-phase ordering: write() stages fsynced temp files before the DB
+    commit; commit() renames them into place after it succeeds; abort()
+    discards them if the DB commit fails. The DB is the source of truth, so
+    a crash between the two phases is repaired by the consistency checker.
+    """
+
+    def __init__(self, store: ProjectFileStore, slug: str):
+        self.store = store
+        self.slug = slug
+        self.project_dir = store.get_project_dir(slug)
+        self._created_dir = not self.project_dir.exists()
+        self._staged: list[tuple[Path, Path]] = []
+        self._deletes: list[Path] = []
+
+        self.project_dir.mkdir(parents=True, exist_ok=True)
+
+    def write(self, filename: str, content: str) -> None:
+        """Stage a file write (content is fsynced to a temp file now)"""
+        target = self.project_dir / filename
+        self._staged.append((write_temp_file(target, content), target))
+
+    def delete(self, filename: str) -> None:
+        """Stage a file removal"""
+        self._deletes.append(self.project_dir / filename)
+
+    def touches(self, filename: str) -> bool:
+        """Check if the transaction writes or deletes a file"""
+        target = self.project_dir / filename
+        return target in self._deletes or any(t == target for _, t in self._staged)
+
+    def commit(self) -> None:
+        """Publish staged changes (atomic renames + directory fsync)"""
+        # Staged .env supersedes any pending write-behind
+        if self.touches(ENV_FILENAME):
+            self.store.cancel_env_write(self.slug)
+
+        for tmp_path, target in self._staged:
+            os.replace(tmp_path, target)
+        for target in self._deletes:
+            target.unlink(missing_ok=True)
+
+        fsync_dir(self.project_dir)
+        self._staged.clear()
+        self._deletes.clear()
+
+    def abort(self) -> None:
+        """Discard staged changes"""
+        for tmp_path, _ in self._staged:
+            tmp_path.unlink(missing_ok=True)
+        self._staged.clear()
+        self._deletes.clear()
+
+        # Don't leave an empty directory behind for a project never created
+        if self._created_dir:
+            try:
+                self.project_dir.rmdir()
+            except OSError:
+                pass
+
+
+class ProjectFileStore:
+    """
+    Project files under PROJECTS_DIR
+
+    .env edits are write-behind: the DB commit is synchronous, the file write
+    is delayed by ENV_WRITE_DELAY_MS and coalesced, so a burst of edits to
+    the same project results in a single write of the latest content.
+    """
+
+    def __init__(self) -> None:
+        # slug -> (project_dir, content or None to delete)
+        self._pending_env: dict[str, tuple[Path, Optional[str]]] = {}
+        self._env_tasks: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def get_project_dir(slug: str) -> Path:
+        """Get project directory path"""
+        return Path(settings.PROJECTS_DIR) / slug
+
+    def begin(self, slug: str) -> ProjectFileTransaction:
+        """
+        Start staging file changes for a project
+
+        Args:
+            slug: Project slug
+
+        Returns:
+            Transaction to commit after the DB commit (or abort)
+        """
+        return ProjectFileTransaction(self, slug)
+
+    def schedule_env_write(self, slug: str, env_vars: dict[str, str]) -> None:
+        """
+        Schedule a coalesced .env write for a project
+
+        Args:
+            slug: Project slug
+            env_vars: New environment variables (empty removes .env)
+        """
+        # Capture the directory now: PROJECTS_DIR may change before the flush
+        project_dir = self.get_project_dir(slug)
+        self._pending_env[slug] = (project_dir, render_env(env_vars) or None)
+
+        task = self._env_tasks.get(slug)
+        if task is None or task.done():
+            self._env_tasks[slug] = asyncio.create_task(self._delayed_flush(slug))
+
+    def cancel_env_write(self, slug: str) -> None:
+        """
+        Drop a pending .env write (e.g. project deleted or rewritten)
+
+        Safe to call from worker threads (restores): the flush task is
+        then cancelled on its own event loop.
+        """
+        self._pending_env.pop(slug, None)
+        task = self._env_tasks.pop(slug, None)
+        if task is None or task.done():
+            return
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if current is task.get_loop():
+            task.cancel()
+        else:
+            task.get_loop().call_soon_threadsafe(task.cancel)
+
+    def has_pending_writes(self) -> bool:
+        """Check if any write-behind .env writes are pending"""
+        return bool(self._pending_env)
+
+    async def _delayed_flush(self, slug: str) -> None:
+        """Wait for the coalescing window, then write the latest content"""
+        await asyncio.sleep(settings.ENV_WRITE_DELAY_MS / 1000)
+        self._env_tasks.pop(slug, None)
+        self._flush_env(slug)
+
+    def _flush_env(self, slug: str) -> None:
+        """Write the pending .env content of a project"""
+        pending = self._pending_env.pop(slug, None)
+        if pending is None:
+            return
+
+        project_dir, content = pending
+        if not project_dir.exists():
+            return  # Project deleted meanwhile
+
+        env_file = project_dir / ENV_FILENAME
+        try:
+            if content is None:
+                env_file.unlink(missing_ok=True)
+                fsync_dir(project_dir)
+            else:
+                atomic_write_text(env_file, content)
+        except OSError as e:
+            # DB already has the new values; the consistency check repairs it
+            logger.error(f"Failed to write {env_file}: {e}")
+
+    async def flush(self) -> None:
+        """Write all pending .env changes now (shutdown, tests)"""
+        for slug in list(self._env_tasks):
+            task = self._env_tasks.pop(slug)
+            if not task.done():
+                task.cancel()
+        for slug in list(self._pending_env):
+            self._flush_env(slug)
+
+    def move_to_trash(self, slug: str) -> Optional[Path]:
+        """
+        Detach a project directory by renaming it (O(1), frees the slug)
+
+        Args:
+            slug: Project slug
+
+        Returns:
+            Trash directory path to remove, or None if there was no directory
+        """
+        project_dir = self.get_project_dir(slug)
+        if not project_dir.exists():
+            return None
+
+        trash_name = f"{TRASH_PREFIX}{slug}-{uuid.uuid4().hex[:8]}"
+        trash_dir = project_dir.with_name(trash_name)
+        os.replace(project_dir, trash_dir)
+        fsync_dir(project_dir.parent)
+        return trash_dir
+
+    @staticmethod
+    def list_trash() -> list[Path]:
+        """List trash directories left by interrupted deletions"""
+        projects_dir = Path(settings.PROJECTS_DIR)
+        if not projects_dir.exists():
+            return []
+        return sorted(
+            entry
+            for entry in projects_dir.iterdir()
+            if entry.is_dir() and entry.name.startswith(TRASH_PREFIX)
+        )
+
+    @staticmethod
+    def remove_tree(path: Optional[Path]) -> None:
+        """Remove a directory tree (blocking; run it in a worker thread)"""
+        if path is not None and path.exists():
+            shutil.rmtree(path)
+
+    def check_consistency(
+        self, projects: Iterable[tuple[str, str, dict[str, str]]], repair: bool = True
+    ) -> dict:
+        """
+        Compare project files on disk with DB rows and repair crash drift
+
+        The DB is the source of truth, but a file is rewritten from it only
+        when missing, truncated (empty) or left behind by an interrupted
+        two-phase write. Other differences may be user uploads (rsync deploys
+        carry the local .env and docker-compose.yml) and are only reported,
+        as are directories without a DB row.
+
+        Args:
+            projects: Iterable of (slug, compose_content, env_vars) from the DB
+            repair: Rewrite drifted files (False: report only)
+
+        Returns:
+            Report dict with "repaired", "modified", "orphaned" and
+            "temp_files_removed"
+        """
+        projects_dir = Path(settings.PROJECTS_DIR)
+        report: dict = {
+            "repaired": [],
+            "modified": [],
+            "orphaned": [],
+            "temp_files_removed": 0,
+        }
+        known_slugs: set[str] = set()
+
+        for slug, compose_content, env_vars in projects:
+            known_slugs.add(slug)
+            project_dir = projects_dir / slug
+            temp_files = (
+                list(project_dir.glob(f".*{TEMP_SUFFIX}"))
+                if project_dir.exists()
+                else []
+            )
+            expected = {
+                COMPOSE_FILENAME: compose_content,
+                ENV_FILENAME: render_env(env_vars),
+            }
+
+            for filename, content in expected.items():
+                path = project_dir / filename
+                try:
+                    actual = path.read_text() if path.exists() else None
+                except OSError:
+                    actual = None
+
+                # Empty .env may legitimately be absent
+                if actual == content or (
+                    filename == ENV_FILENAME and not content and actual is None
+                ):
+                    continue
+
+                interrupted = any(
+                    t.name.startswith(f".{filename}.") for t in temp_files
+                )
+                if actual and not interrupted:
+                    report["modified"].append(f"{slug}/{filename}")
+                    continue
+
+                report["repaired"].append(f"{slug}/{filename}")
+                if repair:
+                    project_dir.mkdir(parents=True, exist_ok=True)
+                    atomic_write_text(path, content)
+
+            if repair:
+                for tmp_file in temp_files:
+                    tmp_file.unlink(missing_ok=True)
+                    report["temp_files_removed"] += 1
+
+        if projects_dir.exists():
+            for entry in projects_dir.iterdir():
+                if entry.name.startswith("."):
+                    continue  # Trash and other internal directories
+                if entry.is_dir() and entry.name not in known_slugs:
+                    report["orphaned"].append(entry.name)
+
+        if report["repaired"] or report["orphaned"]:
+            logger.warning(
+                f"Project files drift: repaired={report['repaired']} "
+                f"orphaned={report['orphaned']}"
+            )
+
+        return report
+
+
+# Shared store (holds write-behind state across requests)
+project_file_store = ProjectFileStore()
@@ -0,0 +1,563 @@
+"""
+Restores
+Selective restores of incremental snapshots over the live data: the
+database, project directories and named volumes are staged next to what
+they replace while everything keeps running, then swapped in with renames
+while only the affected projects' containers are stopped
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import os
+import sqlite3
+import tarfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from app.core.admin_rpc import INTERNAL_ERROR, INVALID_PARAMS, AdminRPCServer, RPCError
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.locks import FileLock
+from app.core.metrics import RESTORE_DOWNTIME, RESTORES
+from app.services.backup_service import SNAPSHOT_BUSY_TIMEOUT
+from app.services.docker_service import DockerService
+from app.services.project_service import ProjectService
+from app.services.project_store import project_file_store
+from app.services.snapshot_service import (
+    DATABASE_SOURCE,
+    HOST_SOURCE,
+    PROJECT_PREFIX,
+    STORE_LOCK,
+    VOLUME_PREFIX,
+    ChunkStore,
+    SnapshotService,
+    file_chunks,
+    restore_tree,
+    snapshot_threads,
+)
+from app.utils.files import TEMP_SUFFIX, fsync_dir
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Staged project directories in PROJECTS_DIR (hidden: not projects)
+STAGING_PREFIX = ".restore-"
+# Staged database, next to the live one
+DATABASE_STAGING_SUFFIX = f".restore{TEMP_SUFFIX}"
+
+
+def volume_archive(
+    chunks: ChunkStore, entries: list[dict[str, Any]], pool: ThreadPoolExecutor
+) -> Iterator[bytes]:
+    """
+    Tar stream of a volume source, for DockerService.stage_volume
+
+    Headers and file contents are produced as the archive is sent, the
+    chunks decompressed and verified ahead on the pool.
+
+    Args:
+        chunks: Store holding the chunks
+        entries: Manifest entries of the volume source
+        pool: Executor for chunk reads (see ChunkStore.read_chunks)
+
+    Yields:
+        Archive parts
+    """
+    data = chunks.read_chunks(file_chunks(entries), pool)
+    try:
+        for entry in entries:
+            info = tarfile.TarInfo(entry["path"])
+            info.mode = entry["mode"]
+            info.uid = entry["uid"]
+            info.gid = entry["gid"]
+            info.mtime = entry["mtime_ns"] // 1_000_000_000
+            kind = entry["type"]
+            if kind == "dir":
+                info.type = tarfile.DIRTYPE
+            elif kind == "symlink":
+                info.type = tarfile.SYMTYPE
+                info.linkname = entry["target"]
+            elif kind == "hardlink":
+                info.type = tarfile.LNKTYPE
+                info.linkname = entry["target"]
+            else:
+                info.size = entry["size"]
+            yield info.tobuf(tarfile.PAX_FORMAT)
+            if kind == "file":
+                for _ in entry["chunks"]:
+                    yield next(data)
+                padding = -entry["size"] % tarfile.BLOCKSIZE
+                if padding:
+                    yield bytes(padding)
+        # End of archive: two zero blocks
+        yield bytes(2 * tarfile.BLOCKSIZE)
+    finally:
+        data.close()
+
+
+class RestoreService:
+    """
+    Service restoring snapshots in place
+
+    Blocking (decompression, disk I/O, Docker calls): run it in a worker
+    thread (job_manager.submit / asyncio.to_thread).
+    """
+
+    def __init__(
+        self, store_dir: Optional[Path] = None, database: Optional[Path] = None
+    ):
+        self.snapshots = SnapshotService(store_dir, database)
+        self.database = self.snapshots.database
+
+    def restore_snapshot(
+        self,
+        snapshot_id: str,
+        database: bool = False,
+        projects: Optional[list[str]] = None,
+        volumes: Optional[list[str]] = None,
+        host: bool = False,
+    ) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        """
+        Restore sources of a snapshot over the live data
+
+        Staging, with no downtime: the selected sources are restored in
+        parallel next to the live data (projects into hidden directories
+        of PROJECTS_DIR, volumes into a staging directory inside each
+        volume, the database into a file beside it), every chunk verified
+        against its SHA-256 as it is decompressed. Nothing live changes
+        if any of them fails.
+
+        Swap: the running containers of the affected projects are
+        stopped, project directories and volume contents renamed into
+        place, and the containers started again; the replaced data is
+        deleted afterwards. The database goes last, once the files are in
+        place, through the SQLite backup API (atomic for the backend's
+        connections). If only that fails, the restore is partial: the
+        summary reports it in "errors".
+
+        Selecting nothing restores everything in the snapshot except the
+        host files.
+
+        Args:
+            snapshot_id: Snapshot ID, or "latest"
+            database: Restore the database
+            projects: Project slugs (their directories and volumes)
+            volumes: Volume names
+            host: Return the host files (.env, ...) in the result, for the
+                CLI to write back
+
+        Returns:
+            (summary, None) on success, (None, error) on failure
+        """
+        try:
+            if not self.snapshots.store_dir.is_dir():
+                raise ValueError("No snapshots in the store")
+            with FileLock(STORE_LOCK, self.snapshots.store_dir).hold():
+                result = self._restore(snapshot_id, database, projects, volumes, host)
+        except Exception as e:
+            RESTORES.inc("error")
+            logger.error(f"Restore of snapshot {snapshot_id} failed: {e}")
+            return None, f"Restore failed: {e}"
+
+        if result["errors"]:
+            RESTORES.inc("partial")
+            logger.error(
+                f"Restore of snapshot {result['id']} incomplete: {result['errors']}"
+            )
+        else:
+            RESTORES.inc("ok")
+        logger.info(
+            f"Restored snapshot {result['id']}: {', '.join(result['sources'])} "
+            f"({result['files']} files, {result['downtime']:.1f}s downtime)"
+        )
+        return result, None
+
+    def _restore(
+        self,
+        snapshot_id: str,
+        database: bool,
+        projects: Optional[list[str]],
+        volumes: Optional[list[str]],
+        host: bool,
+    ) -> dict[str, Any]:
+        snapshot_id = self.snapshots.resolve_id(snapshot_id)
+        header, _ = self.snapshots.read_snapshot(snapshot_id, lambda name: False)
+        names = self._select(header, database, projects or [], volumes or [], host)
+        _, sources = self.snapshots.read_snapshot(snapshot_id, names.__contains__)
+        chunks = ChunkStore(self.snapshots.store_dir, header["compression"])
+        self._remove_leftovers()
+
+        staged = self._stage(chunks, sources)
+        errors: dict[str, str] = {}
+        try:
+            host_files = staged.pop(HOST_SOURCE, {})
+            database_staging = staged.pop(DATABASE_SOURCE, None)
+            # Compose projects whose containers use the staged data
+            affected = sorted(
+                {
+                    name[len(PROJECT_PREFIX) :]
+                    for name in staged
+                    if name.startswith(PROJECT_PREFIX)
+                }
+                | {
+                    header["sources"][name].get("project") or ""
+                    for name in staged
+                    if name.startswith(VOLUME_PREFIX)
+                }
+            )
+            try:
+                stopped, downtime = self._swap(staged, affected)
+            except BaseException:
+                if database_staging is not None:
+                    database_staging.unlink(missing_ok=True)
+                raise
+            # Last: the files it refers to are in place
+            if database_staging is not None:
+                try:
+                    self._swap_database(database_staging)
+                except Exception as e:
+                    errors[DATABASE_SOURCE] = str(e)
+        finally:
+            self._discard(staged)
+
+        files = [
+            e for s in sources.values() for e in s["entries"] if e["type"] == "file"
+        ]
+        result: dict[str, Any] = {
+            "id": snapshot_id,
+            "sources": sorted(sources),
+            "database": DATABASE_SOURCE in sources and DATABASE_SOURCE not in errors,
+            "projects": sorted(
+                n[len(PROJECT_PREFIX) :]
+                for n in sources
+                if n.startswith(PROJECT_PREFIX)
+            ),
+            "volumes": sorted(
+                n[len(VOLUME_PREFIX) :] for n in sources if n.startswith(VOLUME_PREFIX)
+            ),
+            "files": len(files),
+            "bytes": sum(e["size"] for e in files),
+            "stopped": stopped,
+            "downtime": round(downtime, 3),
+            # Sources that were staged but could not be swapped in
+            "errors": errors,
+        }
+        if host:
+            result["host_files"] = host_files
+        return result
+
+    def _select(
+        self,
+        header: dict[str, Any],
+        database: bool,
+        projects: list[str],
+        volumes: list[str],
+        host: bool,
+    ) -> set[str]:
+        """Source names to restore (a project brings its volumes)"""
+        available: dict[str, dict] = header["sources"]
+        snapshot_id = header["id"]
+        if not (database or projects or volumes or host):
+            names = set(available) - {HOST_SOURCE}
+        else:
+            names = set()
+            if database:
+                names.add(DATABASE_SOURCE)
+            if host:
+                names.add(HOST_SOURCE)
+            for slug in projects:
+                names.add(f"{PROJECT_PREFIX}{slug}")
+                names.update(
+                    name
+                    for name, source in available.items()
+                    if source["kind"] == "volume" and source.get("project") == slug
+                )
+            names.update(f"{VOLUME_PREFIX}{volume}" for volume in volumes)
+            missing = sorted(names - set(available))
+            if missing:
+                raise ValueError(f"Not in snapshot {snapshot_id}: {', '.join(missing)}")
+        if DATABASE_SOURCE in names and self.database is None:
+            raise ValueError("No database file to restore into")
+        return names
+
+    def _stage(self, chunks: ChunkStore, sources: dict[str, dict]) -> dict[str, Any]:
+        """Restore all sources next to the live data, in parallel"""
+        staged: dict[str, Any] = {}
+        errors: list[str] = []
+        with ThreadPoolExecutor(
+            max_workers=snapshot_threads(), thread_name_prefix="restore"
+        ) as pool, ThreadPoolExecutor(
+            max_workers=snapshot_threads(), thread_name_prefix="chunks"
+        ) as chunk_pool:
+            futures = {
+                name: pool.submit(self._stage_source, chunks, name, source, chunk_pool)
+                for name, source in sources.items()
+            }
+            for name, future in futures.items():
+                try:
+                    staged[name] = future.result()
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+        if errors:
+            self._discard(staged)
+            raise Exception("; ".join(errors))
+        return staged
+
+    def _stage_source(
+        self,
+        chunks: ChunkStore,
+        name: str,
+        source: dict[str, Any],
+        pool: ThreadPoolExecutor,
+    ) -> Any:
+        entries = source["entries"]
+        if name == DATABASE_SOURCE:
+            assert self.database is not None
+            staging = self.database.with_name(
+                f".{self.database.name}{DATABASE_STAGING_SUFFIX}"
+            )
+            try:
+                fd = os.open(staging, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    for data in chunks.read_chunks(file_chunks(entries), pool):
+                        f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                with closing(sqlite3.connect(staging)) as conn:
+                    check = conn.execute("PRAGMA quick_check").fetchone()[0]
+                if check != "ok":
+                    raise ValueError(f"Database integrity check failed: {check}")
+            except BaseException:
+                staging.unlink(missing_ok=True)
+                raise
+            return staging
+        if name == HOST_SOURCE:
+            return {
+                entry["path"]: b"".join(chunks.read_chunks(entry["chunks"], pool))
+                for entry in entries
+                if entry["type"] == "file"
+            }
+        if name.startswith(PROJECT_PREFIX):
+            slug = name[len(PROJECT_PREFIX) :]
+            # A pending write-behind .env would land in the restored directory
+            project_file_store.cancel_env_write(slug)
+            staging = Path(settings.PROJECTS_DIR) / (
+                f"{STAGING_PREFIX}{slug}-{uuid.uuid4().hex[:8]}"
+            )
+            try:
+                restore_tree(chunks, entries, staging, pool)
+            except BaseException:
+                project_file_store.remove_tree(staging)
+                raise
+            return staging
+        volume = name[len(VOLUME_PREFIX) :]
+        DockerService().stage_volume(volume, volume_archive(chunks, entries, pool))
+        return volume
+
+    def _swap_database(self, staging: Path) -> None:
+        """Replace the live database with the staged one"""
+        assert self.database is not None
+        try:
+            if not self.database.exists():
+                os.replace(staging, self.database)
+                fsync_dir(self.database.parent)
+                return
+            # Copied page by page in one write transaction: connections see
+            # the old or the new database, never a mix
+            with closing(sqlite3.connect(staging)) as source, closing(
+                sqlite3.connect(self.database, timeout=SNAPSHOT_BUSY_TIMEOUT)
+            ) as target:
+                source.backup(target)
+        finally:
+            staging.unlink(missing_ok=True)
+
+    def _swap(
+        self, staged: dict[str, Any], affected: list[str]
+    ) -> tuple[list[str], float]:
+        """
+        Stop the affected projects' containers, rename the staged projects
+        and volumes into place, start the containers again
+
+        Staged entries are removed from staged once swapped. Returns the
+        stopped containers' names and the seconds they were down.
+        """
+        if not staged:
+            return [], 0.0
+        stop_timeout = settings.BACKUP_RESTORE_STOP_TIMEOUT
+        running: list[dict] = []
+        for slug in filter(None, affected):
+            containers, error = DockerService().list_project_containers(slug)
+            if error:
+                raise Exception(error)
+            running.extend(c for c in containers if c["running"])
+
+        trash: list[Path] = []
+        stopped: list[dict] = []
+        started = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=snapshot_threads(), thread_name_prefix="swap"
+        ) as pool:
+            try:
+                results = list(
+                    pool.map(
+                        lambda c: DockerService().stop_container(c["id"], stop_timeout),
+                        running,
+                    )
+                )
+                stopped = [c for c, (ok, _) in zip(running, results) if ok]
+                failed = [
+                    f"{c['name']}: {error}"
+                    for c, (ok, error) in zip(running, results)
+                    if not ok
+                ]
+                if failed:
+                    raise Exception(f"Cannot stop containers: {'; '.join(failed)}")
+
+                volume_swaps = {
+                    name: pool.submit(DockerService().swap_volume, staged[name])
+                    for name in list(staged)
+                    if name.startswith(VOLUME_PREFIX)
+                }
+                for name in [n for n in staged if n.startswith(PROJECT_PREFIX)]:
+                    trash_dir = self._swap_project(
+                        name[len(PROJECT_PREFIX) :], staged.pop(name)
+                    )
+                    if trash_dir is not None:
+                        trash.append(trash_dir)
+                for name, future in volume_swaps.items():
+                    future.result()
+                    staged.pop(name)
+            finally:
+                results = list(
+                    pool.map(
+                        lambda c: DockerService().start_container(c["id"]), stopped
+                    )
+                )
+                downtime = time.perf_counter() - started
+                if stopped:
+                    RESTORE_DOWNTIME.observe(downtime)
+                for container, (ok, error) in zip(stopped, results):
+                    if not ok:
+                        logger.error(f"Cannot start {container['name']}: {error}")
+
+        for trash_dir in trash:
+            project_file_store.remove_tree(trash_dir)
+        return [c["name"] for c in stopped], downtime
+
+    @staticmethod
+    def _swap_project(slug: str, staging: Path) -> Optional[Path]:
+        """Rename a staged project directory into place; returns the old one"""
+        # .env edits made while staging are superseded too
+        project_file_store.cancel_env_write(slug)
+        trash = project_file_store.move_to_trash(slug)
+        live = project_file_store.get_project_dir(slug)
+        os.replace(staging, live)
+        fsync_dir(live.parent)
+        return trash
+
+    def _discard(self, staged: dict[str, Any]) -> None:
+        """Remove staged data that was not swapped in"""
+        for name, value in staged.items():
+            if isinstance(value, Path):
+                if name == DATABASE_SOURCE:
+                    value.unlink(missing_ok=True)
+                else:
+                    project_file_store.remove_tree(value)
+            # Staged volume data is replaced by the next stage_volume
+        staged.clear()
+
+    def _remove_leftovers(self) -> None:
+        """Remove staged data left by an interrupted restore"""
+        projects_dir = Path(settings.PROJECTS_DIR)
+        if projects_dir.is_dir():
+            for entry in projects_dir.iterdir():
+                if entry.is_dir() and entry.name.startswith(STAGING_PREFIX):
+                    project_file_store.remove_tree(entry)
+        if self.database is not None:
+            self.database.with_name(
+                f".{self.database.name}{DATABASE_STAGING_SUFFIX}"
+            ).unlink(missing_ok=True)
+
+
+async def reconcile_restore(result: dict[str, Any]) -> dict[str, Any]:
+    """
+    Bring what is derived from projects in line with a restore
+
+    Project files are checked against the (restored) database rows and
+    Traefik's dynamic config is regenerated from them, so file-provider
+    routing follows the restored project set. Skipped when neither the
+    database nor a project directory was restored.
+
+    Args:
+        result: Summary of RestoreService.restore_snapshot, to which
+            "reconcile" is added (the consistency report and the written
+            Traefik config, or the error)
+
+    Returns:
+        The summary
+    """
+    if not (result["database"] or result["projects"]):
+        return result
+    try:
+        async with AsyncSessionLocal() as session:
+            service = ProjectService(session)
+            report = await service.check_files_consistency()
+            traefik_config = await service.sync_traefik_config()
+    except Exception as e:
+        logger.error(f"Reconciliation after restore of {result['id']} failed: {e}")
+        result["reconcile"] = {"error": str(e)}
+        return result
+
+    result["reconcile"] = {
+        **report,
+        "traefik_config": str(traefik_config) if traefik_config else None,
+    }
+    return result
+
+
+def register_rpc_methods(rpc: AdminRPCServer) -> None:
+    """
+    Expose restores on the admin RPC socket (./docklite maint restore)
+
+    Args:
+        rpc: Server to add the methods to
+    """
+
+    async def restore_snapshot(
+        snapshot: str,
+        database: bool = False,
+        projects: Optional[list] = None,
+        volumes: Optional[list] = None,
+        host: bool = False,
+    ) -> dict:
+        for param, value in (("projects", projects), ("volumes", volumes)):
+            if value is not None and not (
+                isinstance(value, list) and all(isinstance(v, str) for v in value)
+            ):
+                raise RPCError(INVALID_PARAMS, f"{param} must be a list of names")
+
+        result, error = await asyncio.to_thread(
+            RestoreService().restore_snapshot,
+            str(snapshot),
+            bool(database),
+            projects,
+            volumes,
+            bool(host),
+        )
+        if error or result is None:
+            raise RPCError(INTERNAL_ERROR, error or "Restore failed")
+        await reconcile_restore(result)
+        if "host_files" in result:
+            result["host_files"] = {
+                path: base64.b64encode(content).decode()
+                for path, content in result["host_files"].items()
+            }
+        return result
+
+    rpc.add_method("snapshot.restore", restore_snapshot)
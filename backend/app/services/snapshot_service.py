@@ -0,0 +1,1023 @@
+"""
+Incremental snapshots
+Content-addressed store for the database, project directories and named
+volumes: file contents are split into chunks kept once under their SHA-256
+(only chunks not already stored are written), and a snapshot is a manifest
+listing the chunks of every file
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import fnmatch
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import stat
+import tarfile
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, Callable, Generator, Iterable, Iterator, Optional
+
+from app.core.admin_rpc import INTERNAL_ERROR, INVALID_PARAMS, AdminRPCServer, RPCError
+from app.core.config import settings
+from app.core.locks import FileLock
+from app.core.metrics import (
+    BACKUP_CHUNKS,
+    BACKUP_DURATION,
+    BACKUP_STORED_BYTES,
+    BACKUPS,
+)
+from app.services.backup_service import (
+    DATABASE_MEMBER,
+    check_member_name,
+    chown_like,
+    database_path,
+    database_snapshot,
+    resolve_codec,
+)
+from app.services.docker_service import DockerService
+from app.utils.files import TEMP_SUFFIX, fsync_dir
+from app.utils.hostname import get_server_hostname
+from app.utils.logger import get_logger
+
+try:
+    import zstandard
+except ImportError:  # Optional: chunks are zlib-compressed instead
+    zstandard = None
+
+logger = get_logger(__name__)
+
+STORE_DIR = "store"  # In BACKUP_DIR
+CHUNKS_DIR = "chunks"
+SNAPSHOTS_DIR = "snapshots"
+# Manifest: gzipped JSON lines, a header then one line per source
+SNAPSHOT_SUFFIX = ".jsonl.gz"
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_ID = re.compile(r"^\d{8}T\d{6}(_\d+)?$")
+# Lock file in the store: snapshots and pruning run one at a time, restores
+# hold it too so pruning never removes chunks being read
+STORE_LOCK = ".store"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# Chunks read ahead per thread when restoring
+PREFETCH_PER_THREAD = 2
+
+# Source names in a snapshot
+DATABASE_SOURCE = "database"
+HOST_SOURCE = "host"  # Files sent by the CLI (.env, docker-compose.yml, ...)
+PROJECT_PREFIX = "projects/"
+VOLUME_PREFIX = "volumes/"
+
+# How a volume's data was kept consistent while copied ("consistency" of
+# its manifest source)
+CONSISTENCY_PAUSED = "paused"  # The project's running containers were paused
+CONSISTENCY_STOPPED = "stopped"  # No container of the project was running
+CONSISTENCY_LIVE = "live"  # Copied in use: BACKUP_PAUSE_CONTAINERS off, no project
+
+
+def snapshot_threads() -> int:
+    """Sources processed in parallel (BACKUP_THREADS, default one per CPU)"""
+    return settings.BACKUP_THREADS or os.cpu_count() or 1
+
+
+class ChunkStore:
+    """
+    Compressed chunks under chunks/<2 hex digits>/<sha256>, written once
+
+    Chunks are zstd frames (zlib streams without zstandard), told apart
+    by their magic number when read, so a store can mix both. Thread-safe.
+    """
+
+    def __init__(self, root: Path, codec: str):
+        self.root = root / CHUNKS_DIR
+        self.codec = codec
+        self._local = threading.local()
+        self._dirty: set[Path] = set()
+        self._dirty_lock = threading.Lock()
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> tuple[str, int]:
+        """
+        Store a chunk unless it is already there
+
+        Args:
+            data: Chunk content
+
+        Returns:
+            (SHA-256 hex digest, compressed bytes written: 0 if deduplicated)
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            BACKUP_CHUNKS.inc("existing")
+            return digest, 0
+
+        compressed = self._compress(data)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{digest[:16]}.", suffix=TEMP_SUFFIX
+        )
+        try:
+            # Chunks hold .env secrets and password hashes (mkstemp: 0600)
+            chown_like(fd, self.root.parent)
+            with os.fdopen(fd, "wb") as f:
+                f.write(compressed)
+                f.flush()
+                os.fsync(f.fileno())
+            # Two sources storing the same chunk: either rename wins
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        with self._dirty_lock:
+            self._dirty.add(path.parent)
+        BACKUP_CHUNKS.inc("new")
+        BACKUP_STORED_BYTES.inc(amount=len(compressed))
+        return digest, len(compressed)
+
+    def get(self, digest: str) -> bytes:
+        """
+        Read and verify a chunk
+
+        Raises:
+            ValueError: If the content doesn't match its digest
+        """
+        data = self._decompress(self.path(digest).read_bytes())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Chunk {digest[:12]} is corrupt")
+        return data
+
+    def read_chunks(
+        self, digests: Iterable[str], pool: ThreadPoolExecutor
+    ) -> Generator[bytes, None, None]:
+        """
+        Read and verify chunks in order, decompressing ahead on a pool
+
+        Up to PREFETCH_PER_THREAD chunks per snapshot thread are read
+        ahead (zlib/zstd and SHA-256 release the GIL), bounding memory to
+        a few chunks per thread.
+
+        Args:
+            digests: Chunk digests in the order wanted
+            pool: Executor running the reads (not one whose tasks consume
+                this iterator: they could wait on each other)
+
+        Raises:
+            ValueError: If a chunk is corrupt
+        """
+        window = PREFETCH_PER_THREAD * snapshot_threads()
+        remaining = iter(digests)
+        pending: deque[Future] = deque(
+            pool.submit(self.get, digest) for digest in islice(remaining, window)
+        )
+        try:
+            while pending:
+                data = pending.popleft().result()
+                for digest in islice(remaining, 1):
+                    pending.append(pool.submit(self.get, digest))
+                yield data
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def sync(self) -> None:
+        """Flush the directory entries of new chunks (before the manifest)"""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, set()
+        for directory in sorted(dirty):
+            fsync_dir(directory)
+        if dirty:
+            fsync_dir(self.root)
+
+    def files(self) -> Iterator[Path]:
+        """All files in the store (chunks and leftover temp files)"""
+        if not self.root.is_dir():
+            return
+        for prefix in self.root.iterdir():
+            if prefix.is_dir():
+                yield from prefix.iterdir()
+
+    def _compress(self, data: bytes) -> bytes:
+        level = settings.BACKUP_COMPRESSION_LEVEL
+        if self.codec != "zstd":
+            return zlib.compress(data, level or 6)
+        # Compressors aren't thread-safe: one per thread
+        cctx = getattr(self._local, "cctx", None)
+        if cctx is None:
+            cctx = self._local.cctx = zstandard.ZstdCompressor(level=level or 3)
+        compressed: bytes = cctx.compress(data)
+        return compressed
+
+    @staticmethod
+    def _decompress(blob: bytes) -> bytes:
+        if blob[:4] != ZSTD_MAGIC:
+            return zlib.decompress(blob)
+        if zstandard is None:
+            raise ValueError("zstd chunks require the zstandard package")
+        data: bytes = zstandard.ZstdDecompressor().decompress(blob)
+        return data
+
+
+class _SourceWriter:
+    """Entries of one snapshot source, file contents chunked into the store"""
+
+    def __init__(self, chunks: ChunkStore, chunk_size: int):
+        self.chunks = chunks
+        self.chunk_size = chunk_size
+        self.entries: list[dict[str, Any]] = []
+        self.stats: Counter = Counter()
+
+    def add(self, entry: dict[str, Any]) -> None:
+        self.entries.append(entry)
+        if entry["type"] == "file":
+            self.stats["files"] += 1
+            self.stats["bytes"] += entry["size"]
+
+    def add_file(self, entry: dict[str, Any], reader: IO[bytes]) -> None:
+        """Chunk a file's content (read to the end)"""
+        digests = []
+        size = 0
+        for data in iter(lambda: reader.read(self.chunk_size), b""):
+            digest, stored = self.chunks.put(data)
+            digests.append(digest)
+            size += len(data)
+            if stored:
+                self.stats["new_chunks"] += 1
+                self.stats["stored_bytes"] += stored
+        self.stats["chunks"] += len(digests)
+        self.add({**entry, "type": "file", "size": size, "chunks": digests})
+
+    def reuse_file(self, entry: dict[str, Any], previous: dict[str, Any]) -> None:
+        """Take the chunks of an unchanged file from the previous snapshot"""
+        self.stats["reused_files"] += 1
+        self.stats["chunks"] += len(previous["chunks"])
+        self.add(
+            {
+                **entry,
+                "type": "file",
+                "size": previous["size"],
+                "chunks": previous["chunks"],
+            }
+        )
+
+    def source(self, kind: str, **extra: Any) -> dict[str, Any]:
+        """Manifest line of the source (stats are removed before writing)"""
+        return {"kind": kind, **extra, "stats": self.stats, "entries": self.entries}
+
+
+class _ProjectPauses:
+    """
+    Running containers of projects paused while their volumes are copied
+
+    A tar copy of a volume a database is writing to is torn and may not
+    start again; paused (cgroup freezer), the processes can't write and the
+    copy is crash-consistent. All volumes of a project are copied within
+    one pause, so they match each other: the first copy pauses the
+    containers, the last one resumes them. Thread-safe.
+    """
+
+    def __init__(self, copies: Counter) -> None:
+        """
+        Args:
+            copies: Number of volumes to copy per project
+        """
+        self._lock = threading.Lock()
+        self._remaining = copies.copy()
+        # Project -> (consistency, paused containers)
+        self._holds: dict[str, tuple[str, list[dict]]] = {}
+
+    @contextmanager
+    def hold(self, project: str) -> Iterator[str]:
+        """
+        Keep a project's containers paused during a with-block
+
+        Args:
+            project: Compose project of the volume ("" for none)
+
+        Yields:
+            The consistency of the copy (CONSISTENCY_*)
+
+        Raises:
+            Exception: If the containers can't be listed or paused (those
+                already paused are resumed)
+        """
+        if not project or not settings.BACKUP_PAUSE_CONTAINERS:
+            yield CONSISTENCY_LIVE
+            return
+        try:
+            with self._lock:
+                if project not in self._holds:
+                    self._holds[project] = self._pause(project)
+                consistency = self._holds[project][0]
+            yield consistency
+        finally:
+            with self._lock:
+                self._remaining[project] -= 1
+                if self._remaining[project] <= 0 and project in self._holds:
+                    self._resume(self._holds.pop(project)[1])
+
+    def _pause(self, project: str) -> tuple[str, list[dict]]:
+        """Pause the running containers of a project"""
+        docker = DockerService()
+        containers, error = docker.list_project_containers(project)
+        if error:
+            raise Exception(error)
+        running = [c for c in containers if c["running"]]
+        paused: list[dict] = []
+        for container in running:
+            ok, error = docker.pause_container(container["id"])
+            if not ok:
+                self._resume(paused)
+                raise Exception(f"Cannot pause {container['name']}: {error}")
+            paused.append({**container, "paused_at": time.monotonic()})
+        return (CONSISTENCY_PAUSED if running else CONSISTENCY_STOPPED), paused
+
+    @staticmethod
+    def _resume(paused: list[dict]) -> None:
+        """Unpause containers (failures are logged: the others still resume)"""
+        if not paused:
+            return
+        docker = DockerService()
+        for container in paused:
+            ok, error = docker.unpause_container(container["id"])
+            if not ok:
+                logger.error(f"Cannot unpause {container['name']}: {error}")
+        frozen = time.monotonic() - paused[0]["paused_at"]
+        names = ", ".join(c["name"] for c in paused)
+        logger.info(f"Paused {names} for {frozen:.1f}s to copy their volumes")
+
+
+def _walk(root: Path) -> Iterator[tuple[str, os.stat_result]]:
+    """Relative paths and lstat of everything under root (parents first)"""
+    pending = [""]
+    while pending:
+        relative = pending.pop()
+        try:
+            with os.scandir(root / relative) as it:
+                children = sorted(it, key=lambda e: e.name)
+        except FileNotFoundError:
+            continue  # Removed during the walk
+        for child in children:
+            path = f"{relative}/{child.name}" if relative else child.name
+            try:
+                st = child.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            yield path, st
+            if stat.S_ISDIR(st.st_mode):
+                pending.append(path)
+
+
+def _metadata(path: str, st: os.stat_result) -> dict[str, Any]:
+    return {
+        "path": path,
+        "mode": stat.S_IMODE(st.st_mode),
+        "uid": st.st_uid,
+        "gid": st.st_gid,
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+
+def _volume_path(name: str) -> Optional[str]:
+    """Member name of a volume export relative to the volume root"""
+    path = PurePosixPath(name)
+    if path.is_absolute() or ".." in path.parts:
+        raise ValueError(f"Unsafe path in volume archive: {name!r}")
+    relative = str(path)
+    return None if relative == "." else relative
+
+
+def _safe_join(root: Path, relative: str) -> Path:
+    """Path of a manifest entry under root (no absolute paths or ..)"""
+    path = PurePosixPath(relative)
+    if not relative or path.is_absolute() or ".." in path.parts:
+        raise ValueError(f"Unsafe path in snapshot: {relative!r}")
+    return root / path
+
+
+def _apply_metadata(path: Path, entry: dict[str, Any]) -> None:
+    """Restore mode, owner (as root) and modification time"""
+    symlink = entry["type"] == "symlink"
+    if os.geteuid() == 0:
+        os.lchown(path, entry["uid"], entry["gid"])
+    if not symlink:
+        os.chmod(path, entry["mode"])
+    mtime = entry["mtime_ns"]
+    if not symlink or os.utime in os.supports_follow_symlinks:
+        os.utime(path, ns=(mtime, mtime), follow_symlinks=not symlink)
+
+
+def file_chunks(entries: list[dict[str, Any]]) -> Iterator[str]:
+    """Digests of all file contents of a source, in entry order"""
+    for entry in entries:
+        if entry["type"] == "file":
+            yield from entry["chunks"]
+
+
+def restore_tree(
+    chunks: ChunkStore,
+    entries: list[dict[str, Any]],
+    target: Path,
+    pool: ThreadPoolExecutor,
+) -> Counter:
+    """
+    Write the entries of a source under target
+
+    Chunks of all its files are read ahead on the pool, so many small
+    files decompress in parallel as well as the chunks of large ones.
+
+    Args:
+        chunks: Store holding the chunks
+        entries: Manifest entries of the source
+        target: Directory to write into (created if missing)
+        pool: Executor for chunk reads (see ChunkStore.read_chunks)
+
+    Returns:
+        Counter of restored files and bytes
+    """
+    target.mkdir(parents=True, exist_ok=True)
+    data = chunks.read_chunks(file_chunks(entries), pool)
+    totals: Counter = Counter()
+    directories = []
+    try:
+        for entry in entries:
+            path = _safe_join(target, entry["path"])
+            kind = entry["type"]
+            if kind == "dir":
+                path.mkdir(exist_ok=True)
+                directories.append((path, entry))
+                continue
+            if kind == "symlink":
+                os.symlink(entry["target"], path)
+            elif kind == "hardlink":
+                os.link(_safe_join(target, entry["target"]), path)
+                continue
+            else:
+                with open(path, "wb") as f:
+                    for _ in entry["chunks"]:
+                        f.write(next(data))
+                totals["files"] += 1
+                totals["bytes"] += entry["size"]
+            _apply_metadata(path, entry)
+    finally:
+        data.close()
+    # Directory times last: creating their children changed them
+    for path, entry in reversed(directories):
+        _apply_metadata(path, entry)
+    return totals
+
+
+class SnapshotService:
+    """
+    Service for incremental snapshots in BACKUP_DIR/store
+
+    Blocking (file scans, hashing, compression, Docker copies): run it in a
+    worker thread (job_manager.submit / asyncio.to_thread).
+    """
+
+    def __init__(
+        self, store_dir: Optional[Path] = None, database: Optional[Path] = None
+    ):
+        self.store_dir = Path(store_dir or Path(settings.BACKUP_DIR) / STORE_DIR)
+        self.snapshots_dir = self.store_dir / SNAPSHOTS_DIR
+        self.database = database if database is not None else database_path()
+
+    def create_snapshot(
+        self,
+        files: Optional[dict[str, bytes]] = None,
+        projects: Optional[list[str]] = None,
+        volumes: Optional[bool] = None,
+        trigger: str = "api",
+    ) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        """
+        Take a snapshot of the database, projects and their volumes
+
+        Sources (the database, each project directory and each volume) are
+        processed in parallel. Files unchanged since the latest snapshot
+        (same size and mtime) reuse its chunks without being read; other
+        files are chunked and only chunks missing from the store are
+        written. Snapshots beyond BACKUP_SNAPSHOT_KEEP are then pruned
+        together with the chunks no remaining snapshot uses.
+
+        A source that fails (e.g. a volume Docker can't copy) is listed in
+        the result's errors; the others are still saved.
+
+        Args:
+            files: Extra files (path -> content), e.g. the host's .env sent
+                by the CLI
+            projects: Project slugs to include (None: all of PROJECTS_DIR)
+            volumes: Include the named volumes of these projects (None:
+                BACKUP_SNAPSHOT_VOLUMES)
+            trigger: What started the snapshot (api/cli/scheduler), for metrics
+
+        Returns:
+            (snapshot summary, None) on success, (None, error) on failure
+        """
+        started = time.perf_counter()
+        try:
+            codec = resolve_codec(settings.BACKUP_COMPRESSION)
+            members = {check_member_name(k): v for k, v in (files or {}).items()}
+            self.store_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            with FileLock(STORE_LOCK, self.store_dir).hold():
+                result = self._write_snapshot(
+                    ChunkStore(self.store_dir, codec),
+                    members,
+                    projects,
+                    settings.BACKUP_SNAPSHOT_VOLUMES if volumes is None else volumes,
+                )
+                result["pruned"] = self._prune()
+        except (OSError, ValueError, sqlite3.Error) as e:
+            BACKUPS.inc(trigger, "error")
+            logger.error(f"Snapshot failed: {e}")
+            return None, f"Snapshot failed: {e}"
+
+        BACKUPS.inc(trigger, "partial" if result["errors"] else "ok")
+        BACKUP_DURATION.observe(time.perf_counter() - started)
+        stats = result["stats"]
+        logger.info(
+            f"Snapshot {result['id']}: {stats['files']} files, "
+            f"{stats['new_chunks']}/{stats['chunks']} new chunks "
+            f"({stats['stored_bytes']} bytes stored)"
+        )
+        for source, error in result["errors"].items():
+            logger.warning(f"Snapshot {result['id']}: {source} skipped: {error}")
+        return result, None
+
+    def _write_snapshot(
+        self,
+        chunks: ChunkStore,
+        files: dict[str, bytes],
+        projects: Optional[list[str]],
+        volumes: bool,
+    ) -> dict[str, Any]:
+        """Snapshot all sources and write the manifest"""
+        chunk_size = settings.BACKUP_CHUNK_SIZE
+        snapshot_id = self._new_id()
+        previous = self._latest_files()
+        slugs = self._select_projects(projects)
+        errors: dict[str, str] = {}
+
+        tasks: dict[str, Callable[[], dict[str, Any]]] = {}
+        if self.database is not None and self.database.exists():
+            tasks[DATABASE_SOURCE] = lambda: self._snapshot_database(
+                _SourceWriter(chunks, chunk_size)
+            )
+        if files:
+            tasks[HOST_SOURCE] = lambda: self._snapshot_files(
+                _SourceWriter(chunks, chunk_size), files
+            )
+        projects_dir = Path(settings.PROJECTS_DIR)
+
+        def project_source(slug: str, name: str) -> dict[str, Any]:
+            return self._snapshot_tree(
+                _SourceWriter(chunks, chunk_size),
+                projects_dir / slug,
+                previous.get(name, {}),
+            ).source("project")
+
+        project_volumes: list[dict[str, Any]] = []
+        if volumes and slugs:
+            try:
+                project_volumes = self._project_volumes(set(slugs))
+            except Exception as e:
+                errors["volumes"] = str(e)
+        pauses = _ProjectPauses(Counter(v["project"] for v in project_volumes))
+
+        def volume_source(volume: dict[str, Any]) -> dict[str, Any]:
+            with pauses.hold(volume["project"]) as consistency:
+                writer = self._snapshot_volume(
+                    _SourceWriter(chunks, chunk_size), volume["name"]
+                )
+            return writer.source(
+                "volume", project=volume["project"], consistency=consistency
+            )
+
+        for slug in slugs:
+            name = f"{PROJECT_PREFIX}{slug}"
+            tasks[name] = partial(project_source, slug, name)
+        for volume in project_volumes:
+            tasks[f"{VOLUME_PREFIX}{volume['name']}"] = partial(volume_source, volume)
+
+        sources: dict[str, dict[str, Any]] = {}
+        with ThreadPoolExecutor(
+            max_workers=snapshot_threads(), thread_name_prefix="snapshot"
+        ) as pool:
+            futures = {name: pool.submit(task) for name, task in tasks.items()}
+            for name, future in futures.items():
+                try:
+                    sources[name] = future.result()
+                except Exception as e:
+                    errors[name] = str(e)
+        chunks.sync()
+
+        stats: Counter = Counter(
+            files=0, bytes=0, chunks=0, new_chunks=0, stored_bytes=0, reused_files=0
+        )
+        summary = {}
+        for name, source in sources.items():
+            source_stats = source.pop("stats")
+            stats.update(source_stats)
+            summary[name] = {
+                "kind": source["kind"],
+                **({"project": source["project"]} if "project" in source else {}),
+                **(
+                    {"consistency": source["consistency"]}
+                    if "consistency" in source
+                    else {}
+                ),
+                "files": source_stats["files"],
+                "bytes": source_stats["bytes"],
+            }
+
+        header = {
+            "format": SNAPSHOT_FORMAT,
+            "id": snapshot_id,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "hostname": get_server_hostname(),
+            "chunk_size": chunk_size,
+            "compression": chunks.codec,
+            "partial": projects is not None,
+            "sources": summary,
+            "stats": dict(stats),
+            "errors": errors,
+        }
+        self._write_manifest(snapshot_id, header, sources)
+        return header
+
+    def _snapshot_database(self, writer: _SourceWriter) -> dict[str, Any]:
+        assert self.database is not None
+        st = self.database.stat()
+        with database_snapshot(self.database, self.store_dir) as (snapshot, _, info):
+            if info["quick_check"] != "ok":
+                raise ValueError(
+                    f"Database integrity check failed: {info['quick_check']}"
+                )
+            writer.add_file(_metadata(DATABASE_MEMBER, st), snapshot)
+        return writer.source("database", info=info)
+
+    def _snapshot_files(
+        self, writer: _SourceWriter, files: dict[str, bytes]
+    ) -> dict[str, Any]:
+        now = time.time_ns()
+        for path, content in files.items():
+            entry = {"path": path, "mode": 0o600, "uid": 0, "gid": 0, "mtime_ns": now}
+            # BytesIO shares the bytes object until written to: no copy
+            writer.add_file(entry, io.BytesIO(content))
+        return writer.source("files")
+
+    def _snapshot_tree(
+        self, writer: _SourceWriter, root: Path, previous: dict[str, dict]
+    ) -> _SourceWriter:
+        """Snapshot a directory tree (files unchanged since previous reused)"""
+        for path, st in _walk(root):
+            entry = _metadata(path, st)
+            if stat.S_ISDIR(st.st_mode):
+                writer.add({**entry, "type": "dir"})
+            elif stat.S_ISLNK(st.st_mode):
+                writer.add(
+                    {**entry, "type": "symlink", "target": os.readlink(root / path)}
+                )
+            elif stat.S_ISREG(st.st_mode):
+                # The latest snapshot is never pruned: its chunks are present
+                last = previous.get(path)
+                if (
+                    last is not None
+                    and last["size"] == st.st_size
+                    and last["mtime_ns"] == st.st_mtime_ns
+                ):
+                    writer.reuse_file(entry, last)
+                    continue
+                try:
+                    with open(root / path, "rb") as f:
+                        writer.add_file(entry, f)
+                except FileNotFoundError:
+                    continue
+            # Sockets, FIFOs and device files are skipped
+        return writer
+
+    def _snapshot_volume(self, writer: _SourceWriter, volume: str) -> _SourceWriter:
+        """Snapshot a named volume, streamed out of Docker as a tar archive"""
+        with DockerService().export_volume(volume) as stream, tarfile.open(
+            fileobj=stream, mode="r|"
+        ) as tar:
+            for member in tar:
+                path = _volume_path(member.name)
+                if path is None:
+                    continue
+                entry = {
+                    "path": path,
+                    "mode": member.mode & 0o7777,
+                    "uid": member.uid,
+                    "gid": member.gid,
+                    "mtime_ns": int(member.mtime) * 1_000_000_000,
+                }
+                if member.isdir():
+                    writer.add({**entry, "type": "dir"})
+                elif member.issym():
+                    writer.add({**entry, "type": "symlink", "target": member.linkname})
+                elif member.islnk():
+                    target = _volume_path(member.linkname)
+                    writer.add({**entry, "type": "hardlink", "target": target})
+                elif member.isfile():
+                    extracted = tar.extractfile(member)
+                    assert extracted is not None
+                    writer.add_file(entry, extracted)
+        return writer
+
+    def _project_volumes(self, slugs: set[str]) -> list[dict]:
+        """Named volumes created by the compose projects of these slugs"""
+        volumes, error = DockerService().list_volumes()
+        if error:
+            raise Exception(error)
+        return [v for v in volumes if v["project"] in slugs]
+
+    @staticmethod
+    def _select_projects(projects: Optional[list[str]]) -> list[str]:
+        projects_dir = Path(settings.PROJECTS_DIR)
+        available = (
+            sorted(
+                entry.name
+                for entry in projects_dir.iterdir()
+                if entry.is_dir() and not entry.name.startswith(".")
+            )
+            if projects_dir.is_dir()
+            else []
+        )
+        if projects is None:
+            return available
+        unknown = sorted(set(projects) - set(available))
+        if unknown:
+            raise ValueError(f"Unknown projects: {', '.join(unknown)}")
+        return sorted(set(projects))
+
+    def _new_id(self) -> str:
+        """Unused snapshot ID named after the current time"""
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        snapshot_id = stamp
+        counter = 1
+        while self._manifest_path(snapshot_id).exists():
+            snapshot_id = f"{stamp}_{counter}"
+            counter += 1
+        return snapshot_id
+
+    def _manifest_path(self, snapshot_id: str) -> Path:
+        if not SNAPSHOT_ID.match(snapshot_id):
+            raise ValueError(f"Invalid snapshot ID: {snapshot_id!r}")
+        return self.snapshots_dir / f"{snapshot_id}{SNAPSHOT_SUFFIX}"
+
+    def _snapshot_ids(self) -> list[str]:
+        """IDs of all snapshots, oldest first"""
+        if not self.snapshots_dir.is_dir():
+            return []
+        ids = (
+            path.name[: -len(SNAPSHOT_SUFFIX)]
+            for path in self.snapshots_dir.glob(f"*{SNAPSHOT_SUFFIX}")
+        )
+        return sorted(i for i in ids if SNAPSHOT_ID.match(i))
+
+    def _write_manifest(
+        self, snapshot_id: str, header: dict[str, Any], sources: dict[str, dict]
+    ) -> None:
+        """Publish a manifest atomically (temp file, fsync, rename)"""
+        self.snapshots_dir.mkdir(mode=0o700, exist_ok=True)
+        path = self._manifest_path(snapshot_id)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.snapshots_dir, prefix=f".{path.name}.", suffix=TEMP_SUFFIX
+        )
+        try:
+            chown_like(fd, self.store_dir)
+            with os.fdopen(fd, "wb") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as stream:
+                    stream.write(json.dumps(header).encode() + b"\n")
+                    for name in sorted(sources):
+                        line = {"source": name, **sources[name]}
+                        stream.write(json.dumps(line).encode() + b"\n")
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        fsync_dir(self.snapshots_dir)
+
+    def read_snapshot(
+        self, snapshot_id: str, wanted: Optional[Callable[[str], bool]] = None
+    ) -> tuple[dict[str, Any], dict[str, dict]]:
+        """
+        Header and sources of a snapshot
+
+        Args:
+            snapshot_id: Snapshot ID
+            wanted: Filter on source names (None: all; lines of other
+                sources aren't decoded)
+
+        Raises:
+            ValueError: Unknown snapshot
+        """
+        path = self._manifest_path(snapshot_id)
+        if not path.exists():
+            raise ValueError(f"Unknown snapshot: {snapshot_id}")
+        sources = {}
+        with gzip.open(path, "rb") as f:
+            header = json.loads(f.readline())
+            for line in f:
+                # The source name leads each line (names have no commas):
+                # skip unwanted sources without decoding their entries
+                name = json.loads(line[: line.index(b",")] + b"}")["source"]
+                if wanted is None or wanted(name):
+                    source = json.loads(line)
+                    sources[source.pop("source")] = source
+        return header, sources
+
+    def _latest_files(self) -> dict[str, dict[str, dict]]:
+        """Files of the latest snapshot by source and path (for reuse)"""
+        ids = self._snapshot_ids()
+        if not ids:
+            return {}
+        _, sources = self.read_snapshot(
+            ids[-1], lambda name: name.startswith(PROJECT_PREFIX)
+        )
+        return {
+            name: {e["path"]: e for e in source["entries"] if e["type"] == "file"}
+            for name, source in sources.items()
+        }
+
+    def _prune(self) -> dict[str, Any]:
+        """
+        Remove snapshots beyond BACKUP_SNAPSHOT_KEEP, then every stored
+        chunk (and leftover temp file) no remaining snapshot references
+        """
+        ids = self._snapshot_ids()
+        keep = settings.BACKUP_SNAPSHOT_KEEP
+        removed = ids[:-keep] if keep > 0 and len(ids) > keep else []
+        for snapshot_id in removed:
+            self._manifest_path(snapshot_id).unlink(missing_ok=True)
+        if removed:
+            fsync_dir(self.snapshots_dir)
+
+        freed_chunks = freed_bytes = 0
+        if removed:
+            referenced: set[str] = set()
+            for snapshot_id in self._snapshot_ids():
+                _, sources = self.read_snapshot(snapshot_id)
+                for source in sources.values():
+                    for entry in source["entries"]:
+                        referenced.update(entry.get("chunks", ()))
+            for path in ChunkStore(self.store_dir, "gzip").files():
+                if path.name in referenced:
+                    continue
+                freed_bytes += path.stat().st_size
+                path.unlink()
+                freed_chunks += not path.name.endswith(TEMP_SUFFIX)
+        return {"snapshots": removed, "chunks": freed_chunks, "bytes": freed_bytes}
+
+    def resolve_id(self, snapshot_id: str) -> str:
+        """
+        ID of a snapshot, "latest" standing for the newest one
+
+        Raises:
+            ValueError: "latest" with an empty store
+        """
+        if snapshot_id != "latest":
+            return snapshot_id
+        ids = self._snapshot_ids()
+        if not ids:
+            raise ValueError("No snapshots in the store")
+        return ids[-1]
+
+    def list_snapshots(self) -> list[dict[str, Any]]:
+        """
+        Snapshots in the store, newest first
+
+        Returns:
+            Manifest headers (ID, date, sources with file counts and sizes,
+            chunk statistics, errors)
+        """
+        snapshots = []
+        for snapshot_id in reversed(self._snapshot_ids()):
+            try:
+                with gzip.open(self._manifest_path(snapshot_id), "rb") as f:
+                    snapshots.append(json.loads(f.readline()))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def restore_snapshot(
+        self,
+        snapshot_id: str,
+        destination: Path,
+        sources: Optional[list[str]] = None,
+    ) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        """
+        Write sources of a snapshot into a directory
+
+        Only the chunks of the selected sources are read, each checked
+        against its SHA-256 (decompressed ahead on a second pool, see
+        ChunkStore.read_chunks). Sources are restored in parallel, each into
+        destination/<source name> (e.g. projects/blog, volumes/blog_db,
+        database/docklite.db) with modes, times and (as root) owners.
+
+        Args:
+            snapshot_id: Snapshot to restore from ("latest": the newest)
+            destination: Directory for the restored sources
+            sources: Source names or shell patterns ("projects/*",
+                "volumes/blog_*"); None: all
+
+        Returns:
+            (restored sources and totals, None), or (None, error)
+        """
+        patterns = sources or ["*"]
+        try:
+            with FileLock(STORE_LOCK, self.store_dir).hold():
+                snapshot_id = self.resolve_id(snapshot_id)
+                header, selected = self.read_snapshot(
+                    snapshot_id,
+                    lambda name: any(fnmatch.fnmatchcase(name, p) for p in patterns),
+                )
+                for pattern in patterns:
+                    if not any(fnmatch.fnmatchcase(n, pattern) for n in selected):
+                        raise ValueError(f"No source matches {pattern!r}")
+                for name in selected:
+                    target = destination / name
+                    if target.exists() and any(target.iterdir()):
+                        raise ValueError(f"{target} is not empty")
+
+                chunks = ChunkStore(self.store_dir, header["compression"])
+                totals: Counter = Counter(files=0, bytes=0)
+                with ThreadPoolExecutor(
+                    max_workers=snapshot_threads(), thread_name_prefix="restore"
+                ) as pool, ThreadPoolExecutor(
+                    max_workers=snapshot_threads(), thread_name_prefix="chunks"
+                ) as chunk_pool:
+                    futures = [
+                        pool.submit(
+                            restore_tree,
+                            chunks,
+                            source["entries"],
+                            destination / name,
+                            chunk_pool,
+                        )
+                        for name, source in selected.items()
+                    ]
+                    for future in futures:
+                        totals.update(future.result())
+        except (OSError, ValueError, zlib.error) as e:
+            logger.error(f"Restore of snapshot {snapshot_id} failed: {e}")
+            return None, f"Restore failed: {e}"
+
+        return {"id": snapshot_id, "sources": sorted(selected), **totals}, None
+
+
+def register_rpc_methods(rpc: AdminRPCServer) -> None:
+    """
+    Expose snapshots on the admin RPC socket (./docklite maint backup -i)
+
+    Args:
+        rpc: Server to add the methods to
+    """
+
+    async def create_snapshot(
+        files: Optional[dict] = None,
+        projects: Optional[list] = None,
+        volumes: Optional[bool] = None,
+    ) -> dict:
+        try:
+            members = {
+                str(name): base64.b64decode(content, validate=True)
+                for name, content in (files or {}).items()
+            }
+        except (AttributeError, TypeError, ValueError):
+            raise RPCError(INVALID_PARAMS, "files must map paths to base64 content")
+        if projects is not None and not (
+            isinstance(projects, list) and all(isinstance(p, str) for p in projects)
+        ):
+            raise RPCError(INVALID_PARAMS, "projects must be a list of slugs")
+
+        result, error = await asyncio.to_thread(
+            SnapshotService().create_snapshot, members, projects, volumes, "cli"
+        )
+        if error or result is None:
+            raise RPCError(INTERNAL_ERROR, error or "Snapshot failed")
+        return result
+
+    async def list_snapshots() -> list[dict]:
+        return await asyncio.to_thread(SnapshotService().list_snapshots)
+
+    rpc.add_method("snapshot.create", create_snapshot)
+    rpc.add_method("snapshot.list", list_snapshots)
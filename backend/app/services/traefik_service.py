@@ -1,18 +1,50 @@
 """
 Traefik labels management service
-Generates and injects Traefik routing labels into docker-compose.yml
+Generates and injects Traefik routing labels into docker-compose.yml,
+or a dynamic configuration file for Traefik's file provider
 """
 
 from __future__ import annotations
 
 import yaml
 import re
-from typing import Optional
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from app.core.config import settings
+from app.utils.files import atomic_write_text
 
 
 class TraefikService:
     """Service for managing Traefik labels and configuration"""
 
+    # Routing modes
+    ROUTING_MODE_LABELS = "labels"  # Labels in compose, read by Docker provider
+    ROUTING_MODE_FILE = "file"  # Dynamic config file, read by file provider
+
+    # Dynamic config file written for Traefik's file provider
+    DYNAMIC_CONFIG_FILENAME = "docklite-projects.yml"
+
+    # Router priority for project routes (higher than DockLite's own: 10)
+    ROUTER_PRIORITY = 100
+
+    # Log drivers writing files under Docker's data root (rotated by the
+    # logging policy); services using other drivers (syslog, ...) keep theirs
+    FILE_LOG_DRIVERS = ("json-file", "local")
+
+    @staticmethod
+    def get_router_name(slug: str) -> str:
+        """
+        Get Traefik router/service name for a project slug
+
+        Args:
+            slug: Project slug
+
+        Returns:
+            Sanitized name (only lowercase alphanumeric and hyphens)
+        """
+        return re.sub(r"[^a-z0-9-]", "-", slug.lower())
+
     @staticmethod
     def generate_labels(domain: str, slug: str, internal_port: int = 80) -> list[str]:
         """
@@ -26,24 +58,91 @@ class TraefikService:
         Returns:
             List of Traefik label strings
         """
-        # Sanitize slug for Traefik router name (only alphanumeric and hyphens)
-        router_name = re.sub(r"[^a-z0-9-]", "-", slug.lower())
+        plan, _ = TraefikService.build_route_plan(
+            domain, slug, {"app": {}}, [{"service": "app", "port": internal_port}]
+        )
+        return ["traefik.enable=true"] + TraefikService.generate_route_labels(plan[0])
 
-        return [
-            "traefik.enable=true",
-            f"traefik.http.routers.{router_name}.rule=Host(`{domain}`)",
-            f"traefik.http.routers.{router_name}.entrypoints=web",
-            f"traefik.http.routers.{router_name}.priority=100",  # Higher than DockLite (10)
-            f"traefik.http.services.{router_name}.loadbalancer.server.port={internal_port}",
-        ]
+    @staticmethod
+    def _parse_port(value: Any) -> Optional[int]:
+        """
+        Extract internal port from an expose/ports entry
+
+        Handles "80", "8080:80", "${PORT:-8080}:80", "127.0.0.1:8080:80/tcp"
+        and long-syntax dicts ({"target": 80, "published": 8080}).
+        """
+        if isinstance(value, dict):
+            value = value.get("target")
+        if value is None:
+            return None
+
+        port = str(value).split(":")[-1].split("/")[0]
+        try:
+            return int(port)
+        except ValueError:
+            return None
 
     @staticmethod
-    def detect_internal_port(compose_content: str) -> int:
+    def get_service_port(service: Optional[dict]) -> Optional[int]:
+        """
+        Get internal port of a single compose service
+
+        Args:
+            service: Compose service definition
+
+        Returns:
+            Port from 'expose' (first) or 'ports', or None if not declared
+        """
+        if not isinstance(service, dict):
+            return None
+
+        # Check 'expose' section first
+        for entry in service.get("expose") or []:
+            port = TraefikService._parse_port(entry)
+            if port:
+                return port
+
+        # Check 'ports' section (only "host:container" mappings)
+        for entry in service.get("ports") or []:
+            if isinstance(entry, dict) or ":" in str(entry):
+                port = TraefikService._parse_port(entry)
+                if port:
+                    return port
+
+        return None
+
+    @staticmethod
+    def get_entry_service(services: dict) -> str:
+        """
+        Pick the web entry point of a compose project
+
+        The first service that declares 'expose' or 'ports' wins, so helper
+        services (databases, workers) listed first are not routed to.
+        Falls back to the first service.
+
+        Args:
+            services: Compose 'services' mapping
+
+        Returns:
+            Service name
+        """
+        for name, service in services.items():
+            if isinstance(service, dict) and (
+                service.get("expose") or service.get("ports")
+            ):
+                return str(name)
+        return str(next(iter(services)))
+
+    @staticmethod
+    def detect_internal_port(
+        compose_content: str, service_name: Optional[str] = None
+    ) -> int:
         """
         Detect internal port from docker-compose.yml
 
         Args:
             compose_content: Docker Compose YAML content
+            service_name: Service to inspect (default: the entry service)
 
         Returns:
             Internal port number (default: 80)
@@ -55,59 +154,354 @@ class TraefikService:
                 return 80
 
             services = compose_data.get("services", {})
-
-            # Get first service
             if not services:
                 return 80
 
-            first_service = list(services.values())[0]
-
-            # Check 'expose' section first
-            if "expose" in first_service:
-                expose = first_service["expose"]
-                if expose and len(expose) > 0:
-                    port = str(expose[0]).split(":")[-1].split("/")[0]
-                    try:
-                        return int(port)
-                    except ValueError:
-                        pass
-
-            # Check 'ports' section
-            if "ports" in first_service:
-                ports = first_service["ports"]
-                if ports and len(ports) > 0:
-                    port_mapping = str(ports[0])
-                    # Parse "8080:80" or "${PORT}:80" -> extract internal port
-                    # (after :)
-                    if ":" in port_mapping:
-                        internal = port_mapping.split(":")[-1].split("/")[0]
-                        try:
-                            return int(internal)
-                        except ValueError:
-                            pass
+            if service_name is None:
+                service_name = TraefikService.get_entry_service(services)
 
             # Default to 80
-            return 80
+            return TraefikService.get_service_port(services.get(service_name)) or 80
 
         except Exception:
             # If parsing fails, default to 80
             return 80
 
+    @staticmethod
+    def build_performance_middlewares(
+        base_name: str, performance: Optional[dict]
+    ) -> dict[str, dict]:
+        """
+        Build the project-wide performance middleware chain
+
+        Order matters (Traefik applies middlewares as listed): shed load
+        first (rate limit, in-flight limit, circuit breaker), then retry,
+        then response shaping (cache headers, compression).
+
+        Args:
+            base_name: Project router name (middleware name prefix)
+            performance: Performance settings (see PerformanceConfig schema)
+
+        Returns:
+            Ordered mapping of middleware name -> middleware config
+        """
+        if not performance:
+            return {}
+
+        middlewares: dict[str, dict] = {}
+
+        if performance.get("rate_limit_average"):
+            rate_limit: dict = {"average": performance["rate_limit_average"]}
+            if performance.get("rate_limit_burst"):
+                rate_limit["burst"] = performance["rate_limit_burst"]
+            middlewares[f"{base_name}-ratelimit"] = {"rateLimit": rate_limit}
+
+        if performance.get("max_in_flight"):
+            middlewares[f"{base_name}-inflightreq"] = {
+                "inFlightReq": {"amount": performance["max_in_flight"]}
+            }
+
+        if performance.get("circuit_breaker"):
+            middlewares[f"{base_name}-circuitbreaker"] = {
+                "circuitBreaker": {"expression": performance["circuit_breaker"]}
+            }
+
+        if performance.get("retry_attempts"):
+            middlewares[f"{base_name}-retry"] = {
+                "retry": {
+                    "attempts": performance["retry_attempts"],
+                    "initialInterval": "100ms",
+                }
+            }
+
+        if performance.get("cache_control"):
+            middlewares[f"{base_name}-cacheheaders"] = {
+                "headers": {
+                    "customResponseHeaders": {
+                        "Cache-Control": performance["cache_control"]
+                    }
+                }
+            }
+
+        if performance.get("compress"):
+            middlewares[f"{base_name}-compress"] = {"compress": {}}
+
+        return middlewares
+
+    @staticmethod
+    def logging_policy() -> Optional[dict]:
+        """
+        Compose logging section from the PROJECT_LOG_* settings
+
+        Returns:
+            {"driver", "options": {"max-size", "max-file"}}, or None when
+            PROJECT_LOG_DRIVER is empty (compose files left alone)
+        """
+        if not settings.PROJECT_LOG_DRIVER:
+            return None
+        return {
+            "driver": settings.PROJECT_LOG_DRIVER,
+            "options": {
+                "max-size": settings.PROJECT_LOG_MAX_SIZE,
+                "max-file": str(settings.PROJECT_LOG_MAX_FILE),
+            },
+        }
+
+    @staticmethod
+    def apply_logging_policy(services: dict, policy: Optional[dict]) -> None:
+        """
+        Set the logging policy on every service of a compose file
+
+        Services without a logging section or with a file-based driver
+        get the policy (replacing their rotation options); services using
+        another driver are left alone.
+
+        Args:
+            services: Compose "services" mapping (modified in place)
+            policy: Logging section (see logging_policy), None: no change
+        """
+        if not policy:
+            return
+        for name, service in services.items():
+            if not isinstance(service, dict):
+                service = services[name] = {}
+            current = service.get("logging")
+            driver = current.get("driver") if isinstance(current, dict) else None
+            if driver in (None, *TraefikService.FILE_LOG_DRIVERS):
+                service["logging"] = {
+                    "driver": policy["driver"],
+                    "options": dict(policy["options"]),
+                }
+
+    @staticmethod
+    def build_route_plan(
+        domain: str,
+        slug: str,
+        services: dict,
+        routes: Optional[list[dict]] = None,
+        force_internal_port: Optional[int] = None,
+        performance: Optional[dict] = None,
+    ) -> tuple[list[dict], Optional[str]]:
+        """
+        Resolve project routes into Traefik routers/services/middlewares
+
+        Each route targets one compose service and can match on a subdomain
+        and/or path prefix. Without explicit routes the whole domain goes to
+        the entry service. Project-wide performance middlewares are attached
+        to every router (and defined once, on the first route); with HTTPS
+        enabled each route also gets a TLS router on the websecure entrypoint
+        (HTTP/2 is negotiated via ALPN). The plan is provider-agnostic: it is
+        rendered either as container labels or as file-provider config.
+
+        Args:
+            domain: Project domain
+            slug: Project slug
+            services: Compose 'services' mapping
+            routes: Route dicts (see ServiceRoute schema), optional
+            force_internal_port: Port override for the default route
+            performance: Performance settings (see PerformanceConfig schema)
+
+        Returns:
+            Tuple of (resolved routes, error_message)
+        """
+        base_name = TraefikService.get_router_name(slug)
+        shared_middlewares = TraefikService.build_performance_middlewares(
+            base_name, performance
+        )
+        https = bool(performance and performance.get("https"))
+
+        if not routes:
+            routes = [
+                {
+                    "service": TraefikService.get_entry_service(services),
+                    "port": force_internal_port,
+                }
+            ]
+
+        plan: list[dict] = []
+        used_names: set[str] = set()
+
+        for route in routes:
+            service_name = route["service"]
+            if service_name not in services:
+                return [], f"Service '{service_name}' not found in compose file"
+
+            # Router name: slug for a single route, slug-service otherwise
+            name = base_name
+            if len(routes) > 1:
+                name = f"{base_name}-{TraefikService.get_router_name(service_name)}"
+            suffix = 2
+            unique_name = name
+            while unique_name in used_names:
+                unique_name = f"{name}-{suffix}"
+                suffix += 1
+            name = unique_name
+            used_names.add(name)
+
+            host = domain
+            if route.get("subdomain"):
+                host = f"{route['subdomain']}.{domain}"
+            rule = f"Host(`{host}`)"
+
+            priority = TraefikService.ROUTER_PRIORITY
+            # Shared chain is defined once (on the first route)
+            middlewares: dict[str, dict] = {} if plan else dict(shared_middlewares)
+            middleware_names = list(shared_middlewares)
+            path_prefix = route.get("path_prefix")
+            if path_prefix and path_prefix != "/":
+                rule += f" && PathPrefix(`{path_prefix}`)"
+                # More specific prefixes must win over the catch-all route
+                priority += len(path_prefix)
+                if route.get("strip_prefix"):
+                    middlewares[f"{name}-stripprefix"] = {
+                        "stripPrefix": {"prefixes": [path_prefix]}
+                    }
+                    middleware_names.append(f"{name}-stripprefix")
+
+            router: dict = {
+                "rule": rule,
+                "entryPoints": ["web"],
+                "priority": priority,
+                "service": name,
+            }
+            if middleware_names:
+                router["middlewares"] = middleware_names
+
+            routers = {name: router}
+            if https:
+                tls: dict = {}
+                if settings.TRAEFIK_CERT_RESOLVER:
+                    tls["certResolver"] = settings.TRAEFIK_CERT_RESOLVER
+                routers[f"{name}-secure"] = {
+                    **router,
+                    "entryPoints": ["websecure"],
+                    "tls": tls,
+                }
+
+            port = route.get("port") or TraefikService.get_service_port(
+                services[service_name]
+            )
+
+            plan.append(
+                {
+                    "name": name,
+                    "service": service_name,
+                    "port": port or 80,
+                    "routers": routers,
+                    "middlewares": middlewares,
+                    "load_balancer": route.get("load_balancer") or {},
+                }
+            )
+
+        return plan, None
+
+    @staticmethod
+    def _flatten_labels(prefix: str, value: Any) -> list[str]:
+        """
+        Flatten file-provider style config into Docker provider labels
+
+        Keys are lower-cased (labels are case-insensitive), scalar lists are
+        comma-joined, booleans rendered as "true"/"false" and empty sections
+        (e.g. "tls", "compress") as "true".
+        """
+        if value == {}:
+            return [f"{prefix}=true"]
+        if isinstance(value, dict):
+            labels: list[str] = []
+            for key, item in value.items():
+                labels.extend(
+                    TraefikService._flatten_labels(f"{prefix}.{key.lower()}", item)
+                )
+            return labels
+        if isinstance(value, bool):
+            return [f"{prefix}={str(value).lower()}"]
+        if isinstance(value, list):
+            return [f"{prefix}={','.join(str(item) for item in value)}"]
+        return [f"{prefix}={value}"]
+
+    @staticmethod
+    def _load_balancer_options(load_balancer: dict) -> dict:
+        """Build loadBalancer options (sticky sessions, health check)"""
+        options: dict = {}
+        if load_balancer.get("sticky"):
+            options["sticky"] = {"cookie": {"httpOnly": True}}
+        if load_balancer.get("health_check_path"):
+            options["healthCheck"] = {
+                "path": load_balancer["health_check_path"],
+                "interval": load_balancer.get("health_check_interval") or "10s",
+                "timeout": load_balancer.get("health_check_timeout") or "3s",
+            }
+        return options
+
+    @staticmethod
+    def generate_route_labels(route: dict) -> list[str]:
+        """
+        Render one resolved route as Docker provider labels
+
+        Args:
+            route: Entry of build_route_plan() result
+
+        Returns:
+            List of Traefik label strings
+        """
+        name = route["name"]
+        labels: list[str] = []
+        for router_name, router in route["routers"].items():
+            labels.extend(
+                TraefikService._flatten_labels(
+                    f"traefik.http.routers.{router_name}", router
+                )
+            )
+
+        labels.append(
+            f"traefik.http.services.{name}.loadbalancer.server.port={route['port']}"
+        )
+        load_balancer = TraefikService._load_balancer_options(route["load_balancer"])
+        if load_balancer:
+            labels.extend(
+                TraefikService._flatten_labels(
+                    f"traefik.http.services.{name}.loadbalancer", load_balancer
+                )
+            )
+
+        for middleware_name, middleware in route["middlewares"].items():
+            labels.extend(
+                TraefikService._flatten_labels(
+                    f"traefik.http.middlewares.{middleware_name}", middleware
+                )
+            )
+
+        return labels
+
     @staticmethod
     def inject_labels_to_compose(
         compose_content: str,
         domain: str,
         slug: str,
         force_internal_port: Optional[int] = None,
+        routing_mode: str = ROUTING_MODE_LABELS,
+        routes: Optional[list[dict]] = None,
+        performance: Optional[dict] = None,
+        logging: Optional[dict] = None,
     ) -> tuple[str, Optional[str]]:
         """
         Inject Traefik labels into docker-compose.yml
 
+        Every routed service gets its labels, is attached to docklite-network
+        and has its 'ports' replaced by 'expose'. Stale Traefik labels are
+        removed from all services. In file routing mode no labels are added
+        (routing lives in the dynamic config file). Every service gets the
+        logging policy (see apply_logging_policy).
+
         Args:
             compose_content: Original docker-compose.yml content
             domain: Project domain
             slug: Project slug
             force_internal_port: Force specific internal port (optional)
+            routing_mode: "labels" (default) or "file"
+            routes: Per-service routes (default: whole domain to entry service)
+            performance: Performance middlewares / HTTPS settings (optional)
+            logging: Logging policy (see logging_policy; optional)
 
         Returns:
             Tuple of (modified_compose_content, error_message)
@@ -125,57 +519,64 @@ class TraefikService:
             if not services:
                 return compose_content, "Services section is empty"
 
-            # Detect internal port or use forced value
-            if force_internal_port:
-                internal_port = force_internal_port
-            else:
-                internal_port = TraefikService.detect_internal_port(compose_content)
-
-            # Generate labels
-            labels = TraefikService.generate_labels(domain, slug, internal_port)
-
-            # Inject labels into first service
-            first_service_name = list(services.keys())[0]
-            first_service = services[first_service_name]
-
-            # Add labels
-            if "labels" not in first_service:
-                first_service["labels"] = []
-
-            # Ensure labels is a list
-            if not isinstance(first_service["labels"], list):
-                first_service["labels"] = []
-
-            # Remove existing Traefik labels
-            first_service["labels"] = [
-                label
-                for label in first_service["labels"]
-                if not label.startswith("traefik.")
-            ]
-
-            # Add new Traefik labels
-            first_service["labels"].extend(labels)
-
-            # Ensure network is added
-            if "networks" not in first_service:
-                first_service["networks"] = []
-
-            if not isinstance(first_service["networks"], list):
-                first_service["networks"] = []
-
-            if "docklite-network" not in first_service["networks"]:
-                first_service["networks"].append("docklite-network")
-
-            # Remove 'ports' section to avoid port conflicts (Traefik handles
-            # routing)
-            if "ports" in first_service:
-                # Keep only expose if needed
-                if "expose" not in first_service and internal_port:
-                    first_service["expose"] = [str(internal_port)]
-                del first_service["ports"]
+            plan, plan_error = TraefikService.build_route_plan(
+                domain, slug, services, routes, force_internal_port, performance
+            )
+            if plan_error:
+                return compose_content, plan_error
+
+            # Remove existing Traefik labels (routes may have moved)
+            for service in services.values():
+                if not isinstance(service, dict) or "labels" not in service:
+                    continue
+                if not isinstance(service["labels"], list):
+                    service["labels"] = []
+                service["labels"] = [
+                    label
+                    for label in service["labels"]
+                    if not str(label).startswith("traefik.")
+                ]
+                if not service["labels"]:
+                    del service["labels"]
+
+            for route in plan:
+                service = services[route["service"]]
+                if not isinstance(service, dict):
+                    service = services[route["service"]] = {}
+
+                # Add new Traefik labels (file mode routes via dynamic config)
+                if routing_mode != TraefikService.ROUTING_MODE_FILE:
+                    labels = service.setdefault("labels", [])
+                    if "traefik.enable=true" not in labels:
+                        labels.append("traefik.enable=true")
+                    labels.extend(TraefikService.generate_route_labels(route))
+
+                # Ensure network is added
+                if not isinstance(service.get("networks"), (list, dict)):
+                    service["networks"] = []
+                if isinstance(service["networks"], dict):
+                    service["networks"].setdefault("docklite-network", None)
+                elif "docklite-network" not in service["networks"]:
+                    service["networks"].append("docklite-network")
+
+                # Remove 'ports' section to avoid port conflicts (Traefik
+                # handles routing)
+                if "ports" in service:
+                    # Keep only expose if needed
+                    if "expose" not in service:
+                        service["expose"] = [str(route["port"])]
+                    del service["ports"]
+
+                # Horizontal scaling: replicas can't share a container_name
+                replicas = route["load_balancer"].get("replicas")
+                if replicas:
+                    service.setdefault("deploy", {})["replicas"] = replicas
+                    service.pop("container_name", None)
+
+            TraefikService.apply_logging_policy(services, logging)
 
             # Add networks section at root level
-            if "networks" not in compose_data:
+            if not isinstance(compose_data.get("networks"), dict):
                 compose_data["networks"] = {}
 
             compose_data["networks"]["docklite-network"] = {"external": True}
@@ -198,6 +599,10 @@ class TraefikService:
         domain: str,
         slug: str,
         internal_port: Optional[int] = None,
+        routing_mode: str = ROUTING_MODE_LABELS,
+        routes: Optional[list[dict]] = None,
+        performance: Optional[dict] = None,
+        logging: Optional[dict] = None,
     ) -> tuple[str, Optional[str]]:
         """
         Update Traefik labels in existing docker-compose.yml
@@ -208,10 +613,147 @@ class TraefikService:
             domain: Project domain
             slug: Project slug
             internal_port: Internal container port (optional)
+            routing_mode: "labels" (default) or "file"
+            routes: Per-service routes (optional)
+            performance: Performance middlewares / HTTPS settings (optional)
+            logging: Logging policy (optional)
 
         Returns:
             Tuple of (modified_compose_content, error_message)
         """
         return TraefikService.inject_labels_to_compose(
-            compose_content, domain, slug, internal_port
+            compose_content,
+            domain,
+            slug,
+            internal_port,
+            routing_mode,
+            routes,
+            performance,
+            logging,
         )
+
+    @staticmethod
+    def generate_file_config(
+        domain: str,
+        slug: str,
+        compose_content: str,
+        routes: Optional[list[dict]] = None,
+        performance: Optional[dict] = None,
+    ) -> Optional[dict]:
+        """
+        Generate file-provider routers/services for a single project
+
+        Upstreams are the routed services' containers on docklite-network:
+        an explicit container_name, or the Compose default
+        "<slug>-<service>-<n>" (projects are deployed from a directory named
+        after the slug), one server per replica.
+
+        Args:
+            domain: Project domain
+            slug: Project slug
+            compose_content: Project docker-compose.yml content
+            routes: Per-service routes (optional)
+            performance: Performance middlewares / HTTPS settings (optional)
+
+        Returns:
+            Dict with "routers", "services" and "middlewares" keys, or None
+            if the compose content has no services or routes are invalid
+        """
+        try:
+            compose_data = yaml.safe_load(compose_content)
+        except yaml.YAMLError:
+            return None
+
+        if not isinstance(compose_data, dict) or not compose_data.get("services"):
+            return None
+
+        services = compose_data["services"]
+        plan, error = TraefikService.build_route_plan(
+            domain, slug, services, routes, performance=performance
+        )
+        if error:
+            return None
+
+        config: dict = {"routers": {}, "services": {}, "middlewares": {}}
+
+        for route in plan:
+            service = services[route["service"]] or {}
+            replicas = route["load_balancer"].get("replicas") or 1
+            container_name = service.get("container_name")
+
+            if container_name and replicas == 1:
+                hosts = [container_name]
+            else:
+                hosts = [
+                    f"{slug}-{route['service']}-{index}"
+                    for index in range(1, replicas + 1)
+                ]
+
+            load_balancer: dict = {
+                "servers": [{"url": f"http://{host}:{route['port']}"} for host in hosts]
+            }
+            load_balancer.update(
+                TraefikService._load_balancer_options(route["load_balancer"])
+            )
+
+            config["routers"].update(route["routers"])
+            config["services"][route["name"]] = {"loadBalancer": load_balancer}
+            config["middlewares"].update(route["middlewares"])
+
+        return config
+
+    @staticmethod
+    def build_dynamic_config(projects: Iterable[dict]) -> dict:
+        """
+        Build the complete file-provider dynamic configuration
+
+        Args:
+            projects: Iterable of dicts with generate_file_config() arguments
+                (domain, slug, compose_content, routes, performance)
+
+        Returns:
+            Traefik dynamic configuration dict
+        """
+        routers: dict = {}
+        services: dict = {}
+        middlewares: dict = {}
+
+        for project in projects:
+            project_config = TraefikService.generate_file_config(**project)
+            if project_config:
+                routers.update(project_config["routers"])
+                services.update(project_config["services"])
+                middlewares.update(project_config["middlewares"])
+
+        # Traefik rejects empty routers/services maps, so omit the http section
+        if not routers:
+            return {}
+
+        http: dict = {"routers": routers, "services": services}
+        if middlewares:
+            http["middlewares"] = middlewares
+
+        return {"http": http}
+
+    @staticmethod
+    def write_dynamic_config(config: dict, directory: str) -> Path:
+        """
+        Atomically write the dynamic configuration file
+
+        The file is written to a temp file in the same directory, fsynced and
+        renamed over the target, so Traefik's watcher never sees a partially
+        written file.
+
+        Args:
+            config: Traefik dynamic configuration dict
+            directory: Directory watched by Traefik's file provider
+
+        Returns:
+            Path of the written configuration file
+        """
+        target_dir = Path(directory)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / TraefikService.DYNAMIC_CONFIG_FILENAME
+
+        content = yaml.dump(config, default_flow_style=False, sort_keys=False)
+        return atomic_write_text(target, content)
@@ -0,0 +1,268 @@
+"""
+User administration
+Batch user operations behind the admin RPC socket (./docklite user ...)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.constants.messages import ErrorMessages
+from app.core.admin_rpc import (
+    CONFLICT,
+    INVALID_PARAMS,
+    NOT_FOUND,
+    AdminRPCServer,
+    RPCError,
+)
+from app.core.database import AsyncSessionLocal
+from app.models.schemas import UserCreate
+from app.models.user import User
+from app.services.auth_service import AuthService
+from app.utils.formatters import format_user_response
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Usernames/emails per uniqueness query (SQLite bound parameter limit)
+LOOKUP_CHUNK = 500
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first["loc"])
+    return f"{field}: {first['msg']}"
+
+
+class UserAdminService:
+    """Service for administrative user operations"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_users(self) -> list[dict]:
+        """
+        List all users
+
+        Returns:
+            list[dict]: Formatted users ordered by ID
+        """
+        result = await self.db.execute(select(User).order_by(User.id))
+        return [format_user_response(user) for user in result.scalars().all()]
+
+    async def create_users(
+        self, entries: list[Any], skip_existing: bool = False
+    ) -> tuple[Optional[dict], Optional[str]]:
+        """
+        Create users in one transaction
+
+        Entries are validated like POST /api/users; uniqueness is checked
+        with one query per LOOKUP_CHUNK entries and passwords are hashed
+        on all CPUs, so a batch costs about one bcrypt hash per core.
+
+        Args:
+            entries: User fields (username, password, email, system_user,
+                is_admin); invalid entries are reported, not created
+            skip_existing: Skip entries whose username exists instead of
+                reporting them as errors
+
+        Returns:
+            tuple: (report with "created", "skipped" and "errors", error)
+        """
+        report: dict[str, list[Any]] = {"created": [], "skipped": [], "errors": []}
+        # (index in entries, fields, is_admin)
+        accepted: list[tuple[int, UserCreate, bool]] = []
+        seen_usernames: set[str] = set()
+        seen_emails: set[str] = set()
+
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                report["errors"].append(
+                    {"index": index, "username": None, "error": "Not an object"}
+                )
+                continue
+            fields = dict(entry)
+            is_admin = bool(fields.pop("is_admin", False))
+            try:
+                user_data = UserCreate(**fields)
+            except ValidationError as e:
+                report["errors"].append(
+                    {
+                        "index": index,
+                        "username": entry.get("username"),
+                        "error": _validation_message(e),
+                    }
+                )
+                continue
+            if user_data.username in seen_usernames:
+                error = f"Duplicate username in batch: {user_data.username}"
+            elif user_data.email and user_data.email in seen_emails:
+                error = f"Duplicate email in batch: {user_data.email}"
+            else:
+                error = None
+            if error:
+                report["errors"].append(
+                    {"index": index, "username": user_data.username, "error": error}
+                )
+                continue
+            seen_usernames.add(user_data.username)
+            if user_data.email:
+                seen_emails.add(user_data.email)
+            accepted.append((index, user_data, is_admin))
+
+        existing_usernames, existing_emails = await self._existing(
+            seen_usernames, seen_emails
+        )
+        pending: list[tuple[UserCreate, bool]] = []
+        for index, user_data, is_admin in accepted:
+            if user_data.username in existing_usernames:
+                if skip_existing:
+                    report["skipped"].append(user_data.username)
+                    continue
+                error = ErrorMessages.USERNAME_EXISTS
+            elif user_data.email and user_data.email in existing_emails:
+                error = ErrorMessages.EMAIL_EXISTS
+            else:
+                pending.append((user_data, is_admin))
+                continue
+            report["errors"].append(
+                {"index": index, "username": user_data.username, "error": error}
+            )
+
+        if not pending:
+            return report, None
+
+        hashes = await self._hash_passwords([data.password for data, _ in pending])
+        users = [
+            User(
+                username=user_data.username,
+                email=user_data.email,
+                password_hash=password_hash,
+                system_user=user_data.system_user,
+                is_active=1,
+                is_admin=1 if is_admin else 0,
+            )
+            for (user_data, is_admin), password_hash in zip(pending, hashes)
+        ]
+        self.db.add_all(users)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # Created concurrently (e.g. through the API) since the check
+            await self.db.rollback()
+            return None, "Users were created concurrently, retry the batch"
+
+        report["created"] = [
+            {"id": user.id, "username": user.username} for user in users
+        ]
+        logger.info(f"Created {len(users)} users")
+        return report, None
+
+    async def reset_password(
+        self, username: str, password: str
+    ) -> tuple[Optional[User], Optional[str]]:
+        """
+        Set a user's password
+
+        Args:
+            username: Username
+            password: New password
+
+        Returns:
+            tuple: (user, error)
+        """
+        if len(password) < 6:
+            return None, ErrorMessages.PASSWORD_TOO_SHORT
+
+        user = await AuthService(self.db).get_user_by_username(username)
+        if not user:
+            return None, ErrorMessages.USER_NOT_FOUND
+
+        password_hash = await asyncio.to_thread(AuthService.get_password_hash, password)
+        setattr(user, "password_hash", password_hash)
+        await self.db.commit()
+        await self.db.refresh(user)
+        return user, None
+
+    async def _existing(
+        self, usernames: set[str], emails: set[str]
+    ) -> tuple[set[str], set[str]]:
+        """Usernames and emails of the batch that are already taken"""
+        taken_usernames: set[str] = set()
+        taken_emails: set[str] = set()
+        names, addresses = sorted(usernames), sorted(emails)
+        for start in range(0, max(len(names), len(addresses)), LOOKUP_CHUNK):
+            name_chunk = names[start : start + LOOKUP_CHUNK]
+            email_chunk = addresses[start : start + LOOKUP_CHUNK]
+            result = await self.db.execute(
+                select(User.username, User.email).where(
+                    or_(User.username.in_(name_chunk), User.email.in_(email_chunk))
+                )
+            )
+            for username, email in result.all():
+                taken_usernames.add(username)
+                if email:
+                    taken_emails.add(email)
+        return taken_usernames, taken_emails
+
+    @staticmethod
+    async def _hash_passwords(passwords: list[str]) -> list[str]:
+        """bcrypt in a pool sized to the CPUs (bcrypt releases the GIL)"""
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            return list(
+                await asyncio.gather(
+                    *(
+                        loop.run_in_executor(pool, AuthService.get_password_hash, p)
+                        for p in passwords
+                    )
+                )
+            )
+
+
+def register_rpc_methods(rpc: AdminRPCServer) -> None:
+    """
+    Expose user administration on the admin RPC socket
+
+    Args:
+        rpc: Server to add the methods to
+    """
+
+    async def list_users() -> list[dict]:
+        async with AsyncSessionLocal() as session:
+            return await UserAdminService(session).list_users()
+
+    async def create_users(users: list, skip_existing: bool = False) -> dict:
+        if not isinstance(users, list):
+            raise RPCError(INVALID_PARAMS, "users must be a list")
+        async with AsyncSessionLocal() as session:
+            report, error = await UserAdminService(session).create_users(
+                users, skip_existing=bool(skip_existing)
+            )
+        if error or report is None:
+            raise RPCError(CONFLICT, error or "Failed to create users")
+        return report
+
+    async def reset_password(username: str, password: str) -> dict:
+        async with AsyncSessionLocal() as session:
+            user, error = await UserAdminService(session).reset_password(
+                str(username), str(password)
+            )
+        if error or not user:
+            code = (
+                NOT_FOUND if error == ErrorMessages.USER_NOT_FOUND else INVALID_PARAMS
+            )
+            raise RPCError(code, error or "Failed to reset password")
+        return format_user_response(user)
+
+    rpc.add_method("users.list", list_users)
+    rpc.add_method("users.create", create_users)
+    rpc.add_method("users.reset_password", reset_password)
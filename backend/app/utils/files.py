@@ -0,0 +1,86 @@
+"""
+Crash-safe file writing utilities
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+# Suffix of in-flight temp files (cleaned up by the consistency checker)
+TEMP_SUFFIX = ".tmp"
+
+
+def fsync_dir(directory: Path) -> None:
+    """
+    Flush directory entry changes (creates/renames/unlinks) to disk
+
+    Args:
+        directory: Directory to fsync
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Not supported (e.g. some network filesystems)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_temp_file(target: Path, content: str, mode: int = 0o644) -> Path:
+    """
+    Write content to a fsynced temp file next to target
+
+    The temp file is hidden and ends with TEMP_SUFFIX, so watchers that
+    filter by extension (e.g. Traefik's file provider) ignore it.
+
+    Args:
+        target: Final file path (its directory must exist)
+        content: File content
+        mode: File permissions
+
+    Returns:
+        Path of the temp file (rename it over target to publish)
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=target.parent, prefix=f".{target.name}.", suffix=TEMP_SUFFIX
+    )
+    try:
+        with os.fdopen(fd, "w") as tmp_file:
+            tmp_file.write(content)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.chmod(tmp_path, mode)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return Path(tmp_path)
+
+
+def atomic_write_text(target: Path, content: str, mode: int = 0o644) -> Path:
+    """
+    Atomically replace a file: temp file + fsync + rename + directory fsync
+
+    Readers see either the old or the new content, never a truncated file,
+    even if the process crashes mid-write.
+
+    Args:
+        target: File path
+        content: File content
+        mode: File permissions
+
+    Returns:
+        Path of the written file
+    """
+    tmp_path = write_temp_file(target, content, mode)
+    try:
+        os.replace(tmp_path, target)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    fsync_dir(target.parent)
+    return target
@@ -8,6 +8,10 @@ from typing import Any, Optional
 from app.models.project import Project
 from app.models.user import User
 
+# Durations: "30s", "15m", "2h", "7d"
+DURATION_PATTERN = re.compile(r"^(\d+)([smhd])$")
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
 
 def generate_slug_from_domain(domain: str, project_id: int) -> str:
     """
@@ -59,6 +63,10 @@ def format_project_response(project: Optional[Project]) -> dict:
         "owner_id": project.owner_id,
         "compose_content": project.compose_content,
         "env_vars": json.loads(str(project.env_vars) if project.env_vars else "{}"),
+        "routes": json.loads(str(project.routes)) if project.routes else None,
+        "performance": (
+            json.loads(str(project.performance)) if project.performance else None
+        ),
         "status": project.status,
         "created_at": project.created_at,
         "updated_at": project.updated_at,
@@ -119,3 +127,19 @@ def safe_json_dumps(obj: Any, default: str = "{}") -> str:
         return json.dumps(obj)
     except (TypeError, ValueError):
         return default
+
+
+def parse_duration(text: str) -> Optional[int]:
+    """
+    Parse a duration with a unit suffix
+
+    Args:
+        text: Duration (e.g. "30s", "15m", "2h", "7d")
+
+    Returns:
+        Seconds, or None if text is not a duration
+    """
+    match = DURATION_PATTERN.match(text.strip())
+    if match is None:
+        return None
+    return int(match.group(1)) * DURATION_UNITS[match.group(2)]
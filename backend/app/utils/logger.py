@@ -1,10 +1,218 @@
 """
 Logging utilities
+
+Records are handed to a bounded in-memory queue by a QueueHandler and
+written by a background listener thread, so logging never blocks the
+event loop on stdout. Output is JSON lines (LOG_FORMAT=json) carrying the
+request ID of the request being served (propagated via contextvars).
+High-volume loggers can be sampled with LOG_SAMPLING.
 """
 
+import itertools
+import json
 import logging
-from typing import Optional
+import logging.handlers
+import queue
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional, TextIO
+
 from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Request ID of the request being handled (None outside requests)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Records waiting for the writer thread (beyond this, records are dropped)
+LOG_QUEUE_SIZE = 10000
+
+# LogRecord attributes that are not user-supplied "extra" fields
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+
+        # Structured fields passed via extra={...}
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep 1 in N records below WARNING for configured loggers
+
+    Rates come from LOG_SAMPLING, e.g. "docklite.access=0.1,sqlalchemy=0.01"
+    (logger name prefix = fraction kept). Warnings and errors are never
+    sampled out.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        # Longest prefix first, so "a.b" wins over "a"
+        self._every = sorted(
+            (
+                (prefix, max(1, round(1 / rate)) if rate > 0 else 0)
+                for prefix, rate in rates.items()
+            ),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._counters: dict[str, itertools.count[int]] = {}
+
+    @staticmethod
+    def parse(spec: str) -> dict[str, float]:
+        """Parse "name=rate,name=rate" (invalid entries are ignored)"""
+        rates = {}
+        for item in spec.split(","):
+            name, _, rate = item.strip().partition("=")
+            try:
+                rates[name.strip()] = float(rate)
+            except ValueError:
+                continue
+        return rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for prefix, every in self._every:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                if every == 0:
+                    return False
+                # next() on itertools.count is atomic: no lock needed
+                counter = self._counters.setdefault(prefix, itertools.count())
+                return next(counter) % every == 0
+        return True
+
+
+class _StderrHandler(logging.StreamHandler):
+    """Stream handler writing to the current sys.stderr (it may be swapped)"""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    @property  # type: ignore[override]
+    def stream(self) -> TextIO:
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value: TextIO) -> None:
+        pass
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Non-blocking queue handler
+
+    Only does cheap work in the calling thread (merging args into the
+    message, capturing the request ID); formatting happens in the writer
+    thread. Records are dropped (and counted) when the queue is full.
+    After shutdown_logging() records go straight to the output handler.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.direct: Optional[logging.Handler] = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id_var.get()
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            # Traceback objects keep frames alive; render them now
+            formatter = self.formatter or logging.Formatter()
+            record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.direct is not None:
+            self.direct.handle(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_queue_handler: Optional[_QueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> logging.Handler:
+    """
+    Install the queue handler and start the writer thread (idempotent)
+
+    Returns:
+        The shared queue handler
+    """
+    global _queue_handler, _listener
+    if _queue_handler is not None:
+        return _queue_handler
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    stream_handler = _StderrHandler()
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        )
+
+    handler = _QueueHandler(log_queue)
+    handler.setFormatter(stream_handler.formatter)
+    if settings.LOG_SAMPLING:
+        rates = SamplingFilter.parse(settings.LOG_SAMPLING)
+        handler.addFilter(SamplingFilter(rates))
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    _queue_handler = handler
+
+    # Third-party loggers (sqlalchemy, ...) propagate to the root logger.
+    # Its level is left alone: lowering it would turn on SQLAlchemy's
+    # statement logging (it checks the effective level of its loggers).
+    logging.getLogger().addHandler(handler)
+
+    return handler
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is None or _queue_handler is None:
+        return
+    _listener.stop()
+    # Late records (e.g. from other shutdown hooks) are written directly
+    _queue_handler.direct = _listener.handlers[0]
+    _listener = None
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -20,13 +228,10 @@ def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
 
     if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
+        logger.addHandler(setup_logging())
+        logger.setLevel(settings.LOG_LEVEL)
+        # Already handled here, don't emit it again via the root logger
+        logger.propagate = False
 
     return logger
 
@@ -42,9 +247,14 @@ def log_request(request: Request, logger: Optional[logging.Logger] = None) -> No
     if logger is None:
         logger = get_logger(__name__)
 
+    # Skip building the message when INFO is disabled
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    client = request.client.host if request.client else "Unknown"
     logger.info(
-        f"{request.method} {request.url.path} - "
-        f"Client: {request.client.host if request.client else 'Unknown'}"
+        f"{request.method} {request.url.path} - Client: {client}",
+        extra={"method": request.method, "path": request.url.path, "client": client},
     )
 
 
@@ -69,3 +279,84 @@ def log_error(
         message = f"{context} - {message}"
 
     logger.error(message, exc_info=True)
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware assigning request IDs and writing JSON access logs
+
+    The request ID is taken from the X-Request-ID header (or generated),
+    stored in request_id_var for every log record of the request and echoed
+    in the response. One access record per request goes to the
+    "docklite.access" logger (sample it with LOG_SAMPLING).
+    """
+
+    def __init__(self, app: ASGIApp, access_log: bool = True):
+        self.app = app
+        self.logger = get_logger("docklite.access") if access_log else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        status_code = 500
+        # Websockets: 101 once accepted, 403 if closed during the handshake
+        # (the server rejects it); the close code tells how the session ended
+        close_code: Optional[int] = None
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, close_code
+            if message["type"] in (
+                "http.response.start",
+                "websocket.http.response.start",
+            ):
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            elif message["type"] == "websocket.accept":
+                status_code = 101
+            elif message["type"] == "websocket.close":
+                if status_code != 101:
+                    status_code = 403
+                close_code = message.get("code", 1000)
+            await send(message)
+
+        async def receive_wrapper() -> Message:
+            nonlocal close_code
+            message = await receive()
+            if message["type"] == "websocket.disconnect" and close_code is None:
+                close_code = message.get("code", 1005)
+            return message
+
+        websocket = scope["type"] == "websocket"
+        try:
+            await self.app(
+                scope, receive_wrapper if websocket else receive, send_wrapper
+            )
+        finally:
+            if self.logger is not None and self.logger.isEnabledFor(logging.INFO):
+                route = scope.get("route")
+                client = scope.get("client")
+                extra = {
+                    "method": scope.get("method", "WS"),
+                    "path": scope["path"],
+                    "route": getattr(route, "path", None),
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                    "client": client[0] if client else None,
+                }
+                if websocket:
+                    extra["close_code"] = close_code
+                self.logger.info("request", extra=extra)
+            request_id_var.reset(token)
@@ -0,0 +1,8 @@
+"""
+DockLite benchmark suite
+
+Run from backend/:
+    python -m benchmarks                 # all benchmarks, compare to baseline
+    python -m benchmarks -k projects     # only matching benchmarks
+    python -m benchmarks --save-baseline # record a new baseline
+"""
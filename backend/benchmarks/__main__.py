@@ -0,0 +1,129 @@
+"""
+Benchmark runner command line
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from benchmarks import bench_auth, bench_compose, bench_containers, bench_projects
+from benchmarks.harness import (
+    DEFAULT_BASELINE,
+    DEFAULT_THRESHOLD,
+    RunOptions,
+    compare,
+    load_baseline,
+    load_threshold,
+    run_benchmarks,
+    select_cases,
+    write_results,
+)
+
+from app.utils.logger import get_logger
+
+# Imported for their @benchmark registrations
+BENCHMARK_MODULES = (bench_auth, bench_compose, bench_containers, bench_projects)
+
+
+def parse_args(argv: list[str]) -> RunOptions:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="DockLite API benchmarks"
+    )
+    parser.add_argument(
+        "-k",
+        dest="filters",
+        action="append",
+        default=[],
+        help="Only run benchmarks whose name contains this (repeatable)",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Baseline JSON file (default: benchmarks/baseline.json)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        help="Allowed median slowdown vs baseline (default: the baseline's "
+        f"threshold, else {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument("--output", type=Path, help="Write results JSON to this file")
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Overwrite the baseline with these results",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Fewer iterations (smoke run, not for baselines)",
+    )
+    args = parser.parse_args(argv)
+    return RunOptions(
+        filters=args.filters,
+        baseline=args.baseline,
+        threshold=args.threshold,
+        output=args.output,
+        save_baseline=args.save_baseline,
+        quick=args.quick,
+    )
+
+
+def main(argv: list[str]) -> int:
+    options = parse_args(argv)
+    # One access log line per request would drown the report
+    get_logger("docklite.access").setLevel(logging.WARNING)
+    cases = select_cases(options)
+    if not cases:
+        print("No benchmarks selected")
+        return 1
+
+    baseline = load_baseline(options.baseline)
+    threshold = (
+        options.threshold
+        if options.threshold is not None
+        else load_threshold(options.baseline)
+    )
+    print(
+        f"{'benchmark':<36} {'median ms':>11} {'p95 ms':>11} {'ops/s':>9}  baseline"
+    )
+
+    def report(result) -> None:
+        compare([result], baseline, threshold)
+        if result.baseline_median_ms is None:
+            vs = "-"
+        else:
+            change = result.median_ms / result.baseline_median_ms - 1
+            vs = f"{change:+.0%}" + ("  REGRESSION" if result.regression else "")
+        print(
+            f"{result.name:<36} {result.median_ms:>11.3f} {result.p95_ms:>11.3f} "
+            f"{result.ops_per_sec:>9.1f}  {vs}"
+        )
+
+    results = run_benchmarks(cases, report)
+    regressions = [r for r in results if r.regression]
+
+    if options.output:
+        write_results(options.output, results, threshold)
+    if options.save_baseline:
+        if options.quick:
+            print("Not saving a baseline from a --quick run")
+        else:
+            write_results(options.baseline, results, threshold)
+            print(f"Baseline saved to {options.baseline}")
+            return 0
+
+    if regressions:
+        names = ", ".join(r.name for r in regressions)
+        print(
+            f"\n{len(regressions)} regression(s) over {threshold:.0%}: "
+            f"{names}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,31 @@
+"""
+Authentication hot paths: login (bcrypt) and Traefik ForwardAuth
+"""
+
+from benchmarks.harness import ADMIN_PASSWORD, ADMIN_USERNAME, BenchContext, benchmark
+
+
+@benchmark("auth.login", iterations=10, warmup=1)
+async def login(ctx: BenchContext):
+    """POST /api/auth/login (dominated by bcrypt verification)"""
+    client = await ctx.client()
+    credentials = {"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}
+
+    async def run() -> None:
+        response = await client.post("/api/auth/login", json=credentials)
+        assert response.status_code == 200, response.text
+
+    return run
+
+
+@benchmark("auth.verify_admin", iterations=200, warmup=10)
+async def verify_admin(ctx: BenchContext):
+    """GET /api/auth/verify-admin (every dashboard request via ForwardAuth)"""
+    client = await ctx.client()
+    cookies = {"token": ctx.admin_token or ""}
+
+    async def run() -> None:
+        response = await client.get("/api/auth/verify-admin", cookies=cookies)
+        assert response.status_code == 200, response.text
+
+    return run
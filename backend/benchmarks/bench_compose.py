@@ -0,0 +1,35 @@
+"""
+Compose validation and Traefik label injection on small and large files
+"""
+
+from app.services.traefik_service import TraefikService
+from app.validators import validate_docker_compose
+from benchmarks.harness import SMALL_COMPOSE, BenchContext, benchmark, large_compose
+
+COMPOSE_SIZES = {"small": SMALL_COMPOSE, "large": large_compose()}
+
+
+@benchmark("compose.validate", iterations=30, params=list(COMPOSE_SIZES))
+def validate(ctx: BenchContext, size: str):
+    """validate_docker_compose()"""
+    content = COMPOSE_SIZES[size]
+
+    def run() -> None:
+        is_valid, error = validate_docker_compose(content)
+        assert is_valid, error
+
+    return run
+
+
+@benchmark("compose.inject_labels", iterations=30, params=list(COMPOSE_SIZES))
+def inject_labels(ctx: BenchContext, size: str):
+    """TraefikService.inject_labels_to_compose()"""
+    content = COMPOSE_SIZES[size]
+
+    def run() -> None:
+        _, error = TraefikService.inject_labels_to_compose(
+            content, "bench.example.com", "bench-example-com-1"
+        )
+        assert error is None, error
+
+    return run
@@ -0,0 +1,38 @@
+"""
+Container listing (GET /api/containers) at growing container counts
+
+DockerService talks to the fake Docker daemon over its unix socket, so the
+benchmark covers the Engine API round trip, parsing, formatting and
+serialization without a real daemon.
+"""
+
+from benchmarks.harness import BenchContext, benchmark
+
+
+@benchmark("containers.list", iterations=20, warmup=2, params=[10, 1000, 5000])
+async def container_list(ctx: BenchContext, count: int):
+    """GET /api/containers with N containers"""
+    client = await ctx.client()
+    ctx.fake_docker(containers=count)
+
+    async def run() -> None:
+        response = await client.get("/api/containers", headers=ctx.auth_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["total"] == count
+
+    return run
+
+
+@benchmark("containers.inspect", iterations=50, warmup=3)
+async def container_inspect(ctx: BenchContext):
+    """GET /api/containers/{id} with 1000 containers"""
+    client = await ctx.client()
+    ctx.fake_docker(containers=1000)
+
+    async def run() -> None:
+        response = await client.get(
+            "/api/containers/project0_web_1", headers=ctx.auth_headers
+        )
+        assert response.status_code == 200, response.text
+
+    return run
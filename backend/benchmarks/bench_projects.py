@@ -0,0 +1,19 @@
+"""
+Project list endpoint at growing row counts
+"""
+
+from benchmarks.harness import BenchContext, benchmark
+
+
+@benchmark("projects.list", iterations=10, warmup=1, params=[10, 1000, 10000])
+async def project_list(ctx: BenchContext, rows: int):
+    """GET /api/projects with N projects in the DB"""
+    await ctx.seed_projects(rows)
+    client = await ctx.client()
+
+    async def run() -> None:
+        response = await client.get("/api/projects", headers=ctx.auth_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["total"] == rows
+
+    return run
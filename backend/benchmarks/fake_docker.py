@@ -0,0 +1,1061 @@
+"""
+Fake Docker daemon
+
+Serves the subset of the Docker Engine API that DockLite uses over a unix
+socket, backed by synthetic in-memory containers: list, inspect,
+start/stop/restart/remove, logs (followed until the container stops),
+stats, events, exec/attach sessions
+(hijacked streams; the process echoes its input, "size" prints the TTY
+size, "exit N" ends it with code N), and named volumes (in-memory files,
+copied in and out through helper containers' archive endpoint; helpers
+running the restore staging/swap scripts act on the files). Latency and container
+count are configurable, so the backend can be tested and benchmarked at
+scale without Docker installed (point DOCKER_API_SOCKET at the socket).
+
+Standalone:
+    python -m benchmarks.fake_docker --containers 5000 --latency-ms 5
+
+In-process:
+    with FakeDockerServer(containers=5000) as fake:
+        settings.DOCKER_API_SOCKET = fake.socket_path
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import socketserver
+import struct
+import tarfile
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Any, Optional, cast
+from urllib.parse import parse_qs, unquote, urlsplit
+
+SYSTEM_CONTAINERS = ("docklite-traefik", "docklite-backend", "docklite-frontend")
+SERVICES = ("web", "db", "cache")
+IMAGES = {"web": "nginx:alpine", "db": "postgres:16-alpine", "cache": "redis:7-alpine"}
+API_VERSION = "1.43"
+
+# Synthetic containers were created this long before the server started
+CREATED_AGO_SECONDS = 3 * 3600
+
+_VERSION_PREFIX = re.compile(r"^/v\d+\.\d+(?=/)")
+_CONTAINER_PATH = re.compile(r"^/containers/([^/]+)(?:/(\w+))?$")
+_EXEC_PATH = re.compile(r"^/exec/([0-9a-f]+)/(\w+)$")
+
+HELPER_LABEL = "docklite.helper"
+# Staging directory of restored volume data (see DockerService.stage_volume)
+VOLUME_STAGING = ".docklite-restore"
+
+
+def _iso(ts: float) -> str:
+    """RFC 3339 timestamp with nanoseconds, as the daemon formats them"""
+    moment = datetime.fromtimestamp(ts, timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%f") + "000Z"
+
+
+@dataclass
+class FakeContainer:
+    """Synthetic container"""
+
+    id: str
+    name: str
+    image: str
+    created: float
+    running: bool
+    labels: dict[str, str] = field(default_factory=dict)
+    # Frozen by POST /containers/{id}/pause (still running, like Docker)
+    paused: bool = False
+    ports: list[dict] = field(default_factory=list)
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    exit_code: int = 0
+    # Mount point -> volume name
+    mounts: dict[str, str] = field(default_factory=dict)
+    command: list[str] = field(default_factory=list)
+    # Lines added by write_log: (time, stream type, text)
+    written_logs: list[tuple[float, int, str]] = field(default_factory=list)
+    log_config: dict = field(
+        default_factory=lambda: {
+            "Type": "json-file",
+            "Config": {"max-size": "10m", "max-file": "3"},
+        }
+    )
+
+    @property
+    def state(self) -> str:
+        if self.running:
+            return "paused" if self.paused else "running"
+        return "exited"
+
+    def status_text(self, now: float) -> str:
+        """Human status like `docker ps` ("Up 3 hours", "Exited (0) ...")"""
+        if self.running:
+            return f"Up {_duration(now - self.started_at)}"
+        ago = _duration(now - self.finished_at)
+        return f"Exited ({self.exit_code}) {ago} ago"
+
+    def summary(self, now: float) -> dict:
+        """GET /containers/json item"""
+        return {
+            "Id": self.id,
+            "Names": [f"/{self.name}"],
+            "Image": self.image,
+            "ImageID": "sha256:" + hashlib.sha256(self.image.encode()).hexdigest(),
+            "Command": "/docker-entrypoint.sh",
+            "Created": int(self.created),
+            "Ports": self.ports,
+            "Labels": self.labels,
+            "State": self.state,
+            "Status": self.status_text(now),
+            "HostConfig": {"NetworkMode": "docklite-network"},
+        }
+
+    def inspect(self) -> dict:
+        """GET /containers/{id}/json"""
+        port_bindings: dict[str, Optional[list[dict]]] = {}
+        for port in self.ports:
+            key = f"{port['PrivatePort']}/{port['Type']}"
+            if port.get("PublicPort"):
+                port_bindings[key] = [
+                    {
+                        "HostIp": port.get("IP", "0.0.0.0"),
+                        "HostPort": str(port["PublicPort"]),
+                    }
+                ]
+            else:
+                port_bindings[key] = None
+        return {
+            "Id": self.id,
+            "Created": _iso(self.created),
+            "Name": f"/{self.name}",
+            "State": {
+                "Status": self.state,
+                "Running": self.running,
+                "Paused": self.paused,
+                "ExitCode": self.exit_code,
+                "StartedAt": _iso(self.started_at) if self.started_at else "",
+                "FinishedAt": _iso(self.finished_at) if self.finished_at else "",
+            },
+            "Config": {
+                "Image": self.image,
+                "Labels": self.labels,
+                "Tty": False,
+            },
+            "NetworkSettings": {"Ports": port_bindings},
+            "HostConfig": {"LogConfig": self.log_config},
+            "LogPath": f"/var/lib/docker/containers/{self.id}/{self.id}-json.log",
+        }
+
+
+@dataclass
+class FakeVolume:
+    """Named volume with in-memory files (relative path -> content)"""
+
+    name: str
+    labels: dict[str, str] = field(default_factory=dict)
+    files: dict[str, bytes] = field(default_factory=dict)
+
+    def summary(self) -> dict:
+        """GET /volumes item"""
+        return {
+            "Name": self.name,
+            "Driver": "local",
+            "Labels": self.labels,
+            "Mountpoint": f"/var/lib/docker/volumes/{self.name}/_data",
+            "Scope": "local",
+        }
+
+    def archive(self) -> bytes:
+        """Tar of the volume content, as `docker cp <container>:<mount>/. -`"""
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            directories = {"."}
+            for path in sorted(self.files):
+                parts = path.split("/")[:-1]
+                directories.update(
+                    "./" + "/".join(parts[: i + 1]) for i in range(len(parts))
+                )
+            for directory in sorted(directories):
+                info = tarfile.TarInfo(directory)
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                tar.addfile(info)
+            for path, content in sorted(self.files.items()):
+                info = tarfile.TarInfo(f"./{path}")
+                info.size = len(content)
+                info.mode = 0o644
+                tar.addfile(info, io.BytesIO(content))
+        return buffer.getvalue()
+
+    def extract(self, archive: bytes, directory: str) -> None:
+        """PUT archive: add the regular files of a tar under directory"""
+        with tarfile.open(fileobj=io.BytesIO(archive), mode="r") as tar:
+            for member in tar:
+                if member.isfile():
+                    path = os.path.normpath(os.path.join(directory, member.name))
+                    extracted = tar.extractfile(member)
+                    assert extracted is not None
+                    self.files[path] = extracted.read()
+
+    def run_helper(self, action: str) -> None:
+        """Effect of the restore helper scripts on the files"""
+        prefix = f"{VOLUME_STAGING}/"
+        if action == "prepare":
+            self.files = {
+                k: v for k, v in self.files.items() if not k.startswith(prefix)
+            }
+        elif action == "swap":
+            self.files = {
+                k[len(prefix) :]: v
+                for k, v in self.files.items()
+                if k.startswith(prefix)
+            }
+
+
+@dataclass
+class FakeExec:
+    """Exec instance (see FakeDockerDaemon.run_process)"""
+
+    id: str
+    container: FakeContainer
+    cmd: list[str]
+    tty: bool
+    rows: int = 24
+    cols: int = 80
+    running: bool = False
+    exit_code: Optional[int] = None
+
+    def inspect(self) -> dict:
+        """GET /exec/{id}/json"""
+        return {
+            "ID": self.id,
+            "ContainerID": self.container.id,
+            "Running": self.running,
+            "ExitCode": self.exit_code,
+            "ProcessConfig": {
+                "tty": self.tty,
+                "entrypoint": self.cmd[0] if self.cmd else "",
+                "arguments": self.cmd[1:],
+            },
+        }
+
+
+def _duration(seconds: float) -> str:
+    """Rough human duration (as in `docker ps` status)"""
+    if seconds < 60:
+        return f"{max(1, int(seconds))} seconds"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} minutes"
+    if seconds < 2 * 86400:
+        return f"{int(seconds // 3600)} hours"
+    return f"{int(seconds // 86400)} days"
+
+
+class FakeDockerDaemon:
+    """
+    In-memory daemon state
+
+    Containers are grouped as compose projects (project{n}_{service}_1,
+    three services per project) plus the DockLite system containers.
+    Every fifth project container is stopped.
+    """
+
+    def __init__(
+        self, containers: int = 100, latency_ms: float = 0, log_lines: int = 500
+    ):
+        self.latency_ms = latency_ms
+        self.log_lines = log_lines
+        self.requests: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._containers: dict[str, FakeContainer] = {}
+        self._by_name: dict[str, FakeContainer] = {}
+        self._events: list[dict] = []
+        self.execs: dict[str, FakeExec] = {}
+        self.volumes: dict[str, FakeVolume] = {}
+        self.closed = False
+
+        created = time.time() - CREATED_AGO_SECONDS
+        for name in SYSTEM_CONTAINERS:
+            ports = [{"PrivatePort": 80, "Type": "tcp"}]
+            if name == "docklite-traefik":
+                ports = [
+                    {
+                        "IP": "0.0.0.0",
+                        "PrivatePort": 80,
+                        "PublicPort": 80,
+                        "Type": "tcp",
+                    },
+                    {
+                        "IP": "0.0.0.0",
+                        "PrivatePort": 443,
+                        "PublicPort": 443,
+                        "Type": "tcp",
+                    },
+                ]
+            self._add(name, f"{name}:latest", created, True, {}, ports)
+
+        for i in range(max(0, containers - len(SYSTEM_CONTAINERS))):
+            project, service = (
+                f"project{i // len(SERVICES)}",
+                SERVICES[i % len(SERVICES)],
+            )
+            labels = {
+                "com.docker.compose.project": project,
+                "com.docker.compose.service": service,
+                "com.docker.compose.container-number": "1",
+            }
+            ports = [{"PrivatePort": 80, "Type": "tcp"}] if service == "web" else []
+            self._add(
+                f"{project}_{service}_1",
+                IMAGES[service],
+                created,
+                i % 5 != 4,
+                labels,
+                ports,
+            )
+
+    def _add(
+        self,
+        name: str,
+        image: str,
+        created: float,
+        running: bool,
+        labels: dict[str, str],
+        ports: list[dict],
+    ) -> None:
+        container_id = hashlib.sha256(name.encode()).hexdigest()
+        container = FakeContainer(
+            id=container_id,
+            name=name,
+            image=image,
+            created=created,
+            running=running,
+            labels=labels,
+            ports=ports,
+            started_at=created + 1,
+            finished_at=0.0 if running else created + 60,
+        )
+        self._containers[container_id] = container
+        self._by_name[name] = container
+
+    def add_volume(
+        self, name: str, project: str = "", files: Optional[dict[str, bytes]] = None
+    ) -> FakeVolume:
+        """Add a named volume (project: compose project label)"""
+        labels = {"com.docker.compose.project": project} if project else {}
+        volume = FakeVolume(name, labels, dict(files or {}))
+        with self._lock:
+            self.volumes[name] = volume
+        return volume
+
+    def add_container(
+        self,
+        name: str,
+        project: str = "",
+        running: bool = True,
+        log_config: Optional[dict] = None,
+    ) -> FakeContainer:
+        """Add a container (project: compose project label)"""
+        labels = {"com.docker.compose.project": project} if project else {}
+        with self._lock:
+            self._add(name, "nginx:alpine", time.time(), running, labels, [])
+            container = self._by_name[name]
+            if log_config is not None:
+                container.log_config = log_config
+            return container
+
+    def create_container(self, config: dict) -> FakeContainer:
+        """POST /containers/create: stopped container, volumes from Binds"""
+        mounts = {}
+        with self._lock:
+            for bind in (config.get("HostConfig") or {}).get("Binds") or []:
+                volume, mount = bind.split(":")[:2]
+                self.volumes.setdefault(volume, FakeVolume(volume))
+                mounts[mount] = volume
+            name = f"created_{len(self._containers)}_{time.monotonic_ns()}"
+            self._add(
+                name,
+                config.get("Image", ""),
+                time.time(),
+                False,
+                config.get("Labels") or {},
+                [],
+            )
+            container = self._by_name[name]
+            container.mounts = mounts
+            container.command = config.get("Cmd") or []
+            return container
+
+    def find(self, ref: str) -> Optional[FakeContainer]:
+        """Look up by name, full ID or unique ID prefix"""
+        with self._lock:
+            container = self._by_name.get(ref.lstrip("/")) or self._containers.get(ref)
+            if container is None and len(ref) >= 3:
+                matches = [c for i, c in self._containers.items() if i.startswith(ref)]
+                container = matches[0] if len(matches) == 1 else None
+            return container
+
+    def list_containers(
+        self, all: bool, labels: Optional[list[str]] = None
+    ) -> list[dict]:
+        """Containers (labels: "key=value" filters, all must match)"""
+        now = time.time()
+        wanted = [label.partition("=") for label in labels or []]
+        with self._lock:
+            return [
+                c.summary(now)
+                for c in self._containers.values()
+                if (all or c.running) and _labels_match(c.labels, wanted)
+            ]
+
+    def set_running(self, container: FakeContainer, running: bool) -> bool:
+        """Start/stop a container; False when already in that state"""
+        with self._changed:
+            if container.running == running:
+                return False
+            container.running = running
+            container.paused = False
+            now = time.time()
+            if running:
+                container.started_at = now
+                self._record(container, "start", now)
+            else:
+                container.finished_at = now
+                container.exit_code = 0
+                self._record(container, "die", now)
+                self._record(container, "stop", now)
+            return True
+
+    def set_paused(self, container: FakeContainer, paused: bool) -> Optional[str]:
+        """Pause/unpause a container; the error message when not possible"""
+        with self._changed:
+            if not container.running:
+                return f"Container {container.id} is not running"
+            if container.paused == paused:
+                state = "already paused" if paused else "not paused"
+                return f"Container {container.id} is {state}"
+            container.paused = paused
+            self._record(container, "pause" if paused else "unpause", time.time())
+            return None
+
+    def restart(self, container: FakeContainer) -> None:
+        self.set_running(container, False)
+        self.set_running(container, True)
+        with self._changed:
+            self._record(container, "restart", time.time())
+
+    def remove(self, container: FakeContainer) -> None:
+        with self._changed:
+            self._containers.pop(container.id, None)
+            self._by_name.pop(container.name, None)
+            self._record(container, "destroy", time.time())
+
+    def _record(self, container: FakeContainer, action: str, now: float) -> None:
+        """Append an event (caller holds the lock)"""
+        self._events.append(
+            {
+                "status": action,
+                "id": container.id,
+                "from": container.image,
+                "Type": "container",
+                "Action": action,
+                "Actor": {
+                    "ID": container.id,
+                    "Attributes": {
+                        "name": container.name,
+                        "image": container.image,
+                        **container.labels,
+                    },
+                },
+                "scope": "local",
+                "time": int(now),
+                "timeNano": int(now * 1e9),
+            }
+        )
+        self._changed.notify_all()
+
+    def events_after(
+        self, index: int, since: float, until: float
+    ) -> tuple[list[dict], int]:
+        """Events from position `index` within [since, until]"""
+        with self._lock:
+            new = self._events[index:]
+            return [e for e in new if since <= e["timeNano"] / 1e9 <= until], len(
+                self._events
+            )
+
+    def wait_for_events(self, index: int, timeout: float) -> None:
+        with self._changed:
+            if len(self._events) <= index and not self.closed:
+                self._changed.wait(timeout)
+
+    def close(self) -> None:
+        with self._changed:
+            self.closed = True
+            self._changed.notify_all()
+
+    def create_exec(self, container: FakeContainer, config: dict) -> FakeExec:
+        exec_id = hashlib.sha256(os.urandom(16)).hexdigest()
+        instance = FakeExec(
+            exec_id, container, list(config.get("Cmd") or []), bool(config.get("Tty"))
+        )
+        size = config.get("ConsoleSize")
+        if size:
+            instance.rows, instance.cols = size
+        with self._lock:
+            self.execs[exec_id] = instance
+        return instance
+
+    @staticmethod
+    def run_process(
+        read: Any, write: Any, tty: bool, size: Any = lambda: (24, 80)
+    ) -> int:
+        """
+        Echo process of exec/attach sessions
+
+        Echoes stdin; the input lines "size" (prints "rows cols") and
+        "exit N" are commands. Output is raw with a TTY, else stdout frames.
+
+        Args:
+            read: Returns the next stdin bytes (b"": closed)
+            write: Writes output bytes
+            tty: Raw output instead of multiplexed frames
+            size: Returns the current (rows, cols)
+
+        Returns:
+            Exit code (0 when stdin closed)
+        """
+
+        def output(data: bytes) -> None:
+            write(data if tty else struct.pack(">BxxxI", 1, len(data)) + data)
+
+        line = b""
+        while data := read():
+            output(data)
+            line += data
+            while b"\n" in line:
+                command, _, line = line.partition(b"\n")
+                words = command.decode(errors="replace").split()
+                if words[:1] == ["size"]:
+                    rows, cols = size()
+                    output(f"{rows} {cols}\n".encode())
+                elif words[:1] == ["exit"]:
+                    return int(words[1]) if len(words) > 1 else 0
+        return 0
+
+    def write_log(self, container: FakeContainer, line: str, stream: int = 1) -> None:
+        """Log a line (stream 1: stdout, 2: stderr) after the synthetic ones"""
+        with self._changed:
+            last = container.started_at + self.log_lines - 1
+            if container.written_logs:
+                last = container.written_logs[-1][0]
+            # Strictly increasing times, like a real log
+            now = max(time.time(), last + 0.001)
+            container.written_logs.append((now, stream, line))
+            self._changed.notify_all()
+
+    def log_entries(self, container: FakeContainer) -> list[tuple[float, int, str]]:
+        """Synthetic lines (every 10th on stderr) and written ones, in order"""
+        start = container.started_at
+        entries = []
+        for n in range(self.log_lines):
+            if n % 10 == 9:
+                entries.append((start + n, 2, f"warning: slow upstream response ({n})"))
+            else:
+                line = f'10.0.0.{n % 250} - - "GET /items/{n} HTTP/1.1" 200 512'
+                entries.append((start + n, 1, line))
+        with self._lock:
+            return entries + container.written_logs
+
+    def wait_for_logs(
+        self, container: FakeContainer, count: int, timeout: float
+    ) -> None:
+        with self._changed:
+            if len(container.written_logs) <= count and not self.closed:
+                self._changed.wait(timeout)
+
+    def logs(
+        self,
+        container: FakeContainer,
+        tail: Optional[int],
+        timestamps: bool,
+        since: float = 0,
+    ) -> bytes:
+        """Multiplexed log stream (stdout and stderr frames)"""
+        entries = [e for e in self.log_entries(container) if e[0] > since]
+        if tail is not None:
+            entries = entries[len(entries) - min(tail, len(entries)) :]
+        return _log_frames(entries, timestamps)
+
+    def stats(self, container: FakeContainer) -> dict:
+        """One stats snapshot (cgroup v2 layout, deterministic per container)"""
+        seed = int(container.id[:8], 16)
+        cpus = 4
+        system = int(time.time() * 1e9) * cpus
+        usage = seed % 10**9 * 1000
+        cpu_share = (seed % 50 + 1) / 1000 if container.running else 0
+        memory = (seed % 256 + 16) * 1024 * 1024 if container.running else 0
+        return {
+            "read": _iso(time.time()),
+            "preread": _iso(time.time() - 1),
+            "name": f"/{container.name}",
+            "id": container.id,
+            "cpu_stats": {
+                "cpu_usage": {"total_usage": usage + int(1e9 * cpus * cpu_share)},
+                "system_cpu_usage": system,
+                "online_cpus": cpus,
+            },
+            "precpu_stats": {
+                "cpu_usage": {"total_usage": usage},
+                "system_cpu_usage": system - int(1e9 * cpus),
+                "online_cpus": cpus,
+            },
+            "memory_stats": {
+                "usage": memory + 4 * 1024 * 1024,
+                "limit": 2 * 1024**3,
+                "stats": {"inactive_file": 4 * 1024 * 1024},
+            },
+            "networks": {
+                "eth0": {"rx_bytes": seed % 10**6, "tx_bytes": seed % 10**5},
+            },
+            "blkio_stats": {
+                "io_service_bytes_recursive": [
+                    {"major": 8, "minor": 0, "op": "read", "value": seed % 10**7},
+                    {"major": 8, "minor": 0, "op": "write", "value": seed % 10**6},
+                ]
+            },
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Engine API request handler"""
+
+    protocol_version = "HTTP/1.1"
+    server: "_UnixServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # Quiet (the benchmark output is the interesting part)
+
+    def address_string(self) -> str:
+        return "unix"
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def do_HEAD(self) -> None:
+        self._dispatch("HEAD")
+
+    def _dispatch(self, method: str) -> None:
+        daemon = self.server.fake
+        parts = urlsplit(self.path)
+        path = _VERSION_PREFIX.sub("", parts.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        daemon.requests.append((method, path))
+
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            self.body = self._read_chunked()
+
+        if daemon.latency_ms:
+            time.sleep(daemon.latency_ms / 1000)
+
+        if path == "/_ping":
+            self._send(200, b"OK", "text/plain; charset=utf-8")
+        elif path == "/version":
+            self._json(
+                200,
+                {"Version": "24.0.0-fake", "ApiVersion": API_VERSION, "Os": "linux"},
+            )
+        elif path == "/containers/json" and method == "GET":
+            filters = json.loads(query.get("filters") or "{}")
+            self._json(
+                200,
+                daemon.list_containers(_flag(query.get("all")), filters.get("label")),
+            )
+        elif path == "/containers/create" and method == "POST":
+            container = daemon.create_container(json.loads(self.body or b"{}"))
+            self._json(201, {"Id": container.id, "Warnings": []})
+        elif path == "/volumes" and method == "GET":
+            volumes = [v.summary() for v in list(daemon.volumes.values())]
+            self._json(200, {"Volumes": volumes, "Warnings": []})
+        elif path == "/events" and method == "GET":
+            self._events(query)
+        elif _EXEC_PATH.match(path):
+            match = _EXEC_PATH.match(path)
+            assert match is not None
+            self._exec(method, match.group(1), match.group(2), query)
+        else:
+            match = _CONTAINER_PATH.match(path)
+            if match is None:
+                self._error(404, f"page not found: {path}")
+                return
+            self._container(method, unquote(match.group(1)), match.group(2), query)
+
+    def _container(
+        self, method: str, ref: str, action: Optional[str], query: dict[str, str]
+    ) -> None:
+        daemon = self.server.fake
+        container = daemon.find(ref)
+        if container is None:
+            self._error(404, f"No such container: {ref}")
+            return
+
+        if method == "GET" and action == "json":
+            self._json(200, container.inspect())
+        elif method == "GET" and action == "logs":
+            tail = query.get("tail", "all")
+            if _flag(query.get("follow")):
+                self._follow_logs(container, query)
+                return
+            body = daemon.logs(
+                container,
+                None if tail == "all" else int(tail),
+                _flag(query.get("timestamps")),
+                float(query.get("since") or 0),
+            )
+            self._send(200, body, "application/vnd.docker.raw-stream")
+        elif method == "GET" and action == "stats":
+            self._json(200, daemon.stats(container))
+        elif method == "POST" and action in ("start", "stop"):
+            changed = daemon.set_running(container, action == "start")
+            helper = container.labels.get(HELPER_LABEL)
+            if action == "start" and helper and container.command:
+                # Helper script: acts on its volume, then exits
+                for volume in container.mounts.values():
+                    daemon.volumes[volume].run_helper(helper)
+                daemon.set_running(container, False)
+            self._send(204 if changed else 304, b"")
+        elif method == "POST" and action in ("pause", "unpause"):
+            error = daemon.set_paused(container, action == "pause")
+            if error:
+                self._error(409, error)
+                return
+            self._send(204, b"")
+        elif method == "POST" and action == "wait":
+            self._json(200, {"StatusCode": container.exit_code})
+        elif method == "POST" and action == "restart":
+            daemon.restart(container)
+            self._send(204, b"")
+        elif method == "POST" and action == "exec":
+            if not container.running:
+                self._error(409, f"Container {container.id} is not running")
+                return
+            instance = daemon.create_exec(container, json.loads(self.body or b"{}"))
+            self._json(201, {"Id": instance.id})
+        elif method == "POST" and action == "attach":
+            if not container.running:
+                self._error(409, "You cannot attach to a stopped container")
+                return
+            self._upgrade()
+            daemon.run_process(self._read_stdin, self.wfile.write, tty=False)
+            self.close_connection = True
+        elif method == "POST" and action == "resize":
+            self._send(200, b"")
+        elif method == "GET" and action == "archive":
+            mount = query.get("path", "").rstrip(".").rstrip("/")
+            source = daemon.volumes.get(container.mounts.get(mount, ""))
+            if source is None:
+                self._error(404, f"Could not find the file {query.get('path')}")
+                return
+            self._send(200, source.archive(), "application/x-tar")
+        elif method == "PUT" and action == "archive":
+            target = query.get("path", "")
+            for mount, name in container.mounts.items():
+                if target == mount or target.startswith(f"{mount}/"):
+                    relative = target[len(mount) :].strip("/")
+                    daemon.volumes[name].extract(self.body, relative)
+                    self._send(200, b"")
+                    return
+            self._error(404, f"Could not find the file {target}")
+        elif method == "DELETE" and action is None:
+            if container.running and not _flag(query.get("force")):
+                self._error(
+                    409,
+                    f'cannot remove container "/{container.name}": container is '
+                    "running: stop the container before removing or force remove",
+                )
+                return
+            daemon.remove(container)
+            self._send(204, b"")
+        else:
+            self._error(404, f"page not found: {self.path}")
+
+    def _exec(
+        self, method: str, exec_id: str, action: str, query: dict[str, str]
+    ) -> None:
+        instance = self.server.fake.execs.get(exec_id)
+        if instance is None:
+            self._error(404, f"No such exec instance: {exec_id}")
+        elif method == "GET" and action == "json":
+            self._json(200, instance.inspect())
+        elif method == "POST" and action == "resize":
+            instance.rows, instance.cols = int(query["h"]), int(query["w"])
+            self._send(201, b"")
+        elif method == "POST" and action == "start":
+            instance.running = True
+            self._upgrade()
+            try:
+                instance.exit_code = self.server.fake.run_process(
+                    self._read_stdin,
+                    self.wfile.write,
+                    instance.tty,
+                    lambda: (instance.rows, instance.cols),
+                )
+            except (BrokenPipeError, ConnectionResetError):
+                instance.exit_code = 129
+            instance.running = False
+            self.close_connection = True
+        else:
+            self._error(404, f"page not found: {self.path}")
+
+    def _upgrade(self) -> None:
+        """Answer 101 and switch the connection to a raw stream"""
+        self.send_response(101, "UPGRADED")
+        self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Upgrade", "tcp")
+        self.end_headers()
+
+    def _read_chunked(self) -> bytes:
+        """Request body sent with Transfer-Encoding: chunked"""
+        body = bytearray()
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            if size == 0:
+                self.rfile.readline()  # Empty trailer
+                return bytes(body)
+            body += self.rfile.read(size)
+            self.rfile.readline()  # CRLF after the chunk
+
+    def _read_stdin(self) -> bytes:
+        try:
+            # rfile is buffered (StreamRequestHandler.rbufsize): what's available
+            return cast(io.BufferedReader, self.rfile).read1(4096)
+        except (ConnectionResetError, OSError):
+            return b""
+
+    def _events(self, query: dict[str, str]) -> None:
+        """Stream events as JSON lines (chunked) until `until` or disconnect"""
+        daemon = self.server.fake
+        now = time.time()
+        since = float(query.get("since", now))
+        until = float(query["until"]) if "until" in query else None
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        index = 0
+        try:
+            while True:
+                events, index = daemon.events_after(index, since, until or float("inf"))
+                for event in events:
+                    line = json.dumps(event).encode() + b"\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+                if daemon.closed or (until is not None and time.time() >= until):
+                    break
+                daemon.wait_for_events(index, timeout=0.5)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+    def _follow_logs(self, container: FakeContainer, query: dict[str, str]) -> None:
+        """Stream log frames (chunked) until the container stops or is removed"""
+        daemon = self.server.fake
+        since = float(query.get("since") or 0)
+        timestamps = _flag(query.get("timestamps"))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        try:
+            entries = daemon.log_entries(container)
+            written = len(entries) - daemon.log_lines
+            while True:
+                frames = _log_frames([e for e in entries if e[0] > since], timestamps)
+                if frames:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(frames), frames))
+                    self.wfile.flush()
+                gone = daemon.find(container.id) is None
+                if daemon.closed or gone or not container.running:
+                    break
+                daemon.wait_for_logs(container, written, timeout=0.5)
+                with daemon._lock:
+                    entries = container.written_logs[written:]
+                written += len(entries)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+    def _json(self, status: int, data: Any) -> None:
+        self._send(status, json.dumps(data).encode(), "application/json")
+
+    def _error(self, status: int, message: str) -> None:
+        self._json(status, {"message": message})
+
+    def _send(self, status: int, body: bytes, content_type: str = "") -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Api-Version", API_VERSION)
+        if status not in (204, 304):
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and status not in (204, 304) and self.command != "HEAD":
+            self.wfile.write(body)
+
+
+def _log_frames(entries: list[tuple[float, int, str]], timestamps: bool) -> bytes:
+    """Multiplexed frames of log lines, one per line"""
+    frames = bytearray()
+    for ts, stream, line in entries:
+        if timestamps:
+            line = f"{_iso(ts)} {line}"
+        payload = (line + "\n").encode()
+        frames += struct.pack(">BxxxI", stream, len(payload)) + payload
+    return bytes(frames)
+
+
+def _labels_match(labels: dict[str, str], wanted: list[tuple[str, str, str]]) -> bool:
+    """Label filters ("key" or "key=value", partitioned) all match"""
+    for key, equals, value in wanted:
+        if key not in labels or (equals and labels[key] != value):
+            return False
+    return True
+
+
+def _flag(value: Optional[str]) -> bool:
+    return (value or "").lower() in ("1", "true", "yes")
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Like dockerd (SOMAXCONN): concurrent clients aren't refused
+    request_queue_size = 128
+    fake: FakeDockerDaemon
+
+
+class FakeDockerServer:
+    """
+    Fake daemon listening on a unix socket (in a background thread)
+
+    Args:
+        socket_path: Socket path (default: in a new temporary directory)
+        containers: Number of synthetic containers (incl. system containers)
+        latency_ms: Added delay per request
+        log_lines: Log lines per container
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        containers: int = 100,
+        latency_ms: float = 0,
+        log_lines: int = 500,
+    ):
+        self._tmp_dir: Optional[str] = None
+        if socket_path is None:
+            self._tmp_dir = tempfile.mkdtemp(prefix="docklite-fake-docker-")
+            socket_path = os.path.join(self._tmp_dir, "docker.sock")
+        self.socket_path = socket_path
+        self.daemon = FakeDockerDaemon(containers, latency_ms, log_lines)
+        self._server: Optional[_UnixServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "FakeDockerServer":
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = _UnixServer(self.socket_path, _Handler)
+        self._server.fake = self.daemon
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.1},
+            name="fake-docker",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.daemon.close()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def __enter__(self) -> "FakeDockerServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.fake_docker",
+        description="Serve a fake Docker Engine API on a unix socket",
+    )
+    parser.add_argument(
+        "--socket",
+        default=str(Path(tempfile.gettempdir()) / "docklite-fake-docker.sock"),
+        help="Socket path",
+    )
+    parser.add_argument("--containers", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--log-lines", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    server = FakeDockerServer(
+        args.socket, args.containers, args.latency_ms, args.log_lines
+    )
+    server.start()
+    print(
+        f"Fake Docker daemon with {args.containers} containers on {args.socket}\n"
+        f"Run the backend with DOCKER_API_SOCKET={args.socket}",
+        flush=True,
+    )
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,409 @@
+"""
+Benchmark harness
+
+Benchmarks are registered with @benchmark and are factories: they do their
+setup (seed the DB, build inputs) using a fresh BenchContext and return the
+callable to time. The runner warms it up, times a fixed number of
+iterations and compares the median against a JSON baseline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncGenerator, Callable, Optional
+
+from httpx import AsyncClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import settings
+from app.core.database import Base, get_db
+from app.main import app
+from app.models.project import Project
+from app.models.user import User
+from app.services.auth_service import AuthService
+from benchmarks.fake_docker import FakeDockerServer
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+# Median slower than baseline by more than this fraction = regression
+DEFAULT_THRESHOLD = 0.3
+
+ADMIN_USERNAME = "benchadmin"
+ADMIN_PASSWORD = "benchpass123"
+
+SMALL_COMPOSE = """services:
+  web:
+    image: nginx:alpine
+    expose:
+      - "80"
+"""
+
+
+def large_compose(services: int = 200) -> str:
+    """Compose file with many services (env, volumes, healthchecks)"""
+    blocks = ["services:"]
+    for i in range(services):
+        blocks.append(
+            f"""  svc{i}:
+    image: registry.example.com/team/app-{i}:1.{i}
+    environment:
+      - APP_NAME=svc{i}
+      - LOG_LEVEL=info
+      - DATABASE_URL=postgres://db:5432/app{i}
+    volumes:
+      - ./data/svc{i}:/var/lib/app
+    expose:
+      - "{8000 + i}"
+    healthcheck:
+      test: ["CMD", "curl", "-f", "http://localhost:{8000 + i}/health"]
+      interval: 30s"""
+        )
+    return "\n".join(blocks) + "\n"
+
+
+@dataclass
+class BenchmarkCase:
+    """Registered benchmark (one per parameter value)"""
+
+    name: str
+    factory: Callable[..., Any]
+    iterations: int
+    warmup: int
+    param: Any = None
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing summary of one benchmark case (milliseconds)"""
+
+    name: str
+    iterations: int
+    min_ms: float
+    median_ms: float
+    mean_ms: float
+    p95_ms: float
+    max_ms: float
+    ops_per_sec: float
+    baseline_median_ms: Optional[float] = None
+    regression: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "iterations": self.iterations,
+            "min_ms": self.min_ms,
+            "median_ms": self.median_ms,
+            "mean_ms": self.mean_ms,
+            "p95_ms": self.p95_ms,
+            "max_ms": self.max_ms,
+            "ops_per_sec": self.ops_per_sec,
+        }
+
+
+REGISTRY: list[BenchmarkCase] = []
+
+
+def benchmark(
+    name: str,
+    iterations: int = 50,
+    warmup: int = 3,
+    params: Optional[list[Any]] = None,
+) -> Callable:
+    """
+    Register a benchmark factory
+
+    Args:
+        name: Benchmark name (parametrized cases get "[param]" appended)
+        iterations: Timed iterations
+        warmup: Untimed iterations before timing
+        params: Run the factory once per value (passed as second argument)
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(factory: Callable) -> Callable:
+        for param in params if params is not None else [None]:
+            case_name = name if param is None else f"{name}[{param}]"
+            REGISTRY.append(
+                BenchmarkCase(case_name, factory, iterations, warmup, param)
+            )
+        return factory
+
+    return decorator
+
+
+class BenchContext:
+    """
+    Isolated app environment for one benchmark case
+
+    Uses a temporary SQLite file DB and PROJECTS_DIR, with the app's get_db
+    dependency pointed at it (same approach as the test suite).
+    """
+
+    def __init__(self) -> None:
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="docklite-bench-"))
+        self.engine = create_async_engine(
+            f"sqlite+aiosqlite:///{self.tmp_dir / 'bench.db'}"
+        )
+        self.session_factory = async_sessionmaker(
+            self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+        self._client: Optional[AsyncClient] = None
+        self._original_projects_dir = settings.PROJECTS_DIR
+        self._original_docker_socket = settings.DOCKER_API_SOCKET
+        self._docker: Optional[FakeDockerServer] = None
+        self.admin_id: Optional[int] = None
+        self.admin_token: Optional[str] = None
+
+    async def start(self) -> None:
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+            async with self.session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        settings.PROJECTS_DIR = str(self.tmp_dir / "projects")
+
+        # Admin user (one bcrypt hash per case)
+        async with self.session_factory() as session:
+            admin = User(
+                username=ADMIN_USERNAME,
+                email="bench@example.com",
+                password_hash=AuthService.get_password_hash(ADMIN_PASSWORD),
+                is_active=1,
+                is_admin=1,
+            )
+            session.add(admin)
+            await session.commit()
+            self.admin_id = int(admin.id)
+        self.admin_token = AuthService.create_access_token({"sub": ADMIN_USERNAME})
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        if self._docker is not None:
+            self._docker.stop()
+        app.dependency_overrides.pop(get_db, None)
+        settings.PROJECTS_DIR = self._original_projects_dir
+        settings.DOCKER_API_SOCKET = self._original_docker_socket
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def client(self) -> AsyncClient:
+        """In-process HTTP client for the app"""
+        if self._client is None:
+            self._client = AsyncClient(app=app, base_url="http://bench")
+        return self._client
+
+    @property
+    def auth_headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.admin_token}"}
+
+    def fake_docker(self, containers: int, latency_ms: float = 0) -> FakeDockerServer:
+        """Start a fake Docker daemon and point DockerService at it"""
+        self._docker = FakeDockerServer(containers=containers, latency_ms=latency_ms)
+        self._docker.start()
+        settings.DOCKER_API_SOCKET = self._docker.socket_path
+        return self._docker
+
+    async def seed_projects(self, count: int, compose: str = SMALL_COMPOSE) -> None:
+        """Bulk insert projects owned by the admin user"""
+        rows = [
+            {
+                "name": f"project-{i}",
+                "domain": f"project-{i}.bench.local",
+                "slug": f"project-{i}-bench-local-{i}",
+                "owner_id": self.admin_id,
+                "compose_content": compose,
+                "env_vars": '{"APP_ENV": "production"}',
+                "status": "created",
+            }
+            for i in range(count)
+        ]
+        async with self.session_factory() as session:
+            for start in range(0, len(rows), 1000):
+                await session.execute(insert(Project), rows[start : start + 1000])
+            await session.commit()
+
+
+async def _time_case(case: BenchmarkCase) -> list[float]:
+    """Set up a case, then time its iterations (seconds)"""
+    ctx = BenchContext()
+    await ctx.start()
+    try:
+        args = [ctx] if case.param is None else [ctx, case.param]
+        run = case.factory(*args)
+        if inspect.isawaitable(run):
+            run = await run
+        is_async = inspect.iscoroutinefunction(run)
+
+        async def call() -> None:
+            if is_async:
+                await run()
+            else:
+                run()
+
+        for _ in range(case.warmup):
+            await call()
+
+        timings = []
+        for _ in range(case.iterations):
+            start = time.perf_counter()
+            await call()
+            timings.append(time.perf_counter() - start)
+        return timings
+    finally:
+        await ctx.close()
+
+
+def summarize(name: str, timings: list[float]) -> BenchmarkResult:
+    """Compute timing statistics"""
+    ordered = sorted(timings)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    median = statistics.median(ordered)
+    return BenchmarkResult(
+        name=name,
+        iterations=len(ordered),
+        min_ms=round(ordered[0] * 1000, 3),
+        median_ms=round(median * 1000, 3),
+        mean_ms=round(statistics.fmean(ordered) * 1000, 3),
+        p95_ms=round(ordered[p95_index] * 1000, 3),
+        max_ms=round(ordered[-1] * 1000, 3),
+        ops_per_sec=round(1 / median, 1) if median > 0 else 0.0,
+    )
+
+
+def load_baseline(path: Path) -> dict[str, dict]:
+    """Load baseline results (empty when missing)"""
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text())
+    results: dict[str, dict] = data.get("results", {})
+    return results
+
+
+def load_threshold(path: Path) -> float:
+    """Regression threshold recorded in the baseline (or the default)"""
+    if not path.exists():
+        return DEFAULT_THRESHOLD
+    return float(json.loads(path.read_text()).get("threshold", DEFAULT_THRESHOLD))
+
+
+def compare(
+    results: list[BenchmarkResult], baseline: dict[str, dict], threshold: float
+) -> list[BenchmarkResult]:
+    """
+    Mark results whose median regressed beyond the threshold
+
+    Args:
+        results: Current results
+        baseline: Baseline results by name
+        threshold: Allowed slowdown fraction (0.25 = 25%)
+
+    Returns:
+        Regressed results
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if not base:
+            continue
+        result.baseline_median_ms = base["median_ms"]
+        if result.median_ms > base["median_ms"] * (1 + threshold):
+            result.regression = True
+            regressions.append(result)
+    return regressions
+
+
+def write_results(
+    path: Path, results: list[BenchmarkResult], threshold: float
+) -> None:
+    """Write results in the baseline file format"""
+    data = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.machine(),
+        },
+        "threshold": threshold,
+        "results": {r.name: r.to_dict() for r in results},
+    }
+    path.write_text(json.dumps(data, indent=2, sort_keys=False) + "\n")
+
+
+def run_benchmarks(
+    selected: list[BenchmarkCase],
+    report: Callable[[BenchmarkResult], None] = lambda result: None,
+) -> list[BenchmarkResult]:
+    """
+    Run benchmark cases sequentially
+
+    Args:
+        selected: Cases to run
+        report: Called with each result as it completes
+
+    Returns:
+        Results in run order
+    """
+
+    async def main() -> list[BenchmarkResult]:
+        results = []
+        for case in selected:
+            result = summarize(case.name, await _time_case(case))
+            report(result)
+            results.append(result)
+        return results
+
+    return asyncio.run(main())
+
+
+@dataclass
+class RunOptions:
+    """Command line options"""
+
+    filters: list[str] = field(default_factory=list)
+    baseline: Path = DEFAULT_BASELINE
+    threshold: Optional[float] = None  # None: from the baseline file
+    output: Optional[Path] = None
+    save_baseline: bool = False
+    quick: bool = False
+
+
+def select_cases(options: RunOptions) -> list[BenchmarkCase]:
+    """Filter registered cases by name substrings (and --quick)"""
+    cases = [
+        case
+        for case in REGISTRY
+        if not options.filters or any(f in case.name for f in options.filters)
+    ]
+    if options.quick:
+        cases = [
+            BenchmarkCase(
+                c.name,
+                c.factory,
+                max(1, c.iterations // 5),
+                min(c.warmup, 1),
+                c.param,
+            )
+            for c in cases
+        ]
+    return cases
+
@@ -0,0 +1,545 @@
+"""
+Dashboard load test
+
+Replays the DockLite dashboard traffic mix against a running app and
+reports throughput and latency percentiles per endpoint:
+
+- tabs: open dashboard tabs polling /api/containers and /api/projects
+- logins: login storm (bcrypt-bound POST /api/auth/login)
+- forward-auth: Traefik ForwardAuth bursts (GET /api/auth/verify-admin
+  with the browser's cookie, one request per asset of a dashboard page)
+- editors: env var edits (PUT /api/projects/{id}/env)
+
+By default the app is started locally with uvicorn (--workers N) on a
+temporary SQLite DB and projects dir, with DockerService pointed at the
+fake Docker daemon, so no Docker is needed:
+
+    python -m benchmarks.loadtest --duration 30 --workers 2 --tabs 50
+
+Use --url (with --username/--password of an admin) to load an already
+running instance instead; test users and projects are created there.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import secrets
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from benchmarks.fake_docker import FakeDockerServer
+from benchmarks.harness import BENCHMARKS_DIR, SMALL_COMPOSE
+
+BACKEND_DIR = BENCHMARKS_DIR.parent
+USER_PASSWORD = "loadtest-pass-123"
+
+# Seconds to wait for a locally started app to answer /health
+STARTUP_TIMEOUT = 60
+
+
+@dataclass
+class LoadTestOptions:
+    """Load test parameters"""
+
+    url: Optional[str] = None  # None: start the app locally
+    username: str = "loadadmin"
+    password: str = "loadadmin-pass-123"
+    workers: int = 1
+    duration: float = 30
+    tabs: int = 20
+    poll_interval: float = 2.0
+    logins: int = 2
+    forward_auth: int = 5
+    burst_size: int = 20
+    editors: int = 2
+    users: int = 5
+    projects: int = 50
+    containers: int = 1000
+    docker_latency_ms: float = 0
+    output: Optional[Path] = None
+
+
+class LatencyRecorder:
+    """Per-endpoint latencies (seconds) and error counts"""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    async def request(
+        self,
+        client: httpx.AsyncClient,
+        name: str,
+        method: str,
+        url: str,
+        expected: tuple[int, ...] = (200,),
+        **kwargs: Any,
+    ) -> Optional[httpx.Response]:
+        """Send a request, recording its latency under `name`"""
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            self.latencies[name].append(time.perf_counter() - start)
+            return None
+        self.latencies[name].append(time.perf_counter() - start)
+        if response.status_code not in expected:
+            self.errors[name] += 1
+        return response
+
+    def report(self, elapsed: float) -> list[dict]:
+        """Throughput and latency percentiles (ms) per endpoint, plus a total"""
+        rows = []
+        everything: list[float] = []
+        for name in sorted(self.latencies):
+            samples = self.latencies[name]
+            everything.extend(samples)
+            rows.append(self._row(name, samples, self.errors[name], elapsed))
+        rows.append(self._row("total", everything, sum(self.errors.values()), elapsed))
+        return rows
+
+    @staticmethod
+    def _row(name: str, samples: list[float], errors: int, elapsed: float) -> dict:
+        ordered = sorted(samples)
+        return {
+            "endpoint": name,
+            "requests": len(ordered),
+            "errors": errors,
+            "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": percentile(ordered, 50),
+            "p90_ms": percentile(ordered, 90),
+            "p99_ms": percentile(ordered, 99),
+            "max_ms": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+        }
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted latencies, in milliseconds"""
+    if not ordered:
+        return 0.0
+    rank = min(len(ordered), max(1, math.ceil(pct / 100 * len(ordered))))
+    return round(ordered[rank - 1] * 1000, 1)
+
+
+class LocalApp:
+    """
+    App started with uvicorn on a temporary DB, projects dir and fake Docker
+
+    The schema is created before the workers start, so they don't race on
+    create_all.
+    """
+
+    def __init__(self, options: LoadTestOptions):
+        self.options = options
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix="docklite-loadtest-"))
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.docker = FakeDockerServer(
+            str(self.tmp_dir / "docker.sock"),
+            containers=options.containers,
+            latency_ms=options.docker_latency_ms,
+        )
+        self._process: Optional[subprocess.Popen] = None
+
+    def start(self) -> None:
+        db_path = self.tmp_dir / "docklite.db"
+        self._create_schema(db_path)
+        self.docker.start()
+
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
+            "PROJECTS_DIR": str(self.tmp_dir / "projects"),
+            "TRAEFIK_DYNAMIC_CONFIG_DIR": str(self.tmp_dir / "traefik"),
+            "DOCKER_API_SOCKET": self.docker.socket_path,
+            "SECRET_KEY": secrets.token_hex(32),
+            "LOG_LEVEL": "WARNING",
+            "ACCESS_LOG_ENABLED": "false",
+        }
+        self._process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app.main:app",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(self.port),
+                "--workers",
+                str(self.options.workers),
+                "--no-access-log",
+                "--log-level",
+                "warning",
+            ],
+            cwd=BACKEND_DIR,
+            env=env,
+        )
+        self._wait_ready()
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        self.docker.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _create_schema(db_path: Path) -> None:
+        from sqlalchemy import create_engine
+
+        from app.core.database import Base
+        from app.models import project, user  # noqa: F401 (register tables)
+
+        engine = create_engine(f"sqlite:///{db_path}")
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+    def _wait_ready(self) -> None:
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self._process is not None and self._process.poll() is not None:
+                raise RuntimeError("App exited during startup")
+            try:
+                if httpx.get(f"{self.url}/health", timeout=1).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"App did not start within {STARTUP_TIMEOUT}s")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+class DashboardLoad:
+    """Seeds test data and runs the traffic mix"""
+
+    def __init__(self, client: httpx.AsyncClient, options: LoadTestOptions):
+        self.client = client
+        self.options = options
+        self.recorder = LatencyRecorder()
+        self.admin_token = ""
+        self.usernames: list[str] = []
+        self.project_ids: list[int] = []
+        self._prefix = f"lt{secrets.token_hex(3)}"
+        self._deadline = 0.0
+
+    async def seed(self) -> None:
+        """Log in as admin (creating it on a fresh instance), add users/projects"""
+        options = self.options
+        setup = await self.client.get("/api/auth/setup/check")
+        if setup.json().get("setup_needed"):
+            response = await self.client.post(
+                "/api/auth/setup",
+                json={"username": options.username, "password": options.password},
+            )
+        else:
+            response = await self.client.post(
+                "/api/auth/login",
+                json={"username": options.username, "password": options.password},
+            )
+        response.raise_for_status()
+        self.admin_token = response.json()["access_token"]
+        headers = self._auth(self.admin_token)
+
+        for i in range(options.users):
+            username = f"{self._prefix}-user{i}"
+            response = await self.client.post(
+                "/api/users",
+                json={"username": username, "password": USER_PASSWORD},
+                headers=headers,
+            )
+            response.raise_for_status()
+            self.usernames.append(username)
+
+        for i in range(options.projects):
+            response = await self.client.post(
+                "/api/projects",
+                json={
+                    "name": f"{self._prefix}-project{i}",
+                    "domain": f"{self._prefix}-project{i}.loadtest.local",
+                    "compose_content": SMALL_COMPOSE,
+                    "env_vars": {"APP_ENV": "production"},
+                },
+                headers=headers,
+            )
+            response.raise_for_status()
+            self.project_ids.append(int(response.json()["id"]))
+
+    async def run(self) -> float:
+        """Run all scenarios for the configured duration; returns elapsed seconds"""
+        options = self.options
+        self._deadline = time.monotonic() + options.duration
+        scenarios = (
+            [self._tab(i) for i in range(options.tabs)]
+            + [self._login_storm() for _ in range(options.logins)]
+            + [self._forward_auth() for _ in range(options.forward_auth)]
+            + [self._editor() for _ in range(options.editors)]
+        )
+        start = time.perf_counter()
+        await asyncio.gather(*scenarios)
+        return time.perf_counter() - start
+
+    def _running(self) -> bool:
+        return time.monotonic() < self._deadline
+
+    async def _sleep(self, seconds: float) -> None:
+        await asyncio.sleep(max(0.0, min(seconds, self._deadline - time.monotonic())))
+
+    @staticmethod
+    def _auth(token: str) -> dict[str, str]:
+        return {"Authorization": f"Bearer {token}"}
+
+    async def _tab(self, index: int) -> None:
+        """Dashboard tab: poll containers and projects (staggered start)"""
+        headers = self._auth(self.admin_token)
+        interval = self.options.poll_interval
+        await self._sleep(interval * index / max(1, self.options.tabs))
+        while self._running():
+            started = time.monotonic()
+            await asyncio.gather(
+                self.recorder.request(
+                    self.client,
+                    "GET /api/containers",
+                    "GET",
+                    "/api/containers",
+                    headers=headers,
+                ),
+                self.recorder.request(
+                    self.client,
+                    "GET /api/projects",
+                    "GET",
+                    "/api/projects",
+                    headers=headers,
+                ),
+            )
+            await self._sleep(interval - (time.monotonic() - started))
+
+    async def _login_storm(self) -> None:
+        """Back-to-back logins of the test users"""
+        while self._running():
+            username = random.choice(self.usernames or [self.options.username])
+            password = USER_PASSWORD if self.usernames else self.options.password
+            await self.recorder.request(
+                self.client,
+                "POST /api/auth/login",
+                "POST",
+                "/api/auth/login",
+                json={"username": username, "password": password},
+            )
+
+    async def _forward_auth(self) -> None:
+        """Bursts of concurrent ForwardAuth checks, one page load per second"""
+        # Traefik forwards the browser's cookie header
+        headers = {"Cookie": f"token={self.admin_token}"}
+        while self._running():
+            started = time.monotonic()
+            await asyncio.gather(
+                *(
+                    self.recorder.request(
+                        self.client,
+                        "GET /api/auth/verify-admin",
+                        "GET",
+                        "/api/auth/verify-admin",
+                        headers=headers,
+                    )
+                    for _ in range(self.options.burst_size)
+                )
+            )
+            await self._sleep(1.0 - (time.monotonic() - started))
+
+    async def _editor(self) -> None:
+        """Env var edits on random projects (a few per second)"""
+        headers = self._auth(self.admin_token)
+        edit = 0
+        while self._running() and self.project_ids:
+            edit += 1
+            project_id = random.choice(self.project_ids)
+            await self.recorder.request(
+                self.client,
+                "PUT /api/projects/{id}/env",
+                "PUT",
+                f"/api/projects/{project_id}/env",
+                json={"APP_ENV": "production", "RELEASE": str(edit)},
+                headers=headers,
+            )
+            await self._sleep(0.25)
+
+
+async def run_load_test(options: LoadTestOptions, base_url: str) -> dict:
+    """
+    Seed data and run the traffic mix against an app
+
+    Args:
+        options: Load test parameters
+        base_url: App URL
+
+    Returns:
+        Report: {"options": ..., "duration_s": ..., "results": [rows]}
+    """
+    concurrency = (
+        options.tabs * 2
+        + options.logins
+        + options.forward_auth * options.burst_size
+        + options.editors
+    )
+    limits = httpx.Limits(max_connections=concurrency + 10)
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=60, limits=limits
+    ) as client:
+        load = DashboardLoad(client, options)
+        await load.seed()
+        elapsed = await load.run()
+
+    return {
+        "options": {
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in vars(options).items()
+            if key != "password"
+        },
+        "duration_s": round(elapsed, 1),
+        "results": load.recorder.report(elapsed),
+    }
+
+
+def print_report(report: dict) -> None:
+    header = (
+        f"{'endpoint':<30} {'requests':>9} {'errors':>7} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    print(header)
+    for row in report["results"]:
+        if row["endpoint"] == "total":
+            print("-" * len(header))
+        print(
+            f"{row['endpoint']:<30} {row['requests']:>9} {row['errors']:>7} "
+            f"{row['rps']:>8.1f} {row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} "
+            f"{row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}"
+        )
+
+
+def parse_args(argv: list[str]) -> LoadTestOptions:
+    defaults = LoadTestOptions()
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.loadtest",
+        description="Replay dashboard traffic against DockLite",
+    )
+    parser.add_argument("--url", help="Load a running instance instead of a local app")
+    parser.add_argument("--username", default=defaults.username, help="Admin username")
+    parser.add_argument("--password", default=defaults.password, help="Admin password")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=defaults.workers,
+        help="uvicorn workers (local app)",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=defaults.duration, help="Seconds of load"
+    )
+    parser.add_argument(
+        "--tabs", type=int, default=defaults.tabs, help="Open dashboard tabs"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=defaults.poll_interval,
+        help="Seconds between dashboard polls per tab",
+    )
+    parser.add_argument(
+        "--logins", type=int, default=defaults.logins, help="Concurrent login loops"
+    )
+    parser.add_argument(
+        "--forward-auth",
+        type=int,
+        default=defaults.forward_auth,
+        help="Concurrent ForwardAuth page loaders",
+    )
+    parser.add_argument(
+        "--burst-size",
+        type=int,
+        default=defaults.burst_size,
+        help="ForwardAuth requests per page load",
+    )
+    parser.add_argument(
+        "--editors", type=int, default=defaults.editors, help="Concurrent env editors"
+    )
+    parser.add_argument(
+        "--users", type=int, default=defaults.users, help="Test users to create"
+    )
+    parser.add_argument(
+        "--projects", type=int, default=defaults.projects, help="Projects to create"
+    )
+    parser.add_argument(
+        "--containers",
+        type=int,
+        default=defaults.containers,
+        help="Fake Docker containers (local app)",
+    )
+    parser.add_argument(
+        "--docker-latency-ms",
+        type=float,
+        default=defaults.docker_latency_ms,
+        help="Fake Docker latency per API call (local app)",
+    )
+    parser.add_argument("--output", type=Path, help="Write the report JSON here")
+    args = parser.parse_args(argv)
+    return LoadTestOptions(**vars(args))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    options = parse_args(sys.argv[1:] if argv is None else argv)
+
+    app: Optional[LocalApp] = None
+    base_url = options.url
+    if base_url is None:
+        app = LocalApp(options)
+        print(
+            f"Starting app ({options.workers} worker(s), "
+            f"{options.containers} fake containers)...",
+            flush=True,
+        )
+        app.start()
+        base_url = app.url
+
+    try:
+        print(f"Loading {base_url} for {options.duration:g}s...", flush=True)
+        report = asyncio.run(run_load_test(options, base_url))
+    finally:
+        if app is not None:
+            app.stop()
+
+    print_report(report)
+    if options.output:
+        options.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Report written to {options.output}")
+    total = report["results"][-1]
+    # Non-zero when everything failed (e.g. wrong credentials or URL)
+    return 1 if total["requests"] and total["errors"] == total["requests"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
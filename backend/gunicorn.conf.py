@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration (production server, see Dockerfile)
+
+Uvicorn workers (uvloop + httptools from uvicorn[standard]), one per CPU
+by default. Workers are recycled after SERVER_MAX_REQUESTS requests
+(with jitter, so they don't restart together) and get
+SERVER_GRACEFUL_TIMEOUT seconds to finish in-flight requests. All values
+come from the environment via app.core.config.
+"""
+
+from app.core.config import settings
+from app.core.server import worker_count
+
+bind = f"{settings.API_HOST}:{settings.API_PORT}"
+workers = worker_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Connections
+backlog = settings.SERVER_BACKLOG
+keepalive = settings.SERVER_KEEPALIVE
+
+# Recycling and shutdown
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+# A worker whose event loop is blocked this long is restarted
+timeout = 120
+
+# Each worker imports the app itself (no shared fds/locks across fork)
+preload_app = False
+# Worker heartbeat files in memory (a slow disk can't stall heartbeats)
+worker_tmp_dir = "/dev/shm"
+
+# Access logs come from the app's AccessLogMiddleware
+accesslog = None
+errorlog = "-"
+loglevel = settings.LOG_LEVEL.lower()
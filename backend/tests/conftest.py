@@ -64,6 +64,14 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def lock_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep lock files, shared job records and profiles out of the working tree"""
+    path = tmp_path / "locks"
+    monkeypatch.setattr(settings, "LOCK_DIR", str(path))
+    return path
+
+
 @pytest.fixture(scope="function")
 def temp_projects_dir() -> Generator[str, None, None]:
     """Create temporary directory for test projects"""
@@ -78,6 +86,18 @@ def temp_projects_dir() -> Generator[str, None, None]:
     settings.PROJECTS_DIR = original_dir
 
 
+@pytest.fixture
+def fake_docker() -> Generator:
+    """Fake Docker daemon (100 containers), DockerService pointed at it"""
+    from benchmarks.fake_docker import FakeDockerServer
+
+    original_socket = settings.DOCKER_API_SOCKET
+    with FakeDockerServer(containers=100) as server:
+        settings.DOCKER_API_SOCKET = server.socket_path
+        yield server
+    settings.DOCKER_API_SOCKET = original_socket
+
+
 @pytest.fixture
 def sample_compose_content() -> str:
     """Sample valid docker-compose.yml content"""
@@ -0,0 +1,246 @@
+"""Tests for interactive container sessions (WebSocket exec/attach)."""
+
+import asyncio
+import json
+import struct
+from typing import Optional
+from urllib.parse import urlencode
+
+import pytest
+
+from app.api import containers
+from app.core.config import settings
+from app.main import app
+from app.services.exec_service import SessionSlots
+
+
+@pytest.fixture(autouse=True)
+def session_slots(tmp_path, monkeypatch) -> SessionSlots:
+    """Session slot lock files in a temporary directory"""
+    slots = SessionSlots(tmp_path)
+    monkeypatch.setattr(containers, "session_slots", slots)
+    return slots
+
+
+class WebSocketClient:
+    """Drives the app's ASGI WebSocket interface in the test's event loop"""
+
+    def __init__(self, path: str, token: Optional[str] = None, **params):
+        self.path = path
+        self.query = urlencode(params)
+        self.headers = [(b"host", b"test")]
+        if token:
+            self.headers.append((b"authorization", f"Bearer {token}".encode()))
+        self._to_app: asyncio.Queue = asyncio.Queue()
+        self._from_app: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> dict:
+        """Open the connection; returns the accept or close message"""
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "path": self.path,
+            "raw_path": self.path.encode(),
+            "root_path": "",
+            "query_string": self.query.encode(),
+            "headers": self.headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("test", 80),
+            "subprotocols": [],
+        }
+        self._task = asyncio.create_task(
+            app(scope, self._to_app.get, self._from_app.put)
+        )
+        await self._to_app.put({"type": "websocket.connect"})
+        return await self.receive()
+
+    async def receive(self, timeout: float = 5) -> dict:
+        return await asyncio.wait_for(self._from_app.get(), timeout)
+
+    async def receive_output(self, until: bytes, timeout: float = 5) -> bytes:
+        """Collect binary frames until `until` was received"""
+        output = b""
+        while until not in output:
+            message = await self.receive(timeout)
+            assert message["type"] == "websocket.send", message
+            assert message.get("bytes") is not None, message
+            output += message["bytes"]
+        return output
+
+    async def send_bytes(self, data: bytes) -> None:
+        await self._to_app.put({"type": "websocket.receive", "bytes": data})
+
+    async def send_json(self, data: dict) -> None:
+        await self._to_app.put({"type": "websocket.receive", "text": json.dumps(data)})
+
+    async def disconnect(self) -> None:
+        await self._to_app.put({"type": "websocket.disconnect", "code": 1000})
+        if self._task is not None:
+            await asyncio.wait_for(self._task, 5)
+
+
+@pytest.mark.asyncio
+class TestExecSession:
+    """Tests for WS /api/containers/{id}/exec."""
+
+    async def test_requires_auth(self, client, fake_docker):
+        ws = WebSocketClient("/api/containers/project0_web_1/exec")
+
+        message = await ws.connect()
+
+        assert message["type"] == "websocket.close"
+        assert message["code"] == 1008
+
+    async def test_admin_only(self, client, user_token, fake_docker):
+        ws = WebSocketClient("/api/containers/project0_web_1/exec", user_token)
+
+        message = await ws.connect()
+
+        assert message == {
+            "type": "websocket.close",
+            "code": 1008,
+            "reason": "Admin access required",
+        }
+
+    async def test_cross_origin_rejected(self, client, admin_token, fake_docker):
+        ws = WebSocketClient("/api/containers/project0_web_1/exec", admin_token)
+        ws.headers.append((b"origin", b"https://evil.example"))
+
+        message = await ws.connect()
+
+        assert message["code"] == 1008
+
+    async def test_interactive_tty(self, client, admin_token, fake_docker):
+        """Input is relayed, resize applies, the exit code is reported."""
+        ws = WebSocketClient(
+            "/api/containers/project0_web_1/exec",
+            admin_token,
+            cmd="/bin/bash -l",
+            rows=30,
+            cols=100,
+        )
+        assert (await ws.connect())["type"] == "websocket.accept"
+
+        await ws.send_bytes(b"echo hi\n")
+        assert await ws.receive_output(b"echo hi\n") == b"echo hi\n"
+
+        await ws.send_bytes(b"size\n")
+        assert (await ws.receive_output(b"30 100\n")).endswith(b"30 100\n")
+
+        await ws.send_json({"type": "resize", "rows": 50, "cols": 120})
+        await asyncio.sleep(0.1)
+        await ws.send_bytes(b"size\n")
+        assert (await ws.receive_output(b"50 120\n")).endswith(b"50 120\n")
+
+        await ws.send_bytes(b"exit 3\n")
+        await ws.receive_output(b"exit 3\n")
+        assert json.loads((await ws.receive())["text"]) == {
+            "type": "exit",
+            "exit_code": 3,
+        }
+        assert (await ws.receive())["type"] == "websocket.close"
+        await ws.disconnect()
+
+        instance = next(iter(fake_docker.daemon.execs.values()))
+        assert instance.cmd == ["/bin/bash", "-l"]
+        assert instance.tty is True
+
+    async def test_multiplexed_output_without_tty(
+        self, client, admin_token, fake_docker
+    ):
+        """Without a TTY, stream frame headers are stripped."""
+        ws = WebSocketClient(
+            "/api/containers/project0_web_1/exec", admin_token, tty="false"
+        )
+        assert (await ws.connect())["type"] == "websocket.accept"
+
+        await ws.send_bytes(b"hello\n")
+
+        assert await ws.receive_output(b"hello\n") == b"hello\n"
+        await ws.disconnect()
+
+    async def test_invalid_control_message(self, client, admin_token, fake_docker):
+        ws = WebSocketClient("/api/containers/project0_web_1/exec", admin_token)
+        await ws.connect()
+
+        await ws.send_json({"type": "resize", "rows": 0, "cols": 80})
+
+        message = json.loads((await ws.receive())["text"])
+        assert message["type"] == "error"
+        await ws.disconnect()
+
+    async def test_docker_error_reported(self, client, admin_token, fake_docker):
+        """Stopped containers can't exec: the error is sent before closing."""
+        container = fake_docker.daemon.find("project0_web_1")
+        fake_docker.daemon.set_running(container, False)
+        ws = WebSocketClient("/api/containers/project0_web_1/exec", admin_token)
+
+        assert (await ws.connect())["type"] == "websocket.accept"
+        message = json.loads((await ws.receive())["text"])
+        closing = await ws.receive()
+
+        assert message["type"] == "error"
+        assert "is not running" in message["message"]
+        assert closing["code"] == 1011
+        await ws.disconnect()
+
+    async def test_session_cap(self, client, admin_token, fake_docker, monkeypatch):
+        """Sessions over EXEC_MAX_SESSIONS are refused until one ends."""
+        monkeypatch.setattr(settings, "EXEC_MAX_SESSIONS", 1)
+        first = WebSocketClient("/api/containers/project0_web_1/exec", admin_token)
+        assert (await first.connect())["type"] == "websocket.accept"
+
+        second = WebSocketClient("/api/containers/project0_web_1/exec", admin_token)
+        message = await second.connect()
+        assert message["type"] == "websocket.close"
+        assert message["code"] == 1013
+
+        await first.disconnect()
+        third = WebSocketClient("/api/containers/project0_web_1/exec", admin_token)
+        assert (await third.connect())["type"] == "websocket.accept"
+        await third.disconnect()
+
+    async def test_idle_timeout(self, client, admin_token, fake_docker, monkeypatch):
+        monkeypatch.setattr(settings, "EXEC_IDLE_TIMEOUT_SECONDS", 0.2)
+        ws = WebSocketClient("/api/containers/project0_web_1/exec", admin_token)
+        await ws.connect()
+
+        message = json.loads((await ws.receive())["text"])
+
+        assert message == {"type": "timeout"}
+        assert (await ws.receive())["type"] == "websocket.close"
+        await ws.disconnect()
+
+
+@pytest.mark.asyncio
+class TestAttachSession:
+    """Tests for WS /api/containers/{id}/attach."""
+
+    async def test_attach(self, client, admin_token, fake_docker):
+        ws = WebSocketClient("/api/containers/project0_web_1/attach", admin_token)
+        assert (await ws.connect())["type"] == "websocket.accept"
+
+        await ws.send_bytes(b"ping\n")
+
+        assert await ws.receive_output(b"ping\n") == b"ping\n"
+        await ws.disconnect()
+
+
+class TestStreamDemuxer:
+    """Tests for incremental demultiplexing."""
+
+    def test_frames_split_across_reads(self):
+        from app.services.docker_api import StreamDemuxer
+
+        frames = b"".join(
+            struct.pack(">BxxxI", stream, len(data)) + data
+            for stream, data in ((1, b"out\n"), (2, b"err\n"))
+        )
+        demuxer = StreamDemuxer()
+
+        output = [demuxer.feed(frames[i : i + 3]) for i in range(0, len(frames), 3)]
+
+        assert b"".join(output) == b"out\nerr\n"
+        assert output[0] == b""  # Incomplete header kept
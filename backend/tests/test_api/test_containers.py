@@ -45,6 +45,18 @@ class TestContainersAPI:
         assert data["containers"][0]["name"] == "test-container"
         assert data["containers"][0]["status"] == "running"
     
+    async def test_list_containers_fake_daemon(self, client: AsyncClient, admin_token, fake_docker):
+        """Test listing containers end-to-end against the fake Docker daemon."""
+        response = await client.get(
+            "/api/containers",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 100
+        assert {"docklite-backend", "project0_web_1"} <= {c["name"] for c in data["containers"]}
+    
     async def test_list_containers_without_auth(self, client: AsyncClient):
         """Test listing containers without authentication."""
         response = await client.get("/api/containers")
@@ -26,6 +26,8 @@ class TestProjectsCRUD:
         assert "traefik.http.routers" in compose_content
         assert "docklite-network" in compose_content
         assert "external: true" in compose_content
+        # Every service gets the log rotation policy
+        assert "max-size: 10m" in compose_content
         
         assert data["status"] == "created"
         assert "id" in data
@@ -216,12 +218,50 @@ class TestProjectsCRUD:
         # Delete
         response = await client.delete(f"/api/projects/{project_id}", headers=headers)
         
-        assert response.status_code == 204
+        assert response.status_code == 202
         
         # Verify it's gone
         get_response = await client.get(f"/api/projects/{project_id}", headers=headers)
         assert get_response.status_code == 404
     
+    async def test_delete_project_files_in_background(self, client: AsyncClient, sample_project_data, temp_projects_dir, auth_token):
+        """Test project files are removed by a pollable background job"""
+        from pathlib import Path
+        from app.services.job_service import job_manager
+        
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        create_response = await client.post("/api/projects", json=sample_project_data, headers=headers)
+        project = create_response.json()
+        project_dir = Path(temp_projects_dir) / project["slug"]
+        (project_dir / "node_modules" / "pkg").mkdir(parents=True)
+        (project_dir / "node_modules" / "pkg" / "index.js").write_text("x")
+        
+        response = await client.delete(f"/api/projects/{project['id']}", headers=headers)
+        job = response.json()
+        
+        assert response.headers["location"] == f"/api/jobs/{job['id']}"
+        assert job["kind"] == "delete_project_files"
+        assert job["target"] == project["slug"]
+        # Directory is detached right away, so the slug can be reused
+        assert not project_dir.exists()
+        
+        await job_manager.wait()
+        job_response = await client.get(f"/api/jobs/{job['id']}", headers=headers)
+        
+        assert job_response.status_code == 200
+        assert job_response.json()["status"] == "completed"
+        assert job_response.json()["finished_at"] is not None
+        assert list(Path(temp_projects_dir).iterdir()) == []
+    
+    async def test_get_job_not_found(self, client: AsyncClient, auth_token):
+        """Test polling an unknown job returns 404"""
+        response = await client.get(
+            "/api/jobs/unknown",
+            headers={"Authorization": f"Bearer {auth_token}"}
+        )
+        
+        assert response.status_code == 404
+    
     async def test_delete_project_not_found(self, client: AsyncClient, auth_token):
         """Test deleting non-existent project returns 404"""
         response = await client.delete(
@@ -230,3 +270,131 @@ class TestProjectsCRUD:
         )
         
         assert response.status_code == 404
+    
+    async def test_project_changes_published(self, client: AsyncClient, sample_project_data, temp_projects_dir, auth_token):
+        """Test project changes are pushed to /api/events subscribers"""
+        from app.core.events import TOPIC_PROJECTS, hub
+        
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        subscription = hub.subscribe(frozenset({TOPIC_PROJECTS}), 0, True)
+        try:
+            create_response = await client.post("/api/projects", json=sample_project_data, headers=headers)
+            project_id = create_response.json()["id"]
+            await client.delete(f"/api/projects/{project_id}", headers=headers)
+            received = await subscription.get(timeout=1)
+        finally:
+            hub.unsubscribe(subscription)
+        
+        assert [event.type for event in received] == ["created", "deleted"]
+        assert received[0].data["id"] == project_id
+        assert received[0].owner_id is not None
+
+
+@pytest.mark.asyncio
+class TestProjectsFileRouting:
+    """Tests for Traefik file-provider routing mode"""
+
+    @pytest.fixture
+    def dynamic_dir(self, tmp_path, monkeypatch):
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "TRAEFIK_ROUTING_MODE", "file")
+        monkeypatch.setattr(settings, "TRAEFIK_DYNAMIC_CONFIG_DIR", str(tmp_path))
+        return tmp_path
+
+    async def test_project_lifecycle_updates_dynamic_config(self, client: AsyncClient, sample_project_data, temp_projects_dir, auth_token, dynamic_dir):
+        """Test that create/update/delete rewrite the dynamic config file"""
+        import yaml
+
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        config_file = dynamic_dir / "docklite-projects.yml"
+
+        create_response = await client.post("/api/projects", json=sample_project_data, headers=headers)
+        assert create_response.status_code == 201
+        project = create_response.json()
+        assert "traefik.http.routers" not in project["compose_content"]
+
+        routers = yaml.safe_load(config_file.read_text())["http"]["routers"]
+        assert routers[project["slug"]]["rule"] == "Host(`test.local`)"
+
+        await client.put(f"/api/projects/{project['id']}", json={"domain": "new.local"}, headers=headers)
+        routers = yaml.safe_load(config_file.read_text())["http"]["routers"]
+        assert routers[project["slug"]]["rule"] == "Host(`new.local`)"
+
+        await client.delete(f"/api/projects/{project['id']}", headers=headers)
+        assert yaml.safe_load(config_file.read_text()) == {}
+
+
+@pytest.mark.asyncio
+class TestProjectRoutes:
+    """Tests for per-service project routes"""
+
+    COMPOSE = """services:
+  api:
+    image: myapi
+    expose:
+      - "8000"
+  web:
+    image: nginx:alpine
+"""
+
+    async def test_create_and_update_routes(self, client: AsyncClient, temp_projects_dir, auth_token):
+        """Test that routes are stored, applied and can be reset"""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        project_data = {
+            "name": "multi",
+            "domain": "multi.local",
+            "compose_content": self.COMPOSE,
+            "routes": [
+                {"service": "web"},
+                {"service": "api", "path_prefix": "/api", "port": 9000},
+            ],
+        }
+
+        response = await client.post("/api/projects", json=project_data, headers=headers)
+        assert response.status_code == 201
+        data = response.json()
+        assert [r["service"] for r in data["routes"]] == ["web", "api"]
+        assert "PathPrefix(`/api`)" in data["compose_content"]
+        assert "loadbalancer.server.port=9000" in data["compose_content"]
+
+        response = await client.put(f"/api/projects/{data['id']}", json={"routes": []}, headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["routes"] is None
+        assert "PathPrefix" not in data["compose_content"]
+
+    async def test_route_to_missing_service_rejected(self, client: AsyncClient, temp_projects_dir, auth_token):
+        """Test that a route to an unknown service is rejected"""
+        project_data = {
+            "name": "bad",
+            "domain": "bad.local",
+            "compose_content": self.COMPOSE,
+            "routes": [{"service": "worker"}],
+        }
+
+        response = await client.post(
+            "/api/projects", json=project_data, headers={"Authorization": f"Bearer {auth_token}"}
+        )
+
+        assert response.status_code == 400
+        assert "worker" in response.json()["detail"]
+
+    async def test_performance_settings(self, client: AsyncClient, sample_project_data, temp_projects_dir, auth_token):
+        """Test that performance middlewares are stored, applied and reset"""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        project_data = {**sample_project_data, "performance": {"compress": True, "https": True}}
+
+        response = await client.post("/api/projects", json=project_data, headers=headers)
+        assert response.status_code == 201
+        data = response.json()
+        assert data["performance"]["compress"] is True
+        assert data["performance"]["https"] is True
+        assert "compress=true" in data["compose_content"]
+        assert "entrypoints=websecure" in data["compose_content"]
+
+        response = await client.put(f"/api/projects/{data['id']}", json={"performance": {}}, headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["performance"] is None
+        assert "compress" not in data["compose_content"]
@@ -0,0 +1,125 @@
+"""Tests for the benchmark harness (not the benchmarks themselves)"""
+
+import json
+
+import pytest
+
+from benchmarks.harness import (
+    BenchmarkCase,
+    RunOptions,
+    compare,
+    load_baseline,
+    load_threshold,
+    run_benchmarks,
+    select_cases,
+    summarize,
+    write_results,
+)
+
+
+class TestSummarize:
+    """Test timing statistics"""
+
+    def test_statistics(self):
+        """Test median, p95 and throughput from timings in seconds"""
+        result = summarize("case", [0.001 * i for i in range(1, 101)])
+
+        assert result.iterations == 100
+        assert result.min_ms == 1.0
+        assert result.median_ms == 50.5
+        assert result.p95_ms == 95.0
+        assert result.max_ms == 100.0
+        assert result.ops_per_sec == round(1 / 0.0505, 1)
+
+
+class TestCompare:
+    """Test baseline comparison"""
+
+    def test_regression_over_threshold(self):
+        """Test only medians beyond the threshold are regressions"""
+        fast = summarize("fast", [0.010])
+        slow = summarize("slow", [0.020])
+        new = summarize("new", [0.010])
+        baseline = {"fast": {"median_ms": 9.0}, "slow": {"median_ms": 10.0}}
+
+        regressions = compare([fast, slow, new], baseline, threshold=0.3)
+
+        assert regressions == [slow]
+        assert fast.baseline_median_ms == 9.0 and not fast.regression
+        assert new.baseline_median_ms is None
+
+    def test_baseline_roundtrip(self, tmp_path):
+        """Test results written as a baseline load back"""
+        path = tmp_path / "baseline.json"
+        write_results(path, [summarize("case", [0.002, 0.004])], threshold=0.5)
+
+        assert load_baseline(path)["case"]["median_ms"] == 3.0
+        assert load_threshold(path) == 0.5
+        assert json.loads(path.read_text())["machine"]["python"]
+        assert load_baseline(tmp_path / "missing.json") == {}
+
+
+class TestRun:
+    """Test running registered cases"""
+
+    def test_select_and_run(self):
+        """Test filtering, --quick iteration scaling and a sync case run"""
+        calls = []
+
+        def factory(ctx, size):
+            return lambda: calls.append(size)
+
+        cases = [
+            BenchmarkCase("demo[a]", factory, iterations=10, warmup=2, param="a"),
+            BenchmarkCase("other", factory, iterations=10, warmup=2, param="b"),
+        ]
+
+        from benchmarks import harness
+
+        original = harness.REGISTRY[:]
+        harness.REGISTRY[:] = cases
+        try:
+            selected = select_cases(RunOptions(filters=["demo"], quick=True))
+        finally:
+            harness.REGISTRY[:] = original
+
+        assert [(c.name, c.iterations, c.warmup) for c in selected] == [
+            ("demo[a]", 2, 1)
+        ]
+
+        results = run_benchmarks(selected)
+
+        assert results[0].name == "demo[a]"
+        assert calls == ["a"] * 3
+
+
+class TestLoadTestReport:
+    """Test load test latency reporting"""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles in milliseconds"""
+        from benchmarks.loadtest import percentile
+
+        latencies = [i / 1000 for i in range(1, 101)]
+
+        assert percentile(latencies, 50) == 50.0
+        assert percentile(latencies, 99) == 99.0
+        assert percentile(latencies, 100) == 100.0
+        assert percentile([], 50) == 0.0
+
+    def test_report_rows(self):
+        """Test per-endpoint rows, errors and the total row"""
+        from benchmarks.loadtest import LatencyRecorder
+
+        recorder = LatencyRecorder()
+        recorder.latencies["GET /a"] = [0.01, 0.02]
+        recorder.latencies["GET /b"] = [0.03]
+        recorder.errors["GET /b"] = 1
+
+        rows = recorder.report(elapsed=2.0)
+
+        assert [r["endpoint"] for r in rows] == ["GET /a", "GET /b", "total"]
+        assert rows[0]["rps"] == 1.0
+        assert rows[-1]["requests"] == 3
+        assert rows[-1]["errors"] == 1
+        assert rows[-1]["max_ms"] == 30.0
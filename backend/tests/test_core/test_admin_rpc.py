@@ -0,0 +1,174 @@
+"""Tests for the admin RPC socket server."""
+
+import asyncio
+import json
+import os
+import stat
+
+import pytest
+
+from app.core import admin_rpc
+from app.core.admin_rpc import INTERNAL_ERROR, NOT_FOUND, AdminRPCServer, RPCError
+
+
+@pytest.fixture
+async def server(tmp_path):
+    """Server on a temporary socket with a few test methods"""
+    server = AdminRPCServer(tmp_path / "run" / "admin.sock")
+
+    @server.method("echo")
+    async def echo(value, twice: bool = False):
+        return [value, value] if twice else value
+
+    @server.method("missing")
+    async def missing():
+        raise RPCError(NOT_FOUND, "No such thing")
+
+    @server.method("broken")
+    async def broken():
+        raise RuntimeError("boom")
+
+    await server.start()
+    yield server
+    await server.stop()
+
+
+async def call(path, *requests) -> list:
+    """Send requests over one connection, return the responses"""
+    reader, writer = await asyncio.open_unix_connection(str(path))
+    try:
+        responses = []
+        for request in requests:
+            line = (
+                request if isinstance(request, bytes) else json.dumps(request).encode()
+            )
+            writer.write(line + b"\n")
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+        return responses
+    finally:
+        writer.close()
+
+
+@pytest.mark.asyncio
+class TestDispatch:
+    """Tests for request handling."""
+
+    async def test_result(self, server):
+        response = await server.dispatch(
+            {"id": 1, "method": "echo", "params": {"value": "x", "twice": True}}
+        )
+
+        assert response == {"id": 1, "result": ["x", "x"]}
+
+    async def test_unknown_method(self, server):
+        response = await server.dispatch({"id": 2, "method": "nope"})
+
+        assert response["error"]["code"] == "method_not_found"
+
+    async def test_invalid_params(self, server):
+        """Parameters are checked against the handler's signature."""
+        response = await server.dispatch(
+            {"id": 3, "method": "echo", "params": {"bogus": 1}}
+        )
+
+        assert response["error"]["code"] == "invalid_params"
+
+    async def test_invalid_request(self, server):
+        response = await server.dispatch(["not", "an", "object"])
+
+        assert response == {
+            "id": None,
+            "error": {
+                "code": "invalid_request",
+                "message": "Request must be an object with a method",
+            },
+        }
+
+    async def test_handler_errors(self, server):
+        missing = await server.dispatch({"id": 4, "method": "missing"})
+        broken = await server.dispatch({"id": 5, "method": "broken"})
+
+        assert missing["error"] == {"code": NOT_FOUND, "message": "No such thing"}
+        assert broken["error"] == {"code": INTERNAL_ERROR, "message": "boom"}
+
+
+@pytest.mark.asyncio
+class TestSocket:
+    """Tests for serving over the unix socket."""
+
+    async def test_requests_over_one_connection(self, server):
+        responses = await call(
+            server.path,
+            {"id": 1, "method": "echo", "params": {"value": 1}},
+            b"{not json",
+            {"id": 2, "method": "ping"},
+        )
+
+        assert responses[0] == {"id": 1, "result": 1}
+        assert responses[1]["error"]["code"] == "invalid_request"
+        # Module-level methods are registered on the shared server only
+        assert responses[2]["error"]["code"] == "method_not_found"
+
+    async def test_owner_only_permissions(self, server):
+        assert stat.S_IMODE(os.stat(server.path).st_mode) == 0o600
+
+    async def test_owner_only_from_bind(self, tmp_path, monkeypatch):
+        """Test the socket is never accessible to others, not even before chmod."""
+        start_unix_server = asyncio.start_unix_server
+        modes = []
+
+        async def bind(*args, **kwargs):
+            bound = await start_unix_server(*args, **kwargs)
+            modes.append(stat.S_IMODE(os.stat(kwargs["path"]).st_mode))
+            return bound
+
+        monkeypatch.setattr(admin_rpc.asyncio, "start_unix_server", bind)
+        umask = os.umask(0o022)
+        server = AdminRPCServer(tmp_path / "admin.sock")
+        try:
+            await server.start()
+            await server.stop()
+        finally:
+            restored = os.umask(umask)
+
+        assert modes == [0o600]
+        assert restored == 0o022
+
+    async def test_replaces_stale_socket_and_cleans_up(self, tmp_path):
+        path = tmp_path / "admin.sock"
+        path.write_text("stale")
+        server = AdminRPCServer(path)
+
+        await server.start()
+        assert server.running
+        assert (await call(path, {"id": 1, "method": "x"}))[0]["error"]
+        await server.stop()
+
+        assert not path.exists()
+
+    async def test_oversized_request(self, server, monkeypatch):
+        await server.stop()
+        monkeypatch.setattr(admin_rpc.settings, "ADMIN_RPC_MAX_REQUEST_BYTES", 64)
+        await server.start()
+
+        response = await call(
+            server.path, {"id": 1, "method": "echo", "params": {"value": "x" * 100}}
+        )
+
+        assert response[0]["error"]["message"] == "Request too large"
+
+    async def test_disabled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(admin_rpc.settings, "ADMIN_RPC_ENABLED", False)
+        server = AdminRPCServer(tmp_path / "admin.sock")
+
+        await server.start()
+
+        assert not server.running
+        assert not (tmp_path / "admin.sock").exists()
+
+    async def test_ping(self):
+        response = await admin_rpc.admin_rpc.dispatch({"id": 1, "method": "ping"})
+
+        assert response["result"]["pid"] == os.getpid()
+        assert "users.create" in response["result"]["methods"]
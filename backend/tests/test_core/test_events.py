@@ -0,0 +1,228 @@
+"""Tests for the real-time event hub and /api/events."""
+
+import os
+
+import pytest
+from httpx import AsyncClient
+
+from app.api.events import event_stream, parse_topics
+from app.core import events
+from app.core.events import (
+    TOPIC_CONTAINERS,
+    TOPIC_JOBS,
+    TOPIC_PROJECTS,
+    TOPIC_STATS,
+    TOPICS,
+    Event,
+    EventBus,
+    EventHub,
+    Subscription,
+)
+
+
+def all_topics() -> frozenset:
+    return frozenset(TOPICS)
+
+
+class TestSubscription:
+    """Tests for per-client queues."""
+
+    @pytest.mark.asyncio
+    async def test_drops_oldest_when_full(self):
+        """A slow client keeps the newest events and counts the dropped ones."""
+        subscription = Subscription(all_topics(), 1, True, size=3)
+        for i in range(5):
+            subscription.offer(Event(TOPIC_JOBS, "running", {"n": i}))
+
+        received = await subscription.get(timeout=0.1)
+
+        assert [event.data["n"] for event in received] == [2, 3, 4]
+        assert subscription.dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_topic_filter(self):
+        subscription = Subscription(frozenset({TOPIC_STATS}), 1, True, size=10)
+        subscription.offer(Event(TOPIC_JOBS, "running", {}))
+        subscription.offer(Event(TOPIC_STATS, "sample", {}))
+
+        received = await subscription.get(timeout=0.1)
+
+        assert [event.topic for event in received] == [TOPIC_STATS]
+
+    def test_visibility(self):
+        """Owners see their events, admins all, admin-only events stay hidden."""
+        owned = Event(TOPIC_PROJECTS, "created", {}, owner_id=7)
+        admin_only = Event(TOPIC_CONTAINERS, "start", {}, owner_id=None)
+
+        assert owned.visible_to(7, is_admin=False)
+        assert not owned.visible_to(8, is_admin=False)
+        assert owned.visible_to(8, is_admin=True)
+        assert not admin_only.visible_to(7, is_admin=False)
+        assert admin_only.visible_to(1, is_admin=True)
+
+    @pytest.mark.asyncio
+    async def test_get_timeout_and_close(self):
+        subscription = Subscription(all_topics(), 1, True, size=10)
+
+        assert await subscription.get(timeout=0.01) == []
+        subscription.close()
+        assert await subscription.get() == []
+
+    def test_sse_format(self):
+        event = Event(TOPIC_PROJECTS, "created", {"id": 5})
+
+        text = event.to_sse()
+
+        assert text.startswith(f"id: {event.id}\nevent: projects\n")
+        assert 'data: {"type": "created", "id": 5}' in text
+        assert text.endswith("\n\n")
+
+
+@pytest.mark.asyncio
+class TestEventHub:
+    """Tests for publishing within and across workers."""
+
+    async def test_publish_to_subscribers(self):
+        hub = EventHub(EventBus())
+        admin = hub.subscribe(all_topics(), 1, True)
+        owner = hub.subscribe(all_topics(), 2, False)
+        other = hub.subscribe(all_topics(), 3, False)
+
+        hub.publish(TOPIC_PROJECTS, "created", {"id": 1}, owner_id=2)
+
+        assert len(await admin.get(timeout=0.1)) == 1
+        assert len(await owner.get(timeout=0.1)) == 1
+        assert await other.get(timeout=0.01) == []
+
+        hub.unsubscribe(owner)
+        assert hub.subscriber_count == 2
+
+    async def test_events_cross_workers(self, tmp_path):
+        """Events published in one worker reach subscribers of another."""
+        first = EventHub(EventBus(tmp_path, name="1"))
+        second = EventHub(EventBus(tmp_path, name="2"))
+        await first.start()
+        await second.start()
+        try:
+            subscription = second.subscribe(all_topics(), 1, True)
+            # Peer list is cached briefly
+            first._bus._peers_read = 0.0
+
+            first.publish(TOPIC_JOBS, "completed", {"id": "abc"})
+            received = await subscription.get(timeout=2)
+
+            assert [event.data for event in received] == [{"id": "abc"}]
+        finally:
+            await first.stop()
+            await second.stop()
+
+    async def test_interest_across_workers(self, tmp_path):
+        """Publishers can tell whether any worker has subscribers of a topic."""
+        first = EventHub(EventBus(tmp_path, name="publisher"))
+        # Markers of dead pids are ignored, so the subscriber is this process
+        second = EventHub(EventBus(tmp_path, name=str(os.getpid())))
+        await first.start()
+        await second.start()
+        try:
+            assert not first.has_interest(TOPIC_STATS)
+
+            subscription = second.subscribe(frozenset({TOPIC_STATS}), 1, True)
+            assert first.has_interest(TOPIC_STATS)
+            assert not first.has_interest(TOPIC_JOBS)
+
+            second.unsubscribe(subscription)
+            assert not first.has_interest(TOPIC_STATS)
+        finally:
+            await first.stop()
+            await second.stop()
+
+    async def test_stop_closes_streams(self):
+        hub = EventHub(EventBus())
+        subscription = hub.subscribe(all_topics(), 1, True)
+
+        await hub.stop()
+
+        assert subscription.closed
+
+    async def test_disabled(self, monkeypatch):
+        monkeypatch.setattr(events.settings, "EVENTS_ENABLED", False)
+        hub = EventHub(EventBus())
+        subscription = hub.subscribe(all_topics(), 1, True)
+
+        hub.publish(TOPIC_JOBS, "running", {})
+
+        assert await subscription.get(timeout=0.01) == []
+
+
+@pytest.mark.asyncio
+class TestEventStream:
+    """Tests for the SSE generator."""
+
+    async def test_stream_events_and_keepalive(self, monkeypatch):
+        monkeypatch.setattr(events.settings, "EVENTS_KEEPALIVE_SECONDS", 0.01)
+        stream = event_stream(all_topics(), 1, True)
+
+        assert (await stream.__anext__()).startswith("retry:")
+        assert await stream.__anext__() == ": keepalive\n\n"
+
+        events.hub.publish(TOPIC_JOBS, "running", {"id": "x"})
+        chunk = await stream.__anext__()
+        assert "event: jobs" in chunk
+
+        subscribers = events.hub.subscriber_count
+        await stream.aclose()
+        assert events.hub.subscriber_count == subscribers - 1
+
+    async def test_dropped_notice(self, monkeypatch):
+        monkeypatch.setattr(events.settings, "EVENTS_QUEUE_SIZE", 2)
+        stream = event_stream(all_topics(), 1, True)
+        await stream.__anext__()
+
+        for i in range(5):
+            events.hub.publish(TOPIC_JOBS, "running", {"n": i})
+        chunk = await stream.__anext__()
+
+        assert chunk == 'event: dropped\ndata: {"count": 3}\n\n'
+        await stream.aclose()
+
+
+class TestParseTopics:
+    def test_default_all(self):
+        assert parse_topics(None) == frozenset(TOPICS)
+
+    def test_selected(self):
+        assert parse_topics("stats, jobs") == {TOPIC_STATS, TOPIC_JOBS}
+
+    def test_unknown(self):
+        from fastapi import HTTPException
+
+        with pytest.raises(HTTPException) as exc:
+            parse_topics("stats,bogus")
+        assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+class TestEventsAPI:
+    """Tests for GET /api/events (request validation; streams are infinite)."""
+
+    async def test_requires_auth(self, client: AsyncClient):
+        response = await client.get("/api/events")
+
+        assert response.status_code == 401
+
+    async def test_unknown_topic(self, client: AsyncClient, user_token):
+        response = await client.get(
+            "/api/events?topics=bogus",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+
+        assert response.status_code == 400
+
+    async def test_disabled(self, client: AsyncClient, user_token, monkeypatch):
+        monkeypatch.setattr(events.settings, "EVENTS_ENABLED", False)
+
+        response = await client.get(
+            "/api/events", headers={"Authorization": f"Bearer {user_token}"}
+        )
+
+        assert response.status_code == 404
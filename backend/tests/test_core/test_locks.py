@@ -0,0 +1,157 @@
+"""Tests for cross-worker locks, leader election and server settings."""
+
+import asyncio
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.core import locks
+from app.core.locks import FileLock, LeaderElection, lock_dir, startup_lock
+from app.core.server import worker_count
+
+
+class TestLockDir:
+    """Tests for the lock directory derivation."""
+
+    def test_explicit_lock_dir(self, tmp_path):
+        """LOCK_DIR wins."""
+        with patch.object(locks.settings, "LOCK_DIR", str(tmp_path)):
+            assert lock_dir() == tmp_path
+
+    def test_sqlite_database_directory(self, tmp_path):
+        """Without LOCK_DIR the SQLite database's directory is used."""
+        url = f"sqlite+aiosqlite:///{tmp_path}/docklite.db"
+        with patch.object(locks.settings, "LOCK_DIR", None), patch.object(
+            locks.settings, "DATABASE_URL", url
+        ):
+            assert lock_dir() == tmp_path
+
+    def test_memory_database_uses_tempdir(self):
+        """In-memory databases fall back to a temporary directory."""
+        with patch.object(locks.settings, "LOCK_DIR", None), patch.object(
+            locks.settings, "DATABASE_URL", "sqlite+aiosqlite:///:memory:"
+        ):
+            assert lock_dir().name == "docklite"
+
+
+class TestFileLock:
+    """Tests for flock()-based file locks."""
+
+    def test_exclusive(self, tmp_path):
+        """A second holder can't take a held lock until it is released."""
+        first = FileLock("test", tmp_path)
+        second = FileLock("test", tmp_path)
+
+        assert first.acquire(blocking=False) is True
+        assert second.acquire(blocking=False) is False
+        assert second.locked is False
+
+        first.release()
+        assert second.acquire(blocking=False) is True
+        second.release()
+
+    def test_writes_pid(self, tmp_path):
+        """The lock file records the holder's pid."""
+        lock = FileLock("test", tmp_path)
+        with lock.hold():
+            assert lock.locked
+            assert Path(lock.path).read_text().strip().isdigit()
+        assert not lock.locked
+
+    def test_release_without_acquire(self, tmp_path):
+        """Releasing an unheld lock is a no-op."""
+        FileLock("test", tmp_path).release()
+
+    @pytest.mark.asyncio
+    async def test_startup_lock_serializes(self, tmp_path):
+        """startup_lock sections don't overlap."""
+        active = []
+        overlaps = []
+
+        async def section():
+            async with startup_lock():
+                active.append(1)
+                if len(active) > 1:
+                    overlaps.append(True)
+                await asyncio.sleep(0.01)
+                active.pop()
+
+        with patch.object(locks.settings, "LOCK_DIR", str(tmp_path)):
+            await asyncio.gather(section(), section(), section())
+
+        assert overlaps == []
+
+
+class TestLeaderElection:
+    """Tests for single-leader election."""
+
+    @pytest.mark.asyncio
+    async def test_single_leader_and_takeover(self, tmp_path):
+        """One worker leads; a follower takes over when the leader stops."""
+        elected = []
+        first = LeaderElection("leader-test")
+        second = LeaderElection("leader-test")
+
+        @first.on_elected
+        async def first_elected():
+            elected.append("first")
+
+        @second.on_elected
+        async def second_elected():
+            elected.append("second")
+
+        with patch.object(locks.settings, "LOCK_DIR", str(tmp_path)), patch.object(
+            locks.settings, "LEADER_RETRY_SECONDS", 0.01
+        ):
+            await first.start()
+            await second.start()
+            assert [first.is_leader, second.is_leader] == [True, False]
+            assert elected == ["first"]
+
+            await first.stop()
+            for _ in range(100):
+                if second.is_leader:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert second.is_leader
+            assert elected == ["first", "second"]
+            await second.stop()
+
+    @pytest.mark.asyncio
+    async def test_failing_callback_keeps_leadership(self, tmp_path):
+        """A failing callback is logged; the remaining callbacks still run."""
+        ran = []
+        election = LeaderElection("leader-test")
+
+        @election.on_elected
+        async def broken():
+            raise RuntimeError("boom")
+
+        @election.on_elected
+        async def works():
+            ran.append(True)
+
+        with patch.object(locks.settings, "LOCK_DIR", str(tmp_path)):
+            await election.start()
+            assert election.is_leader
+            assert ran == [True]
+            await election.stop()
+            assert not election.is_leader
+
+
+class TestWorkerCount:
+    """Tests for the worker count default."""
+
+    def test_configured(self):
+        assert worker_count(configured=3, cpus=16) == 3
+
+    def test_cpu_based(self):
+        assert worker_count(configured=0, cpus=4) == 5
+
+    def test_minimum_two(self):
+        assert worker_count(configured=0, cpus=1) == 2
+
+    def test_capped(self):
+        assert worker_count(configured=0, cpus=64) == 8
@@ -0,0 +1,187 @@
+"""Tests for core metrics module."""
+
+import os
+import subprocess
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.core import metrics
+from app.core.metrics import MetricsRegistry, statement_type
+from app.services.docker_events import ProjectOwners
+
+
+class TestRegistry:
+    """Tests for metric families and text rendering."""
+
+    def test_counter_render(self):
+        """Counters render one sample per label set."""
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test counter", ("op",))
+        counter.inc("a")
+        counter.inc("a", amount=2)
+        counter.inc("b")
+
+        text = registry.render()
+
+        assert "# TYPE test_total counter" in text
+        assert 'test_total{op="a"} 3' in text
+        assert 'test_total{op="b"} 1' in text
+
+    def test_histogram_buckets_cumulative(self):
+        """Histogram buckets are cumulative with +Inf, sum and count."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("test_seconds", "Test", buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.1)
+        histogram.observe(5)
+
+        text = registry.render()
+
+        assert 'test_seconds_bucket{le="0.1"} 2' in text
+        assert 'test_seconds_bucket{le="1"} 2' in text
+        assert 'test_seconds_bucket{le="+Inf"} 3' in text
+        assert "test_seconds_sum 5.15" in text
+        assert "test_seconds_count 3" in text
+
+    def test_thread_shards_aggregated(self):
+        """Updates from several threads are summed at collection."""
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test")
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.value() == 4000
+
+    def test_label_mismatch(self):
+        """Wrong label count is rejected."""
+        counter = MetricsRegistry().counter("test_total", "Test", ("op",))
+
+        with pytest.raises(ValueError):
+            counter.inc()
+
+    def test_label_escaping(self):
+        """Label values are escaped."""
+        registry = MetricsRegistry()
+        registry.counter("test_total", "Test", ("path",)).inc('a"b\\c')
+
+        assert 'test_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_pid_label(self):
+        """Every series carries the worker pid, histogram buckets keep le last."""
+        registry = MetricsRegistry(label_pid=True)
+        registry.counter("test_total", "Test", ("op",)).inc("a")
+        registry.gauge("test_open", "Test").inc()
+        registry.histogram("test_seconds", "Test", buckets=(1.0,)).observe(0.5)
+        pid = os.getpid()
+
+        text = registry.render()
+
+        assert f'test_total{{op="a",pid="{pid}"}} 1' in text
+        assert f'test_open{{pid="{pid}"}} 1' in text
+        assert f'test_seconds_bucket{{pid="{pid}",le="1"}} 1' in text
+        assert f'test_seconds_count{{pid="{pid}"}} 1' in text
+        samples = [line for line in text.splitlines() if not line.startswith("#")]
+        assert all(f'pid="{pid}"' in line for line in samples)
+
+    def test_statement_type(self):
+        """SQL statements reduce to their verb."""
+        assert statement_type("  select * from users") == "SELECT"
+        assert statement_type("UPDATE projects SET x=1") == "UPDATE"
+        assert statement_type("PRAGMA table_info(x)") == "OTHER"
+        assert statement_type("") == "OTHER"
+
+
+class TestInstrumentation:
+    """Tests for instrumented call sites."""
+
+    @patch("subprocess.run")
+    def test_docker_call_timed(self, mock_run):
+        """Docker calls record duration and failures by operation."""
+        from app.services.docker_service import DockerService
+
+        mock_run.return_value = Mock(returncode=0)
+        service = DockerService()
+        before = metrics.DOCKER_CALL_DURATION.count("start")
+        failures = metrics.DOCKER_CALL_FAILURES.value("start")
+
+        mock_run.side_effect = subprocess.CalledProcessError(1, "docker", stderr="x")
+        success, _ = service.start_container("abc")
+
+        assert not success
+        assert metrics.DOCKER_CALL_DURATION.count("start") == before + 1
+        assert metrics.DOCKER_CALL_FAILURES.value("start") == failures + 1
+
+    def test_password_hash_timed(self):
+        """bcrypt hashing and verification are timed."""
+        from app.services.auth_service import AuthService
+
+        before = metrics.PASSWORD_HASH_DURATION.count("verify")
+        hashed = AuthService.get_password_hash("secret")
+        AuthService.verify_password("secret", hashed)
+
+        assert metrics.PASSWORD_HASH_DURATION.count("verify") == before + 1
+
+    def test_cache_lookup(self):
+        """Cache hits and misses are counted separately."""
+        metrics.record_cache_lookup("test", hit=True)
+        metrics.record_cache_lookup("test", hit=False)
+
+        assert metrics.CACHE_REQUESTS.value("test", "hit") >= 1
+        assert metrics.CACHE_REQUESTS.value("test", "miss") >= 1
+
+    async def test_project_owner_cache(self):
+        """Project owner lookups report hits and misses."""
+        owners = ProjectOwners()
+        owners._owners = {"blog": (1, 2)}
+        owners._loaded = float("inf")  # No reload on misses
+        hits = metrics.CACHE_REQUESTS.value("project_owners", "hit")
+        misses = metrics.CACHE_REQUESTS.value("project_owners", "miss")
+
+        await owners.lookup("blog")
+        await owners.lookup("shop")
+
+        assert metrics.CACHE_REQUESTS.value("project_owners", "hit") == hits + 1
+        assert metrics.CACHE_REQUESTS.value("project_owners", "miss") == misses + 1
+
+
+@pytest.mark.asyncio
+class TestMetricsEndpoint:
+    """Tests for the /metrics endpoint."""
+
+    async def test_request_latency_by_route_template(self, client: AsyncClient, auth_token):
+        """Requests are labelled with the route template, not the raw path."""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        await client.get("/api/projects/12345", headers=headers)
+
+        response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert (
+            'docklite_http_request_duration_seconds_count{method="GET",'
+            f'route="/api/projects/{{project_id}}",status="404",pid="{os.getpid()}"}}'
+        ) in text
+        assert "/api/projects/12345" not in text
+        assert "docklite_http_requests_in_flight" in text
+        assert "docklite_worker_info" in text
+
+    async def test_unmatched_route(self, client: AsyncClient):
+        """Unknown paths share a single label value."""
+        await client.get("/no/such/path")
+
+        response = await client.get("/metrics")
+
+        assert 'route="unmatched",status="404"' in response.text
+        assert "/no/such/path" not in response.text
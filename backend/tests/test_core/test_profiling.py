@@ -0,0 +1,207 @@
+"""Tests for core profiling module."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+
+from app.core import profiling
+from app.core.config import settings
+from app.core.profiling import (
+    ProfileStore,
+    ProfilingMiddleware,
+    build_call_tree,
+    mark_user,
+    profile_store,
+)
+
+
+def busy(ms: float) -> None:
+    """Burn CPU on the event loop thread."""
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def create_app() -> FastAPI:
+    """Small app with the profiling middleware and fake auth."""
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    async def fake_user(admin: bool = False):
+        user = SimpleNamespace(is_admin=admin)
+        mark_user(user)
+        return user
+
+    @app.get("/work/{item_id}")
+    async def work(item_id: int, user=Depends(fake_user)) -> dict:
+        busy(50)
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast(user=Depends(fake_user)) -> dict:
+        return {"ok": True}
+
+    return app
+
+
+@pytest.fixture
+def profiled_client(monkeypatch):
+    """Client for the profiled app with a clean profile store."""
+    monkeypatch.setattr(settings, "PROFILING_INTERVAL_MS", 1)
+    monkeypatch.setattr(settings, "PROFILING_SLOW_REQUEST_MS", 0)
+    profile_store.clear()
+    yield AsyncClient(app=create_app(), base_url="http://test")
+    profile_store.clear()
+
+
+class TestBuildCallTree:
+    """Tests for call tree construction."""
+
+    def test_merges_common_prefixes(self):
+        """Stacks sharing frames merge into one branch."""
+        tree = build_call_tree(
+            [("a", "b"), ("a", "b"), ("a", "c"), ("d",)], interval_ms=5
+        )
+
+        assert tree["samples"] == 4
+        assert tree["time_ms"] == 20
+        assert [c["name"] for c in tree["children"]] == ["a", "d"]
+        a = tree["children"][0]
+        assert a["samples"] == 3
+        assert [(c["name"], c["samples"]) for c in a["children"]] == [
+            ("b", 2),
+            ("c", 1),
+        ]
+
+
+class TestProfileStore:
+    """Tests for the profile files shared by the workers."""
+
+    def test_shared_between_workers(self, tmp_path):
+        worker = ProfileStore(2, tmp_path)
+        other = ProfileStore(2, tmp_path)
+
+        for n in range(3):
+            worker.add({"id": f"p{n}", "tree": {"name": "<request>"}})
+
+        assert other.summaries() == [{"id": "p2"}, {"id": "p1"}]
+        assert other.get("p1") == {"id": "p1", "tree": {"name": "<request>"}}
+        assert other.get("p0") is None
+        other.clear()
+        assert worker.summaries() == []
+
+
+@pytest.mark.asyncio
+class TestProfilingMiddleware:
+    """Tests for ProfilingMiddleware."""
+
+    async def test_admin_requested_profile(self, profiled_client):
+        """Admin requests with the header are captured with a call tree."""
+        async with profiled_client as client:
+            response = await client.get(
+                "/work/1?admin=true", headers={"X-Profile": "1"}
+            )
+
+        assert response.status_code == 200
+        profiles = profile_store.summaries()
+        assert len(profiles) == 1
+        summary = profiles[0]
+        assert summary["reason"] == "requested"
+        assert summary["route"] == "/work/{item_id}"
+        assert summary["status"] == 200
+        assert summary["samples"] > 0
+
+        profile = profile_store.get(summary["id"])
+        assert profile is not None
+        tree = profile["tree"]
+        names = []
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            names.append(node["name"])
+            stack.extend(node["children"])
+        assert any(name.startswith("busy ") for name in names)
+
+    async def test_query_flag(self, profiled_client):
+        """?profile=1 works like the header."""
+        async with profiled_client as client:
+            await client.get("/work/1", params={"admin": "true", "profile": "1"})
+
+        assert profile_store.summaries()[0]["reason"] == "requested"
+
+    async def test_non_admin_request_discarded(self, profiled_client):
+        """Profiles requested by non-admins are not kept."""
+        async with profiled_client as client:
+            await client.get("/work/1", headers={"X-Profile": "1"})
+
+        assert profile_store.summaries() == []
+
+    async def test_unflagged_request_not_profiled(self, profiled_client):
+        """Requests without the flag are not profiled."""
+        async with profiled_client as client:
+            await client.get("/work/1?admin=true")
+
+        assert profile_store.summaries() == []
+
+    async def test_slow_request_captured(self, profiled_client, monkeypatch):
+        """Requests over the slow threshold are captured automatically."""
+        monkeypatch.setattr(settings, "PROFILING_SLOW_REQUEST_MS", 20)
+
+        async with profiled_client as client:
+            await client.get("/fast")
+            await client.get("/work/2")
+
+        profiles = profile_store.summaries()
+        assert [p["reason"] for p in profiles] == ["slow"]
+        assert profiles[0]["path"] == "/work/2"
+        assert profiles[0]["duration_ms"] >= 20
+
+    def test_mark_user_without_profile(self):
+        """mark_user is a no-op outside profiled requests."""
+        mark_user(SimpleNamespace(is_admin=True))
+        assert profiling._current_profile.get() is None
+
+
+@pytest.mark.asyncio
+class TestProfilesAPI:
+    """Tests for /api/admin/profiles."""
+
+    async def test_list_profiles_admin_only(self, client: AsyncClient, user_token):
+        """Non-admin users are rejected."""
+        response = await client.get(
+            "/api/admin/profiles", headers={"Authorization": f"Bearer {user_token}"}
+        )
+
+        assert response.status_code == 403
+
+    async def test_list_and_get_profiles(self, client: AsyncClient, admin_token):
+        """Admins can list, fetch and clear profiles."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        profile_store.clear()
+        profile_store.add(
+            {
+                "id": "abc",
+                "reason": "slow",
+                "path": "/api/projects",
+                "tree": {"name": "<request>", "samples": 0, "children": []},
+            }
+        )
+
+        response = await client.get("/api/admin/profiles", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["profiles"] == [
+            {"id": "abc", "reason": "slow", "path": "/api/projects"}
+        ]
+
+        response = await client.get("/api/admin/profiles/abc", headers=headers)
+        assert response.json()["tree"]["name"] == "<request>"
+
+        response = await client.get("/api/admin/profiles/missing", headers=headers)
+        assert response.status_code == 404
+
+        response = await client.delete("/api/admin/profiles", headers=headers)
+        assert response.status_code == 204
+        assert profile_store.summaries() == []
@@ -0,0 +1,245 @@
+"""Tests for the periodic job scheduler."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+
+from app.core import scheduler as scheduler_module
+from app.core.metrics import SCHEDULER_RUNS
+from app.core.scheduler import (
+    RESULT_FAILURE,
+    RESULT_SKIPPED,
+    RESULT_SUCCESS,
+    RESULT_TIMEOUT,
+    CronSchedule,
+    ScheduledJob,
+    Scheduler,
+)
+
+
+class TestCronSchedule:
+    """Tests for cron expression parsing and matching."""
+
+    def test_every_fifteen_minutes(self):
+        cron = CronSchedule("*/15 * * * *")
+        assert cron.next_after(datetime(2024, 1, 1, 10, 7)) == datetime(
+            2024, 1, 1, 10, 15
+        )
+        assert cron.next_after(datetime(2024, 1, 1, 10, 45)) == datetime(
+            2024, 1, 1, 11, 0
+        )
+
+    def test_strictly_after(self):
+        """A moment on a fire time yields the next one."""
+        cron = CronSchedule("30 3 * * *")
+        assert cron.next_after(datetime(2024, 1, 1, 3, 30)) == datetime(
+            2024, 1, 2, 3, 30
+        )
+
+    def test_weekday_and_month_rollover(self):
+        """Sunday 0 and 7 are equivalent; months and years roll over."""
+        # 2024-12-29 is a Sunday
+        for expression in ("0 0 * * 0", "0 0 * * 7"):
+            cron = CronSchedule(expression)
+            assert cron.next_after(datetime(2024, 12, 25)) == datetime(2024, 12, 29)
+        cron = CronSchedule("0 0 1 1 *")
+        assert cron.next_after(datetime(2024, 6, 1)) == datetime(2025, 1, 1)
+
+    def test_day_or_weekday(self):
+        """With both day fields restricted, either one matches."""
+        cron = CronSchedule("0 12 15 * 1")
+        # 2024-01-08 is a Monday, before the 15th
+        assert cron.next_after(datetime(2024, 1, 3)) == datetime(2024, 1, 8, 12)
+
+    def test_ranges_and_lists(self):
+        cron = CronSchedule("0,30 9-17/4 * * 1-5")
+        assert cron.hours == {9, 13, 17}
+        assert cron.minutes == {0, 30}
+        assert cron.weekdays == {1, 2, 3, 4, 5}
+
+    @pytest.mark.parametrize(
+        "expression", ["* * * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *"]
+    )
+    def test_invalid(self, expression):
+        with pytest.raises(ValueError):
+            CronSchedule(expression)
+
+    def test_never_fires(self):
+        with pytest.raises(ValueError):
+            CronSchedule("0 0 31 2 *").next_after(datetime(2024, 1, 1))
+
+
+class TestScheduledJob:
+    """Tests for job validation and next run computation."""
+
+    async def _noop(self):
+        pass
+
+    def test_needs_exactly_one_schedule(self):
+        with pytest.raises(ValueError):
+            ScheduledJob("job", self._noop)
+        with pytest.raises(ValueError):
+            ScheduledJob("job", self._noop, interval=10, cron="* * * * *")
+
+    def test_interval_with_jitter(self):
+        job = ScheduledJob("job", self._noop, interval=60, jitter=5)
+        next_run = job.schedule_next(1000.0)
+        assert 1060.0 <= next_run <= 1065.0
+
+    def test_run_at_start(self):
+        job = ScheduledJob("job", self._noop, interval=60, run_at_start=True)
+        assert job.schedule_next(1000.0, first=True) == 1000.0
+        assert job.schedule_next(1000.0) == 1060.0
+
+
+@pytest.mark.asyncio
+class TestScheduler:
+    """Tests for running jobs."""
+
+    async def test_interval_job_runs_repeatedly(self, tmp_path):
+        runs = []
+        scheduler = Scheduler(tmp_path / "scheduler.json")
+
+        @scheduler.interval(0.02, run_at_start=True)
+        async def tick():
+            runs.append(1)
+
+        scheduler.start()
+        await asyncio.sleep(0.15)
+        await scheduler.stop()
+
+        assert len(runs) >= 3
+        assert not scheduler.running
+
+    async def test_state_published(self, tmp_path):
+        """The run state is written for the other workers."""
+        leader = Scheduler(tmp_path / "scheduler.json")
+        follower = Scheduler(tmp_path / "scheduler.json")
+
+        @leader.interval(60, run_at_start=True)
+        async def tick():
+            pass
+
+        assert follower.read_state() is None
+        leader.start()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            state = follower.read_state()
+            if state and state["jobs"][0]["last_result"]:
+                break
+        await leader.stop()
+
+        assert state is not None and state["running"] is True
+        assert state["jobs"][0]["name"] == "tick"
+        assert state["jobs"][0]["last_result"] == RESULT_SUCCESS
+        assert datetime.fromisoformat(state["jobs"][0]["next_run"])
+        stopped = follower.read_state()
+        assert stopped is not None and stopped["running"] is False
+
+    async def test_results_and_metrics(self):
+        scheduler = Scheduler()
+
+        async def ok():
+            pass
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        scheduler.add_job("test_ok", ok, interval=60)
+        scheduler.add_job("test_broken", broken, interval=60)
+        scheduler.add_job("test_slow", slow, interval=60, timeout=0.01)
+        before = SCHEDULER_RUNS.value("test_broken", RESULT_FAILURE)
+
+        assert await scheduler.run_job("test_ok") == RESULT_SUCCESS
+        assert await scheduler.run_job("test_broken") == RESULT_FAILURE
+        assert await scheduler.run_job("test_slow") == RESULT_TIMEOUT
+
+        assert SCHEDULER_RUNS.value("test_broken", RESULT_FAILURE) == before + 1
+        job = {job.name: job for job in scheduler.jobs}["test_broken"]
+        assert job.to_dict()["last_error"] == "boom"
+
+    async def test_no_overlap(self):
+        """A run due while the previous one is in progress is skipped."""
+        scheduler = Scheduler()
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+
+        scheduler.add_job("test_blocked", blocked, interval=60)
+        first = asyncio.create_task(scheduler.run_job("test_blocked"))
+        await asyncio.sleep(0)
+
+        assert await scheduler.run_job("test_blocked") == RESULT_SKIPPED
+        release.set()
+        assert await first == RESULT_SUCCESS
+
+    async def test_duplicate_name(self):
+        scheduler = Scheduler()
+
+        async def job():
+            pass
+
+        scheduler.add_job("dup", job, interval=1)
+        with pytest.raises(ValueError):
+            scheduler.add_job("dup", job, interval=1)
+
+
+@pytest.mark.asyncio
+class TestSchedulerAPI:
+    """Tests for /api/admin/scheduler."""
+
+    async def test_admin_only(self, client: AsyncClient, user_token):
+        response = await client.get(
+            "/api/admin/scheduler", headers={"Authorization": f"Bearer {user_token}"}
+        )
+
+        assert response.status_code == 403
+
+    async def test_lists_jobs(
+        self, client: AsyncClient, admin_token, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(
+            scheduler_module.scheduler, "_state_path", tmp_path / "scheduler.json"
+        )
+
+        response = await client.get(
+            "/api/admin/scheduler", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        names = {job["name"] for job in response.json()["jobs"]}
+        assert {"reconcile_projects", "cleanup_stale_trash"} <= names
+
+    async def test_follower_reports_leader_state(
+        self, client: AsyncClient, admin_token, tmp_path, monkeypatch
+    ):
+        """Workers not running the scheduler report the leader's state."""
+        leader = Scheduler(tmp_path / "scheduler.json")
+
+        async def tick():
+            pass
+
+        leader.add_job("tick", tick, interval=60)
+        leader.start()
+        await leader.run_job("tick")
+        monkeypatch.setattr(
+            scheduler_module.scheduler, "_state_path", tmp_path / "scheduler.json"
+        )
+
+        response = await client.get(
+            "/api/admin/scheduler", headers={"Authorization": f"Bearer {admin_token}"}
+        )
+        await leader.stop()
+
+        body = response.json()
+        assert body["leader"] is False
+        assert body["running"] is True
+        assert [(j["name"], j["last_result"]) for j in body["jobs"]] == [
+            ("tick", RESULT_SUCCESS)
+        ]
@@ -0,0 +1,250 @@
+"""Tests for backup archives (SQLite snapshots, manifest, admin RPC/API)."""
+
+import base64
+import gzip
+import hashlib
+import sqlite3
+import tarfile
+import threading
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.admin_rpc import AdminRPCServer
+from app.core.config import settings
+from app.services import backup_service
+from app.services.backup_service import BackupService, read_manifest
+from app.services.job_service import job_manager
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Path:
+    """SQLite database file with some rows"""
+    path = tmp_path / "docklite.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE items (value INTEGER)")
+        conn.executemany("INSERT INTO items VALUES (?)", [(i,) for i in range(1000)])
+    return path
+
+
+@pytest.fixture
+def gzip_backups(monkeypatch):
+    """Archives compressed with gzip (zstandard may not be installed)"""
+    monkeypatch.setattr(settings, "BACKUP_COMPRESSION", "gzip")
+
+
+def extract(archive: Path) -> dict[str, bytes]:
+    """Members of an archive by name"""
+    with tarfile.open(archive, "r:*") as tar:
+        members = {}
+        for member in tar:
+            fileobj = tar.extractfile(member)
+            if fileobj is not None:
+                members[member.name] = fileobj.read()
+        return members
+
+
+@pytest.mark.usefixtures("gzip_backups")
+class TestCreateBackup:
+    """Tests for BackupService.create_backup."""
+
+    def test_archive_contents(self, tmp_path, database):
+        """Test snapshot, extra files and manifest checksums."""
+        service = BackupService(tmp_path / "backups", database)
+
+        result, error = service.create_backup({".env": b"A=1\n"}, trigger="cli")
+
+        assert error is None and result is not None
+        archive = Path(result["path"])
+        assert archive.name.endswith(".tar.gz")
+        assert archive.stat().st_mode & 0o777 == 0o600
+        members = extract(archive)
+        assert list(members) == ["docklite.db", ".env", "manifest.json"]
+
+        snapshot = tmp_path / "snapshot.db"
+        snapshot.write_bytes(members["docklite.db"])
+        with sqlite3.connect(snapshot) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1000
+
+        manifest = result["manifest"]
+        assert manifest["database"]["quick_check"] == "ok"
+        for entry in manifest["files"]:
+            assert hashlib.sha256(members[entry["path"]]).hexdigest() == entry["sha256"]
+
+        # Archive checksum: result and sha256sum-style sidecar file
+        digest = hashlib.sha256(archive.read_bytes()).hexdigest()
+        assert result["sha256"] == digest
+        sidecar = archive.with_name(f"{archive.name}.sha256")
+        assert sidecar.read_text() == f"{digest}  {archive.name}\n"
+        assert read_manifest(archive) == manifest
+
+    def test_snapshot_during_writes(self, tmp_path, database):
+        """Test the snapshot is consistent while another connection writes."""
+        stop = threading.Event()
+
+        def write():
+            with sqlite3.connect(database, timeout=30) as conn:
+                while not stop.is_set():
+                    conn.execute("INSERT INTO items VALUES (1)")
+                    conn.commit()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            result, error = BackupService(
+                tmp_path / "backups", database
+            ).create_backup()
+        finally:
+            stop.set()
+            writer.join()
+
+        assert error is None and result is not None
+        assert result["manifest"]["database"]["quick_check"] == "ok"
+
+    def test_large_database_spilled_to_disk(self, tmp_path, database, monkeypatch):
+        """Test databases above the memory limit go through a removed temp file."""
+        monkeypatch.setattr(settings, "BACKUP_SNAPSHOT_MEMORY_MAX_BYTES", 0)
+        backups = tmp_path / "backups"
+
+        result, error = BackupService(backups, database).create_backup()
+
+        assert error is None and result is not None
+        assert "docklite.db" in extract(Path(result["path"]))
+        assert sorted(p.name for p in backups.iterdir()) == [
+            ".backup.lock",
+            result["name"],
+            f"{result['name']}.sha256",
+        ]
+
+    def test_without_database(self, tmp_path):
+        """Test a missing database file produces a manifest-only archive."""
+        result, error = BackupService(tmp_path, tmp_path / "none.db").create_backup()
+
+        assert error is None and result is not None
+        assert result["manifest"]["database"] is None
+        assert list(extract(Path(result["path"]))) == ["manifest.json"]
+
+    @pytest.mark.parametrize("name", ["../etc/passwd", "/abs", "docklite.db", ""])
+    def test_invalid_member_names(self, tmp_path, database, name):
+        """Test unsafe or reserved archive paths are rejected."""
+        result, error = BackupService(tmp_path, database).create_backup({name: b"x"})
+
+        assert result is None and error is not None
+        assert "Invalid archive path" in error
+        assert not list(tmp_path.glob("docklite_backup_*"))
+
+    def test_zstd(self, tmp_path, database, monkeypatch):
+        """Test zstd archives (when the zstandard package is installed)."""
+        pytest.importorskip("zstandard")
+        monkeypatch.setattr(settings, "BACKUP_COMPRESSION", "zstd")
+
+        result, error = BackupService(tmp_path, database).create_backup()
+
+        assert error is None and result is not None
+        assert result["name"].endswith(".tar.zst")
+        assert read_manifest(Path(result["path"]))["compression"] == "zstd"
+
+
+@pytest.mark.usefixtures("gzip_backups")
+class TestReadManifest:
+    """Tests for archive verification."""
+
+    def test_checksum_mismatch(self, tmp_path, database):
+        """Test a modified member fails verification."""
+        result, _ = BackupService(tmp_path, database).create_backup({".env": b"A=1\n"})
+        assert result is not None
+        archive = Path(result["path"])
+
+        # Same-size change of .env inside the (re-compressed) tar
+        data = gzip.decompress(archive.read_bytes()).replace(b"A=1\n", b"A=2\n")
+        archive.write_bytes(gzip.compress(data))
+
+        with pytest.raises(ValueError, match="checksum mismatch for .env"):
+            read_manifest(archive)
+
+    def test_list_backups(self, tmp_path, database):
+        """Test archives are listed newest first with their checksum."""
+        service = BackupService(tmp_path, database)
+        first, _ = service.create_backup()
+        second, _ = service.create_backup()
+        (tmp_path / "unrelated.txt").write_text("x")
+
+        backups = service.list_backups()
+
+        assert first is not None and second is not None
+        assert [b["name"] for b in backups] == [second["name"], first["name"]]
+        assert backups[0]["sha256"] == second["sha256"]
+        assert backups[0]["compression"] == "gzip"
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("gzip_backups")
+class TestBackupRPC:
+    """Tests for the backup.* admin RPC methods."""
+
+    @pytest.fixture
+    def rpc(self, tmp_path, database, monkeypatch) -> AdminRPCServer:
+        monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path / "backups"))
+        monkeypatch.setattr(backup_service, "database_path", lambda: database)
+        server = AdminRPCServer()
+        backup_service.register_rpc_methods(server)
+        return server
+
+    async def test_create_and_list(self, rpc):
+        files = {"ssh/authorized_keys": base64.b64encode(b"ssh-ed25519 AAAA").decode()}
+
+        created = await rpc.dispatch(
+            {"id": 1, "method": "backup.create", "params": {"files": files}}
+        )
+        listed = await rpc.dispatch({"id": 2, "method": "backup.list"})
+
+        result = created["result"]
+        paths = [f["path"] for f in result["manifest"]["files"]]
+        assert paths == ["docklite.db", "ssh/authorized_keys"]
+        assert listed["result"][0]["name"] == result["name"]
+
+    async def test_invalid_files(self, rpc):
+        bad_base64 = await rpc.dispatch(
+            {"id": 1, "method": "backup.create", "params": {"files": {".env": "!"}}}
+        )
+        bad_path = await rpc.dispatch(
+            {"id": 2, "method": "backup.create", "params": {"files": {"../x": ""}}}
+        )
+
+        assert bad_base64["error"]["code"] == "invalid_params"
+        assert "Invalid archive path" in bad_path["error"]["message"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("gzip_backups")
+class TestBackupAPI:
+    """Tests for /api/admin/backups."""
+
+    async def test_admin_only(self, client: AsyncClient, user_token):
+        headers = {"Authorization": f"Bearer {user_token}"}
+
+        assert (
+            await client.post("/api/admin/backups", headers=headers)
+        ).status_code == 403
+        assert (
+            await client.get("/api/admin/backups", headers=headers)
+        ).status_code == 403
+
+    async def test_backup_job(
+        self, client: AsyncClient, admin_token, tmp_path, database, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path / "backups"))
+        monkeypatch.setattr(backup_service, "database_path", lambda: database)
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        response = await client.post("/api/admin/backups", headers=headers)
+        assert response.status_code == 202
+        await job_manager.wait()
+        job = await client.get(response.headers["Location"], headers=headers)
+        listed = await client.get("/api/admin/backups", headers=headers)
+
+        assert job.json()["status"] == "completed"
+        name = job.json()["result"]["name"]
+        assert [b["name"] for b in listed.json()] == [name]
+        assert job.json()["result"]["manifest"]["files"][0]["path"] == "docklite.db"
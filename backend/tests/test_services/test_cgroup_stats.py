@@ -0,0 +1,233 @@
+"""Tests for container stats read from cgroup v2 files."""
+
+import json
+import subprocess
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.services import cgroup_stats, docker_service
+from app.services.cgroup_stats import CgroupSampler
+from app.services.docker_service import DockerService
+
+MIB = 1024 * 1024
+
+
+def full_id(short_id: str) -> str:
+    return short_id.ljust(64, "0")
+
+
+def write_cgroup(
+    root: Path,
+    short_id: str,
+    usage_usec: int = 0,
+    memory: int = 100 * MIB,
+    limit: str = "max",
+    pid: str = "",
+    parent: str = "system.slice",
+) -> Path:
+    """Cgroup directory of a container, as the systemd or cgroupfs driver names it"""
+    name = (
+        f"docker-{full_id(short_id)}.scope"
+        if parent == "system.slice"
+        else full_id(short_id)
+    )
+    path = root / parent / name
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "cpu.stat").write_text(
+        f"usage_usec {usage_usec}\nuser_usec 0\nsystem_usec 0\n"
+    )
+    (path / "memory.current").write_text(f"{memory}\n")
+    (path / "memory.max").write_text(f"{limit}\n")
+    (path / "memory.stat").write_text(
+        f"anon {memory}\ninactive_file {4 * MIB}\nactive_file 0\n"
+    )
+    (path / "io.stat").write_text(
+        "8:0 rbytes=1000 wbytes=200 rios=1 wios=1 dbytes=0 dios=0\n"
+        "8:16 rbytes=24 wbytes=56 rios=1 wios=1 dbytes=0 dios=0\n"
+    )
+    (path / "cgroup.procs").write_text(f"{pid}\n" if pid else "")
+    return path
+
+
+@pytest.fixture
+def cgroup_root(tmp_path: Path) -> Path:
+    root = tmp_path / "cgroup"
+    root.mkdir()
+    (root / "cgroup.controllers").write_text("cpuset cpu io memory pids\n")
+    return root
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock"""
+    now = [1000.0]
+    monkeypatch.setattr(cgroup_stats.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestCgroupSampler:
+    """Tests for reading cgroup files."""
+
+    def test_read(self, cgroup_root, clock):
+        write_cgroup(cgroup_root, "a" * 12, usage_usec=5_000_000, limit=str(512 * MIB))
+        sampler = CgroupSampler(str(cgroup_root))
+
+        first, missing = sampler.read(["a" * 12])
+        # 1.5s of CPU time in 2s
+        write_cgroup(cgroup_root, "a" * 12, usage_usec=6_500_000, limit=str(512 * MIB))
+        clock[0] += 2
+        second, _ = sampler.read(["a" * 12])
+
+        assert missing == []
+        assert first["a" * 12]["cpu_percent"] == 0
+        assert second["a" * 12] == {
+            "cpu_percent": 75.0,
+            "memory_bytes": 96 * MIB,
+            "memory_limit_bytes": 512 * MIB,
+            "network_rx_bytes": None,
+            "network_tx_bytes": None,
+            "block_read_bytes": 1024,
+            "block_write_bytes": 256,
+        }
+
+    def test_unlimited_memory(self, cgroup_root):
+        write_cgroup(cgroup_root, "a" * 12)
+
+        readings, _ = CgroupSampler(str(cgroup_root)).read(["a" * 12])
+
+        assert readings["a" * 12]["memory_limit_bytes"] > 0
+
+    @pytest.fixture
+    def proc_root(self, tmp_path: Path) -> Path:
+        """Host /proc with the network counters of process 4242"""
+        net_dev = tmp_path / "proc" / "4242" / "net" / "dev"
+        net_dev.parent.mkdir(parents=True)
+        net_dev.write_text(
+            "Inter-|   Receive                 |  Transmit\n"
+            " face |bytes packets errs drop fifo frame compressed multicast|bytes\n"
+            "    lo:  999 1 0 0 0 0 0 0  999 1 0 0 0 0 0 0\n"
+            "  eth0: 1500 3 0 0 0 0 0 0  700 2 0 0 0 0 0 0\n"
+            "  eth1:  500 1 0 0 0 0 0 0  300 1 0 0 0 0 0 0\n"
+        )
+        return tmp_path / "proc"
+
+    def test_network_from_proc(self, cgroup_root, proc_root):
+        write_cgroup(cgroup_root, "a" * 12, pid="4242")
+
+        readings, _ = CgroupSampler(str(cgroup_root), str(proc_root)).read(["a" * 12])
+
+        assert readings["a" * 12]["network_rx_bytes"] == 2000
+        assert readings["a" * 12]["network_tx_bytes"] == 1000
+
+    def test_network_without_proc_root(self, cgroup_root, proc_root, monkeypatch):
+        """Test network counters are unknown unless the host's /proc is configured."""
+        monkeypatch.setattr(settings, "CGROUP_PROC_ROOT", "")
+        monkeypatch.chdir(proc_root)
+        write_cgroup(cgroup_root, "a" * 12, pid="4242")
+
+        readings, _ = CgroupSampler(str(cgroup_root)).read(["a" * 12])
+
+        assert readings["a" * 12]["network_rx_bytes"] is None
+        assert readings["a" * 12]["network_tx_bytes"] is None
+
+    def test_cgroupfs_driver(self, cgroup_root):
+        write_cgroup(cgroup_root, "b" * 12, parent="docker")
+
+        readings, missing = CgroupSampler(str(cgroup_root)).read(["b" * 12, "c" * 12])
+
+        assert list(readings) == ["b" * 12]
+        assert missing == ["c" * 12]
+
+    def test_stopped_container(self, cgroup_root):
+        path = write_cgroup(cgroup_root, "a" * 12)
+        sampler = CgroupSampler(str(cgroup_root))
+        sampler.read(["a" * 12])
+        for file in path.iterdir():
+            file.unlink()
+        path.rmdir()
+
+        readings, missing = sampler.read(["a" * 12])
+
+        assert (readings, missing) == ({}, [])
+
+    def test_not_cgroup_v2(self, tmp_path):
+        readings, missing = CgroupSampler(str(tmp_path)).read(["a" * 12])
+
+        assert (readings, missing) == ({}, ["a" * 12])
+
+
+class TestDockerServiceStats:
+    """Tests for all-container stats from cgroups with the Engine API fallback."""
+
+    def test_mixed_sources(self, fake_docker, cgroup_root, monkeypatch):
+        monkeypatch.setattr(
+            docker_service, "cgroup_sampler", CgroupSampler(str(cgroup_root))
+        )
+        running = DockerService().list_all_containers(all=False)
+        web = next(c for c in running if c["name"] == "project0_web_1")
+        write_cgroup(cgroup_root, web["id"], memory=20 * MIB, limit=str(1024 * MIB))
+        requests = len(fake_docker.daemon.requests)
+
+        samples, error = DockerService().get_all_container_stats()
+
+        assert error is None
+        assert {s["id"] for s in samples} == {c["id"] for c in running}
+        sample = next(s for s in samples if s["id"] == web["id"])
+        assert sample["project"] == "project0"
+        assert sample["memory_usage"] == "16MiB"
+        assert sample["memory_percent"] == 1.56
+        assert sample["block_io"] == "1.02kB / 256B"
+        # No host /proc: unknown, not an idle network
+        assert sample["network_io"] == "N/A"
+        assert sample["network_rx_bytes"] is None
+        # The other containers were sampled by the daemon
+        stats_calls = [
+            path
+            for _, path in fake_docker.daemon.requests[requests:]
+            if "/stats" in path
+        ]
+        assert len(stats_calls) == len(running) - 1
+        assert all(web["id"] not in path for path in stats_calls)
+
+    def test_disabled(self, fake_docker, cgroup_root, monkeypatch):
+        monkeypatch.setattr(settings, "CGROUP_STATS_ENABLED", False)
+        monkeypatch.setattr(
+            docker_service, "cgroup_sampler", CgroupSampler(str(cgroup_root))
+        )
+        running = DockerService().list_all_containers(all=False)
+        web = next(c for c in running if c["name"] == "project0_web_1")
+        write_cgroup(cgroup_root, web["id"], memory=20 * MIB)
+
+        samples, _ = DockerService().get_all_container_stats()
+
+        sample = next(s for s in samples if s["id"] == web["id"])
+        assert sample["memory_usage"] != "16MiB"
+        assert sample["block_read_bytes"] > 0
+
+    @pytest.mark.parametrize("cgroup_samples", [1, 0])
+    def test_cli_fallback_fails(self, cgroup_root, monkeypatch, cgroup_samples):
+        """Test a failed `docker stats` keeps the samples read from cgroups."""
+        monkeypatch.setattr(settings, "DOCKER_API_SOCKET", "")
+        monkeypatch.setattr(
+            docker_service, "cgroup_sampler", CgroupSampler(str(cgroup_root))
+        )
+        listing = "".join(
+            json.dumps({"ID": cid, "Names": name, "Status": "Up 1 minute"}) + "\n"
+            for cid, name in (("a" * 12, "blog_web_1"), ("b" * 12, "blog_db_1"))
+        )
+        if cgroup_samples:
+            write_cgroup(cgroup_root, "a" * 12)
+        failure = subprocess.CalledProcessError(1, "docker", stderr="daemon busy")
+
+        with patch("subprocess.run") as run:
+            run.side_effect = [Mock(returncode=0), Mock(stdout=listing), failure]
+            samples, error = DockerService().get_all_container_stats()
+
+        if cgroup_samples:
+            assert [s["name"] for s in samples] == ["blog_web_1"]
+            assert error is None
+        else:
+            assert (samples, error) == ([], "daemon busy")
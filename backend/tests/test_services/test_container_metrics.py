@@ -0,0 +1,252 @@
+"""Tests for the container metrics store (ring buffers, rollups, compaction)."""
+
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.services import container_metrics
+from app.services.container_metrics import (
+    ContainerMetricsStore,
+    Tier,
+    compact_container_metrics,
+    read_store,
+    sample_container_metrics,
+)
+from app.services.docker_service import DockerService
+
+# 1 minute of 10s samples, 10 minutes of 1m buckets, 4 hours of 1h buckets
+TIERS = (Tier("raw", 10, 6), Tier("1m", 60, 10), Tier("1h", 3600, 4))
+T0 = 1_700_000_000 // 3600 * 3600
+
+
+def sample(cpu: float, rx: float = 0, name: str = "blog_web_1") -> dict:
+    return {
+        "id": "abcdef123456",
+        "name": name,
+        "project": "blog",
+        "cpu_percent": cpu,
+        "memory_bytes": 1000 * cpu,
+        "memory_percent": cpu / 10,
+        "network_rx_bytes": rx,
+        "network_tx_bytes": 0,
+    }
+
+
+def running() -> int:
+    return len(DockerService().list_all_containers(all=False))
+
+
+@pytest.fixture
+def store() -> ContainerMetricsStore:
+    """Baseline at T0, then one sample every 10s with CPU 1, 2, 3..."""
+    store = ContainerMetricsStore(TIERS)
+    store.record([sample(0)], now=T0)
+    for n in range(1, 13):
+        store.record([sample(n, rx=n * 500)], now=T0 + n * 10)
+    return store
+
+
+@pytest.fixture
+def store_path(tmp_path, monkeypatch):
+    path = tmp_path / "metrics.tsdb"
+    monkeypatch.setattr(settings, "CONTAINER_METRICS_PATH", str(path))
+    monkeypatch.setattr(container_metrics, "default_tiers", lambda: TIERS)
+    monkeypatch.setattr(container_metrics, "_live_store", None)
+    monkeypatch.setattr(container_metrics, "_disk_cache", None)
+    return path
+
+
+class TestContainerMetricsStore:
+    """Tests for recording and querying samples."""
+
+    def test_raw_tier(self, store):
+        result = store.query("blog_web_1", 60, 10, now=T0 + 125)
+
+        assert result["tier"] == "raw"
+        assert (result["range"], result["step"]) == (60, 10)
+        assert result["timestamps"] == [T0 + 70 + 10 * n for n in range(6)]
+        assert result["metrics"]["cpu_percent"]["avg"] == [7, 8, 9, 10, 11, 12]
+        assert result["metrics"]["memory_bytes"]["max"][0] == 7000
+        assert result["metrics"]["net_rx_rate"]["avg"] == [50] * 6
+
+    def test_rollups(self, store):
+        """Test coarser tiers keep averages and peaks of their samples."""
+        minutes = store.query("blog_web_1", 600, 60, now=T0 + 125)
+        # A 5m step over the 1m tier
+        wide = store.query("blog_web_1", 600, 300, now=T0 + 125)
+        hours = store.query("blog_web_1", 4 * 3600, 3600, now=T0 + 125)
+
+        assert minutes["tier"] == "1m"
+        assert minutes["metrics"]["cpu_percent"]["avg"][-3:] == [3, 8.5, 12]
+        assert minutes["metrics"]["cpu_percent"]["max"][-3:] == [5, 11, 12]
+        assert minutes["metrics"]["cpu_percent"]["avg"][0] is None
+        assert (wide["tier"], wide["step"]) == ("1m", 300)
+        assert wide["metrics"]["cpu_percent"]["avg"][-1] == 6.5
+        assert hours["tier"] == "1h"
+        assert hours["metrics"]["cpu_percent"]["avg"][-1] == 6.5
+        assert hours["metrics"]["cpu_percent"]["max"][-1] == 12
+
+    def test_step_rounded_to_resolution(self, store):
+        # Beyond the raw tier: 1m buckets, steps in whole minutes
+        result = store.query("blog_web_1", 300, 90, now=T0 + 125)
+
+        assert (result["tier"], result["step"]) == ("1m", 60)
+        assert len(result["timestamps"]) == 5
+
+    def test_ring_wraps(self, store):
+        """Test new buckets overwrite the oldest slots."""
+        store.record([sample(100, rx=6500)], now=T0 + 130)
+
+        result = store.query("blog_web_1", 60, 10, now=T0 + 135)
+
+        assert result["metrics"]["cpu_percent"]["avg"] == [8, 9, 10, 11, 12, 100]
+        assert result["metrics"]["cpu_percent"]["max"] == [8, 9, 10, 11, 12, 100]
+
+    def test_counter_reset(self, store):
+        """Test restarted containers don't report negative traffic."""
+        store.record([sample(1, rx=0)], now=T0 + 130)
+
+        result = store.query("blog_web_1", 10, 10, now=T0 + 135)
+
+        assert result["metrics"]["net_rx_rate"]["avg"] == [0]
+
+    def test_unknown_network(self, tmp_path):
+        """Test unknown network counters are stored as unknown, not as 0."""
+        store = ContainerMetricsStore(TIERS)
+        for n in range(3):
+            store.record([{**sample(n + 1), "network_rx_bytes": None}], now=T0 + n * 10)
+
+        result = store.query("blog_web_1", 20, 10, now=T0 + 25)
+        assert result is not None
+        store.save(tmp_path / "metrics.tsdb")
+        loaded = ContainerMetricsStore.load(tmp_path / "metrics.tsdb", TIERS)
+
+        assert result["metrics"]["cpu_percent"]["avg"] == [2, 3]
+        assert result["metrics"]["net_rx_rate"] == {
+            "avg": [None, None],
+            "max": [None, None],
+        }
+        assert result["metrics"]["net_tx_rate"]["avg"] == [0, 0]
+        assert loaded.query("blog_web_1", 20, 10, now=T0 + 25) == result
+
+    def test_find(self, store):
+        assert store.find("/blog_web_1").name == "blog_web_1"
+        assert store.find("abcdef").name == "blog_web_1"
+        assert store.find("abcdef1234567890").name == "blog_web_1"
+        assert store.find("ab") is None
+        assert store.query("shop_web_1", 60, 10) is None
+
+    def test_prune(self, store):
+        store.record([sample(1, name="shop_web_1")], now=T0 + 5 * 3600)
+
+        assert store.prune(now=T0 + 5 * 3600) == 1
+        assert list(store.series) == ["shop_web_1"]
+
+
+class TestPersistence:
+    """Tests for compaction to disk."""
+
+    def test_save_load(self, store, tmp_path):
+        path = tmp_path / "metrics.tsdb"
+
+        size = store.save(path)
+        loaded = ContainerMetricsStore.load(path, TIERS)
+
+        assert size == path.stat().st_size
+        assert loaded.query("blog_web_1", 600, 60, T0 + 125) == store.query(
+            "blog_web_1", 600, 60, T0 + 125
+        )
+        assert loaded.series["blog_web_1"].last_seen == T0 + 120
+
+    def test_layout_mismatch(self, store, tmp_path):
+        path = tmp_path / "metrics.tsdb"
+        store.save(path)
+
+        with pytest.raises(ValueError):
+            ContainerMetricsStore.load(path, (Tier("raw", 15, 240),) + TIERS[1:])
+        path.write_bytes(path.read_bytes()[:-100])
+        with pytest.raises(ValueError):
+            ContainerMetricsStore.load(path, TIERS)
+
+
+@pytest.mark.asyncio
+class TestJobs:
+    """Tests for the sampling and compaction jobs."""
+
+    async def test_sample_and_compact(self, store_path, fake_docker, monkeypatch):
+        await sample_container_metrics()
+        await sample_container_metrics()
+        live = container_metrics._live_store
+        assert live is not None
+        await compact_container_metrics()
+
+        # Another worker reads the compacted file
+        monkeypatch.setattr(container_metrics, "_live_store", None)
+        disk = read_store()
+
+        assert disk is not None
+        assert len(live.series) == running()
+        assert store_path.exists()
+        assert disk is read_store()
+        name, now = next(iter(live.series)), time.time()
+        assert disk.query(name, 60, 10, now) == live.query(name, 60, 10, now)
+
+    async def test_unreadable_store_replaced(self, store_path, fake_docker):
+        store_path.write_bytes(b"not a store")
+
+        await sample_container_metrics()
+
+        live = container_metrics._live_store
+        assert live is not None
+        assert len(live.series) == running()
+
+
+@pytest.mark.asyncio
+class TestMetricsAPI:
+    """Tests for GET /api/containers/{id}/metrics."""
+
+    @pytest.fixture(autouse=True)
+    def live(self, store, store_path, monkeypatch):
+        monkeypatch.setattr(container_metrics, "_live_store", store)
+
+    async def test_query(self, client: AsyncClient, admin_token):
+        response = await client.get(
+            "/api/containers/blog_web_1/metrics",
+            params={"range": "10m", "step": "1m"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["tier"], body["project"]) == ("1m", "blog")
+        assert len(body["timestamps"]) == 10
+        assert set(body["metrics"]) == set(container_metrics.FIELDS)
+
+    async def test_invalid(self, client: AsyncClient, admin_token):
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        unknown = await client.get("/api/containers/nope/metrics", headers=headers)
+        invalid = await client.get(
+            "/api/containers/blog_web_1/metrics",
+            params={"range": "yesterday"},
+            headers=headers,
+        )
+        too_many = await client.get(
+            "/api/containers/blog_web_1/metrics",
+            params={"range": "30d", "step": "10s"},
+            headers=headers,
+        )
+
+        assert unknown.status_code == 404
+        assert invalid.status_code == 400
+        assert too_many.status_code == 400
+
+    async def test_admin_only(self, client: AsyncClient, user_token):
+        response = await client.get(
+            "/api/containers/blog_web_1/metrics",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+
+        assert response.status_code == 403
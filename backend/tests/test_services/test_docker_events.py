@@ -0,0 +1,107 @@
+"""Tests for forwarding Docker events to the event hub."""
+
+import asyncio
+
+import pytest
+
+from app.core.events import TOPIC_CONTAINERS, Event, hub
+from app.services import docker_events
+from app.services.docker_events import (
+    ContainerEventListener,
+    ProjectOwners,
+    publish_container_event,
+)
+
+
+@pytest.fixture
+def owners(monkeypatch) -> ProjectOwners:
+    """Project owners without DB lookups: project0 is owned by user 7"""
+    owners = ProjectOwners()
+    owners._owners = {"project0": (10, 7)}
+    owners._loaded = float("inf")
+    monkeypatch.setattr(docker_events, "project_owners", owners)
+    return owners
+
+
+def container_event(action: str, project: str = "project0") -> dict:
+    return {
+        "Type": "container",
+        "Action": action,
+        "Actor": {
+            "ID": "0123456789abcdef",
+            "Attributes": {
+                "name": f"{project}_web_1",
+                "com.docker.compose.project": project,
+                "com.docker.compose.service": "web",
+            },
+        },
+        "time": 1700000000,
+    }
+
+
+@pytest.mark.asyncio
+class TestPublishContainerEvent:
+    """Tests for publish_container_event."""
+
+    async def test_state_change_to_owner(self, owners):
+        subscription = hub.subscribe(frozenset({TOPIC_CONTAINERS}), 7, False)
+        try:
+            await publish_container_event(container_event("health_status: healthy"))
+            await publish_container_event(container_event("die"))
+            received = await subscription.get(timeout=1)
+        finally:
+            hub.unsubscribe(subscription)
+
+        assert [(e.type, e.data["state"]) for e in received] == [
+            ("health_status", "running"),
+            ("die", "exited"),
+        ]
+        assert received[1].data["id"] == "0123456789ab"
+        assert received[1].data["project_id"] == 10
+        assert received[1].data["service"] == "web"
+
+    async def test_other_projects_admin_only(self, owners):
+        user = hub.subscribe(frozenset({TOPIC_CONTAINERS}), 7, False)
+        admin = hub.subscribe(frozenset({TOPIC_CONTAINERS}), 1, True)
+        try:
+            await publish_container_event(container_event("start", "other"))
+            assert await user.get(timeout=0.05) == []
+            assert len(await admin.get(timeout=1)) == 1
+        finally:
+            hub.unsubscribe(user)
+            hub.unsubscribe(admin)
+
+    async def test_non_state_actions_ignored(self, owners):
+        admin = hub.subscribe(frozenset({TOPIC_CONTAINERS}), 1, True)
+        try:
+            await publish_container_event(container_event("exec_start: sh"))
+            assert await admin.get(timeout=0.05) == []
+        finally:
+            hub.unsubscribe(admin)
+
+
+@pytest.mark.asyncio
+class TestContainerEventListener:
+    """Tests for following the daemon's event stream."""
+
+    async def test_forwards_daemon_events(self, fake_docker, owners):
+        listener = ContainerEventListener()
+        admin = hub.subscribe(frozenset({TOPIC_CONTAINERS}), 1, True)
+        listener.start()
+        try:
+            await asyncio.sleep(0.3)
+            container = fake_docker.daemon.find("project0_web_1")
+            await asyncio.to_thread(fake_docker.daemon.restart, container)
+
+            received: list[Event] = []
+            while len(received) < 4:
+                events = await admin.get(timeout=5)
+                assert events, "no container events received"
+                received.extend(events)
+        finally:
+            await listener.stop()
+            hub.unsubscribe(admin)
+
+        assert [e.type for e in received] == ["die", "stop", "start", "restart"]
+        assert received[-1].owner_id == 7
+        assert not listener.running
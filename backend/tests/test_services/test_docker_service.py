@@ -3,7 +3,14 @@
 import pytest
 import json
 from unittest.mock import Mock, patch, MagicMock
+import io
+import os
 import subprocess
+import tarfile
+import threading
+import time
+from pathlib import Path
+
 from app.services.docker_service import DockerService
 
 
@@ -532,6 +539,41 @@ class TestGetContainerStats:
         assert error is not None
 
 
+    @patch('subprocess.run')
+    def test_get_all_stats(self, mock_run):
+        """Test one `docker stats` call samples all running containers."""
+        container_json = json.dumps({
+            "ID": "abc123def4567890",
+            "Names": "myproject_web_1",
+            "Image": "nginx:alpine",
+            "Status": "Up 5 minutes",
+            "Ports": "",
+            "CreatedAt": "2024-01-01 10:00:00"
+        })
+        stats_json = json.dumps({
+            "ID": "abc123def456",
+            "CPUPerc": "2.5%",
+            "MemUsage": "10MiB / 1GiB",
+            "MemPerc": "1.0%",
+            "NetIO": "1kB / 2kB"
+        })
+        mock_run.side_effect = [
+            Mock(returncode=0),
+            Mock(stdout=container_json + "\n", returncode=0),
+            Mock(stdout=stats_json + "\n", returncode=0),
+        ]
+        service = DockerService()
+
+        samples, error = service.get_all_container_stats()
+
+        assert error is None
+        assert len(samples) == 1
+        assert samples[0]["project"] == "myproject"
+        assert samples[0]["service"] == "web"
+        assert samples[0]["cpu_percent"] == 2.5
+        assert mock_run.call_args_list[2][0][0][:3] == ["docker", "stats", "--no-stream"]
+
+
 class TestSystemContainerProtection:
     """Tests for system container identification."""
 
@@ -582,3 +624,279 @@ class TestSystemContainerProtection:
         assert len(containers) == 1
         assert containers[0]["is_system"] is False
 
+
+
+class TestEngineAPIBackend:
+    """Tests for DockerService talking to the Engine API (fake daemon)."""
+
+    def test_list_containers(self, fake_docker):
+        """Test listing has the same shape as the CLI backend."""
+        service = DockerService()
+
+        containers = service.list_all_containers()
+
+        assert len(containers) == 100
+        traefik = containers[0]
+        assert traefik["name"] == "docklite-traefik"
+        assert traefik["is_system"] is True
+        assert traefik["ports"] == ["0.0.0.0:80->80/tcp", "0.0.0.0:443->443/tcp"]
+        web = next(c for c in containers if c["name"] == "project0_web_1")
+        assert web["project"] == "project0"
+        assert web["service"] == "web"
+        assert web["state"] == "running"
+        assert len(web["id"]) == 12
+        assert web["created"].endswith("+0000 UTC")
+
+    def test_list_running_only(self, fake_docker):
+        """Test all=False only returns running containers."""
+        containers = DockerService().list_all_containers(all=False)
+
+        assert containers
+        assert all(c["state"] == "running" for c in containers)
+        assert len(containers) < 100
+
+    def test_get_container(self, fake_docker):
+        """Test inspect by name and by ID prefix."""
+        service = DockerService()
+
+        container = service.get_container("project0_web_1")
+
+        assert container is not None
+        assert container["labels"]["com.docker.compose.service"] == "web"
+        assert container["ports"] == ["80/tcp"]
+        by_id = service.get_container(container["id"])
+        assert by_id is not None and by_id["name"] == "project0_web_1"
+        assert service.get_container("missing") is None
+
+    def test_lifecycle(self, fake_docker):
+        """Test stop/start/restart/remove and their errors."""
+        service = DockerService()
+
+        assert service.stop_container("project0_web_1") == (True, None)
+        stopped = service.get_container("project0_web_1")
+        assert stopped is not None and stopped["state"] == "exited"
+        # Already stopped: success, like the CLI
+        assert service.stop_container("project0_web_1") == (True, None)
+        assert service.start_container("project0_web_1") == (True, None)
+        assert service.restart_container("project0_web_1") == (True, None)
+
+        success, error = service.remove_container("project0_web_1")
+        assert success is False
+        assert error is not None and "container is running" in error
+        assert service.remove_container("project0_web_1", force=True) == (True, None)
+
+        success, error = service.start_container("project0_web_1")
+        assert success is False
+        assert error is not None and "No such container" in error
+
+        actions = [
+            (m, p.rsplit("/", 1)[-1])
+            for m, p in fake_docker.daemon.requests
+            if m != "GET"
+        ]
+        assert ("POST", "restart") in actions
+        assert ("DELETE", "project0_web_1") in actions
+
+    def test_logs_are_demultiplexed(self, fake_docker):
+        """Test logs arrive without stream frame headers."""
+        logs, error = DockerService().get_container_logs("project0_web_1", tail=5)
+
+        assert error is None and logs is not None
+        lines = logs.splitlines()
+        assert len(lines) == 5
+        assert all(line[:4].isdigit() for line in lines)  # Timestamps
+        assert "\x00" not in logs
+
+    def test_stats(self, fake_docker):
+        """Test stats are computed like `docker stats`."""
+        stats, error = DockerService().get_container_stats("project0_web_1")
+
+        assert error is None and stats is not None
+        assert 0 < stats["cpu_percent"] <= 100 * 4
+        assert stats["memory_limit"] == "2GiB"
+        assert stats["memory_usage"].endswith("MiB")
+        assert " / " in stats["network_io"]
+
+    def test_all_stats(self, fake_docker):
+        """Test stats of all running containers in one call."""
+        running = DockerService().list_all_containers(all=False)
+
+        samples, error = DockerService().get_all_container_stats()
+
+        assert error is None
+        assert {s["id"] for s in samples} == {c["id"] for c in running}
+        web = next(s for s in samples if s["name"] == "project0_web_1")
+        assert web["project"] == "project0"
+        assert web["memory_limit"] == "2GiB"
+
+    def test_event_stream(self, fake_docker):
+        """Test container events are streamed until the stream is closed."""
+        stream = DockerService().event_stream()
+        received = []
+
+        def follow():
+            for event in stream:
+                received.append(event)
+                if event["Action"] == "start":
+                    break
+
+        thread = threading.Thread(target=follow)
+        thread.start()
+        time.sleep(0.2)
+        container = fake_docker.daemon.find("project0_web_1")
+        fake_docker.daemon.set_running(container, False)
+        fake_docker.daemon.set_running(container, True)
+        thread.join(timeout=5)
+        stream.close()
+
+        assert not thread.is_alive()
+        assert [e["Action"] for e in received] == ["die", "stop", "start"]
+        assert received[0]["Actor"]["Attributes"]["name"] == "project0_web_1"
+
+    def test_unavailable_socket(self, tmp_path, monkeypatch):
+        """Test initialization fails when nothing listens on the socket."""
+        from app.core.config import settings
+
+        monkeypatch.setattr(
+            settings, "DOCKER_API_SOCKET", str(tmp_path / "missing.sock")
+        )
+
+        with pytest.raises(Exception, match="Docker is not available"):
+            DockerService()
+
+    def test_human_size(self):
+        """Test byte formatting matches the docker CLI."""
+        assert DockerService._human_size(1500) == "1.5kB"
+        assert DockerService._human_size(512) == "512B"
+        assert DockerService._human_size(100 * 1024**2, binary=True) == "100MiB"
+
+
+# Stand-in docker CLI: `create` prints an ID, `cp <id>:<path> -` tars the
+# directory named by $FAKE_VOLUME_DIR, `cp - <id>:<path>` extracts into its
+# "staged" subdirectory, `start` logs its arguments, `volume ls` prints two
+# volumes
+FAKE_DOCKER_CLI = """#!/bin/sh
+case "$1" in
+  version|rm) exit 0 ;;
+  create) echo helper123 ;;
+  start) echo "$@" >> "$FAKE_VOLUME_DIR.log" ;;
+  cp) [ "$FAKE_CP_FAIL" = 1 ] && { echo "no such volume" >&2; exit 1; }
+      if [ "$2" = "-" ]; then
+        mkdir -p "$FAKE_VOLUME_DIR/staged" && tar -C "$FAKE_VOLUME_DIR/staged" -xf -
+      else
+        tar -C "$FAKE_VOLUME_DIR" -cf - .
+      fi ;;
+  volume) printf 'blog_db\\tblog\\nloose\\t\\n' ;;
+esac
+"""
+
+
+class TestVolumes:
+    """Tests for volume listing and export (docker CLI and Engine API)."""
+
+    @pytest.fixture
+    def docker_cli(self, tmp_path, monkeypatch):
+        """Fake docker executable first on PATH, volume content in a dir"""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        script = bin_dir / "docker"
+        script.write_text(FAKE_DOCKER_CLI)
+        script.chmod(0o755)
+        volume = tmp_path / "volume"
+        (volume / "pg").mkdir(parents=True)
+        (volume / "pg" / "PG_VERSION").write_text("16\n")
+        monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+        monkeypatch.setenv("FAKE_VOLUME_DIR", str(volume))
+        return volume
+
+    def test_cli_list_volumes(self, docker_cli):
+        volumes, error = DockerService().list_volumes()
+
+        assert error is None
+        assert volumes == [
+            {"name": "blog_db", "project": "blog"},
+            {"name": "loose", "project": ""},
+        ]
+
+    def test_cli_export_volume(self, docker_cli):
+        """Test the tar stream of `docker cp` is passed through."""
+        with DockerService().export_volume("blog_db") as stream:
+            with tarfile.open(fileobj=stream, mode="r|") as tar:
+                names = [m.name for m in tar]
+
+        assert "./pg/PG_VERSION" in names
+
+    def test_cli_export_failure(self, docker_cli, monkeypatch):
+        monkeypatch.setenv("FAKE_CP_FAIL", "1")
+
+        with pytest.raises(Exception, match="docker cp failed: no such volume"):
+            with DockerService().export_volume("blog_db") as stream:
+                stream.read()
+
+    def test_cli_stage_volume(self, docker_cli):
+        """Test the archive is piped into `docker cp -` after the prepare helper."""
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            info = tarfile.TarInfo("pg/PG_VERSION")
+            info.size = 3
+            tar.addfile(info, io.BytesIO(b"17\n"))
+
+        DockerService().stage_volume("blog_db", [buffer.getvalue()])
+
+        assert (docker_cli / "staged" / "pg" / "PG_VERSION").read_text() == "17\n"
+        log = Path(f"{docker_cli}.log").read_text()
+        assert log == "start --attach helper123\n"
+
+    def test_api_stage_and_swap_volume(self, fake_docker):
+        volume = fake_docker.daemon.add_volume("blog_db", "blog", {"old": b"1"})
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            info = tarfile.TarInfo("new")
+            info.size = 1
+            tar.addfile(info, io.BytesIO(b"2"))
+        data = buffer.getvalue()
+        service = DockerService()
+
+        # Sent in parts (chunked upload)
+        service.stage_volume(
+            "blog_db", (data[i : i + 100] for i in range(0, len(data), 100))
+        )
+        staged = dict(volume.files)
+        service.swap_volume("blog_db")
+
+        assert staged == {"old": b"1", ".docklite-restore/new": b"2"}
+        assert volume.files == {"new": b"2"}
+
+    def test_api_list_project_containers(self, fake_docker):
+        fake_docker.daemon.add_container("blog_web_1", "blog")
+        fake_docker.daemon.add_container("blog_db_1", "blog", running=False)
+
+        containers, error = DockerService().list_project_containers("blog")
+
+        assert error is None
+        assert [(c["name"], c["running"]) for c in containers] == [
+            ("blog_db_1", False),
+            ("blog_web_1", True),
+        ]
+
+    def test_api_export_volume(self, fake_docker):
+        fake_docker.daemon.add_volume("blog_db", "blog", {"pg/PG_VERSION": b"16\n"})
+        service = DockerService()
+
+        volumes, _ = service.list_volumes()
+        with service.export_volume("blog_db") as stream:
+            with tarfile.open(fileobj=stream, mode="r|") as tar:
+                files = {}
+                for member in tar:
+                    extracted = tar.extractfile(member)
+                    if extracted is not None:
+                        files[member.name] = extracted.read()
+
+        assert volumes == [{"name": "blog_db", "project": "blog"}]
+        assert files == {"./pg/PG_VERSION": b"16\n"}
+        # The helper container was removed
+        assert fake_docker.daemon.requests[-1][0] == "DELETE"
+        helpers = [
+            c for c in fake_docker.daemon.list_containers(all=True) if "docklite.helper" in c["Labels"]
+        ]
+        assert not helpers
@@ -0,0 +1,111 @@
+"""Tests for background jobs."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.constants.job_constants import JobStatus
+from app.core.events import TOPIC_JOBS, hub
+from app.services import job_service
+from app.services.job_service import JobManager
+
+
+class TestJobManager:
+    """Tests for JobManager."""
+
+    async def test_job_runs_in_thread(self):
+        """Jobs run off the event loop thread and complete."""
+        manager = JobManager()
+        threads = []
+
+        job = manager.submit(
+            "test", lambda: threads.append(threading.get_ident()), owner_id=1
+        )
+        assert job.to_dict()["status"] == JobStatus.PENDING.value
+
+        await manager.wait()
+
+        assert job.status == JobStatus.COMPLETED
+        assert job.finished_at is not None
+        assert threads and threads[0] != threading.get_ident()
+
+    async def test_coroutine_job_awaited(self):
+        """Coroutine functions run on the event loop and complete."""
+        manager = JobManager()
+
+        async def restore(snapshot_id):
+            await asyncio.sleep(0)
+            return {"id": snapshot_id}
+
+        job = manager.submit("test", restore, "latest")
+        await manager.wait()
+
+        assert job.status == JobStatus.COMPLETED
+        assert job.result == {"id": "latest"}
+
+    async def test_job_failure_recorded(self):
+        """Exceptions mark the job as failed with the error message."""
+        manager = JobManager()
+
+        def fail():
+            raise OSError("permission denied")
+
+        job = manager.submit("test", fail)
+        await manager.wait()
+
+        assert job.status == JobStatus.FAILED
+        assert job.error == "permission denied"
+        assert job.to_dict()["status"] == "failed"
+
+    async def test_get_ownership(self):
+        """Only the owner or an admin can see a job."""
+        manager = JobManager()
+        job = manager.submit("test", lambda: None, owner_id=1)
+        await manager.wait()
+
+        assert manager.get(job.id, user_id=1) is job
+        assert manager.get(job.id, user_id=2) is None
+        assert manager.get(job.id, user_id=2, is_admin=True) is job
+        assert manager.get("missing") is None
+
+    async def test_finished_jobs_pruned(self, monkeypatch):
+        """Only the most recent finished jobs are kept."""
+        monkeypatch.setattr(job_service, "MAX_FINISHED_JOBS", 2)
+        manager = JobManager()
+
+        jobs = []
+        for _ in range(4):
+            jobs.append(manager.submit("test", lambda: None))
+            await manager.wait()
+
+        assert manager.get(jobs[0].id) is None
+        assert manager.get(jobs[-1].id) is jobs[-1]
+
+    async def test_progress_published(self):
+        """Status changes are published to the job owner's event streams."""
+        subscription = hub.subscribe(frozenset({TOPIC_JOBS}), 1, False)
+        manager = JobManager()
+        try:
+            job = manager.submit("test", lambda: None, owner_id=1)
+            await manager.wait()
+            received = await subscription.get(timeout=1)
+        finally:
+            hub.unsubscribe(subscription)
+
+        assert [event.type for event in received] == ["running", "completed"]
+        assert received[-1].data["id"] == job.id
+
+    async def test_job_visible_to_other_workers(self, tmp_path):
+        """Polls answered by another worker read the job record."""
+        worker = JobManager(tmp_path)
+        other = JobManager(tmp_path)
+
+        job = worker.submit("test", lambda: {"size": 3}, owner_id=1, target="blog")
+        await worker.wait()
+        seen = other.get(job.id, user_id=1)
+
+        assert seen is not None and seen is not job
+        assert seen.to_dict() == job.to_dict()
+        assert other.get(job.id, user_id=2) is None
+        assert other.get("../../etc/passwd") is None
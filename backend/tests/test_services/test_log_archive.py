@@ -0,0 +1,284 @@
+"""Tests for the container log archive (collector, full-text search, retention)."""
+
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.project import Project
+from app.models.user import User
+from app.services.docker_service import DockerService
+from app.services.log_archive import (
+    LogArchive,
+    LogCollector,
+    fts_query,
+    prune_log_archive,
+)
+
+
+@pytest.fixture
+def archive_path(tmp_path: Path, monkeypatch) -> Path:
+    path = tmp_path / "logs.db"
+    monkeypatch.setattr(settings, "LOG_ARCHIVE_PATH", str(path))
+    return path
+
+
+@pytest.fixture
+def archive(archive_path):
+    archive = LogArchive(archive_path)
+    yield archive
+    archive.close()
+
+
+@pytest.fixture
+def small_docker(monkeypatch):
+    """Fake daemon with the system containers only, 20 log lines each"""
+    from benchmarks.fake_docker import FakeDockerServer
+
+    with FakeDockerServer(containers=3, log_lines=20) as server:
+        monkeypatch.setattr(settings, "DOCKER_API_SOCKET", server.socket_path)
+        yield server
+
+
+def fill(archive: LogArchive, now: float) -> None:
+    archive.insert(
+        [
+            (now - 3600, "blog", "blog_web_1", "stdout", "GET /cart 200"),
+            (now - 60, "blog", "blog_web_1", "stderr", "upstream timeout: payments"),
+            (now - 30, "blog", "blog_db_1", "stdout", "checkpoint complete"),
+            (now - 10, "shop", "shop_web_1", "stderr", "upstream timed out (AND)"),
+        ],
+        {"a" * 12: now - 10},
+    )
+
+
+async def wait_for(condition, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.05)
+
+
+def test_fts_query():
+    """Test operators and quotes in searches are matched literally."""
+    assert fts_query("timeout") == '"timeout"'
+    assert fts_query('upstr* "AND" OR') == '"upstr"* "AND" "OR"'
+    assert fts_query("  * ") == ""
+
+
+class TestLogArchive:
+    """Tests for storing and searching lines."""
+
+    def test_search(self, archive):
+        now = time.time()
+        fill(archive, now)
+
+        lines, error = archive.search("timeout")
+        blog, _ = archive.search("upstream", projects=["blog"])
+        prefix, _ = archive.search("time*")
+        literal, _ = archive.search("AND")
+        recent, _ = archive.search(since=now - 45, until=now - 20)
+        everything, _ = archive.search(limit=2)
+
+        assert error is None
+        assert [(l["project"], l["stream"]) for l in lines] == [("blog", "stderr")]
+        assert lines[0]["message"] == "upstream timeout: payments"
+        assert [l["container"] for l in blog] == ["blog_web_1"]
+        assert [l["project"] for l in prefix] == ["shop", "blog"]
+        assert [l["project"] for l in literal] == ["shop"]
+        assert [l["message"] for l in recent] == ["checkpoint complete"]
+        assert [l["time"] for l in everything] == [now - 10, now - 30]
+        assert archive.cursors() == {"a" * 12: now - 10}
+
+    def test_prune_retention(self, archive):
+        now = time.time()
+        fill(archive, now - 86400 + 45)
+
+        result = archive.prune(retention_days=1, max_bytes=0, now=now)
+
+        assert result["deleted"] == 2
+        # The index follows the table
+        assert archive.search("GET")[0] == []
+        assert [l["project"] for l in archive.search("upstream")[0]] == ["shop"]
+
+    def test_prune_size(self, archive):
+        now = time.time()
+        archive.insert(
+            [
+                (now + n, "blog", "blog_web_1", "stdout", f"line {n} " + "x" * 200)
+                for n in range(5000)
+            ],
+            {},
+        )
+        full = archive.size()
+
+        result = archive.prune(retention_days=0, max_bytes=full // 2)
+
+        assert result["bytes"] <= full // 2
+        assert 0 < result["deleted"] < 5000
+        newest, _ = archive.search(limit=1)
+        assert newest[0]["message"].startswith("line 4999 ")
+
+    async def test_prune_job(self, archive, monkeypatch):
+        """Test the scheduled job prunes the configured archive."""
+        monkeypatch.setattr(settings, "LOG_ARCHIVE_RETENTION_DAYS", 1)
+        fill(archive, time.time() - 86400 + 45)
+
+        await prune_log_archive()
+
+        assert len(archive.search()[0]) == 2
+
+
+@pytest.mark.asyncio
+class TestLogCollector:
+    """Tests for following container logs through the fake daemon."""
+
+    async def test_collect(self, archive_path, small_docker, monkeypatch):
+        monkeypatch.setattr(settings, "LOG_ARCHIVE_FLUSH_SECONDS", 0.05)
+        monkeypatch.setattr(settings, "LOG_ARCHIVE_SCAN_SECONDS", 0.1)
+        daemon = small_docker.daemon
+        web = daemon.add_container("blog_web_1", "blog")
+        reader = LogArchive(archive_path)
+
+        def count() -> int:
+            return len(reader.search(limit=1000)[0])
+
+        collector = LogCollector(LogArchive(archive_path))
+        collector.start()
+        try:
+            # Whole logs of the 3 system containers and blog_web_1
+            await wait_for(lambda: count() == 4 * 20)
+            daemon.write_log(web, "payment failed: upstream timeout", stream=2)
+            await wait_for(lambda: count() == 4 * 20 + 1)
+            # A container started later is picked up by the next scan
+            late = daemon.add_container("shop_web_1", "shop")
+            daemon.write_log(late, "shop ready")
+            await wait_for(lambda: count() == 5 * 20 + 2)
+        finally:
+            await collector.stop()
+
+        lines, _ = reader.search("upstream timeout", projects=["blog"])
+        assert [(l["container"], l["stream"]) for l in lines] == [
+            ("blog_web_1", "stderr")
+        ]
+        assert lines[0]["time"] == pytest.approx(web.written_logs[0][0], abs=1e-5)
+        assert reader.search("ready")[0][0]["project"] == "shop"
+        reader.close()
+
+    async def test_resume_after_restart(self, archive_path, small_docker, monkeypatch):
+        """Test a new collector continues after the last archived line."""
+        monkeypatch.setattr(settings, "LOG_ARCHIVE_FLUSH_SECONDS", 0.05)
+        daemon = small_docker.daemon
+        web = daemon.add_container("blog_web_1", "blog")
+        reader = LogArchive(archive_path)
+        containers = DockerService().list_all_containers(all=False)
+
+        first = LogCollector(LogArchive(archive_path))
+        first.start()
+        await wait_for(lambda: len(reader.search(limit=1000)[0]) == 4 * 20)
+        await first.stop()
+        daemon.write_log(web, "logged while no collector ran")
+
+        second = LogCollector(LogArchive(archive_path))
+        second.start()
+        try:
+            await wait_for(lambda: len(reader.search(limit=1000)[0]) == 4 * 20 + 1)
+            await asyncio.sleep(0.3)
+        finally:
+            await second.stop()
+
+        assert len(containers) == 4
+        assert len(reader.search(limit=1000)[0]) == 4 * 20 + 1
+        assert reader.search("collector")[0][0]["container"] == "blog_web_1"
+        reader.close()
+
+    async def test_container_stop_ends_stream(self, archive, small_docker):
+        web = small_docker.daemon.add_container("blog_web_1", "blog")
+        collector = LogCollector(archive)
+        containers = [
+            c
+            for c in DockerService().list_all_containers(all=False)
+            if c["name"] == "blog_web_1"
+        ]
+
+        collector.follow(containers)
+        thread = collector._threads[containers[0]["id"]]
+        small_docker.daemon.set_running(web, False)
+        await asyncio.to_thread(thread.join, 5)
+
+        assert not thread.is_alive()
+        assert collector.flush() == 20
+        collector.follow([])
+        assert collector._threads == {}
+
+
+@pytest.mark.asyncio
+class TestLogSearchAPI:
+    """Tests for GET /api/logs/search."""
+
+    @pytest.fixture
+    async def owned(self, archive, db_session, user_token) -> None:
+        """Project blog owned by the regular user, shop by the admin"""
+        users = {
+            u.username: u.id for u in (await db_session.execute(select(User))).scalars()
+        }
+        for slug, owner in (("blog", "regularuser"), ("shop", "setupadmin")):
+            db_session.add(
+                Project(
+                    name=slug,
+                    domain=f"{slug}.local",
+                    slug=slug,
+                    owner_id=users[owner],
+                    compose_content="services: {}",
+                )
+            )
+        await db_session.commit()
+        fill(archive, time.time())
+
+    async def test_admin(self, client: AsyncClient, admin_token, owned):
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        response = await client.get(
+            "/api/logs/search", params={"q": "upstream"}, headers=headers
+        )
+        recent = await client.get(
+            "/api/logs/search", params={"since": "2m", "limit": 1}, headers=headers
+        )
+        invalid = await client.get(
+            "/api/logs/search", params={"since": "yesterday"}, headers=headers
+        )
+
+        assert response.status_code == 200
+        assert [l["project"] for l in response.json()["lines"]] == ["shop", "blog"]
+        assert [l["project"] for l in recent.json()["lines"]] == ["shop"]
+        assert invalid.status_code == 400
+
+    async def test_owner_scope(self, client: AsyncClient, user_token, owned):
+        headers = {"Authorization": f"Bearer {user_token}"}
+
+        own = await client.get(
+            "/api/logs/search", params={"q": "upstream"}, headers=headers
+        )
+        other = await client.get(
+            "/api/logs/search", params={"project": "shop"}, headers=headers
+        )
+        container = await client.get(
+            "/api/logs/search",
+            params={"project": "blog", "container": "blog_db_1"},
+            headers=headers,
+        )
+
+        assert [l["container"] for l in own.json()["lines"]] == ["blog_web_1"]
+        assert other.status_code == 404
+        assert [l["message"] for l in container.json()["lines"]] == [
+            "checkpoint complete"
+        ]
+
+    async def test_requires_auth(self, client: AsyncClient):
+        response = await client.get("/api/logs/search")
+
+        assert response.status_code in (401, 403)
@@ -0,0 +1,118 @@
+"""Tests for container log storage reports."""
+
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.admin_rpc import AdminRPCServer
+from app.core.config import settings
+from app.services import log_service
+from app.services.log_service import LogService
+
+
+@pytest.fixture
+def containers_dir(tmp_path: Path, monkeypatch) -> Path:
+    path = tmp_path / "containers"
+    path.mkdir()
+    monkeypatch.setattr(settings, "DOCKER_CONTAINERS_DIR", str(path))
+    return path
+
+
+def write_logs(containers_dir: Path, container_id: str, files: dict[str, int]) -> None:
+    directory = containers_dir / container_id
+    for name, size in files.items():
+        (directory / name).parent.mkdir(parents=True, exist_ok=True)
+        (directory / name).write_bytes(b"x" * size)
+
+
+@pytest.fixture
+def containers(fake_docker, containers_dir) -> dict:
+    """blog (json-file, rotated), shop (local driver), an unbounded container"""
+    daemon = fake_docker.daemon
+    rotated = {"Type": "json-file", "Config": {"max-size": "10m", "max-file": "3"}}
+    web = daemon.add_container("blog_web_1", "blog", log_config=rotated)
+    db = daemon.add_container("blog_db_1", "blog", log_config=rotated)
+    shop = daemon.add_container("shop_web_1", "shop", log_config={"Type": "local"})
+    old = daemon.add_container(
+        "legacy", running=False, log_config={"Type": "json-file", "Config": {}}
+    )
+    write_logs(
+        containers_dir,
+        web.id,
+        {f"{web.id}-json.log": 100, f"{web.id}-json.log.1": 1000, "config.v2.json": 5},
+    )
+    write_logs(containers_dir, db.id, {f"{db.id}-json.log": 10})
+    write_logs(
+        containers_dir,
+        shop.id,
+        {"local-logs/container.log": 50, "local-logs/container.log.1.gz": 20},
+    )
+    write_logs(containers_dir, old.id, {f"{old.id}-json.log": 3000})
+    return {"web": web, "shop": shop, "old": old}
+
+
+class TestLogUsage:
+    """Tests for LogService.get_usage."""
+
+    def test_usage_by_project(self, containers, monkeypatch):
+        """Test sizes include rotated files and projects are sorted by size."""
+        monkeypatch.setattr(settings, "PROJECT_LOG_DRIVER", "json-file")
+
+        usage, error = LogService().get_usage()
+
+        assert error is None and usage is not None
+        sizes = [(p["project"], p["bytes"]) for p in usage["projects"]]
+        assert sizes[:3] == [
+            ("", 3000),
+            ("blog", 1110),
+            ("shop", 70),
+        ]
+        assert usage["total_bytes"] == 4180
+        blog = usage["projects"][1]["containers"]
+        assert [c["name"] for c in blog] == ["blog_db_1", "blog_web_1"]
+        assert blog[1] == {
+            "id": containers["web"].id[:12],
+            "name": "blog_web_1",
+            "driver": "json-file",
+            "max_size": "10m",
+            "max_file": "3",
+            "bytes": 1100,
+            "bounded": True,
+        }
+        # json-file without max-size grows without limit; local always rotates
+        assert usage["unbounded"] == ["legacy"]
+        assert usage["policy"]["driver"] == "json-file"
+
+    def test_directory_not_readable(self, fake_docker, tmp_path):
+        usage, error = LogService(tmp_path / "missing").get_usage()
+
+        assert usage is None and error is not None
+        assert "not readable" in error
+
+
+@pytest.mark.asyncio
+class TestLogUsageRPCAndAPI:
+    """Tests for logs.usage and /api/admin/logs/usage."""
+
+    async def test_rpc(self, containers):
+        rpc = AdminRPCServer()
+        log_service.register_rpc_methods(rpc)
+
+        response = await rpc.dispatch({"id": 1, "method": "logs.usage"})
+
+        assert response["result"]["total_bytes"] == 4180
+
+    async def test_api(self, client: AsyncClient, admin_token, user_token, containers):
+        forbidden = await client.get(
+            "/api/admin/logs/usage",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        response = await client.get(
+            "/api/admin/logs/usage",
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+
+        assert forbidden.status_code == 403
+        assert response.status_code == 200
+        assert response.json()["unbounded"] == ["legacy"]
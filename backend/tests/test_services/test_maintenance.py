@@ -0,0 +1,100 @@
+"""Tests for periodic maintenance jobs."""
+
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.core.events import TOPIC_STATS, hub
+from app.core.metrics import CONTAINERS
+from app.core.scheduler import Scheduler
+from app.services import maintenance
+from app.services.docker_events import ProjectOwners
+
+
+@pytest.mark.asyncio
+class TestMaintenanceJobs:
+    """Tests for the maintenance job functions."""
+
+    async def test_cleanup_removes_stale_trash(self, temp_projects_dir, monkeypatch):
+        """Trash directories older than TRASH_STALE_SECONDS are removed."""
+        trash = Path(temp_projects_dir) / ".trash-old-12345678"
+        project = Path(temp_projects_dir) / "project"
+        for directory in (trash, project):
+            directory.mkdir()
+            (directory / "file").write_text("x")
+        monkeypatch.setattr(settings, "TRASH_STALE_SECONDS", 0)
+
+        await maintenance.cleanup_stale_trash()
+
+        assert not trash.exists()
+        assert project.exists()
+
+    async def test_cleanup_keeps_fresh_trash(self, temp_projects_dir):
+        """Recent trash may belong to a deletion still in progress."""
+        fresh = Path(temp_projects_dir) / ".trash-new-87654321"
+        fresh.mkdir()
+
+        await maintenance.cleanup_stale_trash()
+
+        assert fresh.exists()
+
+    async def test_sample_container_states(self, fake_docker):
+        """Container counts by state are published as a gauge."""
+        await maintenance.sample_container_states()
+
+        running = CONTAINERS.value("running")
+        exited = CONTAINERS.value("exited")
+        assert running > 0 and exited > 0
+        assert running + exited == len(fake_docker.daemon._containers)
+
+    async def test_stats_skipped_without_subscribers(self, monkeypatch):
+        """No docker stats call when nobody subscribed to the stats topic."""
+        monkeypatch.setattr(hub, "has_interest", lambda topic: False)
+
+        def fail():
+            raise AssertionError("stats sampled")
+
+        monkeypatch.setattr(maintenance, "DockerService", fail)
+
+        await maintenance.publish_container_stats()
+
+    async def test_publish_container_stats(self, fake_docker, monkeypatch):
+        """Samples are published per project, scoped to the project owner."""
+        owners = ProjectOwners()
+        owners._owners = {"project0": (10, 7)}
+        owners._loaded = float("inf")
+        monkeypatch.setattr(maintenance, "project_owners", owners)
+        subscription = hub.subscribe(frozenset({TOPIC_STATS}), 7, False)
+        admin = hub.subscribe(frozenset({TOPIC_STATS}), 1, True)
+        try:
+            await maintenance.publish_container_stats()
+
+            owned = await subscription.get(timeout=1)
+            everything = await admin.get(timeout=1)
+        finally:
+            hub.unsubscribe(subscription)
+            hub.unsubscribe(admin)
+
+        assert [event.data["project"] for event in owned] == ["project0"]
+        assert owned[0].data["project_id"] == 10
+        assert {c["project"] for c in owned[0].data["containers"]} == {"project0"}
+        # Containers of unknown projects are grouped for admins
+        assert {event.data["project"] for event in everything} == {"project0", ""}
+
+
+class TestRegisterJobs:
+    """Tests for job registration from settings."""
+
+    def test_disabled_jobs_not_registered(self, monkeypatch):
+        monkeypatch.setattr(settings, "RECONCILE_INTERVAL_SECONDS", 0)
+        monkeypatch.setattr(settings, "CONTAINER_SAMPLE_INTERVAL_SECONDS", 30)
+        monkeypatch.setattr(settings, "TRASH_CLEANUP_CRON", "")
+        monkeypatch.setattr(settings, "EVENTS_STATS_INTERVAL_SECONDS", 0)
+        monkeypatch.setattr(settings, "LOG_ARCHIVE_PRUNE_CRON", "")
+        monkeypatch.setattr(settings, "CONTAINER_METRICS_ENABLED", False)
+        scheduler = Scheduler()
+
+        maintenance.register_jobs(scheduler)
+
+        assert [job.name for job in scheduler.jobs] == ["sample_container_states"]
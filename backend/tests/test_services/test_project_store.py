@@ -0,0 +1,247 @@
+"""Tests for the project file store."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.core.config import settings
+from app.services.project_store import (
+    COMPOSE_FILENAME,
+    ENV_FILENAME,
+    ProjectFileStore,
+    render_env,
+)
+
+COMPOSE = "services:\n  web:\n    image: nginx\n"
+
+
+@pytest.fixture
+def store(temp_projects_dir):
+    """Fresh store writing under a temporary PROJECTS_DIR."""
+    return ProjectFileStore()
+
+
+class TestProjectFileTransaction:
+    """Tests for two-phase project file writes."""
+
+    def test_commit_publishes_files(self, store, temp_projects_dir):
+        """Staged files only appear after commit."""
+        files = store.begin("site")
+        files.write(COMPOSE_FILENAME, COMPOSE)
+        files.write(ENV_FILENAME, render_env({"A": "1"}))
+
+        project_dir = Path(temp_projects_dir) / "site"
+        assert not (project_dir / COMPOSE_FILENAME).exists()
+
+        files.commit()
+
+        assert (project_dir / COMPOSE_FILENAME).read_text() == COMPOSE
+        assert (project_dir / ENV_FILENAME).read_text() == "A=1"
+        assert sorted(p.name for p in project_dir.iterdir()) == [
+            ENV_FILENAME,
+            COMPOSE_FILENAME,
+        ]
+
+    def test_abort_discards_new_project(self, store, temp_projects_dir):
+        """Aborting a new project removes its directory."""
+        files = store.begin("site")
+        files.write(COMPOSE_FILENAME, COMPOSE)
+        files.abort()
+
+        assert not (Path(temp_projects_dir) / "site").exists()
+
+    def test_abort_keeps_existing_files(self, store, temp_projects_dir):
+        """Aborting an update leaves current files untouched."""
+        project_dir = Path(temp_projects_dir) / "site"
+        project_dir.mkdir()
+        (project_dir / COMPOSE_FILENAME).write_text("old")
+
+        files = store.begin("site")
+        files.write(COMPOSE_FILENAME, COMPOSE)
+        files.delete(COMPOSE_FILENAME)
+        files.abort()
+
+        assert (project_dir / COMPOSE_FILENAME).read_text() == "old"
+        assert [p.name for p in project_dir.iterdir()] == [COMPOSE_FILENAME]
+
+    async def test_commit_cancels_pending_env_write(self, store, temp_projects_dir):
+        """A staged .env supersedes a pending write-behind."""
+        (Path(temp_projects_dir) / "site").mkdir()
+        store.schedule_env_write("site", {"OLD": "1"})
+
+        files = store.begin("site")
+        files.write(ENV_FILENAME, "NEW=1")
+        files.commit()
+        await store.flush()
+
+        env_file = Path(temp_projects_dir) / "site" / ENV_FILENAME
+        assert env_file.read_text() == "NEW=1"
+        assert not store.has_pending_writes()
+
+
+class TestEnvWriteBehind:
+    """Tests for coalesced .env writes."""
+
+    async def test_burst_coalesced(self, store, temp_projects_dir, monkeypatch):
+        """A burst of edits results in one write of the latest content."""
+        monkeypatch.setattr(settings, "ENV_WRITE_DELAY_MS", 20)
+        (Path(temp_projects_dir) / "site").mkdir()
+        env_file = Path(temp_projects_dir) / "site" / ENV_FILENAME
+
+        for i in range(5):
+            store.schedule_env_write("site", {"COUNT": str(i)})
+
+        assert not env_file.exists()
+        await asyncio.sleep(0.1)
+
+        assert env_file.read_text() == "COUNT=4"
+        assert not store.has_pending_writes()
+
+    async def test_empty_env_removes_file(self, store, temp_projects_dir):
+        """Empty environment removes .env."""
+        project_dir = Path(temp_projects_dir) / "site"
+        project_dir.mkdir()
+        (project_dir / ENV_FILENAME).write_text("A=1")
+
+        store.schedule_env_write("site", {})
+        await store.flush()
+
+        assert not (project_dir / ENV_FILENAME).exists()
+
+    async def test_cancel_drops_write(self, store, temp_projects_dir):
+        """Cancelled writes never reach disk."""
+        (Path(temp_projects_dir) / "site").mkdir()
+        store.schedule_env_write("site", {"A": "1"})
+        store.cancel_env_write("site")
+        await store.flush()
+
+        assert not (Path(temp_projects_dir) / "site" / ENV_FILENAME).exists()
+
+    async def test_deleted_project_skipped(self, store, temp_projects_dir):
+        """Flushing a deleted project does not recreate its directory."""
+        store.schedule_env_write("gone", {"A": "1"})
+        await store.flush()
+
+        assert not (Path(temp_projects_dir) / "gone").exists()
+
+
+class TestCheckConsistency:
+    """Tests for the boot consistency check."""
+
+    def test_consistent(self, store, temp_projects_dir):
+        """Matching files report nothing."""
+        files = store.begin("site")
+        files.write(COMPOSE_FILENAME, COMPOSE)
+        files.commit()
+
+        report = store.check_consistency([("site", COMPOSE, {})])
+
+        assert report == {
+            "repaired": [],
+            "modified": [],
+            "orphaned": [],
+            "temp_files_removed": 0,
+        }
+
+    def test_missing_files_repaired(self, store, temp_projects_dir):
+        """Missing files are rewritten from the DB."""
+        report = store.check_consistency([("site", COMPOSE, {"A": "1"})])
+
+        project_dir = Path(temp_projects_dir) / "site"
+        assert report["repaired"] == ["site/docker-compose.yml", "site/.env"]
+        assert (project_dir / COMPOSE_FILENAME).read_text() == COMPOSE
+        assert (project_dir / ENV_FILENAME).read_text() == "A=1"
+
+    def test_interrupted_write_repaired(self, store, temp_projects_dir):
+        """Files with a leftover temp file are rewritten and temps removed."""
+        project_dir = Path(temp_projects_dir) / "site"
+        project_dir.mkdir()
+        (project_dir / COMPOSE_FILENAME).write_text("old")
+        (project_dir / ".docker-compose.yml.abc123.tmp").write_text("ne")
+
+        report = store.check_consistency([("site", COMPOSE, {})])
+
+        assert report["repaired"] == ["site/docker-compose.yml"]
+        assert report["temp_files_removed"] == 1
+        assert (project_dir / COMPOSE_FILENAME).read_text() == COMPOSE
+        assert not (project_dir / ".docker-compose.yml.abc123.tmp").exists()
+
+    def test_interrupted_env_write_repaired(self, store, temp_projects_dir):
+        """Stale .env with a leftover temp file is rewritten from the DB."""
+        project_dir = Path(temp_projects_dir) / "site"
+        project_dir.mkdir()
+        (project_dir / COMPOSE_FILENAME).write_text(COMPOSE)
+        (project_dir / ENV_FILENAME).write_text("A=old")
+        (project_dir / "..env.abc123.tmp").write_text("A=n")
+
+        report = store.check_consistency([("site", COMPOSE, {"A": "new"})])
+
+        assert report["repaired"] == ["site/.env"]
+        assert (project_dir / ENV_FILENAME).read_text() == "A=new"
+
+    def test_uploaded_env_reported(self, store, temp_projects_dir):
+        """A .env that came with an rsync deploy is kept, not overwritten."""
+        project_dir = Path(temp_projects_dir) / "site"
+        project_dir.mkdir()
+        (project_dir / COMPOSE_FILENAME).write_text(COMPOSE)
+        (project_dir / ENV_FILENAME).write_text("SECRET=local\n")
+
+        report = store.check_consistency([("site", COMPOSE, {"A": "1"})])
+        empty_db = store.check_consistency([("site", COMPOSE, {})])
+
+        assert report["modified"] == ["site/.env"]
+        assert report["repaired"] == []
+        assert empty_db["modified"] == ["site/.env"]
+        assert (project_dir / ENV_FILENAME).read_text() == "SECRET=local\n"
+
+    def test_user_modified_file_reported(self, store, temp_projects_dir):
+        """Content drift without crash artifacts is reported, not overwritten."""
+        project_dir = Path(temp_projects_dir) / "site"
+        project_dir.mkdir()
+        (project_dir / COMPOSE_FILENAME).write_text("uploaded")
+
+        report = store.check_consistency([("site", COMPOSE, {})])
+
+        assert report["modified"] == ["site/docker-compose.yml"]
+        assert (project_dir / COMPOSE_FILENAME).read_text() == "uploaded"
+
+    def test_report_only(self, store, temp_projects_dir):
+        """repair=False does not touch the filesystem."""
+        report = store.check_consistency([("site", COMPOSE, {})], repair=False)
+
+        assert report["repaired"] == ["site/docker-compose.yml"]
+        assert not (Path(temp_projects_dir) / "site").exists()
+
+    def test_orphaned_directories(self, store, temp_projects_dir):
+        """Directories without a DB row are reported."""
+        (Path(temp_projects_dir) / "leftover").mkdir()
+
+        report = store.check_consistency([])
+
+        assert report["orphaned"] == ["leftover"]
+        assert (Path(temp_projects_dir) / "leftover").exists()
+
+
+class TestTrash:
+    """Tests for detached deletion of project trees."""
+
+    def test_move_to_trash(self, store, temp_projects_dir):
+        """Project directory is renamed to a hidden trash directory."""
+        project_dir = Path(temp_projects_dir) / "site"
+        (project_dir / "data").mkdir(parents=True)
+
+        trash_dir = store.move_to_trash("site")
+
+        assert not project_dir.exists()
+        assert trash_dir.name.startswith(".trash-site-")
+        assert store.list_trash() == [trash_dir]
+        assert store.check_consistency([])["orphaned"] == []
+
+        store.remove_tree(trash_dir)
+        assert store.list_trash() == []
+
+    def test_move_missing_project(self, store, temp_projects_dir):
+        """Missing directories need no removal."""
+        assert store.move_to_trash("missing") is None
+        store.remove_tree(None)
@@ -0,0 +1,456 @@
+"""Tests for in-place snapshot restores (staging, verification, swap)."""
+
+import asyncio
+import base64
+import io
+import os
+import sqlite3
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+
+import pytest
+import yaml
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.admin_rpc import AdminRPCServer
+from app.core.config import settings
+from app.models.project import Project
+from app.models.user import User
+from app.services import restore_service, snapshot_service
+from app.services.job_service import job_manager
+from app.services.project_store import project_file_store
+from app.services.restore_service import RestoreService, volume_archive
+from app.services.snapshot_service import ChunkStore, SnapshotService
+
+CHUNK_SIZE = 1024
+
+
+@pytest.fixture
+def projects(temp_projects_dir, monkeypatch) -> Path:
+    """Projects blog and shop, a chunked file and a symlink each"""
+    monkeypatch.setattr(settings, "BACKUP_CHUNK_SIZE", CHUNK_SIZE)
+    monkeypatch.setattr(settings, "BACKUP_COMPRESSION", "gzip")
+    monkeypatch.setattr(settings, "BACKUP_SNAPSHOT_VOLUMES", False)
+    monkeypatch.setattr(settings, "BACKUP_THREADS", 2)
+    root = Path(temp_projects_dir)
+    for slug in ("blog", "shop"):
+        (root / slug / "static").mkdir(parents=True)
+        (root / slug / "docker-compose.yml").write_text(f"# {slug}\n")
+        (root / slug / "static" / "big.bin").write_bytes(os.urandom(5 * CHUNK_SIZE))
+        (root / slug / "current").symlink_to("static")
+    return root
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Path:
+    path = tmp_path / "docklite.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE items (value INTEGER)")
+        conn.executemany("INSERT INTO items VALUES (?)", [(i,) for i in range(100)])
+    return path
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> Path:
+    return tmp_path / "store"
+
+
+def snapshot(store: Path, database: Path, **kwargs) -> dict:
+    result, error = SnapshotService(store, database).create_snapshot(**kwargs)
+    assert error is None and result is not None
+    return result
+
+
+def count_items(database: Path) -> int:
+    with sqlite3.connect(database) as conn:
+        count: int = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    return count
+
+
+def hidden_dirs(root: Path) -> list[str]:
+    return sorted(p.name for p in root.iterdir() if p.name.startswith("."))
+
+
+class TestRestoreProjects:
+    """Tests for project directories swapped in place."""
+
+    def test_restore_project(self, store, database, projects, fake_docker):
+        """Test only the selected project is replaced, its containers restarted."""
+        created = snapshot(store, database)
+        original = (projects / "blog" / "static" / "big.bin").read_bytes()
+        (projects / "blog" / "static" / "big.bin").write_bytes(b"changed")
+        (projects / "blog" / "new.txt").write_text("added after the snapshot")
+        (projects / "shop" / "docker-compose.yml").write_text("# shop v2\n")
+        daemon = fake_docker.daemon
+        web = daemon.add_container("blog_web_1", "blog")
+        daemon.add_container("blog_worker_1", "blog", running=False)
+        shop = daemon.add_container("shop_web_1", "shop")
+        requests = len(daemon.requests)
+
+        result, error = RestoreService(store, database).restore_snapshot(
+            created["id"], projects=["blog"]
+        )
+
+        assert error is None and result is not None
+        assert result["sources"] == ["projects/blog"]
+        assert result["projects"] == ["blog"]
+        assert not result["database"]
+        assert (projects / "blog" / "static" / "big.bin").read_bytes() == original
+        assert not (projects / "blog" / "new.txt").exists()
+        assert os.readlink(projects / "blog" / "current") == "static"
+        assert (projects / "shop" / "docker-compose.yml").read_text() == "# shop v2\n"
+        # Running containers of the project were stopped, then started again
+        assert result["stopped"] == ["blog_web_1"]
+        assert web.running and shop.running
+        stops = [p for m, p in daemon.requests[requests:] if p.endswith("/stop")]
+        assert stops == [f"/containers/{web.id}/stop"]
+        # Staging and replaced directories are gone
+        assert hidden_dirs(projects) == []
+        assert count_items(database) == 100
+
+    def test_restore_everything(self, store, database, projects, fake_docker):
+        """Test no selection restores all sources but the host files."""
+        snapshot(store, database, files={".env": b"A=1\n"})
+        with sqlite3.connect(database) as conn:
+            conn.execute("DELETE FROM items")
+        (projects / "shop" / "static" / "big.bin").unlink()
+
+        result, error = RestoreService(store, database).restore_snapshot("latest")
+
+        assert error is None and result is not None
+        assert result["sources"] == ["database", "projects/blog", "projects/shop"]
+        assert "host_files" not in result
+        assert result["files"] == 1 + 4
+        assert count_items(database) == 100
+        assert (projects / "shop" / "static" / "big.bin").exists()
+
+    def test_host_files(self, store, database, projects):
+        """Test host files are only returned, nothing live is touched."""
+        snapshot(store, database, files={".env": b"A=1\n"})
+        with sqlite3.connect(database) as conn:
+            conn.execute("DELETE FROM items")
+
+        result, error = RestoreService(store, database).restore_snapshot(
+            "latest", host=True
+        )
+
+        assert error is None and result is not None
+        assert result["sources"] == ["host"]
+        assert result["host_files"] == {".env": b"A=1\n"}
+        assert count_items(database) == 0
+
+    @pytest.mark.asyncio
+    async def test_pending_env_write_dropped(
+        self, store, database, projects, fake_docker
+    ):
+        """Test a write-behind .env scheduled before the restore never lands."""
+        created = snapshot(store, database)
+        project_file_store.schedule_env_write("blog", {"A": "1"})
+
+        _, error = await asyncio.to_thread(
+            RestoreService(store, database).restore_snapshot,
+            created["id"],
+            projects=["blog"],
+        )
+        await project_file_store.flush()
+
+        assert error is None
+        assert not project_file_store.has_pending_writes()
+        assert not (projects / "blog" / ".env").exists()
+
+
+class TestRestoreDatabase:
+    """Tests for the database swap."""
+
+    def test_open_connection_sees_restored_data(self, store, database, projects):
+        """Test the live file is replaced in place (backup API), not renamed."""
+        created = snapshot(store, database)
+        live = sqlite3.connect(database)
+        live.execute("DELETE FROM items WHERE value >= 10")
+        live.commit()
+        inode = database.stat().st_ino
+
+        result, error = RestoreService(store, database).restore_snapshot(
+            created["id"], database=True
+        )
+
+        assert error is None and result is not None
+        assert result["sources"] == ["database"]
+        assert result["stopped"] == [] and result["downtime"] == 0
+        assert live.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 100
+        assert database.stat().st_ino == inode
+        live.close()
+        assert [p.name for p in database.parent.glob(".docklite.db.*")] == []
+
+    def test_missing_live_database(self, store, database, projects):
+        created = snapshot(store, database)
+        database.unlink()
+
+        _, error = RestoreService(store, database).restore_snapshot(
+            created["id"], database=True
+        )
+
+        assert error is None
+        assert count_items(database) == 100
+
+
+class TestRestoreVolumes:
+    """Tests for named volumes staged in place and swapped by helpers."""
+
+    def test_restore_volume(self, store, database, projects, fake_docker):
+        daemon = fake_docker.daemon
+        volume = daemon.add_volume(
+            "blog_db", "blog", {"pg/PG_VERSION": b"16\n", "pg/base/1": b"x" * 3000}
+        )
+        created = snapshot(store, database, volumes=True)
+        volume.files = {"pg/PG_VERSION": b"17\n", "pg/extra": b"new"}
+        db = daemon.add_container("blog_db_1", "blog")
+
+        result, error = RestoreService(store, database).restore_snapshot(
+            created["id"], volumes=["blog_db"]
+        )
+
+        assert error is None and result is not None
+        assert result["volumes"] == ["blog_db"]
+        assert result["projects"] == []
+        assert volume.files == {"pg/PG_VERSION": b"16\n", "pg/base/1": b"x" * 3000}
+        assert result["stopped"] == ["blog_db_1"] and db.running
+        helpers = [
+            c
+            for c in daemon.list_containers(all=True)
+            if "docklite.helper" in c["Labels"]
+        ]
+        assert not helpers
+
+    def test_project_brings_its_volumes(self, store, database, projects, fake_docker):
+        fake_docker.daemon.add_volume("blog_db", "blog", {"a": b"1"})
+        fake_docker.daemon.add_volume("shop_db", "shop", {"b": b"2"})
+        created = snapshot(store, database, volumes=True)
+
+        result, error = RestoreService(store, database).restore_snapshot(
+            created["id"], projects=["blog"]
+        )
+
+        assert error is None and result is not None
+        assert result["sources"] == ["projects/blog", "volumes/blog_db"]
+
+    def test_volume_archive(self, store, database, projects, fake_docker):
+        """Test the generated tar stream matches the snapshot entries."""
+        files = {"pg/PG_VERSION": b"16\n", "pg/base/1": os.urandom(2500)}
+        fake_docker.daemon.add_volume("blog_db", "blog", files)
+        created = snapshot(store, database, volumes=True)
+        service = SnapshotService(store, database)
+        _, sources = service.read_snapshot(created["id"])
+        chunks = ChunkStore(store, "gzip")
+
+        with ThreadPoolExecutor(2) as pool:
+            data = b"".join(
+                volume_archive(chunks, sources["volumes/blog_db"]["entries"], pool)
+            )
+
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            extracted = {}
+            for member in tar.getmembers():
+                source = tar.extractfile(member) if member.isfile() else None
+                if source is not None:
+                    extracted[member.name] = source.read()
+            assert tar.getmember("pg").isdir()
+        assert extracted == files
+
+
+class TestRestoreFailures:
+    """Tests for restores that must leave the live data alone."""
+
+    def test_corrupt_chunk(self, store, database, projects, fake_docker):
+        """Test a corrupt chunk aborts before anything live is replaced."""
+        created = snapshot(store, database)
+        (projects / "blog" / "docker-compose.yml").write_text("# live\n")
+        chunks = ChunkStore(store, "gzip")
+        for path in chunks.files():
+            path.write_bytes(chunks._compress(b"tampered"))
+        container = fake_docker.daemon.add_container("blog_web_1", "blog")
+        stops = len([p for _, p in fake_docker.daemon.requests if "stop" in p])
+
+        result, error = RestoreService(store, database).restore_snapshot(
+            created["id"], database=True, projects=["blog"]
+        )
+
+        assert result is None and error is not None
+        assert "is corrupt" in error
+        assert (projects / "blog" / "docker-compose.yml").read_text() == "# live\n"
+        assert container.running
+        assert len([p for _, p in fake_docker.daemon.requests if "stop" in p]) == stops
+        assert hidden_dirs(projects) == []
+        assert count_items(database) == 100
+
+    def test_database_swap_fails(
+        self, store, database, projects, fake_docker, monkeypatch
+    ):
+        """Test projects stay restored, the database is reported as failed."""
+        created = snapshot(store, database)
+        (projects / "blog" / "docker-compose.yml").write_text("# live\n")
+        with sqlite3.connect(database) as conn:
+            conn.execute("DELETE FROM items")
+
+        def locked(self, staging):
+            staging.unlink()
+            raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(RestoreService, "_swap_database", locked)
+
+        result, error = RestoreService(store, database).restore_snapshot(
+            created["id"], database=True, projects=["blog"]
+        )
+
+        assert error is None and result is not None
+        assert result["errors"] == {"database": "database is locked"}
+        assert not result["database"]
+        assert result["projects"] == ["blog"]
+        assert (projects / "blog" / "docker-compose.yml").read_text() == "# blog\n"
+        assert count_items(database) == 0
+        assert [p.name for p in database.parent.glob(".docklite.db.*")] == []
+
+    def test_not_in_snapshot(self, store, database, projects):
+        created = snapshot(store, database, projects=["shop"])
+
+        result, error = RestoreService(store, database).restore_snapshot(
+            created["id"], projects=["blog"], volumes=["nope"]
+        )
+
+        assert result is None and error is not None
+        assert "projects/blog, volumes/nope" in error
+
+    def test_empty_store(self, store, database):
+        result, error = RestoreService(store, database).restore_snapshot("latest")
+
+        assert result is None and error is not None
+        assert "No snapshots" in error
+
+
+@pytest.mark.asyncio
+class TestRestoreRPCAndAPI:
+    """Tests for snapshot.restore and /api/admin/snapshots/{id}/restore."""
+
+    @pytest.fixture
+    def backups(
+        self, tmp_path: Path, projects, database, db_session, monkeypatch
+    ) -> Path:
+        monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path / "backups"))
+        monkeypatch.setattr(
+            restore_service, "AsyncSessionLocal", lambda: nullcontext(db_session)
+        )
+        monkeypatch.setattr(snapshot_service, "database_path", lambda: database)
+        snapshot(tmp_path / "backups" / "store", database, files={".env": b"A=1\n"})
+        return tmp_path / "backups"
+
+    async def test_rpc(self, backups, database):
+        rpc = AdminRPCServer()
+        restore_service.register_rpc_methods(rpc)
+
+        restored = await rpc.dispatch(
+            {
+                "id": 1,
+                "method": "snapshot.restore",
+                "params": {"snapshot": "latest", "database": True, "host": True},
+            }
+        )
+        invalid = await rpc.dispatch(
+            {
+                "id": 2,
+                "method": "snapshot.restore",
+                "params": {"snapshot": "latest", "volumes": "blog_db"},
+            }
+        )
+
+        assert restored["result"]["sources"] == ["database", "host"]
+        host_files = restored["result"]["host_files"]
+        assert base64.b64decode(host_files[".env"]) == b"A=1\n"
+        assert invalid["error"]["code"] == "invalid_params"
+
+    async def test_api(
+        self, client: AsyncClient, admin_token, user_token, backups, fake_docker
+    ):
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        forbidden = await client.post(
+            "/api/admin/snapshots/latest/restore",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        response = await client.post(
+            "/api/admin/snapshots/latest/restore",
+            json={"projects": ["shop"]},
+            headers=headers,
+        )
+        assert response.status_code == 202
+        await job_manager.wait()
+        job = await client.get(response.headers["Location"], headers=headers)
+
+        assert forbidden.status_code == 403
+        assert job.json()["status"] == "completed"
+        assert job.json()["target"] == "latest"
+        assert job.json()["result"]["projects"] == ["shop"]
+        assert job.json()["result"]["reconcile"]["orphaned"] == ["blog", "shop"]
+        assert "host_files" not in job.json()["result"]
+
+    async def test_routing_resynced(
+        self, backups, db_session, admin_token, tmp_path, fake_docker, monkeypatch
+    ):
+        """Test a restore regenerates Traefik's file-provider config from the DB"""
+        monkeypatch.setattr(settings, "TRAEFIK_ROUTING_MODE", "file")
+        dynamic = tmp_path / "dynamic"
+        dynamic.mkdir()
+        monkeypatch.setattr(settings, "TRAEFIK_DYNAMIC_CONFIG_DIR", str(dynamic))
+        stale = {"http": {"routers": {"gone": {"rule": "Host(`gone.local`)"}}}}
+        (dynamic / "docklite-projects.yml").write_text(yaml.safe_dump(stale))
+        admin = (await db_session.execute(select(User))).scalars().first()
+        db_session.add(
+            Project(
+                name="shop",
+                domain="shop.local",
+                slug="shop",
+                owner_id=admin.id,
+                compose_content="services:\n  web:\n    image: nginx\n",
+            )
+        )
+        await db_session.commit()
+        rpc = AdminRPCServer()
+        restore_service.register_rpc_methods(rpc)
+
+        restored = await rpc.dispatch(
+            {
+                "id": 1,
+                "method": "snapshot.restore",
+                "params": {"snapshot": "latest", "projects": ["shop"]},
+            }
+        )
+
+        reconcile = restored["result"]["reconcile"]
+        config = yaml.safe_load(Path(reconcile["traefik_config"]).read_text())
+        assert list(config["http"]["routers"]) == ["shop"]
+        # The restored compose file is kept, not overwritten from the DB
+        assert reconcile["modified"] == ["shop/docker-compose.yml"]
+        assert reconcile["orphaned"] == ["blog"]
+
+    async def test_reconcile_failure_reported(self, backups, monkeypatch):
+        async def fail(self):
+            raise OSError("read-only file system")
+
+        monkeypatch.setattr(
+            restore_service.ProjectService, "check_files_consistency", fail
+        )
+        rpc = AdminRPCServer()
+        restore_service.register_rpc_methods(rpc)
+
+        restored = await rpc.dispatch(
+            {
+                "id": 1,
+                "method": "snapshot.restore",
+                "params": {"snapshot": "latest", "database": True},
+            }
+        )
+
+        assert restored["result"]["database"] is True
+        assert restored["result"]["reconcile"] == {"error": "read-only file system"}
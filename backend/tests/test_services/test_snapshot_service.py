@@ -0,0 +1,361 @@
+"""Tests for incremental snapshots (chunk store, manifests, selective restore)."""
+
+import base64
+import os
+import sqlite3
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.admin_rpc import AdminRPCServer
+from app.core.config import settings
+from app.core.scheduler import Scheduler
+from app.services import maintenance, snapshot_service
+from app.services.job_service import job_manager
+from app.services.docker_service import DockerService
+from app.services.snapshot_service import ChunkStore, SnapshotService
+
+CHUNK_SIZE = 1024
+
+
+@pytest.fixture
+def projects(temp_projects_dir, monkeypatch) -> Path:
+    """Two projects with files, a subdirectory and a symlink"""
+    monkeypatch.setattr(settings, "BACKUP_CHUNK_SIZE", CHUNK_SIZE)
+    monkeypatch.setattr(settings, "BACKUP_COMPRESSION", "gzip")
+    monkeypatch.setattr(settings, "BACKUP_SNAPSHOT_VOLUMES", False)
+    root = Path(temp_projects_dir)
+    for slug in ("blog", "shop"):
+        (root / slug / "static").mkdir(parents=True)
+        (root / slug / "docker-compose.yml").write_text(f"# {slug}\n")
+        (root / slug / "static" / "big.bin").write_bytes(os.urandom(3 * CHUNK_SIZE))
+        (root / slug / ".env").write_text("SECRET=1\n")
+        os.chmod(root / slug / ".env", 0o600)
+        (root / slug / "current").symlink_to("static")
+    (root / ".trash-old-1234").mkdir()
+    return root
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Path:
+    path = tmp_path / "docklite.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE items (value INTEGER)")
+        conn.executemany("INSERT INTO items VALUES (?)", [(i,) for i in range(100)])
+    return path
+
+
+@pytest.fixture
+def service(tmp_path, database) -> SnapshotService:
+    return SnapshotService(tmp_path / "store", database)
+
+
+def stored_chunks(service: SnapshotService) -> set[str]:
+    return {p.name for p in ChunkStore(service.store_dir, "gzip").files()}
+
+
+class TestCreateSnapshot:
+    """Tests for SnapshotService.create_snapshot."""
+
+    def test_sources_and_stats(self, service, projects):
+        """Test database, projects and host files become sources."""
+        result, error = service.create_snapshot({".env": b"A=1\n"})
+
+        assert error is None
+        assert list(result["sources"]) == [
+            "database",
+            "host",
+            "projects/blog",
+            "projects/shop",
+        ]
+        assert result["sources"]["projects/blog"]["files"] == 3
+        assert result["errors"] == {}
+        # 3 chunks per big.bin, small files of both projects deduplicated
+        stats = result["stats"]
+        assert stats["files"] == 1 + 1 + 6
+        assert stats["new_chunks"] == len(stored_chunks(service))
+        assert service.list_snapshots()[0]["id"] == result["id"]
+
+    def test_incremental(self, service, projects):
+        """Test unchanged files are reused and only changed chunks written."""
+        first, _ = service.create_snapshot(volumes=False)
+        big = projects / "blog" / "static" / "big.bin"
+        data = bytearray(big.read_bytes())
+        data[CHUNK_SIZE + 1] ^= 0xFF  # Change the middle chunk only
+        big.write_bytes(bytes(data))
+
+        second, error = service.create_snapshot(volumes=False)
+
+        assert error is None
+        assert second["id"] != first["id"]
+        # Only the middle chunk of big.bin is new (the database didn't change)
+        assert second["stats"]["new_chunks"] == 1
+        assert second["stats"]["reused_files"] == 5
+
+    def test_selected_projects(self, service, projects):
+        result, _ = service.create_snapshot(projects=["shop"])
+
+        assert "projects/blog" not in result["sources"]
+        assert result["partial"] is True
+
+    def test_unknown_project(self, service, projects):
+        result, error = service.create_snapshot(projects=["nope"])
+
+        assert result is None
+        assert "Unknown projects: nope" in error
+
+    def test_prune_removes_unreferenced_chunks(self, service, projects, monkeypatch):
+        """Test old snapshots are pruned with the chunks only they used."""
+        monkeypatch.setattr(settings, "BACKUP_SNAPSHOT_KEEP", 1)
+        first, _ = service.create_snapshot()
+        (projects / "blog" / "static" / "big.bin").write_bytes(b"replaced")
+
+        second, _ = service.create_snapshot()
+
+        assert second["pruned"]["snapshots"] == [first["id"]]
+        assert second["pruned"]["chunks"] == 3
+        assert [s["id"] for s in service.list_snapshots()] == [second["id"]]
+        restored, error = service.restore_snapshot(
+            second["id"], service.store_dir.parent / "out"
+        )
+        assert error is None
+
+
+class TestVolumes:
+    """Tests for named volumes copied through the fake Docker daemon."""
+
+    def test_project_volumes(self, service, projects, fake_docker):
+        fake_docker.daemon.add_volume(
+            "blog_db", "blog", {"pgdata/PG_VERSION": b"16\n", "pgdata/base/1": b"x"}
+        )
+        fake_docker.daemon.add_volume("other_data", "other", {"a": b"a"})
+
+        result, error = service.create_snapshot(volumes=True)
+
+        assert error is None
+        assert result["sources"]["volumes/blog_db"] == {
+            "kind": "volume",
+            "project": "blog",
+            "consistency": "stopped",
+            "files": 2,
+            "bytes": 4,
+        }
+        assert "volumes/other_data" not in result["sources"]
+        # Helper containers are removed after the copy
+        helpers = [
+            c
+            for c in fake_docker.daemon.list_containers(all=True)
+            if "docklite.helper" in c["Labels"]
+        ]
+        assert not helpers
+
+        restored, _ = service.restore_snapshot(
+            result["id"], service.store_dir.parent / "out", ["volumes/*"]
+        )
+        volume = service.store_dir.parent / "out" / "volumes" / "blog_db"
+        assert (volume / "pgdata" / "PG_VERSION").read_bytes() == b"16\n"
+        assert restored["files"] == 2
+
+    def test_containers_paused_for_copy(self, service, projects, fake_docker):
+        """Test running containers are frozen once for all volumes of a project."""
+        daemon = fake_docker.daemon
+        daemon.add_volume("blog_db", "blog", {"pgdata/PG_VERSION": b"16\n"})
+        daemon.add_volume("blog_cache", "blog", {"dump.rdb": b"x"})
+        db = daemon.add_container("blog_db_1", "blog")
+        worker = daemon.add_container("blog_worker_1", "blog", running=False)
+        requests = len(daemon.requests)
+
+        result, error = service.create_snapshot(volumes=True)
+
+        assert error is None and result is not None
+        assert result["sources"]["volumes/blog_db"]["consistency"] == "paused"
+        assert result["sources"]["volumes/blog_cache"]["consistency"] == "paused"
+        paths = [p for _, p in daemon.requests[requests:]]
+        pauses = [i for i, p in enumerate(paths) if p.endswith("/pause")]
+        unpauses = [i for i, p in enumerate(paths) if p.endswith("/unpause")]
+        copies = [i for i, p in enumerate(paths) if p.endswith("/archive")]
+        assert [paths[i] for i in pauses] == [f"/containers/{db.id}/pause"]
+        assert [paths[i] for i in unpauses] == [f"/containers/{db.id}/unpause"]
+        assert len(copies) == 2
+        assert pauses[0] < min(copies) and max(copies) < unpauses[0]
+        assert db.running and not db.paused
+        assert not worker.running
+
+    def test_pause_failure_skips_volume(
+        self, service, projects, fake_docker, monkeypatch
+    ):
+        """Test a container that can't be paused skips the volume, not a torn copy."""
+        daemon = fake_docker.daemon
+        daemon.add_volume("blog_db", "blog", {"a": b"1"})
+        db = daemon.add_container("blog_db_1", "blog")
+        web = daemon.add_container("blog_web_1", "blog")
+        pause = DockerService.pause_container
+
+        def refuse_web(self, container_id):
+            if container_id == web.id:
+                return False, "freezer unavailable"
+            return pause(self, container_id)
+
+        monkeypatch.setattr(DockerService, "pause_container", refuse_web)
+
+        result, error = service.create_snapshot(volumes=True)
+
+        assert error is None and result is not None
+        assert "volumes/blog_db" not in result["sources"]
+        assert "freezer unavailable" in result["errors"]["volumes/blog_db"]
+        assert "projects/blog" in result["sources"]
+        assert db.running and not db.paused
+        assert not any(p.endswith("/archive") for _, p in daemon.requests)
+
+    def test_copied_live_when_disabled(
+        self, service, projects, fake_docker, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "BACKUP_PAUSE_CONTAINERS", False)
+        fake_docker.daemon.add_volume("blog_db", "blog", {"a": b"1"})
+        fake_docker.daemon.add_container("blog_db_1", "blog")
+
+        result, error = service.create_snapshot(volumes=True)
+
+        assert error is None and result is not None
+        assert result["sources"]["volumes/blog_db"]["consistency"] == "live"
+        assert not any(p.endswith("pause") for _, p in fake_docker.daemon.requests)
+
+    def test_docker_unavailable(self, service, projects, tmp_path, monkeypatch):
+        """Test a Docker failure only skips the volumes."""
+        monkeypatch.setattr(settings, "DOCKER_API_SOCKET", str(tmp_path / "none.sock"))
+
+        result, error = service.create_snapshot(volumes=True)
+
+        assert error is None
+        assert "volumes" in result["errors"]
+        assert "projects/blog" in result["sources"]
+
+
+class TestRestoreSnapshot:
+    """Tests for SnapshotService.restore_snapshot."""
+
+    def test_restore_all(self, service, projects, tmp_path):
+        created, _ = service.create_snapshot({".env": b"A=1\n"})
+        out = tmp_path / "out"
+
+        result, error = service.restore_snapshot(created["id"], out)
+
+        assert error is None
+        assert result["files"] == created["stats"]["files"]
+        blog = out / "projects" / "blog"
+        source = projects / "blog" / "static" / "big.bin"
+        assert (blog / "static" / "big.bin").read_bytes() == source.read_bytes()
+        assert os.readlink(blog / "current") == "static"
+        assert (blog / ".env").stat().st_mode & 0o777 == 0o600
+        assert (blog / "docker-compose.yml").stat().st_mtime_ns == (
+            projects / "blog" / "docker-compose.yml"
+        ).stat().st_mtime_ns
+        assert (out / "host" / ".env").read_bytes() == b"A=1\n"
+        with sqlite3.connect(out / "database" / "docklite.db") as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 100
+
+    def test_selective(self, service, projects, tmp_path):
+        """Test only the selected sources are written."""
+        created, _ = service.create_snapshot()
+        out = tmp_path / "out"
+
+        result, _ = service.restore_snapshot(created["id"], out, ["projects/shop"])
+
+        assert result["sources"] == ["projects/shop"]
+        assert sorted(p.name for p in out.iterdir()) == ["projects"]
+        assert [p.name for p in (out / "projects").iterdir()] == ["shop"]
+
+    def test_no_match(self, service, projects, tmp_path):
+        created, _ = service.create_snapshot()
+
+        result, error = service.restore_snapshot(
+            created["id"], tmp_path / "out", ["projects/nope"]
+        )
+
+        assert result is None
+        assert "No source matches 'projects/nope'" in error
+
+    @pytest.mark.parametrize("snapshot_id", ["20990101T000000", "../etc"])
+    def test_unknown_snapshot(self, service, tmp_path, snapshot_id):
+        result, error = service.restore_snapshot(snapshot_id, tmp_path / "out")
+
+        assert result is None
+        assert "snapshot" in error.lower()
+
+    def test_corrupt_chunk(self, service, projects, tmp_path):
+        """Test chunk contents are verified against their digest."""
+        created, _ = service.create_snapshot()
+        store = ChunkStore(service.store_dir, "gzip")
+        victim = next(iter(store.files()))
+        victim.write_bytes(store._compress(b"tampered"))
+
+        result, error = service.restore_snapshot(created["id"], tmp_path / "out")
+
+        assert result is None
+        assert f"Chunk {victim.name[:12]} is corrupt" in error
+
+
+@pytest.mark.asyncio
+class TestSnapshotRPCAndAPI:
+    """Tests for the snapshot.* RPC methods and /api/admin/snapshots."""
+
+    @pytest.fixture
+    def store(self, tmp_path: Path, projects, database, monkeypatch) -> Path:
+        monkeypatch.setattr(settings, "BACKUP_DIR", str(tmp_path / "backups"))
+        monkeypatch.setattr(snapshot_service, "database_path", lambda: database)
+        return tmp_path / "backups" / "store"
+
+    async def test_rpc(self, store):
+        rpc = AdminRPCServer()
+        snapshot_service.register_rpc_methods(rpc)
+        files = {".env": base64.b64encode(b"A=1\n").decode()}
+
+        created = await rpc.dispatch(
+            {
+                "id": 1,
+                "method": "snapshot.create",
+                "params": {"files": files, "projects": ["blog"]},
+            }
+        )
+        listed = await rpc.dispatch({"id": 2, "method": "snapshot.list"})
+        invalid = await rpc.dispatch(
+            {"id": 3, "method": "snapshot.create", "params": {"projects": "blog"}}
+        )
+
+        assert list(created["result"]["sources"]) == [
+            "database",
+            "host",
+            "projects/blog",
+        ]
+        assert listed["result"][0]["id"] == created["result"]["id"]
+        assert invalid["error"]["code"] == "invalid_params"
+
+    async def test_api(self, client: AsyncClient, admin_token, user_token, store):
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        forbidden = await client.post(
+            "/api/admin/snapshots",
+            headers={"Authorization": f"Bearer {user_token}"},
+        )
+        response = await client.post(
+            "/api/admin/snapshots", json={"projects": ["shop"]}, headers=headers
+        )
+        assert response.status_code == 202
+        await job_manager.wait()
+        job = await client.get(response.headers["Location"], headers=headers)
+        listed = await client.get("/api/admin/snapshots", headers=headers)
+
+        assert forbidden.status_code == 403
+        assert job.json()["status"] == "completed"
+        assert job.json()["target"] == "shop"
+        assert [s["id"] for s in listed.json()] == [job.json()["result"]["id"]]
+
+
+def test_scheduled_snapshot_registered(monkeypatch):
+    monkeypatch.setattr(settings, "BACKUP_SNAPSHOT_CRON", "0 3 * * *")
+    scheduler = Scheduler()
+
+    maintenance.register_jobs(scheduler)
+
+    assert "create_snapshot" in [job.name for job in scheduler.jobs]
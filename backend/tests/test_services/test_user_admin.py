@@ -0,0 +1,147 @@
+"""Tests for administrative user operations (admin RPC methods)."""
+
+from contextlib import nullcontext
+
+import pytest
+
+from app.core.admin_rpc import AdminRPCServer
+from app.models.user import User
+from app.services import user_admin
+from app.services.auth_service import AuthService
+from app.services.user_admin import UserAdminService
+
+
+def entry(username: str, **fields) -> dict:
+    return {"username": username, "password": "password123", **fields}
+
+
+@pytest.fixture
+def rpc(db_session, monkeypatch) -> AdminRPCServer:
+    """User methods on a private server, using the test database"""
+    monkeypatch.setattr(
+        user_admin, "AsyncSessionLocal", lambda: nullcontext(db_session)
+    )
+    server = AdminRPCServer()
+    user_admin.register_rpc_methods(server)
+    return server
+
+
+@pytest.mark.asyncio
+class TestCreateUsers:
+    """Tests for batch user creation."""
+
+    async def test_batch(self, db_session):
+        service = UserAdminService(db_session)
+
+        report, error = await service.create_users(
+            [
+                entry("alice", email="alice@example.com"),
+                entry("bob", is_admin=True, system_user="deploy"),
+            ]
+        )
+
+        assert error is None and report is not None
+        assert [u["username"] for u in report["created"]] == ["alice", "bob"]
+        assert report["errors"] == [] and report["skipped"] == []
+        bob = await AuthService(db_session).get_user_by_username("bob")
+        assert bob is not None
+        assert bob.is_admin == 1
+        assert bob.system_user == "deploy"
+        assert AuthService.verify_password("password123", str(bob.password_hash))
+
+    async def test_invalid_entries_reported(self, db_session):
+        """Invalid rows are reported; the valid ones are still created."""
+        service = UserAdminService(db_session)
+
+        report, _ = await service.create_users(
+            [
+                entry("okay"),
+                entry("x"),  # Too short
+                entry("nomail", email="not-an-email"),
+                entry("okay"),  # Duplicate in batch
+                "not an object",
+            ]
+        )
+
+        assert report is not None
+        assert [u["username"] for u in report["created"]] == ["okay"]
+        assert [e["index"] for e in report["errors"]] == [1, 2, 3, 4]
+        assert report["errors"][0]["error"].startswith("username:")
+        assert "Duplicate username" in report["errors"][2]["error"]
+
+    async def test_existing_users(self, db_session):
+        service = UserAdminService(db_session)
+        await service.create_users([entry("alice", email="alice@example.com")])
+
+        report, _ = await service.create_users(
+            [entry("alice"), entry("carol", email="alice@example.com")]
+        )
+        skipped, _ = await service.create_users([entry("alice")], skip_existing=True)
+
+        assert report is not None and skipped is not None
+        assert [(e["index"], e["error"]) for e in report["errors"]] == [
+            (0, "Username already exists"),
+            (1, "Email already exists"),
+        ]
+        assert skipped["skipped"] == ["alice"]
+        assert skipped["errors"] == []
+
+
+@pytest.mark.asyncio
+class TestRPCMethods:
+    """Tests for the users.* methods."""
+
+    async def test_create_and_list(self, rpc):
+        created = await rpc.dispatch(
+            {"id": 1, "method": "users.create", "params": {"users": [entry("dave")]}}
+        )
+        listed = await rpc.dispatch({"id": 2, "method": "users.list"})
+
+        assert created["result"]["created"][0]["username"] == "dave"
+        assert [u["username"] for u in listed["result"]] == ["dave"]
+        assert "password_hash" not in listed["result"][0]
+
+    async def test_create_requires_list(self, rpc):
+        response = await rpc.dispatch(
+            {"id": 1, "method": "users.create", "params": {"users": "dave"}}
+        )
+
+        assert response["error"]["code"] == "invalid_params"
+
+    async def test_reset_password(self, rpc, db_session):
+        await UserAdminService(db_session).create_users([entry("erin")])
+
+        response = await rpc.dispatch(
+            {
+                "id": 1,
+                "method": "users.reset_password",
+                "params": {"username": "erin", "password": "changed123"},
+            }
+        )
+
+        assert response["result"]["username"] == "erin"
+        user = await AuthService(db_session).get_user_by_username("erin")
+        assert user is not None
+        assert AuthService.verify_password("changed123", str(user.password_hash))
+
+    async def test_reset_password_errors(self, rpc, db_session):
+        db_session.add(User(username="frank", password_hash="x"))
+        await db_session.commit()
+
+        missing = await rpc.dispatch(
+            {
+                "id": 1,
+                "method": "users.reset_password",
+                "params": {"username": "nobody", "password": "changed123"},
+            }
+        )
+        short = await rpc.dispatch(
+            {
+                "id": 2,
+                "method": "users.reset_password",
+                "params": {"username": "frank", "password": "abc"},
+            }
+        )
+
+        assert missing["error"]["code"] == "not_found"
+        assert short["error"]["code"] == "invalid_params"
@@ -2,6 +2,7 @@
 Tests for TraefikService
 """
 import pytest
+import yaml
 from app.services.traefik_service import TraefikService
 
 
@@ -16,11 +17,12 @@ class TestTraefikLabelsGeneration:
             internal_port=80
         )
         
-        assert len(labels) == 4
+        assert len(labels) == 6
         assert "traefik.enable=true" in labels
         assert "traefik.http.routers.example-com-1.rule=Host(`example.com`)" in labels
         assert "traefik.http.routers.example-com-1.entrypoints=web" in labels
         assert "traefik.http.services.example-com-1.loadbalancer.server.port=80" in labels
+        assert "traefik.http.routers.example-com-1.service=example-com-1" in labels
     
     def test_generate_labels_custom_port(self):
         """Test label generation with custom port"""
@@ -298,3 +300,387 @@ services:
         assert error is None
         assert "traefik.enable=true" in modified
 
+
+
+class TestFileProviderConfig:
+    """Test dynamic configuration for Traefik's file provider"""
+
+    def test_generate_file_config(self):
+        """Test router and service generation for a project"""
+        compose = """version: '3.8'
+services:
+  app:
+    image: myapp:latest
+    expose:
+      - "3000"
+"""
+        config = TraefikService.generate_file_config(
+            domain="example.com", slug="example-com-1", compose_content=compose
+        )
+
+        assert config is not None
+        router = config["routers"]["example-com-1"]
+        assert router["rule"] == "Host(`example.com`)"
+        assert router["entryPoints"] == ["web"]
+        assert router["service"] == "example-com-1"
+        servers = config["services"]["example-com-1"]["loadBalancer"]["servers"]
+        assert servers == [{"url": "http://example-com-1-app-1:3000"}]
+
+    def test_generate_file_config_container_name(self):
+        """Test that explicit container_name is used as upstream host"""
+        compose = """services:
+  web:
+    image: nginx:alpine
+    container_name: my-web
+"""
+        config = TraefikService.generate_file_config("a.com", "a-com-1", compose)
+
+        assert config is not None
+        servers = config["services"]["a-com-1"]["loadBalancer"]["servers"]
+        assert servers == [{"url": "http://my-web:80"}]
+
+    def test_generate_file_config_invalid_compose(self):
+        """Test that invalid compose yields no config"""
+        assert TraefikService.generate_file_config("a.com", "a", "{[") is None
+        assert TraefikService.generate_file_config("a.com", "a", "") is None
+
+    def test_build_dynamic_config_multiple_projects(self):
+        """Test merging routers of all projects into one config"""
+        compose = "services:\n  web:\n    image: nginx\n"
+        config = TraefikService.build_dynamic_config(
+            [
+                {"domain": "a.com", "slug": "a-com-1", "compose_content": compose},
+                {"domain": "b.com", "slug": "b-com-2", "compose_content": compose},
+            ]
+        )
+
+        assert set(config["http"]["routers"]) == {"a-com-1", "b-com-2"}
+        assert set(config["http"]["services"]) == {"a-com-1", "b-com-2"}
+
+    def test_build_dynamic_config_empty(self):
+        """Test that no projects produce an empty config"""
+        assert TraefikService.build_dynamic_config([]) == {}
+
+    def test_write_dynamic_config_atomic(self, tmp_path):
+        """Test config file is written and no temp files are left behind"""
+        config = {"http": {"routers": {"r": {"rule": "Host(`x`)", "service": "r"}}}}
+
+        path = TraefikService.write_dynamic_config(config, str(tmp_path / "dynamic"))
+
+        assert path.name == TraefikService.DYNAMIC_CONFIG_FILENAME
+        assert yaml.safe_load(path.read_text()) == config
+        assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+    def test_inject_file_mode_skips_labels(self):
+        """Test that file routing mode strips labels but keeps the network"""
+        compose = """services:
+  web:
+    image: nginx:alpine
+    labels:
+      - "traefik.http.routers.old.rule=Host(`old.com`)"
+"""
+        modified, error = TraefikService.inject_labels_to_compose(
+            compose,
+            domain="example.com",
+            slug="example-com-1",
+            routing_mode=TraefikService.ROUTING_MODE_FILE,
+        )
+
+        assert error is None
+        assert "traefik." not in modified
+        assert "docklite-network" in modified
+
+
+class TestMultiServiceRouting:
+    """Test per-service routes and load-balancer settings"""
+
+    COMPOSE = """services:
+  db:
+    image: postgres:15
+  api:
+    image: myapi:latest
+    expose:
+      - "8000"
+  web:
+    image: nginx:alpine
+    ports:
+      - "8080:80"
+"""
+
+    def test_detect_port_per_service(self):
+        """Test port detection for a named service"""
+        assert TraefikService.detect_internal_port(self.COMPOSE, "api") == 8000
+        assert TraefikService.detect_internal_port(self.COMPOSE, "web") == 80
+        assert TraefikService.detect_internal_port(self.COMPOSE, "db") == 80
+
+    def test_default_route_skips_non_web_first_service(self):
+        """Test that the entry service is the first one exposing a port"""
+        modified, error = TraefikService.inject_labels_to_compose(
+            self.COMPOSE, domain="example.com", slug="example-com-1"
+        )
+
+        assert error is None
+        services = yaml.safe_load(modified)["services"]
+        assert "labels" not in services["db"]
+        assert (
+            "traefik.http.services.example-com-1.loadbalancer.server.port=8000"
+            in services["api"]["labels"]
+        )
+
+    def test_path_and_subdomain_routes(self):
+        """Test multiple routers targeting different services"""
+        routes: list[dict] = [
+            {"service": "web"},
+            {"service": "api", "path_prefix": "/api", "strip_prefix": True},
+            {"service": "api", "subdomain": "admin"},
+        ]
+        modified, error = TraefikService.inject_labels_to_compose(
+            self.COMPOSE, domain="example.com", slug="example-com-1", routes=routes
+        )
+
+        assert error is None
+        services = yaml.safe_load(modified)["services"]
+        web_labels = services["web"]["labels"]
+        api_labels = services["api"]["labels"]
+
+        assert "traefik.http.routers.example-com-1-web.rule=Host(`example.com`)" in web_labels
+        assert (
+            "traefik.http.routers.example-com-1-api.rule=Host(`example.com`) && PathPrefix(`/api`)"
+            in api_labels
+        )
+        assert "traefik.http.routers.example-com-1-api.priority=104" in api_labels
+        assert (
+            "traefik.http.middlewares.example-com-1-api-stripprefix.stripprefix.prefixes=/api"
+            in api_labels
+        )
+        assert (
+            "traefik.http.routers.example-com-1-api-2.rule=Host(`admin.example.com`)"
+            in api_labels
+        )
+        assert "docklite-network" in services["api"]["networks"]
+        assert "ports" not in services["web"]
+
+    def test_unknown_route_service(self):
+        """Test error for a route pointing at a missing service"""
+        modified, error = TraefikService.inject_labels_to_compose(
+            self.COMPOSE, "example.com", "example-com-1", routes=[{"service": "nope"}]
+        )
+
+        assert error == "Service 'nope' not found in compose file"
+        assert modified == self.COMPOSE
+
+    def test_load_balancer_options(self):
+        """Test sticky sessions, health check and replicas"""
+        compose = """services:
+  app:
+    image: myapp
+    container_name: fixed-name
+    expose:
+      - "3000"
+"""
+        routes = [
+            {
+                "service": "app",
+                "load_balancer": {
+                    "sticky": True,
+                    "health_check_path": "/health",
+                    "replicas": 3,
+                },
+            }
+        ]
+        modified, error = TraefikService.inject_labels_to_compose(
+            compose, "example.com", "example-com-1", routes=routes
+        )
+
+        assert error is None
+        app = yaml.safe_load(modified)["services"]["app"]
+        assert app["deploy"]["replicas"] == 3
+        assert "container_name" not in app
+        assert "traefik.http.services.example-com-1.loadbalancer.sticky.cookie.httponly=true" in app["labels"]
+        assert "traefik.http.services.example-com-1.loadbalancer.healthcheck.path=/health" in app["labels"]
+
+        config = TraefikService.generate_file_config(
+            "example.com", "example-com-1", compose, routes
+        )
+        assert config is not None
+        load_balancer = config["services"]["example-com-1"]["loadBalancer"]
+        assert load_balancer["servers"] == [
+            {"url": f"http://example-com-1-app-{i}:3000"} for i in (1, 2, 3)
+        ]
+        assert load_balancer["healthCheck"]["path"] == "/health"
+        assert "sticky" in load_balancer
+
+
+class TestPerformanceMiddlewares:
+    """Test performance middleware chain and HTTPS routers"""
+
+    COMPOSE = """services:
+  web:
+    image: nginx:alpine
+    expose:
+      - "80"
+"""
+
+    def test_middleware_chain_order(self):
+        """Test that load shedding comes before response shaping"""
+        middlewares = TraefikService.build_performance_middlewares(
+            "site",
+            {
+                "compress": True,
+                "cache_control": "public, max-age=60",
+                "retry_attempts": 2,
+                "max_in_flight": 10,
+                "rate_limit_average": 5,
+                "circuit_breaker": "NetworkErrorRatio() > 0.5",
+            },
+        )
+
+        assert list(middlewares) == [
+            "site-ratelimit",
+            "site-inflightreq",
+            "site-circuitbreaker",
+            "site-retry",
+            "site-cacheheaders",
+            "site-compress",
+        ]
+
+    def test_no_performance_no_middlewares(self):
+        """Test that no settings produce no middlewares"""
+        assert TraefikService.build_performance_middlewares("site", None) == {}
+        assert TraefikService.build_performance_middlewares("site", {}) == {}
+
+    def test_labels_with_middlewares_and_https(self):
+        """Test labels for compress, cache headers and websecure router"""
+        modified, error = TraefikService.inject_labels_to_compose(
+            self.COMPOSE,
+            domain="example.com",
+            slug="example-com-1",
+            performance={"https": True, "compress": True, "cache_control": "no-cache"},
+        )
+
+        assert error is None
+        labels = yaml.safe_load(modified)["services"]["web"]["labels"]
+        assert "traefik.http.middlewares.example-com-1-compress.compress=true" in labels
+        assert (
+            "traefik.http.middlewares.example-com-1-cacheheaders.headers.customresponseheaders.cache-control=no-cache"
+            in labels
+        )
+        assert (
+            "traefik.http.routers.example-com-1.middlewares=example-com-1-cacheheaders,example-com-1-compress"
+            in labels
+        )
+        assert "traefik.http.routers.example-com-1-secure.entrypoints=websecure" in labels
+        assert "traefik.http.routers.example-com-1-secure.tls=true" in labels
+        assert "traefik.http.routers.example-com-1-secure.service=example-com-1" in labels
+
+    def test_shared_middlewares_defined_once(self):
+        """Test project middlewares are defined on one route but used by all"""
+        compose = """services:
+  web:
+    image: nginx
+  api:
+    image: myapi
+"""
+        modified, error = TraefikService.inject_labels_to_compose(
+            compose,
+            "example.com",
+            "example-com-1",
+            routes=[{"service": "web"}, {"service": "api", "path_prefix": "/api"}],
+            performance={"compress": True},
+        )
+
+        assert error is None
+        services = yaml.safe_load(modified)["services"]
+        definition = "traefik.http.middlewares.example-com-1-compress.compress=true"
+        assert definition in services["web"]["labels"]
+        assert definition not in services["api"]["labels"]
+        assert (
+            "traefik.http.routers.example-com-1-api.middlewares=example-com-1-compress"
+            in services["api"]["labels"]
+        )
+
+    def test_file_config_with_middlewares(self):
+        """Test file-provider config includes middlewares and TLS router"""
+        config = TraefikService.build_dynamic_config(
+            [
+                {
+                    "domain": "example.com",
+                    "slug": "example-com-1",
+                    "compose_content": self.COMPOSE,
+                    "performance": {"https": True, "max_in_flight": 20},
+                }
+            ]
+        )
+
+        http = config["http"]
+        assert http["middlewares"]["example-com-1-inflightreq"] == {
+            "inFlightReq": {"amount": 20}
+        }
+        secure = http["routers"]["example-com-1-secure"]
+        assert secure["entryPoints"] == ["websecure"]
+        assert secure["tls"] == {}
+        assert secure["middlewares"] == ["example-com-1-inflightreq"]
+
+
+class TestLoggingPolicy:
+    """Test the logging policy injected into every service"""
+    
+    COMPOSE = """services:
+  web:
+    image: nginx:alpine
+  worker:
+    image: busybox
+    logging:
+      driver: json-file
+      options:
+        max-size: 1g
+  audit:
+    image: busybox
+    logging:
+      driver: syslog
+"""
+    
+    def test_policy_from_settings(self, monkeypatch):
+        """Test the policy is built from the PROJECT_LOG_* settings"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "PROJECT_LOG_DRIVER", "local")
+        monkeypatch.setattr(settings, "PROJECT_LOG_MAX_SIZE", "20m")
+        monkeypatch.setattr(settings, "PROJECT_LOG_MAX_FILE", 5)
+        
+        assert TraefikService.logging_policy() == {
+            "driver": "local",
+            "options": {"max-size": "20m", "max-file": "5"},
+        }
+        
+        monkeypatch.setattr(settings, "PROJECT_LOG_DRIVER", "")
+        assert TraefikService.logging_policy() is None
+    
+    def test_policy_on_every_service(self):
+        """Test unrouted services and file drivers get the policy, others don't"""
+        policy = {"driver": "json-file", "options": {"max-size": "10m", "max-file": "3"}}
+        
+        modified, error = TraefikService.inject_labels_to_compose(
+            self.COMPOSE,
+            domain="example.com",
+            slug="example-com-1",
+            logging=policy
+        )
+        
+        assert error is None
+        services = yaml.safe_load(modified)["services"]
+        assert services["web"]["logging"] == policy
+        assert services["worker"]["logging"] == policy
+        assert services["audit"]["logging"] == {"driver": "syslog"}
+    
+    def test_no_policy(self):
+        """Test compose files are left alone without a policy"""
+        modified, error = TraefikService.inject_labels_to_compose(
+            self.COMPOSE,
+            domain="example.com",
+            slug="example-com-1"
+        )
+        
+        assert error is None
+        services = yaml.safe_load(modified)["services"]
+        assert "logging" not in services["web"]
+        assert services["worker"]["logging"]["options"] == {"max-size": "1g"}
@@ -0,0 +1,63 @@
+"""Tests for crash-safe file writing utilities"""
+import os
+from pathlib import Path
+
+import pytest
+
+from app.utils import files
+from app.utils.files import TEMP_SUFFIX, atomic_write_text, write_temp_file
+
+
+class TestAtomicWriteText:
+    """Test atomic_write_text function"""
+
+    def test_creates_file(self, tmp_path):
+        """Test writing a new file"""
+        target = tmp_path / "config.yml"
+        atomic_write_text(target, "key: value\n")
+
+        assert target.read_text() == "key: value\n"
+        assert oct(target.stat().st_mode & 0o777) == oct(0o644)
+
+    def test_replaces_file(self, tmp_path):
+        """Test replacing existing content"""
+        target = tmp_path / "config.yml"
+        target.write_text("old")
+        atomic_write_text(target, "new")
+
+        assert target.read_text() == "new"
+
+    def test_no_temp_files_left(self, tmp_path):
+        """Test temp file is renamed, not left behind"""
+        atomic_write_text(tmp_path / "config.yml", "content")
+
+        assert [p.name for p in tmp_path.iterdir()] == ["config.yml"]
+
+    def test_failed_rename_keeps_old_content(self, tmp_path, monkeypatch):
+        """Test a failure before the rename leaves the old file intact"""
+        target = tmp_path / "config.yml"
+        target.write_text("old")
+
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(files.os, "replace", fail_replace)
+        with pytest.raises(OSError):
+            atomic_write_text(target, "new")
+
+        assert target.read_text() == "old"
+        assert list(tmp_path.glob(f"*{TEMP_SUFFIX}")) == []
+
+
+class TestWriteTempFile:
+    """Test write_temp_file function"""
+
+    def test_hidden_temp_file(self, tmp_path):
+        """Test temp file is hidden and next to the target"""
+        tmp_file = write_temp_file(tmp_path / ".env", "A=1")
+
+        assert tmp_file.parent == tmp_path
+        assert tmp_file.name.startswith("..env.")
+        assert tmp_file.name.endswith(TEMP_SUFFIX)
+        assert tmp_file.read_text() == "A=1"
+        assert not (tmp_path / ".env").exists()
@@ -6,7 +6,8 @@ from app.utils.formatters import (
     format_project_response,
     format_user_response,
     safe_json_loads,
-    safe_json_dumps
+    safe_json_dumps,
+    parse_duration
 )
 
 
@@ -24,6 +25,8 @@ class TestFormatProjectResponse:
             owner_id = 1
             compose_content = "version: '3.8'\nservices:\n  web:\n    image: nginx"
             env_vars = '{"KEY": "value", "DB_HOST": "localhost"}'
+            routes = None
+            performance = None
             status = "running"
             created_at = datetime(2024, 1, 1, 12, 0, 0)
             updated_at = datetime(2024, 1, 2, 13, 30, 0)
@@ -52,6 +55,8 @@ class TestFormatProjectResponse:
             owner_id = 1
             compose_content = "services:\n  app:\n    image: alpine"
             env_vars = None
+            routes = None
+            performance = None
             status = "created"
             created_at = datetime.now()
             updated_at = datetime.now()
@@ -188,3 +193,19 @@ class TestSafeJsonDumps:
         result = safe_json_dumps(obj, default="[]")
         assert result == "[]"
 
+
+class TestParseDuration:
+    """Test parse_duration function"""
+
+    def test_units(self):
+        """Test each unit suffix"""
+        assert parse_duration("30s") == 30
+        assert parse_duration("5m") == 300
+        assert parse_duration("24h") == 86400
+        assert parse_duration(" 7d ") == 7 * 86400
+
+    def test_invalid(self):
+        """Test values without a known unit"""
+        assert parse_duration("5") is None
+        assert parse_duration("1w") is None
+        assert parse_duration("-5m") is None
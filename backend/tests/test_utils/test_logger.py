@@ -117,3 +117,151 @@ class TestLogError:
         call_kwargs = mock_logger.error.call_args[1]
         assert call_kwargs.get("exc_info") is True
 
+
+
+class TestJsonFormatter:
+    """Test JsonFormatter"""
+    
+    def test_json_fields(self):
+        """Test records render as JSON with extra fields and request ID"""
+        import json
+        from app.utils.logger import JsonFormatter
+        
+        record = logging.makeLogRecord({
+            "name": "docklite.access",
+            "levelno": logging.INFO,
+            "levelname": "INFO",
+            "msg": "GET %s",
+            "args": ("/api/projects",),
+            "status": 200,
+            "request_id": "abc123",
+        })
+        
+        entry = json.loads(JsonFormatter().format(record))
+        
+        assert entry["message"] == "GET /api/projects"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "docklite.access"
+        assert entry["status"] == 200
+        assert entry["request_id"] == "abc123"
+        assert "args" not in entry
+
+
+class TestSamplingFilter:
+    """Test SamplingFilter"""
+    
+    def _record(self, name, level=logging.INFO):
+        return logging.makeLogRecord({"name": name, "levelno": level})
+    
+    def test_parse(self):
+        """Test sampling spec parsing ignores invalid entries"""
+        from app.utils.logger import SamplingFilter
+        
+        rates = SamplingFilter.parse("docklite.access=0.1, sqlalchemy=0,bad")
+        
+        assert rates == {"docklite.access": 0.1, "sqlalchemy": 0.0}
+    
+    def test_keeps_one_in_n(self):
+        """Test 1 in N info records of a sampled logger are kept"""
+        from app.utils.logger import SamplingFilter
+        
+        sampler = SamplingFilter({"docklite.access": 0.25})
+        kept = [sampler.filter(self._record("docklite.access")) for _ in range(100)]
+        
+        assert sum(kept) == 25
+    
+    def test_warnings_and_other_loggers_kept(self):
+        """Test warnings and unsampled loggers always pass"""
+        from app.utils.logger import SamplingFilter
+        
+        sampler = SamplingFilter({"docklite": 0})
+        
+        assert not sampler.filter(self._record("docklite.access"))
+        assert sampler.filter(self._record("docklite.access", logging.WARNING))
+        assert sampler.filter(self._record("app.services"))
+
+
+class TestQueueHandler:
+    """Test non-blocking queue handler"""
+    
+    def test_full_queue_drops_without_blocking(self):
+        """Test records are dropped, not blocked on, when the queue is full"""
+        import queue
+        from app.utils.logger import _QueueHandler
+        
+        records: queue.Queue = queue.Queue(maxsize=1)
+        handler = _QueueHandler(records)
+        logger = logging.getLogger("test_queue_full")
+        logger.propagate = False
+        logger.addHandler(handler)
+        
+        logger.warning("first")
+        logger.warning("second")
+        
+        assert records.qsize() == 1
+        assert handler.dropped == 1
+        logger.removeHandler(handler)
+    
+    def test_prepare_captures_request_id(self):
+        """Test request ID and message are captured in the calling context"""
+        import queue
+        from app.utils.logger import _QueueHandler, request_id_var
+        
+        handler = _QueueHandler(queue.Queue())
+        token = request_id_var.set("req-1")
+        try:
+            record = handler.prepare(logging.makeLogRecord({"msg": "a %s", "args": ("b",)}))
+        finally:
+            request_id_var.reset(token)
+        
+        assert getattr(record, "request_id") == "req-1"
+        assert record.msg == "a b"
+        assert record.args is None
+
+
+@pytest.mark.asyncio
+class TestAccessLogMiddleware:
+    """Test request ID propagation"""
+    
+    async def test_request_id_echoed(self, client):
+        """Test incoming X-Request-ID is echoed back"""
+        response = await client.get("/", headers={"X-Request-ID": "trace-42"})
+        
+        assert response.headers["x-request-id"] == "trace-42"
+    
+    async def test_request_id_generated(self, client):
+        """Test a request ID is generated when missing"""
+        first = await client.get("/")
+        second = await client.get("/")
+        
+        assert len(first.headers["x-request-id"]) == 32
+        assert first.headers["x-request-id"] != second.headers["x-request-id"]
+    
+    async def test_websocket_status(self):
+        """Test websockets are logged as 101 with their close code"""
+        from app.utils.logger import AccessLogMiddleware
+        
+        async def accepted(scope, receive, send):
+            await send({"type": "websocket.accept"})
+            await receive()
+        
+        async def rejected(scope, receive, send):
+            await send({"type": "websocket.close", "code": 1008})
+        
+        async def receive():
+            return {"type": "websocket.disconnect", "code": 1001}
+        
+        async def send(message):
+            pass
+        
+        scope = {"type": "websocket", "path": "/ws", "headers": []}
+        records = []
+        for app in (accepted, rejected):
+            middleware = AccessLogMiddleware(app)
+            middleware.logger = Mock()
+            middleware.logger.isEnabledFor.return_value = True
+            await middleware(scope, receive, send)
+            records.append(middleware.logger.info.call_args.kwargs["extra"])
+        
+        assert (records[0]["status"], records[0]["close_code"]) == (101, 1001)
+        assert (records[1]["status"], records[1]["close_code"]) == (403, 1008)
@@ -1,5 +1,6 @@
 """Development commands for DockLite CLI."""
 
+import os
 import time
 import typer
 from pathlib import Path
@@ -10,8 +11,6 @@ from ..config import (
     SCRIPTS_DIR,
     VENV_PYTHON,
     DEFAULT_PROJECTS_DIR,
-    CONTAINER_BACKEND,
-    CONTAINER_FRONTEND,
     get_access_url
 )
 from ..utils.console import (
@@ -25,7 +24,6 @@ from ..utils.console import (
 )
 from ..utils.docker import (
     docker_compose_cmd,
-    is_container_running,
     get_container_status
 )
 from ..utils.validation import check_docker, check_docker_compose
@@ -175,6 +173,10 @@ def setup_dev():
 def start(
     build: bool = typer.Option(False, "--build", "-b", help="Rebuild images before starting"),
     follow: bool = typer.Option(False, "--follow", "-f", help="Follow logs after starting"),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", "-w", min=0,
+        help="Backend worker processes (0 = CPU count + 1, default from WEB_CONCURRENCY)"
+    ),
 ) -> None:
     """Start DockLite services."""
     print_banner("Starting DockLite Development Environment")
@@ -195,6 +197,10 @@ def start(
     args = ["up", "-d"]
     if build:
         args.append("--build")
+    if workers is not None:
+        # Read by docker-compose.yml (backend environment)
+        os.environ["WEB_CONCURRENCY"] = str(workers)
+        log_info(f"Backend workers: {workers or 'auto'}")
     
     docker_compose_cmd(*args, cwd=PROJECT_ROOT)
     
@@ -203,7 +209,8 @@ def start(
     time.sleep(3)
     
     # Check if containers are running
-    if is_container_running(CONTAINER_BACKEND) and is_container_running(CONTAINER_FRONTEND):
+    status = get_container_status()
+    if status["backend"] and status["frontend"]:
         log_success("All services started successfully!")
     else:
         log_warning("Some services may not have started correctly")
@@ -569,3 +576,58 @@ def test_cli(
         log_error("Some CLI tests failed")
         raise typer.Exit(1)
 
+
+
+@app.command()
+def bench(
+    duration: float = typer.Option(30, "--duration", "-d", help="Seconds of load"),
+    workers: int = typer.Option(1, "--workers", "-w", help="Backend workers (uvicorn)"),
+    tabs: int = typer.Option(20, "--tabs", "-t", help="Open dashboard tabs polling the API"),
+    containers: int = typer.Option(1000, "--containers", "-c", help="Fake Docker containers"),
+    url: Optional[str] = typer.Option(None, "--url", help="Load a running instance instead of a local app"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Report JSON file (relative to backend/)"),
+    micro: bool = typer.Option(False, "--micro", help="Run the micro-benchmark suite instead"),
+    local: bool = typer.Option(False, "--local", help="Use local Python instead of the backend container"),
+    args: List[str] = typer.Argument(None, help="Extra arguments for the benchmark runner"),
+) -> None:
+    """Load test the API with dashboard traffic (fake Docker, temporary DB)."""
+    import subprocess
+    import sys
+    
+    if micro:
+        print_banner("DockLite Micro-Benchmarks")
+        bench_args = ["-m", "benchmarks"]
+    else:
+        print_banner("DockLite Load Test")
+        bench_args = [
+            "-m", "benchmarks.loadtest",
+            "--duration", str(duration),
+            "--workers", str(workers),
+            "--tabs", str(tabs),
+            "--containers", str(containers),
+        ]
+        if url:
+            bench_args.extend(["--url", url])
+        if output:
+            bench_args.extend(["--output", output])
+    bench_args.extend(args or [])
+    
+    log_step("Running benchmarks...")
+    try:
+        if local:
+            subprocess.run(
+                [sys.executable, *bench_args],
+                cwd=PROJECT_ROOT / "backend",
+                check=True
+            )
+        else:
+            docker_compose_cmd(
+                "run", "--rm", "--no-deps", "backend", "python", *bench_args,
+                cwd=PROJECT_ROOT,
+                check=True
+            )
+    except subprocess.CalledProcessError:
+        log_error("Benchmark run failed (or regressions found)")
+        raise typer.Exit(1)
+    
+    log_success("Benchmarks complete")
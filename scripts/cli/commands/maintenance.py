@@ -1,12 +1,15 @@
 """Maintenance commands for DockLite CLI."""
 
+import base64
+import os
+import sqlite3
 import subprocess
 import tarfile
 import tempfile
-import time
+from contextlib import closing
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 from rich.table import Table
@@ -17,6 +20,7 @@ from ..config import (
     BACKEND_DATA_DIR,
     ENV_FILE,
     DOCKER_COMPOSE_FILE,
+    DOCKER_CONTAINERS_DIR,
     CONTAINER_TRAEFIK,
     CONTAINER_BACKEND,
     CONTAINER_FRONTEND,
@@ -36,11 +40,17 @@ from ..utils.console import (
     create_table,
     create_progress
 )
+from ..utils.archive import LEGACY_INFO_NAME, stage_backup
 from ..utils.docker import (
     docker_compose_cmd,
     is_container_running,
-    get_container_status
+    get_container_status,
+    get_container_states,
+    get_system_containers,
+    watch_container_events,
+    with_docker_group
 )
+from ..utils.rpc import AdminRPCClient, AdminRPCError, connect_backend
 from ..utils.validation import check_docker
 
 app = typer.Typer(
@@ -50,202 +60,563 @@ app = typer.Typer(
 )
 
 
+# Host files added to backups (archive path -> file); the backend only
+# sees its own data
+CONFIG_FILES = {
+    ".env": ENV_FILE,
+    "docker-compose.yml": DOCKER_COMPOSE_FILE,
+}
+SSH_AUTHORIZED_KEYS = Path("/home/docklite/.ssh/authorized_keys")
+
+
+def read_config_files() -> dict:
+    """
+    Host configuration files to include in a backup.
+    
+    Returns:
+        dict: Archive path -> base64 content (for the backup.create method)
+    """
+    files = {}
+    for name, path in CONFIG_FILES.items():
+        if path.exists():
+            files[name] = path.read_bytes()
+    
+    if SSH_AUTHORIZED_KEYS.exists():
+        try:
+            files["ssh/authorized_keys"] = SSH_AUTHORIZED_KEYS.read_bytes()
+        except PermissionError:
+            result = subprocess.run(
+                ["sudo", "cat", str(SSH_AUTHORIZED_KEYS)],
+                capture_output=True,
+                check=False
+            )
+            if result.returncode == 0:
+                files["ssh/authorized_keys"] = result.stdout
+            else:
+                log_warning("Cannot read SSH authorized_keys (skipped)")
+    
+    return {name: base64.b64encode(content).decode() for name, content in files.items()}
+
+
 @app.command()
 def backup(
-    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Output directory")
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Output directory"),
+    incremental: bool = typer.Option(
+        False, "--incremental", "-i",
+        help="Snapshot into the deduplicated store, with projects and volumes"
+    ),
+    project: Optional[List[str]] = typer.Option(
+        None, "--project", "-p", help="Only this project (repeatable, with --incremental)"
+    ),
+    no_volumes: bool = typer.Option(
+        False, "--no-volumes", help="Skip named volumes (with --incremental)"
+    )
 ) -> None:
-    """Backup database and configuration."""
+    """Backup database and configuration (--incremental: also projects and volumes)."""
+    if not incremental and (project or no_volumes):
+        log_error("--project and --no-volumes require --incremental")
+        raise typer.Exit(1)
+    if incremental and output:
+        log_error("--output can't be used with --incremental (snapshots stay in the store)")
+        raise typer.Exit(1)
+    
     print_banner("DockLite Backup")
     
-    # Determine backup directory
-    backup_dir = output if output else BACKUPS_DIR
-    backup_dir.mkdir(parents=True, exist_ok=True)
+    # The backend writes archives to BACKUPS_DIR (bind-mounted); created here
+    # so the archives belong to the current user
+    BACKUPS_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Generate timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_name = f"docklite_backup_{timestamp}"
-    backup_path = backup_dir / f"{backup_name}.tar.gz"
+    log_info("Reading configuration...")
+    files = read_config_files()
     
-    log_step(f"Creating backup: {backup_name}")
+    client = connect_backend()
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        
-        # Backup database
-        log_info("Backing up database...")
-        db_file = BACKEND_DATA_DIR / "docklite.db"
-        if db_file.exists():
-            import shutil
-            shutil.copy(db_file, temp_path / "docklite.db")
-            log_success("Database backed up")
-        else:
-            log_warning("Database file not found")
-        
-        # Backup configuration
-        log_info("Backing up configuration...")
-        if ENV_FILE.exists():
-            import shutil
-            shutil.copy(ENV_FILE, temp_path / ".env")
-        if DOCKER_COMPOSE_FILE.exists():
-            import shutil
-            shutil.copy(DOCKER_COMPOSE_FILE, temp_path / "docker-compose.yml")
-        log_success("Configuration backed up")
-        
-        # Backup SSH keys (if exist)
-        log_info("Backing up SSH configuration...")
-        ssh_dir = Path("/home/docklite/.ssh")
-        if ssh_dir.exists():
-            ssh_backup = temp_path / "ssh"
-            ssh_backup.mkdir()
-            authorized_keys = ssh_dir / "authorized_keys"
-            if authorized_keys.exists():
-                import shutil
-                try:
-                    shutil.copy(authorized_keys, ssh_backup / "authorized_keys")
-                except PermissionError:
-                    subprocess.run(
-                        ["sudo", "cp", str(authorized_keys), str(ssh_backup / "authorized_keys")],
-                        check=False
-                    )
-        
-        # Create metadata file
-        metadata = f"""DockLite Backup
-================
-Date: {datetime.now()}
-Hostname: {get_hostname()}
-Version: {VERSION}
-User: {Path.home().name}
-
-Contents:
-- Database (SQLite)
-- Configuration (.env, docker-compose.yml)
-- SSH keys
-"""
-        (temp_path / "backup_info.txt").write_text(metadata)
-        
-        # Create tar archive
-        log_step("Creating archive...")
-        with tarfile.open(backup_path, "w:gz") as tar:
-            tar.add(temp_path, arcname=".")
+    if incremental:
+        create_snapshot(client, files, project or None, False if no_volumes else None)
+        return
     
-    # Get backup size
-    backup_size = backup_path.stat().st_size
-    size_mb = backup_size / (1024 * 1024)
+    # Consistent database snapshot (SQLite backup API), streamed by the
+    # backend into a compressed archive with the files above
+    log_step("Creating backup...")
+    with client:
+        try:
+            result = client.call("backup.create", files=files)
+        except AdminRPCError as e:
+            log_error(f"Backup failed: {e.message}")
+            raise typer.Exit(1)
+    
+    backup_path = BACKUPS_DIR / result["name"]
+    checksum_path = BACKUPS_DIR / f"{result['name']}.sha256"
+    if output and output.resolve() != BACKUPS_DIR.resolve():
+        import shutil
+        output.mkdir(parents=True, exist_ok=True)
+        backup_path = Path(shutil.move(str(backup_path), str(output / result["name"])))
+        if checksum_path.exists():
+            shutil.move(str(checksum_path), str(output / checksum_path.name))
+    
+    manifest = result["manifest"]
+    size_mb = result["size"] / (1024 * 1024)
     
     log_success("Backup created successfully!")
     console.print()
     print_banner("Backup Complete")
-    log_info(f"File:     [cyan]{backup_path}[/cyan]")
-    log_info(f"Size:     [cyan]{size_mb:.2f} MB[/cyan]")
-    log_info(f"Location: [cyan]{backup_dir}[/cyan]")
+    log_info(f"File:        [cyan]{backup_path}[/cyan]")
+    log_info(f"Size:        [cyan]{size_mb:.2f} MB[/cyan] ({manifest['compression']})")
+    log_info(f"SHA-256:     [cyan]{result['sha256']}[/cyan]")
+    if manifest["database"]:
+        log_info(f"Database:    [cyan]{manifest['database']['page_count']} pages[/cyan], integrity {manifest['database']['quick_check']}")
+    else:
+        log_warning("Database file not found (not included)")
+    log_info(f"Files:       [cyan]{', '.join(f['path'] for f in manifest['files'])}[/cyan]")
     console.print()
     log_info(f"To restore: [cyan]./docklite restore {backup_path}[/cyan]")
 
 
+def create_snapshot(client: AdminRPCClient, files: dict, projects: Optional[List[str]], volumes: Optional[bool]) -> None:
+    """
+    Take an incremental snapshot through the backend and print its summary.
+    
+    Args:
+        client: Connected admin RPC client
+        files: Host files (archive path -> base64 content)
+        projects: Project slugs (None: all)
+        volumes: Include volumes (None: backend default)
+    """
+    # Files unchanged since the last snapshot are skipped; only chunks
+    # the store doesn't have yet are written
+    log_step("Creating incremental snapshot...")
+    with client:
+        try:
+            result = client.call(
+                "snapshot.create", files=files, projects=projects, volumes=volumes
+            )
+        except AdminRPCError as e:
+            log_error(f"Snapshot failed: {e.message}")
+            raise typer.Exit(1)
+    
+    stats = result["stats"]
+    sources = result["sources"]
+    projects_count = sum(1 for s in sources.values() if s["kind"] == "project")
+    volumes_count = sum(1 for s in sources.values() if s["kind"] == "volume")
+    
+    if result["errors"]:
+        log_warning("Snapshot created with errors:")
+        for source, error in result["errors"].items():
+            log_warning(f"  {source}: {error}")
+    else:
+        log_success("Snapshot created successfully!")
+    console.print()
+    print_banner("Snapshot Complete")
+    log_info(f"Snapshot:    [cyan]{result['id']}[/cyan]")
+    log_info(f"Sources:     [cyan]{projects_count} projects, {volumes_count} volumes[/cyan]" + (", database" if "database" in sources else ""))
+    log_info(f"Files:       [cyan]{stats['files']}[/cyan] ({stats['bytes'] / (1024 * 1024):.2f} MB, {stats['reused_files']} unchanged)")
+    log_info(f"New data:    [cyan]{stats['new_chunks']} of {stats['chunks']} chunks[/cyan] ({stats['stored_bytes'] / (1024 * 1024):.2f} MB stored)")
+    if result["pruned"]["snapshots"]:
+        log_info(f"Pruned:      [cyan]{len(result['pruned']['snapshots'])} old snapshots[/cyan] ({result['pruned']['bytes'] / (1024 * 1024):.2f} MB freed)")
+
+
 @app.command()
-def restore(
-    backup_file: Path = typer.Argument(..., help="Backup file to restore"),
-    no_confirm: bool = typer.Option(False, "--no-confirm", help="Skip confirmation prompt")
-) -> None:
-    """Restore from backup."""
-    if not backup_file.exists():
-        log_error(f"Backup file not found: {backup_file}")
-        raise typer.Exit(1)
+def snapshots() -> None:
+    """List incremental snapshots."""
+    client = connect_backend()
+    with client:
+        try:
+            items = client.call("snapshot.list")
+        except AdminRPCError as e:
+            log_error(f"Cannot list snapshots: {e.message}")
+            raise typer.Exit(1)
     
-    print_banner("DockLite Restore")
+    if not items:
+        log_info("No snapshots yet (create one with: ./docklite maint backup --incremental)")
+        return
     
-    log_warning("This will REPLACE current database and configuration!")
-    if not no_confirm:
-        if not confirm("Continue with restore?"):
-            log_info("Cancelled")
-            raise typer.Abort()
+    table = create_table("Snapshots")
+    table.add_column("ID", style="cyan", no_wrap=True)
+    table.add_column("Created", no_wrap=True)
+    table.add_column("Projects", justify="right")
+    table.add_column("Volumes", justify="right")
+    table.add_column("Files", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("New data", justify="right")
+    table.add_column("Notes")
+    for item in items:
+        kinds = [s["kind"] for s in item["sources"].values()]
+        stats = item["stats"]
+        notes = []
+        if item["partial"]:
+            notes.append("selected projects")
+        if item["errors"]:
+            notes.append(f"[yellow]{len(item['errors'])} errors[/yellow]")
+        table.add_row(
+            item["id"],
+            item["created_at"].replace("T", " "),
+            str(kinds.count("project")),
+            str(kinds.count("volume")),
+            str(stats["files"]),
+            f"{stats['bytes'] / (1024 * 1024):.1f} MB",
+            f"{stats['stored_bytes'] / (1024 * 1024):.1f} MB",
+            ", ".join(notes)
+        )
+    console.print(table)
+
+
+def write_host_files(files: dict) -> List[str]:
+    """
+    Write restored host files back in place.
+    
+    Config files are replaced atomically (temp file + rename, keeping the
+    mode of the current file); SSH keys are installed with sudo.
+    
+    Args:
+        files: Archive path -> content
+    
+    Returns:
+        List[str]: Archive paths written
+    """
+    written = []
+    for name, content in files.items():
+        if name == "ssh/authorized_keys":
+            with tempfile.NamedTemporaryFile() as staged:
+                staged.write(content)
+                staged.flush()
+                keys_dir = str(SSH_AUTHORIZED_KEYS.parent)
+                result = subprocess.run(
+                    ["sudo", "sh", "-c",
+                     'install -d -m 700 -o docklite -g docklite "$1" && '
+                     'install -m 600 -o docklite -g docklite "$2" "$3"',
+                     "install", keys_dir, staged.name, str(SSH_AUTHORIZED_KEYS)],
+                    check=False
+                )
+            if result.returncode != 0:
+                log_warning("Cannot install SSH authorized_keys (skipped)")
+                continue
+        elif name in CONFIG_FILES:
+            path = CONFIG_FILES[name]
+            mode = path.stat().st_mode & 0o777 if path.exists() else 0o600
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(content)
+                os.chmod(tmp_name, mode)
+                os.replace(tmp_name, path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+        else:
+            log_warning(f"Unknown host file skipped: {name}")
+            continue
+        written.append(name)
+    return written
+
+
+def restart_services(database: bool, config: bool) -> None:
+    """
+    Apply restored data to the running stack.
+    
+    `compose up -d` only recreates services whose configuration changed;
+    a restored database only needs the backend restarted.
+    
+    Args:
+        database: Database was restored
+        config: Host configuration files were restored
+    """
+    if config:
+        log_step("Applying configuration...")
+        docker_compose_cmd("up", "-d", cwd=PROJECT_ROOT, check=False)
+    elif database and is_container_running(CONTAINER_BACKEND):
+        log_step("Restarting backend...")
+        subprocess.run(with_docker_group(["docker", "restart", CONTAINER_BACKEND]), check=False)
+
+
+def restore_archive(archive: Path, database: bool, config: bool, no_confirm: bool) -> None:
+    """
+    Restore the database and/or host configuration from a backup archive.
+    
+    Args:
+        archive: .tar.gz or .tar.zst backup
+        database: Restore the database
+        config: Restore .env, docker-compose.yml and SSH keys
+        no_confirm: Skip the confirmation prompt
+    """
+    if not (database or config):
+        database = config = True
     
     with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
+        staged = Path(temp_dir)
         
-        # Extract backup
-        log_step("Extracting backup...")
-        with tarfile.open(backup_file, "r:gz") as tar:
-            tar.extractall(temp_path)
-        log_success("Backup extracted")
+        # Checksums are verified while extracting: nothing of a damaged
+        # archive is used, and the services keep running meanwhile
+        log_step("Extracting and verifying backup...")
+        try:
+            manifest = stage_backup(archive, staged)
+        except (OSError, ValueError, tarfile.TarError) as e:
+            log_error(f"Cannot read backup: {e}")
+            raise typer.Exit(1)
         
-        # Show backup info
-        info_file = temp_path / "backup_info.txt"
-        if info_file.exists():
-            console.print()
-            console.print(info_file.read_text())
-            console.print()
+        info_file = staged / LEGACY_INFO_NAME
+        console.print()
+        if manifest:
+            log_success("Backup verified")
+            log_info(f"Backup:   [cyan]{manifest['name']}[/cyan]")
+            log_info(f"Date:     [cyan]{manifest['created_at']}[/cyan]")
+            log_info(f"Hostname: [cyan]{manifest['hostname']}[/cyan]")
+            log_info(f"Files:    [cyan]{', '.join(f['path'] for f in manifest['files'])}[/cyan]")
+        else:
+            log_warning("Backup has no manifest (made by an older version): checksums not verified")
+            if info_file.exists():
+                console.print(info_file.read_text())
+        console.print()
         
-        # Stop services
-        log_step("Stopping services...")
-        docker_compose_cmd("down", cwd=PROJECT_ROOT)
+        staged_db: Optional[Path] = None
+        if database and (staged / "docklite.db").exists():
+            staged_db = staged / "docklite.db"
+        if staged_db is not None:
+            try:
+                with closing(sqlite3.connect(staged_db)) as conn:
+                    check = conn.execute("PRAGMA quick_check").fetchone()[0]
+            except sqlite3.DatabaseError as e:
+                check = str(e)
+            if check != "ok":
+                log_error(f"Database in backup is damaged: {check}")
+                raise typer.Exit(1)
+        host_files = {}
+        if config:
+            for name in [*CONFIG_FILES, "ssh/authorized_keys"]:
+                if (staged / name).exists():
+                    host_files[name] = (staged / name).read_bytes()
         
-        # Backup current state
-        log_step("Backing up current state...")
-        safety_backup_dir = BACKUPS_DIR
-        safety_backup_dir.mkdir(parents=True, exist_ok=True)
-        safety_name = f"pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.tar.gz"
-        safety_backup = safety_backup_dir / safety_name
+        if staged_db is None and not host_files:
+            log_warning("Nothing to restore in this backup")
+            return
         
-        import shutil
+        replaced = (["database"] if staged_db else []) + list(host_files)
+        log_warning(f"This will REPLACE: {', '.join(replaced)}")
+        if not no_confirm:
+            if not confirm("Continue with restore?"):
+                log_info("Cancelled")
+                raise typer.Abort()
+        
+        # Same layout as a backup, so it can be restored the same way
+        log_step("Backing up current state...")
+        BACKUPS_DIR.mkdir(parents=True, exist_ok=True)
+        safety_backup = BACKUPS_DIR / f"pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.tar.gz"
+        live_db = BACKEND_DATA_DIR / "docklite.db"
         with tarfile.open(safety_backup, "w:gz") as tar:
-            if BACKEND_DATA_DIR.exists():
-                tar.add(BACKEND_DATA_DIR, arcname="backend-data")
-            if ENV_FILE.exists():
-                tar.add(ENV_FILE, arcname=".env")
-            if DOCKER_COMPOSE_FILE.exists():
-                tar.add(DOCKER_COMPOSE_FILE, arcname="docker-compose.yml")
+            if staged_db and live_db.exists():
+                copy = staged / "pre_restore.db"
+                with closing(sqlite3.connect(live_db)) as src, closing(sqlite3.connect(copy)) as dst:
+                    src.backup(dst)
+                tar.add(copy, arcname="docklite.db")
+            for name in host_files:
+                if name in CONFIG_FILES and CONFIG_FILES[name].exists():
+                    tar.add(CONFIG_FILES[name], arcname=name)
         log_success(f"Safety backup created: {safety_backup}")
         
-        # Restore database
-        log_step("Restoring database...")
-        db_backup = temp_path / "docklite.db"
-        if db_backup.exists():
+        # The backup API replaces the live database in place, atomically
+        # for the backend's open connections
+        if staged_db:
+            log_step("Restoring database...")
             BACKEND_DATA_DIR.mkdir(parents=True, exist_ok=True)
-            shutil.copy(db_backup, BACKEND_DATA_DIR / "docklite.db")
+            with closing(sqlite3.connect(staged_db)) as src, closing(sqlite3.connect(live_db)) as dst:
+                src.backup(dst)
             log_success("Database restored")
+        if host_files:
+            log_step("Restoring configuration...")
+            write_host_files(host_files)
+            log_success("Configuration restored")
+    
+    restart_services(bool(staged_db), bool(host_files))
+    
+    log_success("Restore complete!")
+    console.print()
+    log_info(f"Safety backup saved at: [cyan]{safety_backup}[/cyan]")
+
+
+def restore_snapshot(
+    snapshot_id: str,
+    database: bool,
+    projects: List[str],
+    volumes: List[str],
+    config: bool,
+    no_confirm: bool
+) -> None:
+    """
+    Restore sources of an incremental snapshot through the backend.
+    
+    Args:
+        snapshot_id: Snapshot ID or "latest"
+        database: Restore the database
+        projects: Project slugs (with their volumes)
+        volumes: Volume names
+        config: Restore .env, docker-compose.yml and SSH keys
+        no_confirm: Skip the confirmation prompt
+    """
+    client = connect_backend()
+    with client:
+        try:
+            items = client.call("snapshot.list")
+        except AdminRPCError as e:
+            log_error(f"Cannot list snapshots: {e.message}")
+            raise typer.Exit(1)
+        if snapshot_id == "latest":
+            snapshot = items[0] if items else None
+        else:
+            snapshot = next((item for item in items if item["id"] == snapshot_id), None)
+        if snapshot is None:
+            log_error(f"Snapshot not found: {snapshot_id}")
+            raise typer.Exit(1)
         
-        # Restore configuration
-        log_step("Restoring configuration...")
-        env_backup = temp_path / ".env"
-        if env_backup.exists():
-            shutil.copy(env_backup, ENV_FILE)
-        compose_backup = temp_path / "docker-compose.yml"
-        if compose_backup.exists():
-            shutil.copy(compose_backup, DOCKER_COMPOSE_FILE)
-        log_success("Configuration restored")
+        sources = snapshot["sources"]
+        if not (database or projects or volumes or config):
+            database = "database" in sources
+            projects = [name.split("/", 1)[1] for name, s in sources.items() if s["kind"] == "project"]
+            volumes = [name.split("/", 1)[1] for name, s in sources.items() if s["kind"] == "volume"]
+            config = "host" in sources
         
-        # Restore SSH keys
-        ssh_backup = temp_path / "ssh" / "authorized_keys"
-        if ssh_backup.exists():
-            log_step("Restoring SSH keys...")
-            subprocess.run(
-                ["sudo", "mkdir", "-p", "/home/docklite/.ssh"],
-                check=False
-            )
-            subprocess.run(
-                ["sudo", "cp", str(ssh_backup), "/home/docklite/.ssh/authorized_keys"],
-                check=False
-            )
-            subprocess.run(
-                ["sudo", "chown", "-R", "docklite:docklite", "/home/docklite/.ssh"],
-                check=False
-            )
-            subprocess.run(
-                ["sudo", "chmod", "600", "/home/docklite/.ssh/authorized_keys"],
-                check=False
+        console.print()
+        log_info(f"Snapshot: [cyan]{snapshot['id']}[/cyan] ({snapshot['created_at'].replace('T', ' ')})")
+        if database:
+            log_info("Database: [cyan]yes[/cyan]")
+        if projects:
+            log_info(f"Projects: [cyan]{', '.join(projects)}[/cyan] (with their volumes)")
+        if volumes:
+            log_info(f"Volumes:  [cyan]{', '.join(volumes)}[/cyan]")
+        if config:
+            log_info("Config:   [cyan].env, docker-compose.yml, SSH keys[/cyan]")
+        console.print()
+        log_warning("This will REPLACE the live data listed above!")
+        if not no_confirm:
+            if not confirm("Continue with restore?"):
+                log_info("Cancelled")
+                raise typer.Abort()
+        
+        # The backend stages and verifies everything first; only the
+        # affected projects' containers are stopped, for the final swap
+        log_step("Restoring snapshot...")
+        try:
+            result = client.call(
+                "snapshot.restore",
+                snapshot=snapshot["id"],
+                database=database,
+                projects=projects,
+                volumes=volumes,
+                host=config
             )
-            log_success("SSH keys restored")
+        except AdminRPCError as e:
+            log_error(e.message)
+            raise typer.Exit(1)
     
-    # Restart services
-    log_step("Starting services...")
-    docker_compose_cmd("up", "-d", cwd=PROJECT_ROOT)
-    time.sleep(3)
+    written = []
+    if result.get("host_files"):
+        log_step("Restoring configuration...")
+        written = write_host_files({
+            name: base64.b64decode(content) for name, content in result["host_files"].items()
+        })
+    restart_services(result["database"], bool(written))
     
-    log_success("Restore complete!")
+    # Sources staged but not swapped in (e.g. the database was locked);
+    # the others are restored
+    errors = result.get("errors") or {}
+    if errors:
+        for name, error in errors.items():
+            log_error(f"Could not restore {name}: {error}")
+        log_warning("Restore incomplete!")
+    else:
+        log_success("Restore complete!")
     console.print()
-    log_info("DockLite has been restored from backup")
-    log_info(f"Safety backup saved at: [cyan]{safety_backup}[/cyan]")
+    log_info(f"Sources:  [cyan]{', '.join(result['sources'])}[/cyan]")
+    log_info(f"Files:    [cyan]{result['files']}[/cyan] ({result['bytes'] / (1024 * 1024):.2f} MB)")
+    if result["stopped"]:
+        log_info(f"Downtime: [cyan]{result['downtime']:.1f}s[/cyan] ({', '.join(result['stopped'])})")
+    # Traefik config and project files resynced with the restored projects
+    reconcile = result.get("reconcile") or {}
+    if reconcile.get("error"):
+        log_warning(f"Routing not resynced ({reconcile['error']}): restart the backend")
+    elif reconcile.get("modified"):
+        log_info(f"Kept:     [cyan]{', '.join(reconcile['modified'])}[/cyan] (differ from the database)")
+    if errors:
+        raise typer.Exit(1)
+
+
+@app.command()
+def restore(
+    source: str = typer.Argument(..., help="Backup archive, snapshot ID or 'latest'"),
+    database: bool = typer.Option(False, "--database", help="Restore the database"),
+    projects: Optional[List[str]] = typer.Option(
+        None, "--project", "-p", help="Restore this project and its volumes (snapshots, repeatable)"
+    ),
+    volumes: Optional[List[str]] = typer.Option(
+        None, "--volume", help="Restore this volume (snapshots, repeatable)"
+    ),
+    config: bool = typer.Option(False, "--config", help="Restore .env, docker-compose.yml and SSH keys"),
+    no_confirm: bool = typer.Option(False, "--no-confirm", help="Skip confirmation prompt")
+) -> None:
+    """Restore from a backup archive or a snapshot (everything unless selected)."""
+    print_banner("DockLite Restore")
+    
+    archive = Path(source)
+    if archive.exists():
+        if projects or volumes:
+            log_error("--project and --volume need a snapshot (archives hold the database and configuration)")
+            raise typer.Exit(1)
+        restore_archive(archive, database, config, no_confirm)
+    elif source.endswith((".tar.gz", ".tar.zst")):
+        log_error(f"Backup file not found: {archive}")
+        raise typer.Exit(1)
+    else:
+        restore_snapshot(source, database, projects or [], volumes or [], config, no_confirm)
+
+
+def show_log_usage() -> None:
+    """Print container log disk usage by project (from the backend)."""
+    client = connect_backend()
+    with client:
+        try:
+            usage = client.call("logs.usage")
+        except AdminRPCError as e:
+            log_warning(f"Cannot read log usage: {e.message}")
+            return
+    
+    table = create_table("Container Logs")
+    table.add_column("Project", style="cyan")
+    table.add_column("Containers", justify="right")
+    table.add_column("Size", justify="right")
+    for project in usage["projects"]:
+        table.add_row(
+            project["project"] or "(no project)",
+            str(len(project["containers"])),
+            f"{project['bytes'] / (1024 * 1024):.1f} MB"
+        )
+    console.print(table)
+    log_info(f"Total: [cyan]{usage['total_bytes'] / (1024 * 1024):.1f} MB[/cyan]")
+    if usage["unbounded"]:
+        log_warning(f"Logs without rotation: {', '.join(usage['unbounded'])}")
+        log_info("Redeploy these projects to apply the logging policy (PROJECT_LOG_*)")
+
+
+def clean_logs() -> None:
+    """
+    Show log usage and remove rotated container log files.
+    
+    Docker only writes the current file of each container, so rotated
+    files (json-file *.log.N, local driver container.log.N[.gz]) can be
+    deleted without racing with it; one find call covers all containers.
+    """
+    show_log_usage()
+    
+    log_step("Removing rotated log files...")
+    result = subprocess.run(
+        [
+            "sudo", "find", str(DOCKER_CONTAINERS_DIR), "-mindepth", "2", "-maxdepth", "3",
+            "-type", "f", "(", "-name", "*-json.log.*", "-o", "-name", "container.log.*", ")",
+            "-delete"
+        ],
+        check=False
+    )
+    if result.returncode == 0:
+        log_success("Rotated logs removed")
+    else:
+        log_warning("Cannot remove rotated logs")
 
 
 @app.command()
@@ -303,34 +674,7 @@ def clean(
     
     # Clean logs
     if logs:
-        log_step("Cleaning log files...")
-        result = subprocess.run(
-            ["docker-compose", "ps", "-q"],
-            cwd=PROJECT_ROOT,
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        
-        if result.returncode == 0:
-            container_ids = result.stdout.strip().split('\n')
-            for cid in container_ids:
-                if cid:
-                    # Get log path
-                    log_result = subprocess.run(
-                        ["docker", "inspect", "--format={{.LogPath}}", cid],
-                        capture_output=True,
-                        text=True,
-                        check=False
-                    )
-                    if log_result.returncode == 0:
-                        log_path = log_result.stdout.strip()
-                        subprocess.run(
-                            ["sudo", "truncate", "-s", "0", log_path],
-                            check=False
-                        )
-        
-        log_success("Logs cleaned")
+        clean_logs()
     
     # Show disk usage
     log_step("Disk usage after cleanup:")
@@ -339,12 +683,71 @@ def clean(
     log_success("Cleanup complete!")
 
 
+def render_container_states(states: dict, changed: dict) -> Table:
+    """
+    Table of system container states (for `status --watch`).
+    
+    Args:
+        states: Container name -> state
+        changed: Container name -> time of the last state change
+    
+    Returns:
+        Table: Rich table
+    """
+    table = create_table()
+    table.add_column("Service", style="cyan")
+    table.add_column("Container")
+    table.add_column("State")
+    table.add_column("Changed")
+    for service, name in get_system_containers().items():
+        state = states.get(name, "missing")
+        style = "green" if state == "running" else "red"
+        when = changed[name].strftime("%H:%M:%S") if name in changed else ""
+        table.add_row(service.capitalize(), name, f"[{style}]{state}[/{style}]", when)
+    return table
+
+
+def watch_status() -> None:
+    """Show container states, updated as Docker reports events (no polling)."""
+    from rich.live import Live
+    
+    names = list(get_system_containers().values())
+    try:
+        # Subscribe before reading the states so no change is missed
+        events = watch_container_events(*names)
+    except RuntimeError as e:
+        log_error(str(e))
+        raise typer.Exit(1)
+    
+    states = get_container_states(*names)
+    changed: dict[str, datetime] = {}
+    log_info("Watching container events (Ctrl+C to stop)")
+    try:
+        with Live(render_container_states(states, changed), console=console, auto_refresh=False) as live:
+            for name, state in events:
+                states[name] = state
+                changed[name] = datetime.now()
+                live.update(render_container_states(states, changed), refresh=True)
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        log_error(f"Docker events stopped: {e}")
+        raise typer.Exit(1)
+    finally:
+        events.close()
+
+
 def status(
-    verbose: bool = typer.Option(False, "--verbose", "-v", help="Show detailed information")
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Show detailed information"),
+    watch: bool = typer.Option(False, "--watch", "-w", help="Keep showing container states as they change")
 ) -> None:
     """Show system status."""
     print_banner("DockLite System Status")
     
+    if watch:
+        watch_status()
+        return
+    
     # Check containers
     console.print()
     log_step("Container Status:")
@@ -1,16 +1,11 @@
 """User management commands for DockLite CLI."""
 
-import subprocess
-import time
+import csv
 import typer
 from pathlib import Path
 from typing import Optional
 
-from ..config import (
-    PROJECT_ROOT,
-    CONTAINER_BACKEND,
-    get_access_url
-)
+from ..config import get_access_url
 from ..utils.console import (
     log_info,
     log_success,
@@ -19,13 +14,10 @@ from ..utils.console import (
     log_error,
     print_banner,
     console,
-    create_table
-)
-from ..utils.docker import (
-    docker_compose_cmd,
-    is_container_running
+    create_table,
+    create_progress
 )
-from ..utils.validation import check_docker
+from ..utils.rpc import AdminRPCError, connect_backend
 
 app = typer.Typer(
     help="User management commands",
@@ -33,6 +25,59 @@ app = typer.Typer(
     context_settings={"help_option_names": ["-h", "--help"]}
 )
 
+# Users per import request (progress is reported per batch)
+IMPORT_BATCH_SIZE = 100
+# CSV values treated as true in the is_admin column
+TRUE_VALUES = {"1", "true", "yes", "y", "admin"}
+
+
+def print_user_list(users: list) -> None:
+    """Print usernames with role (for 'user not found' hints)."""
+    for user in users:
+        if user["is_admin"]:
+            log_info(f"  [cyan]{user['username']}[/cyan] [yellow](admin)[/yellow]")
+        else:
+            log_info(f"  [cyan]{user['username']}[/cyan] (user)")
+
+
+def read_users_csv(csv_file: Path) -> list[tuple[int, dict]]:
+    """
+    Read users from a CSV file.
+
+    Columns (header row required): username, password, and optionally
+    email, system_user, is_admin. Unknown columns are ignored.
+
+    Args:
+        csv_file: Path to the CSV file
+
+    Returns:
+        list: (CSV line, user entry for the users.create method) pairs; the
+        line is where the row ends (quoted fields may span lines)
+
+    Raises:
+        ValueError: If the header lacks required columns
+    """
+    with open(csv_file, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        columns = set(reader.fieldnames or [])
+        missing = {"username", "password"} - columns
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+
+        entries = []
+        for row in reader:
+            entry = {
+                "username": (row.get("username") or "").strip(),
+                "password": row.get("password") or "",
+                "is_admin": (row.get("is_admin") or "").strip().lower() in TRUE_VALUES,
+            }
+            if (row.get("email") or "").strip():
+                entry["email"] = row["email"].strip()
+            if (row.get("system_user") or "").strip():
+                entry["system_user"] = row["system_user"].strip()
+            entries.append((reader.line_num, entry))
+        return entries
+
 
 @app.command(name="add")
 def add(
@@ -44,125 +89,125 @@ def add(
 ) -> None:
     """Add a new user to DockLite."""
     import getpass
-    
+
     print_banner("Add New User")
-    
-    # Check Docker
-    check_docker()
-    
-    # Check if backend is running
-    if not is_container_running(CONTAINER_BACKEND):
-        log_warning("Backend is not running. Starting it...")
-        docker_compose_cmd("up", "-d", "backend", cwd=PROJECT_ROOT)
-        log_step("Waiting for backend...")
-        time.sleep(3)
-    
-    # Get password if not provided
-    if not password:
-        console.print()
-        password = getpass.getpass(f"Enter password for {username}: ")
-        password_confirm = getpass.getpass("Confirm password: ")
-        
-        if password != password_confirm:
-            log_error("Passwords do not match!")
+
+    client = connect_backend()
+
+    with client:
+        # Get password if not provided
+        if not password:
+            console.print()
+            password = getpass.getpass(f"Enter password for {username}: ")
+            password_confirm = getpass.getpass("Confirm password: ")
+
+            if password != password_confirm:
+                log_error("Passwords do not match!")
+                raise typer.Exit(1)
+
+        if len(password) < 8:
+            log_error("Password must be at least 8 characters!")
             raise typer.Exit(1)
-    
-    if len(password) < 8:
-        log_error("Password must be at least 8 characters!")
-        raise typer.Exit(1)
-    
-    # Check if user exists
-    log_step("Checking if user exists...")
-    try:
-        result = docker_compose_cmd(
-            "exec", "-T", "backend",
-            "python", "-m", "app.cli_helpers.list_users", "simple",
-            cwd=PROJECT_ROOT,
-            capture_output=True
-        )
-        existing_users = result.stdout.strip().split('\n') if result.stdout.strip() else []
-        
-        if username in existing_users:
-            log_error(f"User '{username}' already exists!")
+
+        # Create user (existence is checked by the backend)
+        log_step(f"Creating user '{username}'...")
+
+        entry = {
+            "username": username,
+            "password": password,
+            "is_admin": is_admin,
+            "system_user": system_user,
+        }
+        if email:
+            entry["email"] = email
+
+        try:
+            report = client.call("users.create", users=[entry])
+        except AdminRPCError as e:
+            log_error(f"Failed to create user: {e.message}")
             raise typer.Exit(1)
-            
-    except subprocess.CalledProcessError:
-        log_warning("Could not check existing users, continuing...")
-    
-    # Create user
-    log_step(f"Creating user '{username}'...")
-    
-    # Build Python script
-    admin_flag = "True" if is_admin else "False"
-    email_arg = f'"{email}"' if email else "None"
-    
-    python_script = f"""
-import asyncio
-import sys
-import logging
-
-# Disable SQLAlchemy logging
-logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
-
-from app.core.database import AsyncSessionLocal
-from app.models import user, project  # Import all models
-from app.models.user import User
-from app.services.auth_service import AuthService
-
-async def create_user():
-    async with AsyncSessionLocal() as session:
-        new_user = User(
-            username="{username}",
-            password_hash=AuthService.get_password_hash("{password}"),
-            is_admin={admin_flag},
-            email={email_arg},
-            system_user="{system_user}"
-        )
-        session.add(new_user)
-        await session.commit()
-        await session.refresh(new_user)
-        
-        print(f"SUCCESS:{{new_user.id}}")
-
-if __name__ == "__main__":
-    asyncio.run(create_user())
-"""
-    
+
+    if report["errors"]:
+        log_error(f"Failed to create user: {report['errors'][0]['error']}")
+        raise typer.Exit(1)
+
+    user_id = report["created"][0]["id"]
+    log_success(f"User '{username}' created successfully! (ID: {user_id})")
+
+    console.print()
+    console.print("[bold]User Details:[/bold]")
+    console.print(f"  Username:     [cyan]{username}[/cyan]")
+    console.print(f"  Role:         [cyan]{'Admin' if is_admin else 'User'}[/cyan]")
+    console.print(f"  System User:  [cyan]{system_user}[/cyan]")
+    if email:
+        console.print(f"  Email:        [cyan]{email}[/cyan]")
+    console.print()
+
+    if is_admin:
+        log_info("This user has full admin privileges")
+    else:
+        log_info("This user can only see their own projects")
+
+
+@app.command(name="import")
+def import_users(
+    csv_file: Path = typer.Argument(..., help="CSV file (username,password[,email,system_user,is_admin])", exists=True, dir_okay=False),
+    skip_existing: bool = typer.Option(False, "--skip-existing", help="Skip users that already exist instead of reporting errors"),
+    batch_size: int = typer.Option(IMPORT_BATCH_SIZE, "--batch-size", "-b", min=1, help="Users per request"),
+) -> None:
+    """Import users from a CSV file."""
+    print_banner("Import Users")
+
     try:
-        result = docker_compose_cmd(
-            "exec", "-T", "backend",
-            "python", "-c", python_script,
-            cwd=PROJECT_ROOT,
-            capture_output=True
-        )
-        
-        if "SUCCESS" in result.stdout:
-            user_id = result.stdout.strip().split(":")[-1]
-            log_success(f"User '{username}' created successfully! (ID: {user_id})")
-            
-            console.print()
-            console.print("[bold]User Details:[/bold]")
-            console.print(f"  Username:     [cyan]{username}[/cyan]")
-            console.print(f"  Role:         [cyan]{'Admin' if is_admin else 'User'}[/cyan]")
-            console.print(f"  System User:  [cyan]{system_user}[/cyan]")
-            if email:
-                console.print(f"  Email:        [cyan]{email}[/cyan]")
-            console.print()
-            
-            if is_admin:
-                log_info("This user has full admin privileges")
-            else:
-                log_info("This user can only see their own projects")
-                
-        else:
-            log_error("Failed to create user")
-            console.print(result.stdout)
-            raise typer.Exit(1)
-            
-    except subprocess.CalledProcessError as e:
-        log_error("Failed to create user")
-        if e.stderr:
-            console.print(f"[red]{e.stderr}[/red]")
+        entries = read_users_csv(csv_file)
+    except (OSError, ValueError, csv.Error) as e:
+        log_error(f"Cannot read {csv_file.name}: {e}")
+        raise typer.Exit(1)
+
+    if not entries:
+        log_warning("No users in file")
+        return
+
+    client = connect_backend()
+
+    created, skipped, errors = 0, [], []
+    log_step(f"Importing {len(entries)} users...")
+    with client, create_progress() as progress:
+        task = progress.add_task("Importing users...", total=len(entries))
+        for start in range(0, len(entries), batch_size):
+            lines = [line for line, _ in entries[start:start + batch_size]]
+            batch = [entry for _, entry in entries[start:start + batch_size]]
+            try:
+                report = client.call("users.create", users=batch, skip_existing=skip_existing)
+            except AdminRPCError as e:
+                log_error(f"Import stopped at row {lines[0]}: {e.message}")
+                raise typer.Exit(1)
+
+            created += len(report["created"])
+            skipped.extend(report["skipped"])
+            for error in report["errors"]:
+                row = lines[error["index"]] if error["index"] is not None else None
+                errors.append((row, error["username"], error["error"]))
+            progress.update(
+                task,
+                advance=len(batch),
+                description=f"Imported {created}/{len(entries)} users"
+            )
+
+    console.print()
+    log_success(f"Created {created} users")
+    if skipped:
+        log_info(f"Skipped {len(skipped)} existing users")
+
+    if errors:
+        log_error(f"{len(errors)} users were not created:")
+        table = create_table()
+        table.add_column("Row", justify="right", style="cyan")
+        table.add_column("Username", style="cyan")
+        table.add_column("Error", style="red")
+        for row, username, error in errors:
+            table.add_row(str(row or "-"), username or "", error)
+        console.print(table)
         raise typer.Exit(1)
 
 
@@ -172,37 +217,27 @@ def list_users(
 ) -> None:
     """List all users."""
     print_banner("DockLite Users")
-    
-    # Check Docker
-    check_docker()
-    
-    # Check if backend is running
-    if not is_container_running(CONTAINER_BACKEND):
-        log_warning("Backend is not running. Starting it...")
-        docker_compose_cmd("up", "-d", "backend", cwd=PROJECT_ROOT)
-        time.sleep(3)
-    
+
+    client = connect_backend()
+
     # Get users list
     log_step("Loading users...")
     console.print()
-    
-    if verbose:
-        # Detailed user info
-        result = docker_compose_cmd(
-            "exec", "-T", "backend",
-            "python", "-m", "app.cli_helpers.list_users", "detailed",
-            cwd=PROJECT_ROOT,
-            capture_output=True
-        )
-        
-        output = result.stdout.strip()
-        
-        if output == "NO_USERS":
-            log_warning("No users found in database!")
-            log_info("Use the setup screen to create the first admin user:")
-            log_info(f"[cyan]{get_access_url()}[/cyan]")
+
+    with client:
+        try:
+            users = client.call("users.list")
+        except AdminRPCError as e:
+            log_error(f"Failed to load users: {e.message}")
             raise typer.Exit(1)
-        
+
+    if not users:
+        log_warning("No users found in database!")
+        log_info("Use the setup screen to create the first admin user:")
+        log_info(f"[cyan]{get_access_url()}[/cyan]")
+        raise typer.Exit(1)
+
+    if verbose:
         # Create table
         table = create_table("Users", show_lines=True)
         table.add_column("ID", justify="right", style="cyan")
@@ -211,80 +246,49 @@ def list_users(
         table.add_column("Role")
         table.add_column("Status")
         table.add_column("System User")
-        
-        for line in output.split('\n'):
-            if '|' in line:
-                parts = line.split('|')
-                if len(parts) == 6:
-                    user_id, username, email, role, status, sys_user = parts
-                    
-                    # Style based on role and status
-                    role_style = "yellow" if role == "admin" else "white"
-                    status_style = "green" if status == "active" else "red"
-                    
-                    table.add_row(
-                        user_id,
-                        username,
-                        email,
-                        f"[{role_style}]{role}[/{role_style}]",
-                        f"[{status_style}]{status}[/{status_style}]",
-                        sys_user
-                    )
-        
+
+        for user in users:
+            role = "admin" if user["is_admin"] else "user"
+            status = "active" if user["is_active"] else "inactive"
+
+            # Style based on role and status
+            role_style = "yellow" if role == "admin" else "white"
+            status_style = "green" if status == "active" else "red"
+
+            table.add_row(
+                str(user["id"]),
+                user["username"],
+                user["email"] or "",
+                f"[{role_style}]{role}[/{role_style}]",
+                f"[{status_style}]{status}[/{status_style}]",
+                user["system_user"]
+            )
+
         console.print(table)
     else:
-        # Simple list
-        result = docker_compose_cmd(
-            "exec", "-T", "backend",
-            "python", "-m", "app.cli_helpers.list_users", "simple",
-            cwd=PROJECT_ROOT,
-            capture_output=True
-        )
-        
-        output = result.stdout.strip()
-        
-        if output == "NO_USERS":
-            log_warning("No users found in database!")
-            log_info("Use the setup screen to create the first admin user:")
-            log_info(f"[cyan]{get_access_url()}[/cyan]")
-            raise typer.Exit(1)
-        
-        for line in output.split('\n'):
-            if ':' in line:
-                parts = line.split(':')
-                if len(parts) == 3:
-                    username, role, status = parts
-                    
-                    if role == "admin":
-                        if status == "✓":
-                            log_success(f"[cyan]{username}[/cyan] [yellow]({role})[/yellow]")
-                        else:
-                            log_warning(f"[cyan]{username}[/cyan] [yellow]({role})[/yellow] [red][inactive][/red]")
-                    else:
-                        if status == "✓":
-                            log_info(f"[cyan]{username}[/cyan] ({role})")
-                        else:
-                            log_warning(f"[cyan]{username}[/cyan] ({role}) [red][inactive][/red]")
-    
+        for user in users:
+            username = user["username"]
+            role = "admin" if user["is_admin"] else "user"
+
+            if role == "admin":
+                if user["is_active"]:
+                    log_success(f"[cyan]{username}[/cyan] [yellow]({role})[/yellow]")
+                else:
+                    log_warning(f"[cyan]{username}[/cyan] [yellow]({role})[/yellow] [red]\\[inactive][/red]")
+            else:
+                if user["is_active"]:
+                    log_info(f"[cyan]{username}[/cyan] ({role})")
+                else:
+                    log_warning(f"[cyan]{username}[/cyan] ({role}) [red]\\[inactive][/red]")
+
     console.print()
-    
-    # Count users
-    result = docker_compose_cmd(
-        "exec", "-T", "backend",
-        "python", "-m", "app.cli_helpers.list_users", "count",
-        cwd=PROJECT_ROOT,
-        capture_output=True,
-        check=False
-    )
-    
-    count = result.stdout.strip()
-    log_info(f"Total users: [cyan]{count}[/cyan]")
-    
+    log_info(f"Total users: [cyan]{len(users)}[/cyan]")
+
     console.print()
-    
+
     if not verbose:
         log_info("Use [cyan]--verbose[/cyan] for detailed information")
-    
+
     console.print()
 
 
@@ -295,99 +299,76 @@ def reset_password(
 ) -> None:
     """Reset user password."""
     print_banner("Reset User Password")
-    
-    # Check Docker
-    check_docker()
-    
-    # Check if backend is running
-    if not is_container_running(CONTAINER_BACKEND):
-        log_warning("Backend is not running. Starting it...")
-        docker_compose_cmd("up", "-d", "backend", cwd=PROJECT_ROOT)
-        time.sleep(3)
-    
-    # First, get list of existing users
-    log_step("Checking existing users...")
-    
-    result = docker_compose_cmd(
-        "exec", "-T", "backend",
-        "python", "-m", "app.cli_helpers.reset_password", "list",
-        cwd=PROJECT_ROOT,
-        capture_output=True
-    )
-    
-    users_list = result.stdout.strip()
-    
-    if users_list == "NO_USERS":
-        log_warning("No users found in database!")
-        log_info("Use the setup screen to create the first admin user:")
-        log_info(f"[cyan]{get_access_url()}[/cyan]")
-        raise typer.Exit(1)
-    
-    # Check if requested user exists
-    if not any(line.startswith(f"{username}:") for line in users_list.split('\n')):
-        log_error(f"User '{username}' not found!")
-        console.print()
-        log_step("Existing users:")
-        for line in users_list.split('\n'):
-            if ':' in line:
-                user, role = line.split(':', 1)
-                if role == "admin":
-                    log_info(f"  [cyan]{user}[/cyan] [yellow]({role})[/yellow]")
-                else:
-                    log_info(f"  [cyan]{user}[/cyan] ({role})")
-        console.print()
-        log_info(f"Usage: [cyan]./docklite user reset-password <username>[/cyan]")
-        raise typer.Exit(1)
-    
-    console.print()
-    log_info(f"Username: [cyan]{username}[/cyan]")
-    console.print()
-    
-    # If password not provided, ask interactively
-    if not password:
-        log_step(f"Enter new password for user '{username}':")
-        password = typer.prompt("Password", hide_input=True)
-        password_confirm = typer.prompt("Confirm password", hide_input=True)
-        
-        if password != password_confirm:
-            log_error("Passwords don't match!")
+
+    client = connect_backend()
+
+    with client:
+        # First, get list of existing users
+        log_step("Checking existing users...")
+
+        try:
+            users = client.call("users.list")
+        except AdminRPCError as e:
+            log_error(f"Failed to load users: {e.message}")
             raise typer.Exit(1)
-        
-        if len(password) < 6:
-            log_error("Password must be at least 6 characters!")
+
+        if not users:
+            log_warning("No users found in database!")
+            log_info("Use the setup screen to create the first admin user:")
+            log_info(f"[cyan]{get_access_url()}[/cyan]")
             raise typer.Exit(1)
-    
-    # Execute password reset
-    log_step("Resetting password...")
-    
-    result = docker_compose_cmd(
-        "exec", "-T", "backend",
-        "python", "-m", "app.cli_helpers.reset_password", "reset", username, password,
-        cwd=PROJECT_ROOT,
-        capture_output=True,
-        check=False
-    )
-    
-    if "SUCCESS" in result.stdout:
-        console.print()
-        log_success("Password reset successfully!")
-        console.print()
-        
-        # Show user info
-        for line in result.stdout.split('\n'):
-            if line.startswith('User ID:') or line.startswith('Email:') or \
-               line.startswith('Admin:') or line.startswith('Active:'):
-                console.print(line)
-        
-        console.print()
-        log_info("You can now login with:")
-        log_info(f"  Username: [cyan]{username}[/cyan]")
-        log_info(f"  Password: [cyan][your new password][/cyan]")
+
+        # Check if requested user exists
+        if not any(user["username"] == username for user in users):
+            log_error(f"User '{username}' not found!")
+            console.print()
+            log_step("Existing users:")
+            print_user_list(users)
+            console.print()
+            log_info(f"Usage: [cyan]./docklite user reset-password <username>[/cyan]")
+            raise typer.Exit(1)
+
         console.print()
-        log_info(f"Frontend: [cyan]{get_access_url()}[/cyan]")
-    else:
+        log_info(f"Username: [cyan]{username}[/cyan]")
         console.print()
-        log_error("Failed to reset password")
-        console.print(result.stdout)
-        raise typer.Exit(1)
 
+        # If password not provided, ask interactively
+        if not password:
+            log_step(f"Enter new password for user '{username}':")
+            password = typer.prompt("Password", hide_input=True)
+            password_confirm = typer.prompt("Confirm password", hide_input=True)
+
+            if password != password_confirm:
+                log_error("Passwords don't match!")
+                raise typer.Exit(1)
+
+            if len(password) < 6:
+                log_error("Password must be at least 6 characters!")
+                raise typer.Exit(1)
+
+        # Execute password reset
+        log_step("Resetting password...")
+
+        try:
+            user = client.call("users.reset_password", username=username, password=password)
+        except AdminRPCError as e:
+            console.print()
+            log_error(f"Failed to reset password: {e.message}")
+            raise typer.Exit(1)
+
+    console.print()
+    log_success("Password reset successfully!")
+    console.print()
+
+    # Show user info
+    console.print(f"User ID: {user['id']}")
+    console.print(f"Email: {user['email'] or 'N/A'}")
+    console.print(f"Admin: {'Yes' if user['is_admin'] else 'No'}")
+    console.print(f"Active: {'Yes' if user['is_active'] else 'No'}")
+
+    console.print()
+    log_info("You can now login with:")
+    log_info(f"  Username: [cyan]{username}[/cyan]")
+    log_info(f"  Password: [cyan][your new password][/cyan]")
+    console.print()
+    log_info(f"Frontend: [cyan]{get_access_url()}[/cyan]")
@@ -0,0 +1,87 @@
+"""Command index for the bash completion (scripts/completion)."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+INDEX_VERSION = 1
+# Key of the root command's line
+ROOT_KEY = "."
+
+
+def index_path() -> Path:
+    """
+    Location of the cached index (read by docklite-completion.bash).
+
+    Returns:
+        Path: $XDG_CACHE_HOME/docklite/completion-index
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "docklite" / "completion-index"
+
+
+def _entries(command: Any, ctx: Any, key: str) -> list[tuple[str, int, list[str]]]:
+    """Index entries of a command and its subcommands (depth first)."""
+    if hasattr(command, "list_commands"):
+        names = []
+        entries = []
+        for name in command.list_commands(ctx):
+            subcommand = command.get_command(ctx, name)
+            if subcommand is None or subcommand.hidden:
+                continue
+            names.append(name)
+            sub_ctx = subcommand.context_class(subcommand, info_name=name, parent=ctx)
+            sub_key = name if key == ROOT_KEY else f"{key} {name}"
+            entries.extend(_entries(subcommand, sub_ctx, sub_key))
+        return [(key, 0, names)] + entries
+
+    words, arguments = [], 0
+    for param in command.get_params(ctx):
+        if param.param_type_name == "argument":
+            arguments += 1
+        elif not getattr(param, "hidden", False):
+            words.extend(param.opts + param.secondary_opts)
+    return [(key, arguments, words)]
+
+
+def build_index(root: Any, source: Optional[Path] = None) -> str:
+    """
+    Build the completion index of a command tree.
+
+    One tab-separated line per command: key ("." for the root, else the
+    command path, e.g. "user add"), number of positional arguments, and
+    the words to complete (subcommands of groups, options of commands).
+
+    Args:
+        root: Root Click/Typer command (lazy commands are imported)
+        source: CLI package directory; the completion rebuilds the index
+            when a file in it is newer
+
+    Returns:
+        str: Index file contents
+    """
+    source = source or Path(__file__).parent
+    ctx = root.context_class(root, info_name="docklite")
+    lines = [
+        f"# docklite completion index v{INDEX_VERSION}",
+        f"# source {source.resolve()}",
+    ]
+    for key, arguments, words in _entries(root, ctx, ROOT_KEY):
+        lines.append(f"{key}\t{arguments}\t{' '.join(words)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_index(root: Any, path: Path) -> None:
+    """
+    Write the index atomically (completions may read it concurrently).
+
+    Args:
+        root: Root command
+        path: Index file
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    tmp.write_text(build_index(root))
+    os.replace(tmp, path)
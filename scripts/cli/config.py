@@ -18,6 +18,10 @@ BACKUPS_DIR = PROJECT_ROOT / "backups"
 ENV_FILE = PROJECT_ROOT / ".env"
 DOCKER_COMPOSE_FILE = PROJECT_ROOT / "docker-compose.yml"
 VENV_PYTHON = PROJECT_ROOT / ".venv" / "bin" / "python"
+# Backend admin RPC socket (bind-mounted from the backend container)
+ADMIN_SOCKET = PROJECT_ROOT / "run" / "admin.sock"
+# Docker's per-container directories (log files)
+DOCKER_CONTAINERS_DIR = Path("/var/lib/docker/containers")
 
 # Default projects directory - use home directory for cross-platform compatibility
 _home = Path.home()
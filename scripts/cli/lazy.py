@@ -0,0 +1,102 @@
+"""Lazily loaded subcommands for DockLite CLI."""
+
+from __future__ import annotations
+
+import importlib
+from collections.abc import MutableMapping
+from typing import Any, Iterator, NamedTuple, Optional
+
+import typer
+from typer.core import TyperGroup
+
+
+class LazyCommand(NamedTuple):
+    """Where a subcommand lives; its module is imported on first use."""
+
+    module: str  # e.g. "cli.commands.user"
+    attr: str  # Typer app (command group) or command function
+    help: Optional[str] = None  # Overrides the group's/function's help
+
+
+def load_command(name: str, spec: LazyCommand) -> Any:
+    """
+    Import a lazy subcommand and build its Click command.
+
+    Args:
+        name: Command name
+        spec: Module and attribute of the command
+
+    Returns:
+        Command (or group) registered under `name`
+    """
+    target = getattr(importlib.import_module(spec.module), spec.attr)
+    if isinstance(target, typer.Typer):
+        group = typer.main.get_group(target)
+        if spec.help:
+            group.help = spec.help
+        group.name = name
+        return group
+    single = typer.Typer(add_completion=False)
+    single.command(name=name, help=spec.help)(target)
+    command = typer.main.get_command(single)
+    command.name = name
+    return command
+
+
+class LazyCommands(MutableMapping):
+    """
+    Command table of a group: lazy names are listed without importing.
+
+    Looking a command up imports its module once; listing all commands
+    (e.g. for --help) imports every module.
+    """
+
+    def __init__(self, lazy: dict[str, LazyCommand], loaded: MutableMapping):
+        self._lazy = dict(lazy)
+        self._loaded = dict(loaded)
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._loaded:
+            if name not in self._lazy:
+                raise KeyError(name)
+            self._loaded[name] = load_command(name, self._lazy[name])
+        return self._loaded[name]
+
+    def __setitem__(self, name: str, command: Any) -> None:
+        self._loaded[name] = command
+
+    def __delitem__(self, name: str) -> None:
+        if name not in self:
+            raise KeyError(name)
+        self._lazy.pop(name, None)
+        self._loaded.pop(name, None)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._lazy or name in self._loaded
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._lazy
+        yield from (name for name in self._loaded if name not in self._lazy)
+
+    def __len__(self) -> int:
+        return len(self._lazy.keys() | self._loaded.keys())
+
+    @property
+    def loaded(self) -> list[str]:
+        """Names of the commands built so far."""
+        return list(self._loaded)
+
+
+class LazyGroup(TyperGroup):
+    """
+    Typer group whose `lazy_commands` are imported only when they run.
+
+    Subclass it with a `lazy_commands` table and pass it as `cls` to
+    typer.Typer; commands registered on the Typer app itself stay eager.
+    """
+
+    lazy_commands: dict[str, LazyCommand] = {}
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.commands = LazyCommands(self.lazy_commands, self.commands)
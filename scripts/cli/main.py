@@ -4,32 +4,40 @@ import typer
 from typing import Optional
 
 from . import __version__
-from .commands import development, deployment, maintenance, user
+from .lazy import LazyCommand, LazyGroup
+
+
+class DockLiteGroup(LazyGroup):
+    """Root command group; command modules are imported when they run."""
+
+    lazy_commands = {
+        # Command groups
+        "dev": LazyCommand("cli.commands.development", "app", "Development commands (7)"),
+        "deploy": LazyCommand("cli.commands.deployment", "app", "Deployment commands (3)"),
+        "user": LazyCommand("cli.commands.user", "app", "User management commands (4)"),
+        "maint": LazyCommand("cli.commands.maintenance", "app", "Maintenance commands (4)"),
+        # Essential commands at root level for convenience
+        "start": LazyCommand("cli.commands.development", "start"),
+        "stop": LazyCommand("cli.commands.development", "stop"),
+        "restart": LazyCommand("cli.commands.development", "restart"),
+        "logs": LazyCommand("cli.commands.development", "logs"),
+        "test": LazyCommand("cli.commands.development", "test"),
+        "bench": LazyCommand("cli.commands.development", "bench"),
+        "status": LazyCommand("cli.commands.maintenance", "status"),
+    }
+
 
 # Create main Typer app with -h support
 app = typer.Typer(
     name="docklite",
     help="DockLite - Multi-tenant Docker management system",
+    cls=DockLiteGroup,
     add_completion=True,
     no_args_is_help=True,
     rich_markup_mode="rich",
     context_settings={"help_option_names": ["-h", "--help"]}
 )
 
-# Add command groups
-app.add_typer(development.app, name="dev", help="Development commands (6)")
-app.add_typer(deployment.app, name="deploy", help="Deployment commands (3)")
-app.add_typer(user.app, name="user", help="User management commands (3)")
-app.add_typer(maintenance.app, name="maint", help="Maintenance commands (3)")
-
-# Register essential commands at root level for convenience
-app.command(name="start")(development.start)
-app.command(name="stop")(development.stop)
-app.command(name="restart")(development.restart)
-app.command(name="logs")(development.logs)
-app.command(name="test")(development.test)
-app.command(name="status")(maintenance.status)
-
 
 @app.command()
 def version():
@@ -38,6 +46,18 @@ def version():
     console.print(f"DockLite v{__version__}")
 
 
+@app.command(name="completion-index", hidden=True)
+def completion_index(
+    ctx: typer.Context,
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Index file (default: user cache)")
+) -> None:
+    """Write the command index used by the bash completion."""
+    from pathlib import Path
+    from .completion import index_path, write_index
+
+    write_index(ctx.find_root().command, Path(output) if output else index_path())
+
+
 @app.callback()
 def main_callback():
     """
@@ -47,11 +67,12 @@ def main_callback():
       start, stop, restart    # System lifecycle
       logs, status            # Monitoring
       test                    # Run all tests
+      bench                   # Load test the API
     
     Command Groups:
-      dev                     # Development (setup-dev, rebuild, test-*, test-cli)
+      dev                     # Development (setup-dev, rebuild, test-*, test-cli, bench)
       deploy                  # Deployment (setup-user, setup-ssh, init-db)
-      user                    # User management (add, list, reset-password)
+      user                    # User management (add, list, reset-password, import)
       maint                   # Maintenance (backup, restore, clean)
     
     Examples:
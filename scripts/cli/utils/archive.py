@@ -0,0 +1,135 @@
+"""Backup archive helpers (.tar.gz and .tar.zst written by the backend)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+import subprocess
+import tarfile
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import Iterator, Optional
+
+# Last member of archives written by the backend's backup engine
+MANIFEST_NAME = "manifest.json"
+# Written by backups made before the manifest existed
+LEGACY_INFO_NAME = "backup_info.txt"
+# Read size while extracting members
+COPY_CHUNK = 1024 * 1024
+
+
+@contextmanager
+def open_backup(path: Path) -> Iterator[tarfile.TarFile]:
+    """
+    Open a backup archive for sequential reading.
+
+    zstd archives are read with the zstandard module if installed, else
+    through the `zstd` command.
+
+    Args:
+        path: .tar.gz or .tar.zst archive
+
+    Yields:
+        TarFile: Archive in stream mode (iterate or extractall once)
+
+    Raises:
+        ValueError: If the archive is zstd-compressed and no zstd
+            decompressor is available
+    """
+    if not path.name.endswith(".zst"):
+        with tarfile.open(path, "r:*") as tar:
+            yield tar
+        return
+
+    try:
+        import zstandard
+    except ImportError:
+        zstandard = None
+
+    if zstandard is not None:
+        with open(path, "rb") as raw:
+            with zstandard.ZstdDecompressor().stream_reader(raw) as stream:
+                with tarfile.open(fileobj=stream, mode="r|") as tar:
+                    yield tar
+        return
+
+    if not shutil.which("zstd"):
+        raise ValueError("zstd archives need the zstd command or the zstandard package")
+    process = subprocess.Popen(["zstd", "-dc", str(path)], stdout=subprocess.PIPE)
+    assert process.stdout is not None
+    try:
+        with tarfile.open(fileobj=process.stdout, mode="r|") as tar:
+            yield tar
+    finally:
+        process.stdout.close()
+        if process.wait() != 0:
+            raise ValueError(f"zstd failed to decompress {path.name}")
+
+
+def read_manifest(directory: Path) -> Optional[dict]:
+    """
+    Manifest of an extracted backup.
+
+    Args:
+        directory: Directory the archive was extracted to
+
+    Returns:
+        dict: Manifest, or None for backups without one
+    """
+    manifest = directory / MANIFEST_NAME
+    if not manifest.exists():
+        return None
+    data: dict = json.loads(manifest.read_text())
+    return data
+
+
+def stage_backup(path: Path, directory: Path) -> Optional[dict]:
+    """
+    Extract a backup archive, verifying it on the way.
+
+    Members are hashed while they are written (one pass over the archive)
+    and checked against the manifest at the end, so nothing of a damaged
+    archive is ever used. Backups made before manifests can't be verified.
+
+    Args:
+        path: .tar.gz or .tar.zst archive
+        directory: Empty directory to extract to
+
+    Returns:
+        dict: Manifest, or None for backups without one
+
+    Raises:
+        ValueError: On unsafe member names, missing members or checksum
+            mismatches (and see open_backup)
+    """
+    checksums = {}
+    with open_backup(path) as tar:
+        for member in tar:
+            name = PurePosixPath(member.name)
+            if name.is_absolute() or ".." in name.parts:
+                raise ValueError(f"Unsafe path in archive: {member.name}")
+            target = directory.joinpath(*name.parts)
+            if member.isdir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            if not member.isfile():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            digest = hashlib.sha256()
+            source = tar.extractfile(member)
+            assert source is not None
+            with open(target, "wb") as f:
+                for chunk in iter(lambda: source.read(COPY_CHUNK), b""):
+                    digest.update(chunk)
+                    f.write(chunk)
+            target.chmod(member.mode & 0o777)
+            checksums[str(name)] = digest.hexdigest()
+
+    manifest = read_manifest(directory)
+    if manifest is None:
+        return None
+    for entry in manifest["files"]:
+        if checksums.get(entry["path"]) != entry["sha256"]:
+            raise ValueError(f"{path.name}: checksum mismatch for {entry['path']}")
+    return manifest
@@ -2,16 +2,38 @@
 
 from __future__ import annotations
 
+import json
+import shlex
 import subprocess
 import shutil
 import grp
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Generator, Optional
 from .console import log_error
 
+# Container events that change what `docker ps` reports -> new state
+EVENT_STATES = {
+    "create": "created",
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "stop": "exited",
+    "kill": "exited",
+    "destroy": "missing",
+}
 
+
+@lru_cache(maxsize=None)
 def has_docker_group() -> bool:
-    """Check if current user is in docker group (Linux-specific)."""
+    """
+    Check if current user is in docker group (Linux-specific).
+
+    Group membership doesn't change while the CLI runs, so the result is
+    cached for the process.
+    """
     try:
         import os
         # On macOS, docker group doesn't exist - always return True to skip sg
@@ -32,15 +54,22 @@ def get_docker_compose_command() -> list[str]:
     1. docker-compose (standalone)
     2. docker compose (plugin)
     
+    The probe runs once per process; callers get a fresh list they may extend.
+    
     Returns:
         List[str]: Command parts
     
     Raises:
         FileNotFoundError: If neither command is available
     """
+    return list(_detect_docker_compose_command())
+
+
+@lru_cache(maxsize=None)
+def _detect_docker_compose_command() -> tuple[str, ...]:
     # Try docker-compose first
     if shutil.which("docker-compose"):
-        return ["docker-compose"]
+        return ("docker-compose",)
     
     # Try docker compose
     try:
@@ -50,13 +79,34 @@ def get_docker_compose_command() -> list[str]:
             text=True
         )
         if result.returncode == 0:
-            return ["docker", "compose"]
+            return ("docker", "compose")
     except FileNotFoundError:
         pass
     
     raise FileNotFoundError("docker-compose not found")
 
 
+def clear_caches() -> None:
+    """Forget cached group membership and compose command (e.g. after setup)."""
+    has_docker_group.cache_clear()
+    _detect_docker_compose_command.cache_clear()
+
+
+def with_docker_group(cmd: list[str]) -> list[str]:
+    """
+    Wrap a command in `sg docker -c` if the user isn't in the docker group.
+    
+    Args:
+        cmd: Command parts
+    
+    Returns:
+        List[str]: Command to run
+    """
+    if has_docker_group():
+        return cmd
+    return ["sg", "docker", "-c", shlex.join(cmd)]
+
+
 def docker_compose_cmd(
     *args: str,
     cwd: Optional[Path] = None,
@@ -75,12 +125,8 @@ def docker_compose_cmd(
     Returns:
         CompletedProcess: Result of the command
     """
-    cmd = get_docker_compose_command()
-    cmd.extend(args)
-    
     # Use sg docker if not in docker group
-    if not has_docker_group():
-        cmd = ["sg", "docker", "-c", " ".join(cmd)]
+    cmd = with_docker_group(get_docker_compose_command() + list(args))
     
     return subprocess.run(
         cmd,
@@ -91,6 +137,33 @@ def docker_compose_cmd(
     )
 
 
+def get_container_states(*names: str) -> dict[str, str]:
+    """
+    Get the state of containers with a single `docker ps` call.
+    
+    Args:
+        *names: Container names (all containers if empty)
+    
+    Returns:
+        dict: Container name -> state ("running", "exited", ...; "missing"
+            for requested containers that don't exist)
+    """
+    cmd = with_docker_group(["docker", "ps", "--all", "--format", "{{.Names}}\t{{.State}}"])
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return {name: "missing" for name in names}
+    
+    states = {}
+    for line in result.stdout.splitlines():
+        name, _, state = line.partition("\t")
+        if name:
+            states[name] = state or "unknown"
+    if not names:
+        return states
+    return {name: states.get(name, "missing") for name in names}
+
+
 def is_container_running(container_name: str) -> bool:
     """
     Check if a container is running.
@@ -101,35 +174,15 @@ def is_container_running(container_name: str) -> bool:
     Returns:
         bool: True if running, False otherwise
     """
-    try:
-        if has_docker_group():
-            result = subprocess.run(
-                ["docker", "ps", "--format", "{{.Names}}"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-        else:
-            result = subprocess.run(
-                ["sg", "docker", "-c", "docker ps --format '{{.Names}}'"],
-                capture_output=True,
-                text=True,
-                check=True,
-                shell=True
-            )
-        
-        containers = result.stdout.strip().split('\n')
-        return container_name in containers
-    except subprocess.CalledProcessError:
-        return False
+    return get_container_states(container_name)[container_name] == "running"
 
 
-def get_container_status() -> dict:
+def get_system_containers() -> dict[str, str]:
     """
-    Get status of all DockLite containers.
+    Names of DockLite's own containers.
     
     Returns:
-        dict: Container name -> running status
+        dict: Service name -> container name
     """
     from ..config import (
         CONTAINER_TRAEFIK,
@@ -138,12 +191,82 @@ def get_container_status() -> dict:
     )
     
     return {
-        "traefik": is_container_running(CONTAINER_TRAEFIK),
-        "backend": is_container_running(CONTAINER_BACKEND),
-        "frontend": is_container_running(CONTAINER_FRONTEND),
+        "traefik": CONTAINER_TRAEFIK,
+        "backend": CONTAINER_BACKEND,
+        "frontend": CONTAINER_FRONTEND,
+    }
+
+
+def get_container_status() -> dict:
+    """
+    Get status of all DockLite containers (one `docker ps` call).
+    
+    Returns:
+        dict: Service name -> running status
+    """
+    containers = get_system_containers()
+    states = get_container_states(*containers.values())
+    return {
+        service: states[name] == "running"
+        for service, name in containers.items()
     }
 
 
+def watch_container_events(*names: str) -> Generator[tuple[str, str], None, None]:
+    """
+    Stream state changes of containers from `docker events`.
+    
+    The events process is started before the generator returns its first
+    item, so callers can read the current states after starting it and
+    miss no change in between.
+    
+    Args:
+        *names: Container names to watch
+    
+    Yields:
+        tuple: (container name, new state) for each state-changing event
+    
+    Raises:
+        RuntimeError: If `docker events` can't be started or exits
+    """
+    cmd = ["docker", "events", "--filter", "type=container", "--format", "{{json .}}"]
+    for name in names:
+        cmd.extend(["--filter", f"container={name}"])
+    try:
+        process = subprocess.Popen(
+            with_docker_group(cmd),
+            stdout=subprocess.PIPE,
+            # Never read while it runs: a full pipe would block the process
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+    except FileNotFoundError as e:
+        raise RuntimeError(f"Cannot run docker events: {e}")
+    return _read_events(process)
+
+
+def _read_events(process: "subprocess.Popen[str]") -> Generator[tuple[str, str], None, None]:
+    assert process.stdout is not None
+    try:
+        for line in process.stdout:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            # "health_status: healthy" and exec events carry a suffix
+            action = (event.get("Action") or event.get("status") or "").split(":")[0]
+            state = EVENT_STATES.get(action)
+            name = (event.get("Actor") or {}).get("Attributes", {}).get("name")
+            if state and name:
+                yield name, state
+        code = process.wait()
+        raise RuntimeError(f"docker events exited with code {code}")
+    finally:
+        if process.poll() is None:
+            process.terminate()
+            process.wait()
+
+
 def docker_exec(
     container: str,
     *command: str,
@@ -160,10 +283,7 @@ def docker_exec(
     Returns:
         CompletedProcess: Result
     """
-    cmd = ["docker", "exec", "-T", container, *command]
-    
-    if not has_docker_group():
-        cmd = ["sg", "docker", "-c", " ".join(cmd)]
+    cmd = with_docker_group(["docker", "exec", "-T", container, *command])
     
     return subprocess.run(
         cmd,
@@ -0,0 +1,191 @@
+"""Admin RPC client for talking to the running backend."""
+
+from __future__ import annotations
+
+import itertools
+import json
+import socket
+import subprocess
+import time
+from pathlib import Path
+from typing import IO, Any, Optional
+
+from ..config import ADMIN_SOCKET, CONTAINER_BACKEND, PROJECT_ROOT
+from .console import log_error, log_step, log_warning
+from .docker import (
+    docker_compose_cmd,
+    get_docker_compose_command,
+    is_container_running,
+    with_docker_group
+)
+from .validation import check_docker
+
+# Relay used when the socket can't be opened from the host
+RELAY_COMMAND = ["exec", "-T", "backend", "python", "-m", "app.cli_helpers.rpc_call"]
+# Seconds to wait for a just-started backend to serve the admin socket
+BACKEND_START_TIMEOUT = 30
+
+
+class AdminRPCError(Exception):
+    """Error returned by the backend (or no backend to talk to)."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class AdminRPCClient:
+    """
+    Connection to the backend's admin RPC socket.
+
+    Connects to the socket directly when the current user may open it
+    (e.g. root); otherwise all calls go through one relay process started
+    with `docker compose exec`. Either way the connection is reused for
+    every call, so a batch costs one round trip per call instead of one
+    container exec and interpreter start.
+
+    Usage:
+        with AdminRPCClient() as client:
+            users = client.call("users.list")
+    """
+
+    def __init__(self, socket_path: Path = ADMIN_SOCKET):
+        self.socket_path = socket_path
+        self._sock: Optional[socket.socket] = None
+        self._relay: Optional["subprocess.Popen[bytes]"] = None
+        self._reader: Optional[IO[bytes]] = None
+        self._ids = itertools.count(1)
+
+    def __enter__(self) -> "AdminRPCClient":
+        self.connect()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def via_relay(self) -> bool:
+        """True if calls go through `docker compose exec`."""
+        return self._relay is not None
+
+    def connect(self) -> None:
+        """Open the socket, or start the relay if it can't be opened."""
+        if self._reader is not None:
+            return
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(self.socket_path))
+        except (FileNotFoundError, PermissionError, ConnectionRefusedError):
+            sock.close()
+            self._start_relay()
+            return
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+
+    def call(self, method: str, **params: Any) -> Any:
+        """
+        Call a backend method.
+
+        Args:
+            method: Method name (e.g. "users.list")
+            **params: Method parameters
+
+        Returns:
+            Any: Method result
+
+        Raises:
+            AdminRPCError: On an error response or a lost connection
+        """
+        self.connect()
+        assert self._reader is not None
+        request = {"id": next(self._ids), "method": method, "params": params}
+        line = json.dumps(request).encode() + b"\n"
+        try:
+            if self._sock is not None:
+                self._sock.sendall(line)
+            elif self._relay is not None and self._relay.stdin is not None:
+                self._relay.stdin.write(line)
+                self._relay.stdin.flush()
+            response = self._reader.readline()
+        except OSError as e:
+            raise AdminRPCError("unavailable", f"Admin connection lost: {e}")
+
+        if not response:
+            reason = self._relay_error() or "Admin connection closed"
+            raise AdminRPCError("unavailable", reason)
+        message = json.loads(response)
+        if "error" in message:
+            error = message["error"]
+            raise AdminRPCError(error.get("code", "error"), error.get("message", ""))
+        return message.get("result")
+
+    def close(self) -> None:
+        """Close the connection (and end the relay)."""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._relay is not None:
+            if self._relay.stdin is not None:
+                self._relay.stdin.close()
+            try:
+                self._relay.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._relay.kill()
+            self._relay = None
+
+    def _start_relay(self) -> None:
+        cmd = with_docker_group(get_docker_compose_command() + RELAY_COMMAND)
+        self._relay = subprocess.Popen(
+            cmd,
+            cwd=PROJECT_ROOT,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        self._reader = self._relay.stdout
+
+    def _relay_error(self) -> str:
+        if self._relay is None or self._relay.stderr is None:
+            return ""
+        try:
+            self._relay.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            return ""
+        return self._relay.stderr.read().decode(errors="replace").strip()
+
+
+def connect_backend() -> AdminRPCClient:
+    """
+    Connect to the backend's admin socket, starting the backend if needed.
+
+    Returns:
+        AdminRPCClient: Connected client (close it when done)
+
+    Raises:
+        SystemExit: If the backend doesn't answer
+    """
+    check_docker()
+
+    started = False
+    if not is_container_running(CONTAINER_BACKEND):
+        log_warning("Backend is not running. Starting it...")
+        docker_compose_cmd("up", "-d", "backend", cwd=PROJECT_ROOT)
+        log_step("Waiting for backend...")
+        started = True
+
+    deadline = time.monotonic() + (BACKEND_START_TIMEOUT if started else 0)
+    while True:
+        client = AdminRPCClient()
+        try:
+            client.call("ping")
+            return client
+        except AdminRPCError as e:
+            client.close()
+            if time.monotonic() >= deadline:
+                log_error(f"Backend admin socket is not available: {e.message}")
+                raise SystemExit(1)
+        time.sleep(1)
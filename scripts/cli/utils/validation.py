@@ -3,6 +3,7 @@
 import shutil
 import subprocess
 from .console import log_error
+from .docker import get_docker_compose_command
 
 
 def check_docker():
@@ -39,20 +40,10 @@ def check_docker_compose():
     Raises:
         SystemExit: If docker-compose is not available
     """
-    # Check for docker-compose command
-    if shutil.which("docker-compose"):
-        return
-    
-    # Check for docker compose plugin
     try:
-        result = subprocess.run(
-            ["docker", "compose", "version"],
-            capture_output=True,
-            check=False
-        )
-        if result.returncode == 0:
-            return
-    except Exception:
+        get_docker_compose_command()  # Cached for later compose calls
+        return
+    except FileNotFoundError:
         pass
     
     log_error("docker-compose is not installed")
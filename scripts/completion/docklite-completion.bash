@@ -1,192 +1,118 @@
 #!/bin/bash
 # Bash completion for DockLite CLI
 # Source this file or copy to /etc/bash_completion.d/
+#
+# Commands and options are read from an index generated by the CLI itself
+# (`docklite completion-index`), cached in ${XDG_CACHE_HOME:-~/.cache}/docklite.
+# The index is rebuilt when a CLI source file is newer than it, so a
+# completion never has to start Python except after an update.
+
+_docklite_index_file() {
+    echo "${XDG_CACHE_HOME:-$HOME/.cache}/docklite/completion-index"
+}
+
+# Rebuild the index if it is missing or older than the CLI sources
+_docklite_refresh_index() {
+    local index="$1" cli="$2"
+    local source="" file
+
+    if [ -f "${index}" ]; then
+        # Second header line: "# source <cli package dir>"
+        source="$(sed -n '2s/^# source //p' "${index}")"
+        [ -n "${source}" ] || return 0
+        for file in "${source}"/main.py "${source}"/commands/*.py; do
+            if [ "${file}" -nt "${index}" ]; then
+                source=""
+                break
+            fi
+        done
+        [ -z "${source}" ] || return 0
+    fi
+
+    "${cli}" completion-index >/dev/null 2>&1
+}
+
+# Print "<nargs>\t<words>" of a command key ("." is the root)
+_docklite_lookup() {
+    local index="$1" wanted="$2"
+    local key nargs words
+
+    while IFS=$'\t' read -r key nargs words; do
+        if [ "${key}" == "${wanted}" ]; then
+            printf '%s\t%s\n' "${nargs}" "${words}"
+            return 0
+        fi
+    done < "${index}"
+    return 1
+}
 
 _docklite_completion() {
-    local cur prev opts
+    local cur prev
     COMPREPLY=()
     cur="${COMP_WORDS[COMP_CWORD]}"
     prev="${COMP_WORDS[COMP_CWORD-1]}"
-    
-    # Root commands (6) and groups (4)
-    local root_commands="start stop restart logs status test"
-    local groups="dev deploy user maint"
-    local all_level1="${root_commands} ${groups} version help"
-    
-    # Group subcommands
-    local dev_commands="setup-dev rebuild test-backend test-frontend test-e2e"
-    local deploy_commands="setup-user setup-ssh init-db"
-    local user_commands="add list reset-password"
-    local maint_commands="backup restore clean"
-    
-    # If we're completing the first argument (root command or group)
-    if [ $COMP_CWORD -eq 1 ]; then
-        COMPREPLY=( $(compgen -W "${all_level1}" -- ${cur}) )
-        return 0
-    fi
-    
-    # Get the first argument (command or group)
-    local first_arg="${COMP_WORDS[1]}"
-    
-    # Check if first arg is a group
-    case "${first_arg}" in
-        dev)
-            # If completing second argument, suggest dev subcommands
-            if [ $COMP_CWORD -eq 2 ]; then
-                COMPREPLY=( $(compgen -W "${dev_commands}" -- ${cur}) )
+
+    local index
+    index="$(_docklite_index_file)"
+    _docklite_refresh_index "${index}" "${COMP_WORDS[0]}"
+    [ -f "${index}" ] || return 0
+
+    # Walk the words typed so far down the command tree
+    local key="." path="" entry nargs words i word
+    local positional=0
+    entry="$(_docklite_lookup "${index}" ".")" || return 0
+    for (( i = 1; i < COMP_CWORD; i++ )); do
+        word="${COMP_WORDS[i]}"
+        if [[ "${word}" == -* ]]; then
+            continue
+        fi
+        if [ ${positional} -eq 0 ] && \
+           entry="$(_docklite_lookup "${index}" "${path:+${path} }${word}")"; then
+            path="${path:+${path} }${word}"
+            key="${path}"
+        else
+            entry="$(_docklite_lookup "${index}" "${key}")"
+            positional=$(( positional + 1 ))
+        fi
+    done
+    nargs="${entry%%$'\t'*}"
+    words="${entry#*$'\t'}"
+
+    # Arguments that complete to files, directories or service names
+    case "${key}" in
+        logs)
+            if [ ${positional} -eq 0 ] && [[ "${cur}" != -* ]]; then
+                COMPREPLY=( $(compgen -W "backend frontend traefik" -- ${cur}) )
                 return 0
             fi
-            # Otherwise handle subcommand options
-            local subcommand="${COMP_WORDS[2]}"
-            case "${subcommand}" in
-                setup-dev)
-                    local opts="--help -h"
-                    COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    ;;
-                rebuild)
-                    local opts="--no-cache --follow --help -h -f"
-                    COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    ;;
-                test-backend)
-                    local opts="--verbose --coverage --help -h -v -k --cov --tb"
-                    COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    ;;
-                test-frontend)
-                    local opts="--watch --ui --coverage --help -h -w -u"
-                    COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    ;;
-                test-e2e)
-                    local opts="--ui --debug --report --headed --help -h -u -d -r"
-                    COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    ;;
-            esac
             ;;
-        deploy)
-            # If completing second argument, suggest deploy subcommands
-            if [ $COMP_CWORD -eq 2 ]; then
-                COMPREPLY=( $(compgen -W "${deploy_commands}" -- ${cur}) )
+        "maint restore")
+            if [ ${positional} -eq 0 ] && [[ "${cur}" != -* ]]; then
+                COMPREPLY=( $(compgen -W "latest" -- ${cur}) $(compgen -f -X '!*.tar.gz' -- ${cur}) $(compgen -f -X '!*.tar.zst' -- ${cur}) )
                 return 0
             fi
-            # Otherwise handle subcommand options
-            local subcommand="${COMP_WORDS[2]}"
-            case "${subcommand}" in
-                setup-user)
-                    local opts="--user --dir --help -h -u -d"
-                    COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    ;;
-                setup-ssh)
-                    local opts="--user --help -h -u"
-                    COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    ;;
-                init-db)
-                    local opts="--reset --help -h"
-                    COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    ;;
-            esac
             ;;
-        user)
-            # If completing second argument, suggest user subcommands
-            if [ $COMP_CWORD -eq 2 ]; then
-                COMPREPLY=( $(compgen -W "${user_commands}" -- ${cur}) )
+        "user import")
+            if [ ${positional} -eq 0 ] && [[ "${cur}" != -* ]]; then
+                COMPREPLY=( $(compgen -f -- ${cur}) )
                 return 0
             fi
-            # Otherwise handle subcommand options
-            local subcommand="${COMP_WORDS[2]}"
-            case "${subcommand}" in
-                add)
-                    # First arg is username, then suggest options
-                    if [ $COMP_CWORD -eq 3 ]; then
-                        # Username (no suggestions for security)
-                        COMPREPLY=()
-                    else
-                        local opts="--password --admin --email --system-user --help -h -p -a -e -s"
-                        COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    fi
-                    ;;
-                list)
-                    local opts="--verbose --help -h -v"
-                    COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    ;;
-                reset-password)
-                    # First arg is username, then suggest options
-                    if [ $COMP_CWORD -eq 3 ]; then
-                        # Username (no suggestions for security)
-                        COMPREPLY=()
-                    else
-                        local opts="--password --help -h -p"
-                        COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    fi
-                    ;;
-            esac
             ;;
-        maint)
-            # If completing second argument, suggest maint subcommands
-            if [ $COMP_CWORD -eq 2 ]; then
-                COMPREPLY=( $(compgen -W "${maint_commands}" -- ${cur}) )
+        "maint backup")
+            # If completing -o or --output, suggest directories
+            if [[ "${prev}" == "-o" ]] || [[ "${prev}" == "--output" ]]; then
+                COMPREPLY=( $(compgen -d -- ${cur}) )
                 return 0
             fi
-            # Otherwise handle subcommand options
-            local subcommand="${COMP_WORDS[2]}"
-            case "${subcommand}" in
-                backup)
-                    local opts="--output --help -h -o"
-                    # If completing -o or --output, suggest directories
-                    if [[ "${prev}" == "-o" ]] || [[ "${prev}" == "--output" ]]; then
-                        COMPREPLY=( $(compgen -d -- ${cur}) )
-                    else
-                        COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    fi
-                    ;;
-                restore)
-                    # Complete with backup files
-                    if [ $COMP_CWORD -eq 3 ]; then
-                        COMPREPLY=( $(compgen -f -X '!*.tar.gz' -- ${cur}) )
-                    else
-                        local opts="--no-confirm --help -h"
-                        COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    fi
-                    ;;
-                clean)
-                    local opts="--all --images --volumes --logs --help -h"
-                    COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-                    ;;
-            esac
-            ;;
-        # Root commands
-        start)
-            local opts="--build --follow --help -h -b -f"
-            COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-            ;;
-        stop)
-            local opts="--volumes --help -h -v"
-            COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-            ;;
-        restart)
-            local opts="--build --help -h -b"
-            COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-            ;;
-        logs)
-            # Complete with service names
-            if [ $COMP_CWORD -eq 2 ]; then
-                local services="backend frontend traefik"
-                COMPREPLY=( $(compgen -W "${services}" -- ${cur}) )
-            fi
-            ;;
-        status)
-            local opts="--verbose --help -h -v"
-            COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-            ;;
-        test)
-            local opts="--verbose --quiet --help -h -v -q"
-            COMPREPLY=( $(compgen -W "${opts}" -- ${cur}) )
-            ;;
-        *)
-            # Default: suggest --help
-            if [[ ${cur} == -* ]]; then
-                COMPREPLY=( $(compgen -W "--help -h" -- ${cur}) )
-            fi
             ;;
     esac
+
+    # Positional arguments (usernames, ...) get no suggestions
+    if [ ${positional} -lt ${nargs:-0} ] && [[ "${cur}" != -* ]]; then
+        return 0
+    fi
+
+    COMPREPLY=( $(compgen -W "${words}" -- ${cur}) )
 }
 
 # Register completion for both ./docklite and docklite (if in PATH)
@@ -5,6 +5,16 @@ from pathlib import Path
 from unittest.mock import Mock, MagicMock
 import subprocess
 
+from cli.utils.docker import clear_caches
+
+
+@pytest.fixture(autouse=True)
+def clear_docker_caches():
+    """Forget the per-process docker group / compose command probes."""
+    clear_caches()
+    yield
+    clear_caches()
+
 
 @pytest.fixture
 def project_root():
@@ -0,0 +1,81 @@
+"""Tests for backup archive helpers."""
+
+import io
+import json
+import shutil
+import subprocess
+import sys
+import tarfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cli.utils.archive import open_backup, read_manifest, stage_backup
+
+
+def make_tar(path: Path, files: dict) -> None:
+    """Uncompressed tar with the given members"""
+    with tarfile.open(path, "w") as tar:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+
+
+class TestOpenBackup:
+    """Tests for open_backup."""
+
+    def test_gzip(self, tmp_path):
+        """Test .tar.gz archives are read."""
+        archive = tmp_path / "backup.tar.gz"
+        with tarfile.open(archive, "w:gz") as tar:
+            info = tarfile.TarInfo("manifest.json")
+            data = json.dumps({"name": "backup.tar.gz"}).encode()
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+        with open_backup(archive) as tar:
+            tar.extractall(tmp_path / "out")
+
+        assert read_manifest(tmp_path / "out") == {"name": "backup.tar.gz"}
+
+    @pytest.mark.skipif(not shutil.which("zstd"), reason="zstd command not installed")
+    def test_zstd(self, tmp_path):
+        """Test .tar.zst archives are read (zstandard module or zstd command)."""
+        plain = tmp_path / "backup.tar"
+        make_tar(plain, {".env": b"A=1\n"})
+        subprocess.run(["zstd", "-q", str(plain), "-o", str(tmp_path / "backup.tar.zst")], check=True)
+
+        with open_backup(tmp_path / "backup.tar.zst") as tar:
+            names = [member.name for member in tar]
+
+        assert names == [".env"]
+
+    def test_without_manifest(self, tmp_path):
+        """Test backups made before manifests have none."""
+        assert read_manifest(tmp_path) is None
+
+
+class TestStageBackup:
+    """Tests for stage_backup."""
+
+    def test_legacy_backup(self, tmp_path):
+        """Test backups without a manifest are extracted unverified."""
+        archive = tmp_path / "backup.tar.gz"
+        make_tar(archive, {"./.env": b"A=1\n", "./ssh/authorized_keys": b"ssh-ed25519 AAAA\n"})
+
+        manifest = stage_backup(archive, tmp_path / "out")
+
+        assert manifest is None
+        assert (tmp_path / "out" / "ssh" / "authorized_keys").read_bytes() == b"ssh-ed25519 AAAA\n"
+
+    def test_unsafe_path(self, tmp_path):
+        archive = tmp_path / "backup.tar.gz"
+        make_tar(archive, {"../escape": b"x"})
+
+        with pytest.raises(ValueError, match="Unsafe path"):
+            stage_backup(archive, tmp_path / "out")
+
+        assert not (tmp_path / "escape").exists()
@@ -21,7 +21,7 @@ class TestStartCommand:
     @patch('cli.commands.development.check_docker')
     @patch('cli.commands.development.check_docker_compose')
     @patch('cli.commands.development.docker_compose_cmd')
-    @patch('cli.commands.development.is_container_running')
+    @patch('cli.commands.development.get_container_status')
     @patch('cli.commands.development.DEFAULT_PROJECTS_DIR')
     def test_start_basic(
         self,
@@ -33,7 +33,7 @@ class TestStartCommand:
     ):
         """Test basic start command."""
         mock_projects_dir.mkdir = Mock()
-        mock_container.return_value = True
+        mock_container.return_value = {"traefik": True, "backend": True, "frontend": True}
         
         # Use main_app because start is registered at root level
         result = runner.invoke(main_app, ["start"])
@@ -45,7 +45,7 @@ class TestStartCommand:
     @patch('cli.commands.development.check_docker')
     @patch('cli.commands.development.check_docker_compose')
     @patch('cli.commands.development.docker_compose_cmd')
-    @patch('cli.commands.development.is_container_running')
+    @patch('cli.commands.development.get_container_status')
     @patch('cli.commands.development.DEFAULT_PROJECTS_DIR')
     def test_start_with_build(
         self,
@@ -57,11 +57,36 @@ class TestStartCommand:
     ):
         """Test start with --build flag."""
         mock_projects_dir.mkdir = Mock()
-        mock_container.return_value = True
+        mock_container.return_value = {"traefik": True, "backend": True, "frontend": True}
         
         result = runner.invoke(main_app, ["start", "--build"])
         
         mock_check_docker.assert_called_once()
+    
+    @patch('cli.commands.development.check_docker')
+    @patch('cli.commands.development.check_docker_compose')
+    @patch('cli.commands.development.docker_compose_cmd')
+    @patch('cli.commands.development.get_container_status')
+    @patch('cli.commands.development.DEFAULT_PROJECTS_DIR')
+    @patch.dict('os.environ', {}, clear=False)
+    def test_start_with_workers(
+        self,
+        mock_projects_dir,
+        mock_container,
+        mock_docker_compose,
+        mock_check_compose,
+        mock_check_docker
+    ):
+        """Test --workers is passed to compose as WEB_CONCURRENCY."""
+        import os
+        mock_projects_dir.mkdir = Mock()
+        mock_container.return_value = {"traefik": True, "backend": True, "frontend": True}
+        
+        result = runner.invoke(main_app, ["start", "--workers", "4"])
+        
+        assert result.exit_code == 0
+        assert os.environ["WEB_CONCURRENCY"] == "4"
+        mock_docker_compose.assert_any_call("up", "-d", cwd=mock_docker_compose.call_args[1]["cwd"])
 
 
 class TestStopCommand:
@@ -106,6 +131,53 @@ class TestLogsCommand:
         assert mock_docker_compose.called
 
 
+class TestBenchCommand:
+    """Tests for bench command."""
+    
+    @patch('cli.commands.development.docker_compose_cmd')
+    def test_bench_runs_load_test_in_container(self, mock_docker_compose):
+        """Test bench runs the load test in a one-off backend container."""
+        result = runner.invoke(main_app, ["bench", "-d", "10", "-w", "2", "--tabs", "50"])
+        
+        assert result.exit_code == 0
+        args = mock_docker_compose.call_args[0]
+        assert args[:4] == ("run", "--rm", "--no-deps", "backend")
+        assert args[4:7] == ("python", "-m", "benchmarks.loadtest")
+        assert ("--duration", "10.0") == args[7:9]
+        assert "--workers" in args and "2" in args
+        assert "50" in args
+    
+    @patch('cli.commands.development.docker_compose_cmd')
+    def test_bench_micro(self, mock_docker_compose):
+        """Test --micro runs the micro-benchmark suite with extra args."""
+        result = runner.invoke(main_app, ["bench", "--micro", "--", "-k", "projects"])
+        
+        assert result.exit_code == 0
+        args = mock_docker_compose.call_args[0]
+        assert args[4:] == ("python", "-m", "benchmarks", "-k", "projects")
+    
+    @patch('subprocess.run')
+    def test_bench_local(self, mock_run):
+        """Test --local runs with the current Python in backend/."""
+        result = runner.invoke(main_app, ["bench", "--local", "--url", "http://localhost:8000"])
+        
+        assert result.exit_code == 0
+        cmd = mock_run.call_args[0][0]
+        assert cmd[1:3] == ["-m", "benchmarks.loadtest"]
+        assert "--url" in cmd
+        assert str(mock_run.call_args[1]["cwd"]).endswith("backend")
+    
+    @patch('cli.commands.development.docker_compose_cmd')
+    def test_bench_failure(self, mock_docker_compose):
+        """Test failing benchmark run exits with error."""
+        import subprocess
+        mock_docker_compose.side_effect = subprocess.CalledProcessError(1, "docker")
+        
+        result = runner.invoke(main_app, ["bench", "--micro"])
+        
+        assert result.exit_code == 1
+
+
 class TestVersionCommand:
     """Tests for version command."""
     
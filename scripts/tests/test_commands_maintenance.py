@@ -1,7 +1,16 @@
 """Tests for maintenance commands."""
 
+import base64
+import hashlib
+import io
+import json
+import sqlite3
+import tarfile
+from contextlib import closing
+from typing import Optional
+
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 from typer.testing import CliRunner
 import sys
 from pathlib import Path
@@ -10,6 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from cli.commands.maintenance import app as maint_app
 from cli.main import app as main_app
+from cli.utils.rpc import AdminRPCError
 
 runner = CliRunner()
 maint_runner = CliRunner()
@@ -52,27 +62,374 @@ class TestStatusCommand:
         assert mock_docker_compose.called
 
 
+    @patch('cli.commands.maintenance.get_container_states')
+    @patch('cli.commands.maintenance.watch_container_events')
+    @patch('cli.commands.maintenance.docker_compose_cmd')
+    def test_status_watch(self, mock_docker_compose, mock_events, mock_states):
+        """Test --watch updates states from events until interrupted."""
+        def events():
+            yield "docklite-backend", "exited"
+            raise KeyboardInterrupt
+        
+        def states(*names):
+            # Subscribed to events before reading the current states
+            assert mock_events.called
+            return {name: "running" for name in names}
+        
+        mock_events.return_value = events()
+        mock_states.side_effect = states
+        
+        result = runner.invoke(main_app, ["status", "--watch"])
+        
+        assert result.exit_code == 0
+        assert "exited" in result.stdout
+        assert mock_events.call_args.args == ("docklite-traefik", "docklite-backend", "docklite-frontend")
+        assert not mock_docker_compose.called
+
+
+def backup_result(name="docklite_backup_20250101_000000.tar.zst"):
+    """backup.create result as returned by the backend"""
+    return {
+        "name": name,
+        "path": f"/backups/{name}",
+        "size": 2048,
+        "sha256": "ab" * 32,
+        "manifest": {
+            "name": name,
+            "compression": "zstd",
+            "database": {"page_size": 4096, "page_count": 12, "quick_check": "ok"},
+            "files": [
+                {"path": "docklite.db", "size": 49152, "sha256": "cd" * 32},
+                {"path": ".env", "size": 4, "sha256": "ef" * 32},
+            ],
+        },
+    }
+
+
+def snapshot_result() -> dict:
+    """snapshot.create result of one project with a volume"""
+    return {
+        "id": "20250101T030000",
+        "created_at": "2025-01-01T03:00:00",
+        "partial": True,
+        "sources": {
+            "database": {"kind": "database", "files": 1, "bytes": 4096},
+            "projects/blog": {"kind": "project", "files": 10, "bytes": 2048},
+            "volumes/blog_db": {"kind": "volume", "project": "blog", "files": 5, "bytes": 1024},
+        },
+        "stats": {
+            "files": 16, "bytes": 7168, "chunks": 40, "new_chunks": 1,
+            "stored_bytes": 512, "reused_files": 9,
+        },
+        "errors": {},
+        "pruned": {"snapshots": [], "chunks": 0, "bytes": 0},
+    }
+
+
 class TestBackupCommand:
     """Tests for backup command."""
     
-    @patch('cli.commands.maintenance.BACKUPS_DIR')
-    @patch('tarfile.open')
-    @patch('tempfile.TemporaryDirectory')
-    def test_backup_creates_archive(self, mock_temp, mock_tarfile, mock_backups_dir):
-        """Test backup creates archive."""
-        mock_backups_dir.mkdir = Mock()
-        mock_temp.return_value.__enter__.return_value = "/tmp/test"
+    def test_backup_sends_config_files(self, tmp_path):
+        """Test the backend is asked for a backup including host config files."""
+        env_file = tmp_path / ".env"
+        env_file.write_text("A=1\n")
+        client = MagicMock()
+        client.__enter__.return_value = client
+        client.call.return_value = backup_result()
+        
+        with patch('cli.commands.maintenance.BACKUPS_DIR', tmp_path / "backups"), \
+             patch('cli.commands.maintenance.CONFIG_FILES', {".env": env_file, "docker-compose.yml": tmp_path / "missing.yml"}), \
+             patch('cli.commands.maintenance.SSH_AUTHORIZED_KEYS', tmp_path / "no_keys"), \
+             patch('cli.commands.maintenance.connect_backend', return_value=client):
+            result = runner.invoke(maint_app, ["backup"])
+        
+        assert result.exit_code == 0
+        assert client.call.call_args.args == ("backup.create",)
+        assert client.call.call_args.kwargs["files"] == {".env": base64.b64encode(b"A=1\n").decode()}
+        assert "12 pages" in result.stdout
+        assert "docklite.db, .env" in result.stdout
+    
+    def test_backup_moved_to_output(self, tmp_path):
+        """Test --output moves the archive and its checksum file."""
+        backups = tmp_path / "backups"
+        backups.mkdir()
+        name = "docklite_backup_20250101_000000.tar.zst"
+        (backups / name).write_bytes(b"archive")
+        (backups / f"{name}.sha256").write_text("x")
+        client = MagicMock()
+        client.__enter__.return_value = client
+        client.call.return_value = backup_result(name)
+        
+        with patch('cli.commands.maintenance.BACKUPS_DIR', backups), \
+             patch('cli.commands.maintenance.read_config_files', return_value={}), \
+             patch('cli.commands.maintenance.connect_backend', return_value=client):
+            result = runner.invoke(maint_app, ["backup", "--output", str(tmp_path / "out")])
+        
+        assert result.exit_code == 0
+        assert (tmp_path / "out" / name).read_bytes() == b"archive"
+        assert (tmp_path / "out" / f"{name}.sha256").exists()
+        assert not (backups / name).exists()
+    
+    def test_backup_error(self, tmp_path):
+        """Test backend errors are reported."""
+        client = MagicMock()
+        client.__enter__.return_value = client
+        client.call.side_effect = AdminRPCError("internal_error", "Backup failed: disk full")
+        
+        with patch('cli.commands.maintenance.BACKUPS_DIR', tmp_path), \
+             patch('cli.commands.maintenance.read_config_files', return_value={}), \
+             patch('cli.commands.maintenance.connect_backend', return_value=client):
+            result = runner.invoke(maint_app, ["backup"])
+        
+        assert result.exit_code == 1
+        assert "disk full" in result.output
+
+
+    def test_incremental_backup(self, tmp_path):
+        """Test --incremental creates a snapshot of the selected projects."""
+        client = MagicMock()
+        client.__enter__.return_value = client
+        client.call.return_value = snapshot_result()
+        
+        with patch('cli.commands.maintenance.BACKUPS_DIR', tmp_path), \
+             patch('cli.commands.maintenance.read_config_files', return_value={}), \
+             patch('cli.commands.maintenance.connect_backend', return_value=client):
+            result = runner.invoke(maint_app, ["backup", "-i", "-p", "blog", "--no-volumes"])
+        
+        assert result.exit_code == 0
+        assert client.call.call_args.args == ("snapshot.create",)
+        assert client.call.call_args.kwargs == {"files": {}, "projects": ["blog"], "volumes": False}
+        assert "20250101T030000" in result.stdout
+        assert "1 of 40 chunks" in result.stdout
+    
+    def test_project_requires_incremental(self):
+        """Test --project is rejected without --incremental."""
+        result = runner.invoke(maint_app, ["backup", "--project", "blog"])
         
-        # Mock tarfile
-        mock_tar = Mock()
-        mock_tarfile.return_value.__enter__.return_value = mock_tar
+        assert result.exit_code == 1
+        assert "require --incremental" in result.output
+    
+    def test_list_snapshots(self):
+        """Test snapshots are listed in a table."""
+        client = MagicMock()
+        client.__enter__.return_value = client
+        client.call.return_value = [snapshot_result()]
         
-        with patch('shutil.copy'):
-            with patch('pathlib.Path.exists', return_value=True):
-                result = runner.invoke(maint_app, ["backup"])
+        with patch('cli.commands.maintenance.connect_backend', return_value=client):
+            result = runner.invoke(maint_app, ["snapshots"])
         
-        # Should create backup
-        # Note: This is a simplified test
+        assert result.exit_code == 0
+        assert client.call.call_args.args == ("snapshot.list",)
+        assert "20250101T030000" in result.stdout
+
+
+def make_backup(tmp_path: Path, files: dict, sha256: Optional[dict] = None) -> Path:
+    """Backup archive with a manifest of the given members"""
+    manifest = {
+        "name": "docklite_backup_x.tar.gz",
+        "created_at": "2025-01-01T00:00:00",
+        "hostname": "example.com",
+        "files": [
+            {"path": name, "sha256": (sha256 or {}).get(name, hashlib.sha256(content).hexdigest())}
+            for name, content in files.items()
+        ],
+    }
+    archive = tmp_path / "docklite_backup_x.tar.gz"
+    with tarfile.open(archive, "w:gz") as tar:
+        for name, content in [*files.items(), ("manifest.json", json.dumps(manifest).encode())]:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+    return archive
+
+
+class TestRestoreCommand:
+    """Tests for restore command."""
+    
+    def test_restore_shows_manifest(self, tmp_path):
+        """Test backups with a manifest are read and summarized."""
+        archive = make_backup(tmp_path, {".env": b"A=1\n"})
+        env_file = tmp_path / "restored.env"
+        env_file.write_text("A=0\n")
+        
+        with patch('cli.commands.maintenance.docker_compose_cmd') as compose, \
+             patch('cli.commands.maintenance.BACKUPS_DIR', tmp_path / "safety"), \
+             patch('cli.commands.maintenance.BACKEND_DATA_DIR', tmp_path / "data"), \
+             patch.dict('cli.commands.maintenance.CONFIG_FILES', {".env": env_file}):
+            result = runner.invoke(maint_app, ["restore", str(archive), "--no-confirm"])
+        
+        assert result.exit_code == 0
+        assert "example.com" in result.stdout
+        assert env_file.read_text() == "A=1\n"
+        # Only services whose configuration changed are recreated
+        assert compose.call_args.args == ("up", "-d")
+        safety = next((tmp_path / "safety").glob("pre_restore_*.tar.gz"))
+        with tarfile.open(safety) as tar:
+            assert tar.extractfile(".env").read() == b"A=0\n"
+    
+    def test_restore_database_in_place(self, tmp_path):
+        """Test the live database is replaced in place, only the backend restarted."""
+        data = tmp_path / "data"
+        data.mkdir()
+        with closing(sqlite3.connect(data / "docklite.db")) as conn:
+            conn.execute("CREATE TABLE items (value INTEGER)")
+            conn.commit()
+        backup_db = tmp_path / "docklite.db"
+        with closing(sqlite3.connect(backup_db)) as conn:
+            conn.execute("CREATE TABLE items (value INTEGER)")
+            conn.execute("INSERT INTO items VALUES (42)")
+            conn.commit()
+        archive = make_backup(tmp_path, {"docklite.db": backup_db.read_bytes(), ".env": b"A=1\n"})
+        inode = (data / "docklite.db").stat().st_ino
+        
+        with patch('cli.commands.maintenance.docker_compose_cmd') as compose, \
+             patch('cli.commands.maintenance.is_container_running', return_value=True), \
+             patch('cli.commands.maintenance.subprocess.run') as run, \
+             patch('cli.commands.maintenance.BACKUPS_DIR', tmp_path / "safety"), \
+             patch('cli.commands.maintenance.BACKEND_DATA_DIR', data):
+            result = runner.invoke(maint_app, ["restore", str(archive), "--database", "--no-confirm"])
+        
+        assert result.exit_code == 0
+        with closing(sqlite3.connect(data / "docklite.db")) as conn:
+            assert conn.execute("SELECT value FROM items").fetchall() == [(42,)]
+        assert (data / "docklite.db").stat().st_ino == inode
+        assert not compose.called
+        assert run.call_args.args[0][-2:] == ["restart", "docklite-backend"]
+    
+    def test_restore_checksum_mismatch(self, tmp_path):
+        """Test a damaged archive is rejected before anything is replaced."""
+        archive = make_backup(tmp_path, {".env": b"A=1\n"}, sha256={".env": "0" * 64})
+        env_file = tmp_path / "live.env"
+        env_file.write_text("A=0\n")
+        
+        with patch('cli.commands.maintenance.docker_compose_cmd') as compose, \
+             patch.dict('cli.commands.maintenance.CONFIG_FILES', {".env": env_file}):
+            result = runner.invoke(maint_app, ["restore", str(archive), "--no-confirm"])
+        
+        assert result.exit_code == 1
+        assert "checksum mismatch for .env" in result.output
+        assert env_file.read_text() == "A=0\n"
+        assert not compose.called
+    
+    def test_archive_rejects_projects(self, tmp_path):
+        archive = make_backup(tmp_path, {".env": b"A=1\n"})
+        
+        result = runner.invoke(maint_app, ["restore", str(archive), "-p", "blog"])
+        
+        assert result.exit_code == 1
+        assert "need a snapshot" in result.output
+    
+    def test_restore_snapshot_projects(self):
+        """Test selected projects are restored through the backend."""
+        client = MagicMock()
+        client.__enter__.return_value = client
+        client.call.side_effect = [
+            [snapshot_result()],
+            {
+                "id": "20250101T030000", "sources": ["projects/blog", "volumes/blog_db"],
+                "database": False, "projects": ["blog"], "volumes": ["blog_db"],
+                "files": 15, "bytes": 3072, "stopped": ["blog_web_1"], "downtime": 1.5,
+                "reconcile": {"repaired": [], "modified": ["blog/docker-compose.yml"], "orphaned": []},
+            },
+        ]
+        
+        with patch('cli.commands.maintenance.connect_backend', return_value=client), \
+             patch('cli.commands.maintenance.docker_compose_cmd') as compose:
+            result = runner.invoke(maint_app, ["restore", "latest", "-p", "blog", "--no-confirm"])
+        
+        assert result.exit_code == 0
+        assert client.call.call_args.args == ("snapshot.restore",)
+        assert client.call.call_args.kwargs == {
+            "snapshot": "20250101T030000", "database": False,
+            "projects": ["blog"], "volumes": [], "host": False,
+        }
+        assert "1.5s" in result.stdout
+        assert "blog/docker-compose.yml" in result.stdout
+        assert not compose.called
+    
+    def test_restore_snapshot_partial(self):
+        """Test sources the backend could not swap in fail the command."""
+        client = MagicMock()
+        client.__enter__.return_value = client
+        client.call.side_effect = [
+            [snapshot_result()],
+            {
+                "id": "20250101T030000", "sources": ["database", "projects/blog"],
+                "database": False, "projects": ["blog"], "volumes": [],
+                "files": 15, "bytes": 3072, "stopped": [], "downtime": 0,
+                "errors": {"database": "database is locked"},
+            },
+        ]
+        
+        with patch('cli.commands.maintenance.connect_backend', return_value=client), \
+             patch('cli.commands.maintenance.docker_compose_cmd'):
+            result = runner.invoke(maint_app, ["restore", "latest", "--database", "-p", "blog", "--no-confirm"])
+        
+        assert result.exit_code == 1
+        assert "Could not restore database: database is locked" in result.output
+        assert "Restore complete!" not in result.output
+    
+    def test_restore_snapshot_routing_not_resynced(self):
+        """Test a failed Traefik resync after the restore is reported."""
+        client = MagicMock()
+        client.__enter__.return_value = client
+        client.call.side_effect = [
+            [snapshot_result()],
+            {
+                "id": "20250101T030000", "sources": ["projects/blog"],
+                "database": False, "projects": ["blog"], "volumes": [],
+                "files": 15, "bytes": 3072, "stopped": [], "downtime": 0, "errors": {},
+                "reconcile": {"error": "read-only file system"},
+            },
+        ]
+        
+        with patch('cli.commands.maintenance.connect_backend', return_value=client), \
+             patch('cli.commands.maintenance.docker_compose_cmd'):
+            result = runner.invoke(maint_app, ["restore", "latest", "-p", "blog", "--no-confirm"])
+        
+        assert result.exit_code == 0
+        assert "Routing not resynced (read-only file system)" in result.output
+    
+    def test_restore_snapshot_everything(self, tmp_path):
+        """Test no selection restores every source and writes host files back."""
+        snapshot = snapshot_result()
+        snapshot["sources"]["host"] = {"kind": "host", "files": 1, "bytes": 4}
+        client = MagicMock()
+        client.__enter__.return_value = client
+        client.call.side_effect = [
+            [snapshot],
+            {
+                "id": "20250101T030000", "sources": ["database", "host", "projects/blog", "volumes/blog_db"],
+                "database": True, "projects": ["blog"], "volumes": ["blog_db"],
+                "files": 17, "bytes": 7172, "stopped": [], "downtime": 0,
+                "host_files": {".env": base64.b64encode(b"A=1\n").decode()},
+            },
+        ]
+        env_file = tmp_path / ".env"
+        
+        with patch('cli.commands.maintenance.connect_backend', return_value=client), \
+             patch('cli.commands.maintenance.docker_compose_cmd') as compose, \
+             patch.dict('cli.commands.maintenance.CONFIG_FILES', {".env": env_file}):
+            result = runner.invoke(maint_app, ["restore", "20250101T030000", "--no-confirm"])
+        
+        assert result.exit_code == 0
+        assert client.call.call_args.kwargs == {
+            "snapshot": "20250101T030000", "database": True,
+            "projects": ["blog"], "volumes": ["blog_db"], "host": True,
+        }
+        assert env_file.read_text() == "A=1\n"
+        assert compose.call_args.args == ("up", "-d")
+    
+    def test_unknown_snapshot(self):
+        client = MagicMock()
+        client.__enter__.return_value = client
+        client.call.return_value = [snapshot_result()]
+        
+        with patch('cli.commands.maintenance.connect_backend', return_value=client):
+            result = runner.invoke(maint_app, ["restore", "20990101T000000"])
+        
+        assert result.exit_code == 1
+        assert "Snapshot not found" in result.output
 
 
 class TestCleanCommand:
@@ -96,3 +453,29 @@ class TestCleanCommand:
         
         # Should run docker volume prune
         assert mock_subprocess.called
+    
+    def test_clean_logs(self):
+        """Test log usage is shown and only rotated files are removed, in one call."""
+        client = MagicMock()
+        client.__enter__.return_value = client
+        client.call.return_value = {
+            "policy": {"driver": "json-file", "options": {"max-size": "10m", "max-file": "3"}},
+            "total_bytes": 3 * 1024 * 1024,
+            "projects": [
+                {"project": "blog", "bytes": 3 * 1024 * 1024, "containers": [{"name": "blog_web_1"}]},
+            ],
+            "unbounded": ["legacy"],
+        }
+        
+        with patch('cli.commands.maintenance.connect_backend', return_value=client), \
+             patch('cli.commands.maintenance.subprocess.run') as run:
+            result = runner.invoke(maint_app, ["clean", "--logs"])
+        
+        assert result.exit_code == 0
+        assert client.call.call_args.args == ("logs.usage",)
+        assert "blog" in result.stdout and "3.0 MB" in result.stdout
+        assert "legacy" in result.output
+        commands = [c.args[0] for c in run.call_args_list]
+        assert commands[0][:3] == ["sudo", "find", "/var/lib/docker/containers"]
+        assert "*-json.log.*" in commands[0] and "-delete" in commands[0]
+        assert not any("truncate" in command for command in commands)
@@ -8,181 +8,300 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from cli.commands.user import app
+from cli.commands.user import app, read_users_csv
+from cli.utils.rpc import AdminRPCError
 
 runner = CliRunner()
 
+USERS = [
+    {"id": 1, "username": "admin", "email": "admin@example.com", "is_admin": True,
+     "is_active": True, "system_user": "docklite"},
+    {"id": 2, "username": "testuser", "email": None, "is_admin": False,
+     "is_active": False, "system_user": "docklite"},
+]
+
+
+def rpc_client(*results):
+    """Mock AdminRPCClient class whose calls return `results` in order."""
+    client = Mock()
+    client.__enter__ = Mock(return_value=client)
+    client.__exit__ = Mock(return_value=False)
+    client.call.side_effect = [{"pid": 1}, *results]  # ping first
+    return Mock(return_value=client), client
+
+
+def created(*names):
+    return {
+        "created": [{"id": i + 10, "username": n} for i, n in enumerate(names)],
+        "skipped": [],
+        "errors": [],
+    }
+
 
 class TestAddCommand:
     """Tests for user add command."""
-    
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
-    @patch('cli.commands.user.docker_compose_cmd')
-    def test_add_user_with_password(self, mock_docker_compose, mock_container, mock_check):
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
+    def test_add_user_with_password(self, mock_container, mock_check):
         """Test adding user with password flag."""
         mock_container.return_value = True
-        mock_docker_compose.return_value = Mock(stdout="User created successfully\n", returncode=0)
-        
-        result = runner.invoke(app, ["add", "testuser", "--password", "testpass123"])
-        
-        assert mock_docker_compose.called
-    
-    @pytest.mark.skip(reason="Interactive mode with getpass is difficult to test properly")
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
-    @patch('cli.commands.user.docker_compose_cmd')
-    @patch('typer.prompt')
-    def test_add_user_interactive(self, mock_prompt, mock_docker_compose, mock_container, mock_check):
-        """Test adding user in interactive mode."""
-        mock_container.return_value = True
-        mock_docker_compose.return_value = Mock(stdout="User created successfully\n", returncode=0)
-        mock_prompt.side_effect = ["password123", "password123"]
-        
-        result = runner.invoke(app, ["add", "testuser"])
-        
-        assert mock_docker_compose.called
-    
-    @pytest.mark.skip(reason="Mock assertion for inline Python code is complex")
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
-    @patch('cli.commands.user.docker_compose_cmd')
-    def test_add_user_with_admin_flag(self, mock_docker_compose, mock_container, mock_check):
-        """Test adding admin user."""
+        client_class, client = rpc_client(created("testuser"))
+
+        with patch('cli.utils.rpc.AdminRPCClient', client_class):
+            result = runner.invoke(app, ["add", "testuser", "--password", "testpass123"])
+
+        assert result.exit_code == 0
+        assert "ID: 10" in result.stdout
+        method, = client.call.call_args.args
+        assert method == "users.create"
+        assert client.call.call_args.kwargs["users"] == [{
+            "username": "testuser",
+            "password": "testpass123",
+            "is_admin": False,
+            "system_user": "docklite",
+        }]
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
+    def test_add_user_with_admin_flag_and_email(self, mock_container, mock_check):
+        """Test adding admin user with email."""
         mock_container.return_value = True
-        mock_docker_compose.return_value = Mock(stdout="User created successfully\n", returncode=0)
-        
-        result = runner.invoke(app, ["add", "adminuser", "--password", "admin123", "--admin"])
-        
-        assert mock_docker_compose.called
-        # Check that --admin flag was passed
-        call_args = str(mock_docker_compose.call_args)
-        assert "--admin" in call_args
-    
-    @pytest.mark.skip(reason="Mock assertion for inline Python code is complex")
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
-    @patch('cli.commands.user.docker_compose_cmd')
-    def test_add_user_with_email(self, mock_docker_compose, mock_container, mock_check):
-        """Test adding user with email."""
+        client_class, client = rpc_client(created("adminuser"))
+
+        with patch('cli.utils.rpc.AdminRPCClient', client_class):
+            result = runner.invoke(app, [
+                "add", "adminuser", "--password", "admin12345", "--admin",
+                "--email", "admin@example.com",
+            ])
+
+        assert result.exit_code == 0
+        entry, = client.call.call_args.kwargs["users"]
+        assert entry["is_admin"] is True
+        assert entry["email"] == "admin@example.com"
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
+    def test_add_existing_user(self, mock_container, mock_check):
+        """Test error reported by the backend."""
         mock_container.return_value = True
-        mock_docker_compose.return_value = Mock(stdout="User created successfully\n", returncode=0)
-        
-        result = runner.invoke(app, ["add", "testuser", "--password", "test123", "--email", "test@example.com"])
-        
-        assert mock_docker_compose.called
-    
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
+        client_class, _ = rpc_client({
+            "created": [],
+            "skipped": [],
+            "errors": [{"index": 0, "username": "admin", "error": "Username already exists"}],
+        })
+
+        with patch('cli.utils.rpc.AdminRPCClient', client_class):
+            result = runner.invoke(app, ["add", "admin", "--password", "testpass123"])
+
+        assert result.exit_code == 1
+        assert "Username already exists" in result.output
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
     def test_add_user_backend_not_running(self, mock_container, mock_check):
         """Test error when backend not running."""
         mock_container.return_value = False
-        
+
         result = runner.invoke(app, ["add", "testuser", "--password", "test123"])
-        
+
         assert result.exit_code != 0
 
 
+class TestImportCommand:
+    """Tests for user import command."""
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
+    def test_import_in_batches(self, mock_container, mock_check, tmp_path):
+        """Test rows are sent in batches and parsed from the CSV."""
+        mock_container.return_value = True
+        csv_file = tmp_path / "users.csv"
+        csv_file.write_text(
+            "username,password,email,is_admin\n"
+            "alice,password1,alice@example.com,yes\n"
+            "bob,password2,,\n"
+            "carol,password3,,0\n"
+        )
+        client_class, client = rpc_client(created("alice", "bob"), created("carol"))
+
+        with patch('cli.utils.rpc.AdminRPCClient', client_class):
+            result = runner.invoke(app, ["import", str(csv_file), "--batch-size", "2"])
+
+        assert result.exit_code == 0
+        assert "Created 3 users" in result.stdout
+        first, second = client.call.call_args_list[1:]
+        assert first.kwargs["users"] == [
+            {"username": "alice", "password": "password1", "is_admin": True,
+             "email": "alice@example.com"},
+            {"username": "bob", "password": "password2", "is_admin": False},
+        ]
+        assert [u["username"] for u in second.kwargs["users"]] == ["carol"]
+        assert second.kwargs["skip_existing"] is False
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
+    def test_import_reports_errors(self, mock_container, mock_check, tmp_path):
+        """Test rejected rows are listed with their CSV line."""
+        mock_container.return_value = True
+        csv_file = tmp_path / "users.csv"
+        csv_file.write_text("username,password\nalice,password1\nx,password2\n")
+        client_class, _ = rpc_client({
+            "created": [{"id": 5, "username": "alice"}],
+            "skipped": [],
+            "errors": [{"index": 1, "username": "x", "error": "username: too short"}],
+        })
+
+        with patch('cli.utils.rpc.AdminRPCClient', client_class):
+            result = runner.invoke(app, ["import", str(csv_file), "--skip-existing"])
+
+        assert result.exit_code == 1
+        assert "Created 1 users" in result.stdout
+        assert "username: too short" in result.output
+
+    def test_csv_lines(self, tmp_path):
+        """Test entries keep their CSV line, also after multi-line fields."""
+        csv_file = tmp_path / "users.csv"
+        csv_file.write_text('username,password\nalice,"pass\nword1"\n\nbob,password2\n')
+
+        entries = read_users_csv(csv_file)
+
+        assert [(line, entry["username"]) for line, entry in entries] == [(3, "alice"), (5, "bob")]
+        assert entries[0][1]["password"] == "pass\nword1"
+
+    def test_import_missing_columns(self, tmp_path):
+        """Test CSV without required columns is rejected before connecting."""
+        csv_file = tmp_path / "users.csv"
+        csv_file.write_text("name,email\nalice,alice@example.com\n")
+
+        result = runner.invoke(app, ["import", str(csv_file)])
+
+        assert result.exit_code == 1
+        assert "password, username" in result.output
+
+
 class TestListCommand:
     """Tests for user list command."""
-    
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
-    @patch('cli.commands.user.docker_compose_cmd')
-    def test_list_users_simple(self, mock_docker_compose, mock_container, mock_check):
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
+    def test_list_users_simple(self, mock_container, mock_check):
         """Test list command in simple mode."""
         mock_container.return_value = True
-        mock_docker_compose.return_value = Mock(stdout="admin:admin:✓\ntestuser:testuser:○\n", returncode=0)
-        
-        result = runner.invoke(app, ["list"])
-        
-        assert mock_docker_compose.called
+        client_class, client = rpc_client(USERS)
+
+        with patch('cli.utils.rpc.AdminRPCClient', client_class):
+            result = runner.invoke(app, ["list"])
+
         assert result.exit_code == 0
-    
-    @pytest.mark.skip(reason="Mock assertion for backend helper output format is complex")
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
-    @patch('cli.commands.user.docker_compose_cmd')
-    def test_list_users_verbose(self, mock_docker_compose, mock_container, mock_check):
+        assert client.call.call_args.args == ("users.list",)
+        assert "Total users: 2" in result.stdout
+        assert "inactive" in result.stdout
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
+    def test_list_users_verbose(self, mock_container, mock_check):
         """Test list command in verbose mode."""
         mock_container.return_value = True
-        mock_docker_compose.return_value = Mock(
-            stdout="1|admin|admin@example.com|admin|active|docklite\n2|testuser|test@example.com|testuser|active|docklite\n",
-            returncode=0
-        )
-        
-        result = runner.invoke(app, ["list", "--verbose"])
-        
-        assert mock_docker_compose.called
-        # Check that detailed format was requested
-        call_args = str(mock_docker_compose.call_args)
-        assert "detailed" in call_args
-    
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
+        client_class, _ = rpc_client(USERS)
+
+        with patch('cli.utils.rpc.AdminRPCClient', client_class):
+            result = runner.invoke(app, ["list", "--verbose"])
+
+        assert result.exit_code == 0
+        assert "admin@example.com" in result.stdout
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
+    def test_list_users_empty(self, mock_container, mock_check):
+        """Test hint when there are no users."""
+        mock_container.return_value = True
+        client_class, _ = rpc_client([])
+
+        with patch('cli.utils.rpc.AdminRPCClient', client_class):
+            result = runner.invoke(app, ["list"])
+
+        assert result.exit_code == 1
+        assert "No users found" in result.stdout
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
     def test_list_users_backend_not_running(self, mock_container, mock_check):
         """Test error when backend not running."""
         mock_container.return_value = False
-        
+
         result = runner.invoke(app, ["list"])
-        
+
         assert result.exit_code != 0
 
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
+    def test_admin_socket_unavailable(self, mock_container, mock_check):
+        """Test error when the running backend doesn't answer."""
+        mock_container.return_value = True
+        client = Mock()
+        client.call.side_effect = AdminRPCError("unavailable", "no such socket")
+
+        with patch('cli.utils.rpc.AdminRPCClient', Mock(return_value=client)):
+            result = runner.invoke(app, ["list"])
+
+        assert result.exit_code == 1
+        assert "no such socket" in result.output
+        client.close.assert_called_once()
+
 
 class TestResetPasswordCommand:
     """Tests for user reset-password command."""
-    
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
-    @patch('cli.commands.user.docker_compose_cmd')
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
     @patch('typer.prompt')
-    def test_reset_password_interactive(self, mock_prompt, mock_docker_compose, mock_container, mock_check):
+    def test_reset_password_interactive(self, mock_prompt, mock_container, mock_check):
         """Test reset-password in interactive mode."""
         mock_container.return_value = True
-        mock_docker_compose.side_effect = [
-            Mock(stdout="admin:admin\ntestuser:testuser\n", returncode=0),  # list users
-            Mock(stdout="SUCCESS: Password reset for user 'admin'\nUser ID: 1\n", returncode=0)  # reset
-        ]
         mock_prompt.side_effect = ["newpass123", "newpass123"]
-        
-        result = runner.invoke(app, ["reset-password", "admin"])
-        
-        assert mock_docker_compose.call_count >= 2
-    
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
-    @patch('cli.commands.user.docker_compose_cmd')
-    def test_reset_password_with_password_flag(self, mock_docker_compose, mock_container, mock_check):
+        client_class, client = rpc_client(USERS, USERS[0])
+
+        with patch('cli.utils.rpc.AdminRPCClient', client_class):
+            result = runner.invoke(app, ["reset-password", "admin"])
+
+        assert result.exit_code == 0
+        assert client.call.call_args.kwargs == {"username": "admin", "password": "newpass123"}
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
+    def test_reset_password_with_password_flag(self, mock_container, mock_check):
         """Test reset-password with password flag."""
         mock_container.return_value = True
-        mock_docker_compose.side_effect = [
-            Mock(stdout="admin:admin\ntestuser:testuser\n", returncode=0),  # list users
-            Mock(stdout="SUCCESS: Password reset for user 'admin'\n", returncode=0)  # reset
-        ]
-        
-        result = runner.invoke(app, ["reset-password", "admin", "--password", "newpass123"])
-        
-        assert mock_docker_compose.call_count >= 2
-    
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
-    @patch('cli.commands.user.docker_compose_cmd')
-    def test_reset_password_user_not_found(self, mock_docker_compose, mock_container, mock_check):
+        client_class, client = rpc_client(USERS, USERS[0])
+
+        with patch('cli.utils.rpc.AdminRPCClient', client_class):
+            result = runner.invoke(app, ["reset-password", "admin", "--password", "newpass123"])
+
+        assert result.exit_code == 0
+        assert "Password reset successfully" in result.stdout
+        assert client.call.call_args.args == ("users.reset_password",)
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
+    def test_reset_password_user_not_found(self, mock_container, mock_check):
         """Test error when user doesn't exist."""
         mock_container.return_value = True
-        mock_docker_compose.return_value = Mock(stdout="admin:admin\n", returncode=0)
-        
-        result = runner.invoke(app, ["reset-password", "nonexistent", "--password", "test123"])
-        
+        client_class, client = rpc_client(USERS)
+
+        with patch('cli.utils.rpc.AdminRPCClient', client_class):
+            result = runner.invoke(app, ["reset-password", "nonexistent", "--password", "test123"])
+
         assert result.exit_code != 0
-    
-    @patch('cli.commands.user.check_docker')
-    @patch('cli.commands.user.is_container_running')
+        assert "testuser" in result.stdout  # Existing users listed
+        assert client.call.call_count == 2
+
+    @patch('cli.utils.rpc.check_docker')
+    @patch('cli.utils.rpc.is_container_running')
     def test_reset_password_backend_not_running(self, mock_container, mock_check):
         """Test error when backend not running."""
         mock_container.return_value = False
-        
+
         result = runner.invoke(app, ["reset-password", "admin", "--password", "test123"])
-        
-        assert result.exit_code != 0
 
+        assert result.exit_code != 0
@@ -2,6 +2,7 @@
 
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+import json
 import subprocess
 import sys
 from pathlib import Path
@@ -11,8 +12,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from cli.utils.docker import (
     has_docker_group,
     get_docker_compose_command,
+    with_docker_group,
     is_container_running,
-    get_container_status
+    get_container_states,
+    get_container_status,
+    watch_container_events
 )
 
 
@@ -40,6 +44,25 @@ class TestHasDockerGroup:
             with patch('grp.getgrnam', side_effect=KeyError("docker")):
                 # If docker group doesn't exist, return True to skip sg command
                 assert has_docker_group() is True
+    
+    def test_result_is_cached(self):
+        """Test group membership is checked once per process."""
+        with patch('shutil.which', return_value="/usr/bin/sg"):
+            with patch('grp.getgrnam') as mock_grp:
+                mock_grp.return_value = Mock(gr_gid=999)
+                with patch('os.getgroups', return_value=[1000]):
+                    assert has_docker_group() is False
+                    assert has_docker_group() is False
+                assert mock_grp.call_count == 1
+    
+    def test_wraps_command_in_sg(self):
+        """Test commands are quoted for sg when not in the docker group."""
+        with patch('cli.utils.docker.has_docker_group', return_value=False):
+            assert with_docker_group(["docker", "ps", "--format", "{{.Names}}\t{{.State}}"]) == [
+                "sg", "docker", "-c", "docker ps --format '{{.Names}}\t{{.State}}'"
+            ]
+        with patch('cli.utils.docker.has_docker_group', return_value=True):
+            assert with_docker_group(["docker", "ps"]) == ["docker", "ps"]
 
 
 class TestGetDockerComposeCommand:
@@ -63,6 +86,16 @@ class TestGetDockerComposeCommand:
             with patch('subprocess.run', side_effect=FileNotFoundError()):
                 with pytest.raises(FileNotFoundError):
                     get_docker_compose_command()
+    
+    def test_probe_is_cached(self):
+        """Test `docker compose version` runs once and callers get copies."""
+        with patch('shutil.which', return_value=None):
+            with patch('subprocess.run') as mock_run:
+                mock_run.return_value = Mock(returncode=0)
+                command = get_docker_compose_command()
+                command.append("up")
+                assert get_docker_compose_command() == ["docker", "compose"]
+                assert mock_run.call_count == 1
 
 
 class TestIsContainerRunning:
@@ -73,7 +106,7 @@ class TestIsContainerRunning:
         with patch('cli.utils.docker.has_docker_group', return_value=True):
             with patch('subprocess.run') as mock_run:
                 mock_run.return_value = Mock(
-                    stdout="docklite-backend\ndocklite-frontend\n",
+                    stdout="docklite-backend\trunning\ndocklite-frontend\trunning\n",
                     returncode=0
                 )
                 assert is_container_running("docklite-backend") is True
@@ -83,7 +116,7 @@ class TestIsContainerRunning:
         with patch('cli.utils.docker.has_docker_group', return_value=True):
             with patch('subprocess.run') as mock_run:
                 mock_run.return_value = Mock(
-                    stdout="docklite-frontend\n",
+                    stdout="docklite-backend\texited\ndocklite-frontend\trunning\n",
                     returncode=0
                 )
                 assert is_container_running("docklite-backend") is False
@@ -95,17 +128,69 @@ class TestIsContainerRunning:
                 assert is_container_running("docklite-backend") is False
 
 
+class TestGetContainerStates:
+    """Tests for get_container_states function."""
+    
+    def test_missing_containers(self):
+        """Test requested containers that don't exist are reported missing."""
+        with patch('cli.utils.docker.has_docker_group', return_value=True):
+            with patch('subprocess.run') as mock_run:
+                mock_run.return_value = Mock(stdout="web\tpaused\n", returncode=0)
+                assert get_container_states("web", "db") == {"web": "paused", "db": "missing"}
+    
+    def test_all_containers(self):
+        """Test all containers are returned when no name is given."""
+        with patch('cli.utils.docker.has_docker_group', return_value=True):
+            with patch('subprocess.run') as mock_run:
+                mock_run.return_value = Mock(stdout="web\trunning\ndb\texited\n", returncode=0)
+                assert get_container_states() == {"web": "running", "db": "exited"}
+
+
 class TestGetContainerStatus:
     """Tests for get_container_status function."""
     
     def test_returns_status_dict(self):
-        """Test returns dictionary with container statuses."""
-        with patch('cli.utils.docker.is_container_running') as mock_running:
-            mock_running.side_effect = [True, True, False]  # traefik, backend, frontend
-            status = get_container_status()
+        """Test returns dictionary with container statuses from one docker call."""
+        with patch('cli.utils.docker.has_docker_group', return_value=True):
+            with patch('subprocess.run') as mock_run:
+                mock_run.return_value = Mock(
+                    stdout="docklite-traefik\trunning\ndocklite-backend\trunning\n"
+                           "docklite-frontend\texited\nother\trunning\n",
+                    returncode=0
+                )
+                status = get_container_status()
             
+            assert mock_run.call_count == 1
             assert isinstance(status, dict)
             assert status["traefik"] is True
             assert status["backend"] is True
             assert status["frontend"] is False
 
+
+class TestWatchContainerEvents:
+    """Tests for watch_container_events function."""
+    
+    def test_yields_state_changes(self):
+        """Test events are mapped to states and others are ignored."""
+        events = [
+            {"Type": "container", "Action": "die", "Actor": {"Attributes": {"name": "docklite-backend"}}},
+            {"Type": "container", "Action": "exec_start: sh", "Actor": {"Attributes": {"name": "docklite-backend"}}},
+            {"Type": "container", "Action": "start", "Actor": {"Attributes": {"name": "docklite-backend"}}},
+        ]
+        process = Mock()
+        process.stdout = iter([json.dumps(e) + "\n" for e in events] + ["not json\n"])
+        process.wait.return_value = 1
+        process.poll.return_value = 1
+        
+        with patch('cli.utils.docker.has_docker_group', return_value=True):
+            with patch('subprocess.Popen', return_value=process) as mock_popen:
+                stream = watch_container_events("docklite-backend")
+                assert next(stream) == ("docklite-backend", "exited")
+                assert next(stream) == ("docklite-backend", "running")
+                with pytest.raises(RuntimeError, match="exited with code 1"):
+                    next(stream)
+        
+        cmd = mock_popen.call_args.args[0]
+        assert cmd[:2] == ["docker", "events"]
+        assert "container=docklite-backend" in cmd
+        assert mock_popen.call_args.kwargs["stderr"] == subprocess.DEVNULL
@@ -0,0 +1,97 @@
+"""Tests for the admin RPC client."""
+
+import json
+import socket
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cli.utils.rpc import AdminRPCClient, AdminRPCError
+
+# Stand-in for `docker compose exec ... rpc_call`: answers each request line
+RELAY_SCRIPT = """
+import json, sys
+for line in sys.stdin:
+    request = json.loads(line)
+    print(json.dumps({"id": request["id"], "result": ["relay", request["method"]]}), flush=True)
+"""
+
+
+@pytest.fixture
+def admin_socket(tmp_path):
+    """Unix socket server answering like the backend; yields (path, requests)"""
+    path = tmp_path / "admin.sock"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen(1)
+    requests = []
+
+    def serve():
+        conn, _ = server.accept()
+        with conn, conn.makefile("rb") as lines:
+            for line in lines:
+                request = json.loads(line)
+                requests.append(request)
+                if request["method"] == "fail":
+                    response = {"id": request["id"], "error": {"code": "not_found", "message": "nope"}}
+                else:
+                    response = {"id": request["id"], "result": request["params"]}
+                conn.sendall(json.dumps(response).encode() + b"\n")
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield path, requests
+    server.close()
+
+
+class TestAdminRPCClient:
+    """Tests for AdminRPCClient."""
+
+    def test_calls_share_one_connection(self, admin_socket):
+        """Test results are returned and requests get increasing ids."""
+        path, requests = admin_socket
+
+        with AdminRPCClient(path) as client:
+            assert client.call("echo", value=1) == {"value": 1}
+            assert client.call("echo") == {}
+            assert not client.via_relay
+
+        assert [r["id"] for r in requests] == [1, 2]
+
+    def test_error_response(self, admin_socket):
+        """Test error responses raise AdminRPCError."""
+        path, _ = admin_socket
+
+        with AdminRPCClient(path) as client:
+            with pytest.raises(AdminRPCError) as exc:
+                client.call("fail")
+
+        assert exc.value.code == "not_found"
+        assert exc.value.message == "nope"
+
+    def test_falls_back_to_relay(self, tmp_path):
+        """Test calls go through the exec relay when the socket is missing."""
+        with patch('cli.utils.rpc.get_docker_compose_command', return_value=[sys.executable, "-c", RELAY_SCRIPT]), \
+             patch('cli.utils.docker.has_docker_group', return_value=True):
+            with AdminRPCClient(tmp_path / "missing.sock") as client:
+                assert client.via_relay
+                assert client.call("users.list") == ["relay", "users.list"]
+                assert client.call("ping") == ["relay", "ping"]
+
+    def test_relay_failure(self, tmp_path):
+        """Test relay errors are reported."""
+        script = "import sys; sys.stderr.write('admin socket unavailable'); sys.exit(1)"
+        with patch('cli.utils.rpc.get_docker_compose_command', return_value=[sys.executable, "-c", script]), \
+             patch('cli.utils.docker.has_docker_group', return_value=True):
+            client = AdminRPCClient(tmp_path / "missing.sock")
+            with pytest.raises(AdminRPCError) as exc:
+                client.call("ping")
+            client.close()
+
+        assert exc.value.code == "unavailable"
+        assert "admin socket unavailable" in exc.value.message
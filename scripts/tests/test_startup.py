@@ -0,0 +1,96 @@
+"""Tests for CLI startup cost (lazy subcommands) and the completion index."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cli.main import app as main_app
+
+SCRIPTS_DIR = Path(__file__).parent.parent
+# Generous bound for `import cli.main` on slow CI machines (~40ms locally)
+IMPORT_BUDGET_SECONDS = 0.5
+
+runner = CliRunner()
+
+
+def run_python(code: str) -> dict:
+    """Run code in a fresh interpreter; it prints a JSON result."""
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TestLazyImport:
+    """Tests that command modules are imported only when needed."""
+
+    def test_import_skips_command_modules(self):
+        """Test importing the entry point loads no command module."""
+        result = run_python(
+            "import json, sys, time\n"
+            "start = time.perf_counter()\n"
+            "import cli.main\n"
+            "elapsed = time.perf_counter() - start\n"
+            "print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))\n"
+        )
+
+        assert not [m for m in result["modules"] if m.startswith("cli.commands")]
+        assert "rich.table" not in result["modules"]
+        assert result["elapsed"] < IMPORT_BUDGET_SECONDS
+
+    def test_command_imports_only_its_module(self):
+        """Test running a command loads only the module defining it."""
+        result = run_python(
+            "import json, sys\n"
+            "from cli.main import app\n"
+            "try:\n"
+            "    app(['user', '--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print(json.dumps(sorted(m for m in sys.modules if m.startswith('cli.commands.'))))\n"
+        )
+
+        assert result == ["cli.commands.user"]
+
+    def test_help_lists_all_commands(self):
+        """Test root help still shows lazy commands with their help."""
+        result = runner.invoke(main_app, ["--help"])
+
+        assert result.exit_code == 0
+        for name in ("dev", "deploy", "user", "maint", "start", "status", "version"):
+            assert name in result.stdout
+        assert "User management commands (4)" in result.stdout
+        assert "completion-index" not in result.stdout
+
+
+class TestCompletionIndex:
+    """Tests for the completion-index command."""
+
+    def test_writes_index(self, tmp_path):
+        """Test the index lists groups, commands and their options."""
+        index = tmp_path / "cache" / "completion-index"
+
+        result = runner.invoke(main_app, ["completion-index", "--output", str(index)])
+
+        assert result.exit_code == 0
+        lines = index.read_text().splitlines()
+        assert lines[0] == "# docklite completion index v1"
+        assert lines[1] == f"# source {(SCRIPTS_DIR / 'cli').resolve()}"
+        entries = {
+            key: (int(nargs), words.split())
+            for key, nargs, words in (line.split("\t") for line in lines[2:])
+        }
+        root_nargs, root_words = entries["."]
+        assert {"dev", "user", "start", "status", "version"} <= set(root_words)
+        assert "completion-index" not in root_words
+        assert entries["user"][1] == ["add", "import", "list", "reset-password"]
+        assert entries["user add"][0] == 1
+        assert "--admin" in entries["user add"][1]
+        assert "--skip-existing" in entries["user import"][1]
+        assert "--install-completion" not in entries["start"][1]